@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Measures the speed of rlibc's floating point conversions in snprintf()
+against the host C library.
+
+Each conversion is timed on three sets of values: short decimals such as those
+found in measurements, random values of moderate size, and doubles with random
+bit patterns, which span the full exponent range.
+"""
+
+import ctypes
+import random
+import struct
+
+from rlibc_bench import RlibcBenchmark
+
+FORMATS = [b'%g', b'%.17g', b'%f', b'%.2f', b'%e', b'%a']
+
+NUM_VALUES = 1024
+
+
+def short_values(rng: random.Random) -> list:
+    return [round(rng.uniform(0, 1000), rng.randint(0, 3))
+            for _ in range(NUM_VALUES)]
+
+
+def moderate_values(rng: random.Random) -> list:
+    return [rng.uniform(0, 1e6) for _ in range(NUM_VALUES)]
+
+
+def random_bits(rng: random.Random) -> list:
+    values = []
+    while len(values) < NUM_VALUES:
+        value = struct.unpack('<d', struct.pack('<Q', rng.getrandbits(63)))[0]
+        if value != float('inf') and value == value:
+            values.append(value)
+    return values
+
+
+VALUE_SETS = [
+    ('short', short_values),
+    ('moderate', moderate_values),
+    ('bits', random_bits),
+]
+
+
+def main() -> None:
+    bench = RlibcBenchmark()
+    host = ctypes.CDLL(None)
+
+    print(f'{"format":>6}  {"values":>8}  {"rlibc":>10}  {"host":>10}  '
+          f'{"speedup":>7}')
+
+    for format_string in FORMATS:
+        for name, generate in VALUE_SETS:
+            # %f prints every integer digit of huge values, which would not fit
+            # in the harness's buffer and is not representative.
+            if format_string.endswith(b'f') and name == 'bits':
+                continue
+
+            values = (ctypes.c_double * NUM_VALUES)(
+                *generate(random.Random(0)))
+            rlibc = bench.time_format_double(format_string, values)
+            libc = bench.time_format_double(format_string, values, host)
+            print(f'{format_string.decode():>6}  {name:>8}  '
+                  f'{rlibc:>7.1f} ns  {libc:>7.1f} ns  {libc / rlibc:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
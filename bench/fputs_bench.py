@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Compares fputs() against fprintf() with a "%s" format.
+
+Both write the same strings to a stream whose device discards its data, so the
+measurement shows the per-call overhead of going through printf's formatter.
+"""
+
+import ctypes
+
+from rlibc_bench import RlibcBenchmark
+
+SIZES = [8, 64, 512, 4096]
+
+# Buffering modes, from <stdio.h>.
+_IOFBF = 0
+_IONBF = 2
+
+BUFSIZ = 1024
+
+
+class File(ctypes.Structure):
+    """Mirror of rlibc's FILE structure."""
+    _fields_ = [('write', ctypes.c_void_p), ('buffer', ctypes.c_void_p),
+                ('buffer_size', ctypes.c_size_t),
+                ('buffered', ctypes.c_size_t), ('mode', ctypes.c_int)]
+
+
+def main() -> None:
+    bench = RlibcBenchmark()
+    discard = bench.address_of(bench.harness, 'rc_bench_discard')
+    buffer = ctypes.create_string_buffer(BUFSIZ)
+
+    print(f'{"stream":<10}  {"size":>6}  {"fprintf":>10}  {"fputs":>10}  '
+          f'{"speedup":>7}')
+
+    for mode, name in ((_IONBF, 'unbuffered'), (_IOFBF, 'buffered')):
+        stream = File(write=discard, mode=mode)
+        if mode != _IONBF:
+            stream.buffer = ctypes.addressof(buffer)
+            stream.buffer_size = BUFSIZ
+        address = ctypes.addressof(stream)
+
+        for size in SIZES:
+            string = b'x' * size
+            fprintf = bench.time_fprintf(string, address)
+            fputs = bench.time_fputs(string, address)
+            print(f'{name:<10}  {size:>6}  {fprintf:>7.1f} ns  '
+                  f'{fputs:>7.1f} ns  {fprintf / fputs:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
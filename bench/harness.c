@@ -0,0 +1,447 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+// Timing loops for rlibc benchmarks.
+//
+// This file is compiled against the host C library into a standalone shared
+// object. Benchmark scripts pass it pointers to the functions under test (from
+// either rlibc's test library or the host libc), so that the timed loop runs
+// entirely in C without any per-call ctypes overhead.
+
+#include <stddef.h>
+#include <stdint.h>
+#include <time.h>
+
+typedef void *(*copy_fn)(void *, const void *, size_t);
+typedef int (*compare_fn)(const void *, const void *, size_t);
+typedef void *(*set_fn)(void *, int, size_t);
+typedef void *(*scan_fn)(const void *, int, size_t);
+typedef size_t (*strlen_fn)(const char *);
+typedef int (*strcmp_fn)(const char *, const char *);
+typedef char *(*strcpy_fn)(char *, const char *);
+typedef void *(*memmem_fn)(const void *, size_t, const void *, size_t);
+typedef char *(*strstr_fn)(const char *, const char *);
+typedef int (*format_fn)(char *, size_t, const void *, ...);
+typedef long long (*parse_fn)(const char *, char **, int);
+typedef void *(*malloc_fn)(size_t);
+typedef void (*free_fn)(void *);
+typedef int (*fputs_fn)(const char *, void *);
+typedef int (*fprintf_fn)(void *, const char *, ...);
+typedef void (*copy_page_fn)(void *, const void *);
+typedef void (*zero_page_fn)(void *);
+
+#define CACHE_LINE_SIZE 64
+
+static uint64_t now_ns(void)
+{
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (uint64_t)ts.tv_sec * 1000000000 + ts.tv_nsec;
+}
+
+// Calls fn(dst, src, n) the specified number of times. Returns the total
+// elapsed time in nanoseconds.
+uint64_t rc_bench_copy(copy_fn fn,
+                       void *dst,
+                       const void *src,
+                       size_t n,
+                       uint64_t iterations)
+{
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        fn(dst, src, n);
+    }
+    return now_ns() - start;
+}
+
+// Calls fn(s1, s2, n) the specified number of times. Returns the total elapsed
+// time in nanoseconds.
+uint64_t rc_bench_compare(compare_fn fn,
+                          const void *s1,
+                          const void *s2,
+                          size_t n,
+                          uint64_t iterations)
+{
+    // Accumulate the results so that the calls cannot be optimized out.
+    volatile int sink = 0;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink += fn(s1, s2, n);
+    }
+    return now_ns() - start;
+}
+
+// Calls fn(dst, c, n) the specified number of times. Returns the total
+// elapsed time in nanoseconds.
+uint64_t rc_bench_set(set_fn fn,
+                      void *dst,
+                      int c,
+                      size_t n,
+                      uint64_t iterations)
+{
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        fn(dst, c, n);
+    }
+    return now_ns() - start;
+}
+
+// Calls fn(s, c, n) the specified number of times. Returns the total elapsed
+// time in nanoseconds.
+uint64_t rc_bench_scan(scan_fn fn,
+                       const void *s,
+                       int c,
+                       size_t n,
+                       uint64_t iterations)
+{
+    void *volatile sink;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink = fn(s, c, n);
+    }
+    (void)sink;
+    return now_ns() - start;
+}
+
+// Calls fn(s) the specified number of times. Returns the total elapsed time in
+// nanoseconds.
+uint64_t rc_bench_strlen(strlen_fn fn, const char *s, uint64_t iterations)
+{
+    volatile size_t sink = 0;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink += fn(s);
+    }
+    return now_ns() - start;
+}
+
+// Calls fn(s1, s2) the specified number of times. Returns the total elapsed
+// time in nanoseconds.
+uint64_t rc_bench_strcmp(strcmp_fn fn,
+                         const char *s1,
+                         const char *s2,
+                         uint64_t iterations)
+{
+    volatile int sink = 0;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink += fn(s1, s2);
+    }
+    return now_ns() - start;
+}
+
+// Calls fn(dst, src) the specified number of times. Returns the total elapsed
+// time in nanoseconds.
+uint64_t rc_bench_strcpy(strcpy_fn fn,
+                         char *dst,
+                         const char *src,
+                         uint64_t iterations)
+{
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        fn(dst, src);
+    }
+    return now_ns() - start;
+}
+
+// Calls fn(haystack, haystack_len, needle, needle_len) the specified number of
+// times. Returns the total elapsed time in nanoseconds.
+uint64_t rc_bench_memmem(memmem_fn fn,
+                         const void *haystack,
+                         size_t haystack_len,
+                         const void *needle,
+                         size_t needle_len,
+                         uint64_t iterations)
+{
+    void *volatile sink;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink = fn(haystack, haystack_len, needle, needle_len);
+    }
+    (void)sink;
+    return now_ns() - start;
+}
+
+// Calls fn(haystack, needle) the specified number of times. Returns the total
+// elapsed time in nanoseconds.
+uint64_t rc_bench_strstr(strstr_fn fn,
+                         const char *haystack,
+                         const char *needle,
+                         uint64_t iterations)
+{
+    char *volatile sink;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink = fn(haystack, needle);
+    }
+    (void)sink;
+    return now_ns() - start;
+}
+
+// Calls fn(buffer, size, format, value, value, value, value) the specified
+// number of times, cycling through the given values, so that formats may
+// contain up to four conversions. If wide is nonzero, the values are passed as
+// unsigned long long; otherwise, as unsigned int. Returns the total elapsed
+// time in nanoseconds.
+//
+// format is passed through untouched, allowing fn to be either snprintf() or
+// rc_snprintf_compiled().
+uint64_t rc_bench_format(format_fn fn,
+                         const void *format,
+                         const uint64_t *values,
+                         size_t count,
+                         int wide,
+                         uint64_t iterations)
+{
+    char buffer[128];
+    volatile int sink = 0;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        if (wide) {
+            unsigned long long v = values[i % count];
+            sink += fn(buffer, sizeof buffer, format, v, v, v, v);
+        } else {
+            unsigned v = values[i % count];
+            sink += fn(buffer, sizeof buffer, format, v, v, v, v);
+        }
+    }
+    return now_ns() - start;
+}
+
+// Calls fn(buffer, size, format, value) the specified number of times, cycling
+// through the given double values. Returns the total elapsed time in
+// nanoseconds.
+uint64_t rc_bench_format_double(format_fn fn,
+                                const void *format,
+                                const double *values,
+                                size_t count,
+                                uint64_t iterations)
+{
+    char buffer[128];
+    volatile int sink = 0;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink += fn(buffer, sizeof buffer, format, values[i % count]);
+    }
+    return now_ns() - start;
+}
+
+// Calls fn(strings[i % count], NULL, base) the specified number of times.
+// Returns the total elapsed time in nanoseconds.
+uint64_t rc_bench_parse(parse_fn fn,
+                        const char *const *strings,
+                        size_t count,
+                        int base,
+                        uint64_t iterations)
+{
+    volatile long long sink = 0;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink += fn(strings[i % count], NULL, base);
+    }
+    return now_ns() - start;
+}
+
+#define CHURN_MAX_SLOTS 1024
+
+// Simulates a program's allocation pattern with a pool of `slots` live blocks.
+// Each iteration frees a pseudo-randomly chosen block and replaces it with a
+// new allocation, cycling through the given sizes. All blocks are freed at the
+// end. Returns the total elapsed time in nanoseconds.
+uint64_t rc_bench_churn(malloc_fn alloc,
+                        free_fn release,
+                        const size_t *sizes,
+                        size_t count,
+                        size_t slots,
+                        uint64_t iterations)
+{
+    void *pool[CHURN_MAX_SLOTS] = {0};
+    uint64_t state = 1;
+
+    if (slots > CHURN_MAX_SLOTS) {
+        slots = CHURN_MAX_SLOTS;
+    }
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        state = state * 6364136223846793005ULL + 1442695040888963407ULL;
+        size_t slot = (state >> 33) % slots;
+        release(pool[slot]);
+        pool[slot] = alloc(sizes[i % count]);
+    }
+    for (size_t i = 0; i < slots; ++i) {
+        release(pool[i]);
+    }
+    return now_ns() - start;
+}
+
+// A stream write function which discards its data, for use as the device of a
+// benchmarked stream.
+size_t rc_bench_discard(void *stream, const char *data, size_t size)
+{
+    (void)stream;
+    (void)data;
+    return size;
+}
+
+// Calls fn(string, stream) the specified number of times. Returns the total
+// elapsed time in nanoseconds.
+uint64_t rc_bench_fputs(fputs_fn fn,
+                        const char *string,
+                        void *stream,
+                        uint64_t iterations)
+{
+    volatile int sink = 0;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink += fn(string, stream);
+    }
+    return now_ns() - start;
+}
+
+// Calls fn(stream, "%s", string) the specified number of times. Returns the
+// total elapsed time in nanoseconds.
+uint64_t rc_bench_fprintf(fprintf_fn fn,
+                          void *stream,
+                          const char *string,
+                          uint64_t iterations)
+{
+    volatile int sink = 0;
+
+    uint64_t start = now_ns();
+    for (uint64_t i = 0; i < iterations; ++i) {
+        sink += fn(stream, "%s", string);
+    }
+    return now_ns() - start;
+}
+
+// Links the cache lines of a working set into a single cycle in a random
+// order, for the workload of rc_bench_pollution(). Following the chain visits
+// every line, and as each load depends on the previous one, the time taken
+// reflects where the lines are found in the cache hierarchy.
+void rc_bench_make_chain(void *working_set, size_t size, uint64_t seed)
+{
+    const size_t lines = size / CACHE_LINE_SIZE;
+    uint8_t *const base = working_set;
+
+    // Sattolo's algorithm: shuffling the identity permutation, swapping each
+    // element only with those before it, yields a single random cycle.
+    for (size_t i = 0; i < lines; ++i) {
+        *(void **)(base + i * CACHE_LINE_SIZE) = base + i * CACHE_LINE_SIZE;
+    }
+    for (size_t i = lines - 1; i > 0; --i) {
+        seed = seed * 6364136223846793005ULL + 1442695040888963407ULL;
+        size_t j = (seed >> 33) % i;
+        void **a = (void **)(base + i * CACHE_LINE_SIZE);
+        void **b = (void **)(base + j * CACHE_LINE_SIZE);
+        void *tmp = *a;
+        *a = *b;
+        *b = tmp;
+    }
+}
+
+enum pollution_op {
+    POLLUTION_NONE,
+    // fn(dst, src, chunk) for each chunk of the region.
+    POLLUTION_COPY,
+    // fn(dst, 0, chunk) for each chunk of the region.
+    POLLUTION_SET,
+    // fn(dst, src) for each page of the region.
+    POLLUTION_COPY_PAGE,
+    // fn(dst) for each page of the region.
+    POLLUTION_ZERO_PAGE,
+};
+
+// Measures the effect of a memory operation on a cache-resident workload
+// sharing the processor with it, as a process does with the kernel copying or
+// zeroing pages on its behalf.
+//
+// Each iteration runs the operation over the n bytes at dst (and src), split
+// into calls of chunk bytes, and then the workload, which follows the chain
+// built by rc_bench_make_chain() through its working set once. The total time
+// spent in each is returned through op_ns and workload_ns.
+void rc_bench_pollution(int op,
+                        void *fn,
+                        uint8_t *dst,
+                        const uint8_t *src,
+                        size_t n,
+                        size_t chunk,
+                        void *working_set,
+                        size_t working_set_size,
+                        uint64_t iterations,
+                        uint64_t *op_ns,
+                        uint64_t *workload_ns)
+{
+    const size_t lines = working_set_size / CACHE_LINE_SIZE;
+    void *volatile sink;
+    void **p = working_set;
+
+    *op_ns = 0;
+    *workload_ns = 0;
+
+    for (uint64_t i = 0; i < iterations; ++i) {
+        uint64_t start = now_ns();
+        for (size_t offset = 0; offset < n; offset += chunk) {
+            switch (op) {
+            case POLLUTION_COPY:
+                ((copy_fn)fn)(dst + offset, src + offset, chunk);
+                break;
+            case POLLUTION_SET:
+                ((set_fn)fn)(dst + offset, 0, chunk);
+                break;
+            case POLLUTION_COPY_PAGE:
+                ((copy_page_fn)fn)(dst + offset, src + offset);
+                break;
+            case POLLUTION_ZERO_PAGE:
+                ((zero_page_fn)fn)(dst + offset);
+                break;
+            default:
+                break;
+            }
+        }
+        uint64_t middle = now_ns();
+
+        for (size_t line = 0; line < lines; ++line) {
+            p = *p;
+        }
+        sink = p;
+
+        uint64_t end = now_ns();
+        *op_ns += middle - start;
+        *workload_ns += end - middle;
+    }
+    (void)sink;
+}
+
+#if defined(__x86_64__) || defined(__i386__)
+
+// Bare `rep movsb` and `rep stosb`, with the signatures of memcpy() and
+// memset(), against which rlibc's small-size paths are compared to find where
+// the string instructions' startup cost stops dominating.
+void *rc_bench_rep_movsb(void *dst, const void *src, size_t n)
+{
+    void *d = dst;
+    __asm__ volatile("rep movsb" : "+c"(n), "+D"(d), "+S"(src) : : "memory");
+    return dst;
+}
+
+void *rc_bench_rep_stosb(void *dst, int c, size_t n)
+{
+    void *d = dst;
+    __asm__ volatile("rep stosb" : "+c"(n), "+D"(d) : "a"(c) : "memory");
+    return dst;
+}
+
+#endif  // defined(__x86_64__) || defined(__i386__)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Measures the speed of rlibc's malloc() and free() against the host C
+library.
+
+Each workload keeps a pool of live allocations and repeatedly frees a random
+one, replacing it with a new allocation drawn from a size distribution.
+"""
+
+import ctypes
+import random
+
+from rlibc_bench import RlibcBenchmark
+
+NUM_SIZES = 4096
+
+# (name, smallest size, largest size)
+WORKLOADS = [
+    ('small', 8, 128),
+    ('mixed', 8, 4096),
+    ('large', 16 * 1024, 256 * 1024),
+]
+
+# Large enough to spill out of the caches, while keeping the large workload
+# within the 64 MiB arena of the test library.
+POOL_SIZES = [16, 256]
+
+
+def sample_sizes(low: int, high: int) -> ctypes.Array:
+    """Returns random allocation sizes, skewed towards the smaller end."""
+    rng = random.Random(low)
+    sizes = [int(low * (high / low)**rng.random()) for _ in range(NUM_SIZES)]
+    return (ctypes.c_size_t * NUM_SIZES)(*sizes)
+
+
+def main() -> None:
+    bench = RlibcBenchmark()
+    host = ctypes.CDLL(None)
+
+    print(f'{"workload":<8}  {"pool":>5}  {"rlibc":>10}  {"host":>10}  '
+          f'{"speedup":>7}')
+
+    for name, low, high in WORKLOADS:
+        sizes = sample_sizes(low, high)
+        for slots in POOL_SIZES:
+            rlibc = bench.time_churn(sizes, slots)
+            libc = bench.time_churn(sizes, slots, host)
+            print(f'{name:<8}  {slots:>5}  {rlibc:>7.1f} ns  {libc:>7.1f} ns  '
+                  f'{libc / rlibc:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
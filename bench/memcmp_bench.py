@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Measures rlibc's memcmp() and rc_memeq() throughput.
+
+Buffers are compared in full (they are equal), across sizes and relative
+alignments. Optionally, another build of rlibc's test library can be passed
+to compare against its memcmp().
+"""
+
+import argparse
+import ctypes
+from pathlib import Path
+
+from rlibc_bench import RlibcBenchmark, format_size
+
+SIZES = [8, 64, 512, 4096, 65536, 2**20]
+
+# (s1, s2) offsets from a 64-byte aligned address.
+ALIGNMENTS = [(0, 0), (0, 3), (5, 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--baseline',
+                        type=Path,
+                        help='another test_rlibc.so to compare against')
+    args = parser.parse_args()
+
+    bench = RlibcBenchmark()
+    baseline = (ctypes.cdll.LoadLibrary(args.baseline.resolve())
+                if args.baseline else None)
+
+    size = max(SIZES) + 128
+    buffers = [ctypes.create_string_buffer(b'\x5a' * size, size)
+               for _ in range(2)]
+    aligned = [(ctypes.addressof(buf) + 63) & ~63 for buf in buffers]
+
+    header = f'{"size":>8}  {"align":>5}  {"memcmp":>10}  {"rc_memeq":>10}'
+    if baseline:
+        header += f'  {"baseline":>10}  {"speedup":>7}'
+    print(header)
+
+    for size in SIZES:
+        for align1, align2 in ALIGNMENTS:
+            s1, s2 = aligned[0] + align1, aligned[1] + align2
+
+            # Throughput in GB/s (bytes per nanosecond).
+            memcmp = size / bench.time_compare('memcmp', s1, s2, size)
+            memeq = size / bench.time_compare('rc_memeq', s1, s2, size)
+            line = (f'{format_size(size):>8}  {align1:>2},{align2:<2}  '
+                    f'{memcmp:>5.2f} GB/s  {memeq:>5.2f} GB/s')
+
+            if baseline:
+                base = size / bench.time_compare('memcmp', s1, s2, size,
+                                                 baseline)
+                line += f'  {base:>5.2f} GB/s  {memcmp / base:>6.1f}x'
+
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Compares rlibc's memmove() throughput for forward and backward copies.
+
+Overlapping moves with dst > src must copy backwards. This benchmark checks
+that they keep up with forward copies across buffer sizes.
+"""
+
+import argparse
+import ctypes
+
+from rlibc_bench import RlibcBenchmark, format_size
+
+# 4 KiB to 4 MiB.
+SIZES = [2**n for n in range(12, 23, 2)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--offset',
+                        type=int,
+                        default=64,
+                        help='distance in bytes between src and dst')
+    args = parser.parse_args()
+
+    bench = RlibcBenchmark()
+    buffer = ctypes.create_string_buffer(max(SIZES) + args.offset)
+    ctypes.memset(buffer, 0xaa, len(buffer))
+    low = ctypes.addressof(buffer)
+    high = low + args.offset
+
+    print(f'{"size":>8}  {"memmove fwd":>13}  {"memmove bwd":>13}  '
+          f'{"bwd/fwd":>7}')
+
+    for size in SIZES:
+        # Throughput of each direction in GB/s (bytes per nanosecond).
+        fwd = size / bench.time_copy('memmove', low, high, size)
+        bwd = size / bench.time_copy('memmove', high, low, size)
+        print(f'{format_size(size):>8}  {fwd:>8.2f} GB/s  {bwd:>8.2f} GB/s  '
+              f'{bwd / fwd:>7.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Measures the speed of integer conversions in rlibc's snprintf().
+
+Each conversion formats values spread evenly across digit counts. Optionally,
+another build of rlibc's test library can be passed to compare against, and
+the host C library can be included for reference.
+"""
+
+import argparse
+import ctypes
+from pathlib import Path
+import random
+
+from rlibc_bench import RlibcBenchmark
+
+# (format, whether the argument is 64 bits wide, maximum value)
+CONVERSIONS = [
+    (b'%d', False, 2**31 - 1),
+    (b'%u', False, 2**32 - 1),
+    (b'%x', False, 2**32 - 1),
+    (b'%llu', True, 2**64 - 1),
+    (b'%llx', True, 2**64 - 1),
+]
+
+NUM_VALUES = 1024
+
+
+def sample_values(maximum: int) -> ctypes.Array:
+    """Returns values up to maximum with uniformly distributed bit lengths."""
+    rng = random.Random(0)
+    values = []
+    for _ in range(NUM_VALUES):
+        bits = rng.randint(1, maximum.bit_length())
+        values.append(min(rng.getrandbits(bits), maximum))
+    return (ctypes.c_uint64 * NUM_VALUES)(*values)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--baseline',
+                        type=Path,
+                        help='another test_rlibc.so to compare against')
+    parser.add_argument('--host',
+                        action='store_true',
+                        help="include the host C library's snprintf()")
+    args = parser.parse_args()
+
+    bench = RlibcBenchmark()
+    baseline = (ctypes.cdll.LoadLibrary(args.baseline.resolve())
+                if args.baseline else None)
+    host = ctypes.CDLL(None) if args.host else None
+
+    header = f'{"format":>6}  {"rlibc":>10}'
+    if baseline:
+        header += f'  {"baseline":>10}  {"speedup":>7}'
+    if host:
+        header += f'  {"host":>10}'
+    print(header)
+
+    for format_string, wide, maximum in CONVERSIONS:
+        values = sample_values(maximum)
+
+        # Calls per microsecond.
+        rlibc = 1000 / bench.time_format(format_string, values, wide)
+        line = f'{format_string.decode():>6}  {rlibc:>6.1f}/us'
+
+        if baseline:
+            base = 1000 / bench.time_format(format_string, values, wide,
+                                            baseline)
+            line += f'  {base:>6.1f}/us  {rlibc / base:>6.2f}x'
+
+        if host:
+            libc = 1000 / bench.time_format(format_string, values, wide, host)
+            line += f'  {libc:>6.1f}/us'
+
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
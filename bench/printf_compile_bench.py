@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Compares snprintf() against rc_snprintf_compiled().
+
+Each format string is formatted repeatedly, either parsing it on every call or
+using a copy compiled once up front by rc_printf_compile().
+"""
+
+import ctypes
+import random
+
+from rlibc_bench import RlibcBenchmark
+
+# Format strings typical of logging, taking up to four unsigned int arguments.
+FORMATS = [
+    b'%u',
+    b'starting up, please wait',
+    b'irq %u: count=%u',
+    b'[%5u] cpu%u: %08x %x\n',
+    b'%-8u|%8u|%#010x|%u',
+]
+
+MAX_SEGMENTS = 16
+
+
+class PrintfSegment(ctypes.Structure):
+    """Mirror of rlibc's struct rc_printf_segment."""
+    _fields_ = [('literal', ctypes.c_char_p),
+                ('literal_length', ctypes.c_size_t), ('type', ctypes.c_int),
+                ('flags', ctypes.c_uint32), ('base', ctypes.c_uint32),
+                ('precision', ctypes.c_int32), ('width', ctypes.c_int32)]
+
+
+def main() -> None:
+    bench = RlibcBenchmark()
+
+    rng = random.Random(0)
+    values = (ctypes.c_uint64 * 256)(*(rng.getrandbits(rng.randint(1, 32))
+                                       for _ in range(256)))
+
+    print(f'{"format":<28}  {"snprintf":>10}  {"compiled":>10}  {"speedup":>7}')
+
+    for format_string in FORMATS:
+        segments = (PrintfSegment * MAX_SEGMENTS)()
+        if bench.rlibc.rc_printf_compile(segments, MAX_SEGMENTS,
+                                         format_string) < 0:
+            raise RuntimeError(f'failed to compile {format_string!r}')
+
+        # Calls per microsecond.
+        parsed = 1000 / bench.time_format(format_string, values, False)
+        compiled = 1000 / bench.time_format(ctypes.addressof(segments),
+                                            values,
+                                            False,
+                                            function='rc_snprintf_compiled')
+
+        label = repr(format_string)[2:-1]
+        print(f'{label:<28}  {parsed:>6.1f}/us  {compiled:>6.1f}/us  '
+              f'{compiled / parsed:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,409 @@
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Benchmark helpers for rlibc."""
+
+import ctypes
+from pathlib import Path
+import subprocess
+from typing import Callable, Optional, Tuple
+
+
+def format_size(size: int) -> str:
+    """Formats a byte count using binary units, e.g. 4096 -> '4 KiB'."""
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024 or size % 1024 != 0:
+            return f'{size} {unit}'
+        size //= 1024
+    return f'{size} GiB'
+
+
+class RlibcBenchmark:
+    """Loads rlibc's test library alongside the C benchmark harness.
+
+    Timed loops run in the harness, which calls the function under test through
+    a pointer, so measurements do not include any ctypes overhead.
+    """
+
+    # Paths to the test rlibc binary and benchmark harness from the rlibc
+    # repository root.
+    RLIBC_TEST_SO: Path = Path('build') / 'test_rlibc.so'
+    HARNESS_SO: Path = Path('build') / 'bench_harness.so'
+
+    # Minimum duration of a single measurement, in nanoseconds.
+    MIN_DURATION_NS = 20_000_000
+
+    # Number of times each measurement is repeated. The fastest run is kept.
+    REPEATS = 5
+
+    def __init__(self):
+        root = Path(
+            subprocess.check_output(
+                ('git', 'rev-parse',
+                 '--show-toplevel')).decode('utf-8').strip())
+
+        for lib in (self.RLIBC_TEST_SO, self.HARNESS_SO):
+            if not (root / lib).exists():
+                raise RuntimeError(
+                    f'No library found at {root / lib}; run `make bench-lib`')
+
+        self.rlibc = ctypes.cdll.LoadLibrary(root / self.RLIBC_TEST_SO)
+        self.harness = ctypes.cdll.LoadLibrary(root / self.HARNESS_SO)
+
+        self.harness.rc_bench_copy.restype = ctypes.c_uint64
+        self.harness.rc_bench_copy.argtypes = (ctypes.c_void_p,
+                                               ctypes.c_void_p,
+                                               ctypes.c_void_p,
+                                               ctypes.c_size_t,
+                                               ctypes.c_uint64)
+        self.harness.rc_bench_compare.restype = ctypes.c_uint64
+        self.harness.rc_bench_compare.argtypes = (ctypes.c_void_p,
+                                                  ctypes.c_void_p,
+                                                  ctypes.c_void_p,
+                                                  ctypes.c_size_t,
+                                                  ctypes.c_uint64)
+        self.harness.rc_bench_set.restype = ctypes.c_uint64
+        self.harness.rc_bench_set.argtypes = (ctypes.c_void_p,
+                                              ctypes.c_void_p,
+                                              ctypes.c_int,
+                                              ctypes.c_size_t,
+                                              ctypes.c_uint64)
+        self.harness.rc_bench_scan.restype = ctypes.c_uint64
+        self.harness.rc_bench_scan.argtypes = (ctypes.c_void_p,
+                                               ctypes.c_void_p,
+                                               ctypes.c_int,
+                                               ctypes.c_size_t,
+                                               ctypes.c_uint64)
+        self.harness.rc_bench_strlen.restype = ctypes.c_uint64
+        self.harness.rc_bench_strlen.argtypes = (ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_uint64)
+        self.harness.rc_bench_strcmp.restype = ctypes.c_uint64
+        self.harness.rc_bench_strcmp.argtypes = (ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_uint64)
+
+        self.harness.rc_bench_strcpy.restype = ctypes.c_uint64
+        self.harness.rc_bench_strcpy.argtypes = (ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_uint64)
+
+        self.harness.rc_bench_memmem.restype = ctypes.c_uint64
+        self.harness.rc_bench_memmem.argtypes = (ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_size_t,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_size_t,
+                                                 ctypes.c_uint64)
+
+        self.harness.rc_bench_strstr.restype = ctypes.c_uint64
+        self.harness.rc_bench_strstr.argtypes = (ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_uint64)
+
+        self.harness.rc_bench_format.restype = ctypes.c_uint64
+        self.harness.rc_bench_format.argtypes = (ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_void_p,
+                                                 ctypes.c_size_t,
+                                                 ctypes.c_int,
+                                                 ctypes.c_uint64)
+
+        self.harness.rc_bench_format_double.restype = ctypes.c_uint64
+        self.harness.rc_bench_format_double.argtypes = (ctypes.c_void_p,
+                                                        ctypes.c_void_p,
+                                                        ctypes.c_void_p,
+                                                        ctypes.c_size_t,
+                                                        ctypes.c_uint64)
+
+        self.harness.rc_bench_parse.restype = ctypes.c_uint64
+        self.harness.rc_bench_parse.argtypes = (ctypes.c_void_p,
+                                                ctypes.c_void_p,
+                                                ctypes.c_size_t,
+                                                ctypes.c_int,
+                                                ctypes.c_uint64)
+
+        self.harness.rc_bench_churn.restype = ctypes.c_uint64
+        self.harness.rc_bench_churn.argtypes = (ctypes.c_void_p,
+                                                ctypes.c_void_p,
+                                                ctypes.c_void_p,
+                                                ctypes.c_size_t,
+                                                ctypes.c_size_t,
+                                                ctypes.c_uint64)
+
+        self.harness.rc_bench_fputs.restype = ctypes.c_uint64
+        self.harness.rc_bench_fputs.argtypes = (ctypes.c_void_p,
+                                                ctypes.c_char_p,
+                                                ctypes.c_void_p,
+                                                ctypes.c_uint64)
+        self.harness.rc_bench_fprintf.restype = ctypes.c_uint64
+        self.harness.rc_bench_fprintf.argtypes = (ctypes.c_void_p,
+                                                  ctypes.c_void_p,
+                                                  ctypes.c_char_p,
+                                                  ctypes.c_uint64)
+
+        self.harness.rc_bench_make_chain.restype = None
+        self.harness.rc_bench_make_chain.argtypes = (ctypes.c_void_p,
+                                                     ctypes.c_size_t,
+                                                     ctypes.c_uint64)
+        self.harness.rc_bench_pollution.restype = None
+        self.harness.rc_bench_pollution.argtypes = (ctypes.c_int,
+                                                    ctypes.c_void_p,
+                                                    ctypes.c_void_p,
+                                                    ctypes.c_void_p,
+                                                    ctypes.c_size_t,
+                                                    ctypes.c_size_t,
+                                                    ctypes.c_void_p,
+                                                    ctypes.c_size_t,
+                                                    ctypes.c_uint64,
+                                                    ctypes.c_void_p,
+                                                    ctypes.c_void_p)
+
+    @staticmethod
+    def address_of(lib: ctypes.CDLL, name: str) -> int:
+        """Returns the address of a function within a loaded library."""
+        return ctypes.cast(getattr(lib, name), ctypes.c_void_p).value
+
+    def measure(self, run: Callable[[int], int]) -> float:
+        """Returns the average duration of one iteration in nanoseconds.
+
+        run is called with an iteration count and must return the total time
+        taken in nanoseconds. The count is scaled until a run takes at least
+        MIN_DURATION_NS.
+        """
+        iterations = 1
+        while True:
+            elapsed = run(iterations)
+            if elapsed >= self.MIN_DURATION_NS:
+                break
+            scale = self.MIN_DURATION_NS / max(elapsed, 1)
+            iterations = int(iterations * min(max(scale * 1.2, 2), 1000))
+
+        best = elapsed
+        for _ in range(self.REPEATS - 1):
+            best = min(best, run(iterations))
+
+        return best / iterations
+
+    def time_copy(self,
+                  function: str,
+                  dst: int,
+                  src: int,
+                  size: int,
+                  lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times a memcpy()-like function. Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, function)
+        return self.measure(lambda iterations: self.harness.rc_bench_copy(
+            fn, dst, src, size, iterations))
+
+    def time_compare(self,
+                     function: str,
+                     s1: int,
+                     s2: int,
+                     size: int,
+                     lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times a memcmp()-like function. Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, function)
+        return self.measure(lambda iterations: self.harness.rc_bench_compare(
+            fn, s1, s2, size, iterations))
+
+    def time_set(self,
+                 function: str,
+                 dst: int,
+                 c: int,
+                 size: int,
+                 lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times a memset()-like function. Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, function)
+        return self.measure(lambda iterations: self.harness.rc_bench_set(
+            fn, dst, c, size, iterations))
+
+    def time_scan(self,
+                  function: str,
+                  s: int,
+                  c: int,
+                  size: int,
+                  lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times a memchr()-like function. Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, function)
+        return self.measure(lambda iterations: self.harness.rc_bench_scan(
+            fn, s, c, size, iterations))
+
+    def time_strlen(self,
+                    function: str,
+                    s: int,
+                    lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times a strlen()-like function. Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, function)
+        return self.measure(lambda iterations: self.harness.rc_bench_strlen(
+            fn, s, iterations))
+
+    def time_strcmp(self,
+                    function: str,
+                    s1: int,
+                    s2: int,
+                    lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times a strcmp()-like function. Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, function)
+        return self.measure(lambda iterations: self.harness.rc_bench_strcmp(
+            fn, s1, s2, iterations))
+
+    def time_strcpy(self,
+                    function: str,
+                    dst: int,
+                    src: int,
+                    lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times a strcpy()-like function. Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, function)
+        return self.measure(lambda iterations: self.harness.rc_bench_strcpy(
+            fn, dst, src, iterations))
+
+    def time_memmem(self,
+                    haystack: bytes,
+                    needle: bytes,
+                    lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times memmem(haystack, needle). Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, 'memmem')
+        return self.measure(lambda iterations: self.harness.rc_bench_memmem(
+            fn, haystack, len(haystack), needle, len(needle), iterations))
+
+    def time_strstr(self,
+                    haystack: bytes,
+                    needle: bytes,
+                    lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times strstr(haystack, needle). Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, 'strstr')
+        return self.measure(lambda iterations: self.harness.rc_bench_strstr(
+            fn, haystack, needle, iterations))
+
+    def time_format(self,
+                    format_string,
+                    values: ctypes.Array,
+                    wide: bool,
+                    lib: Optional[ctypes.CDLL] = None,
+                    function: str = 'snprintf') -> float:
+        """Times an snprintf()-like function, cycling through an array of
+        uint64_t values. Returns ns per call.
+
+        Each value is passed as the first four arguments to the function: as
+        unsigned long long if wide is set, or as unsigned int otherwise.
+        format_string may be bytes or a pointer to a compiled format. The
+        function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, function)
+        return self.measure(lambda iterations: self.harness.rc_bench_format(
+            fn, format_string, ctypes.addressof(values), len(values), wide,
+            iterations))
+
+    def time_format_double(self,
+                           format_string: bytes,
+                           values: ctypes.Array,
+                           lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times snprintf() with a single double argument, cycling through an
+        array of doubles. Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, 'snprintf')
+        return self.measure(
+            lambda iterations: self.harness.rc_bench_format_double(
+                fn, format_string, ctypes.addressof(values), len(values),
+                iterations))
+
+    def time_parse(self,
+                   function: str,
+                   strings: ctypes.Array,
+                   base: int,
+                   lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times a strtoll()-like function, cycling through an array of
+        strings. Returns ns per call.
+
+        The function is looked up in rlibc unless another library is given.
+        """
+        fn = self.address_of(lib or self.rlibc, function)
+        return self.measure(lambda iterations: self.harness.rc_bench_parse(
+            fn, ctypes.addressof(strings), len(strings), base, iterations))
+
+    def time_churn(self,
+                   sizes: ctypes.Array,
+                   slots: int,
+                   lib: Optional[ctypes.CDLL] = None) -> float:
+        """Times malloc() and free() replacing blocks in a pool of live
+        allocations, cycling through an array of sizes. Returns ns per
+        replacement.
+
+        The functions are looked up in rlibc unless another library is given.
+        """
+        alloc = self.address_of(lib or self.rlibc, 'malloc')
+        release = self.address_of(lib or self.rlibc, 'free')
+        return self.measure(lambda iterations: self.harness.rc_bench_churn(
+            alloc, release, ctypes.addressof(sizes), len(sizes), slots,
+            iterations))
+
+    def time_fputs(self, string: bytes, stream: int) -> float:
+        """Times rlibc's fputs(string, stream). Returns ns per call."""
+        fn = self.address_of(self.rlibc, 'fputs')
+        return self.measure(lambda iterations: self.harness.rc_bench_fputs(
+            fn, string, stream, iterations))
+
+    def time_fprintf(self, string: bytes, stream: int) -> float:
+        """Times rlibc's fprintf(stream, "%s", string). Returns ns per call."""
+        fn = self.address_of(self.rlibc, 'fprintf')
+        return self.measure(lambda iterations: self.harness.rc_bench_fprintf(
+            fn, stream, string, iterations))
+
+    # Operations of time_pollution(), matching enum pollution_op in harness.c.
+    POLLUTION_NONE = 0
+    POLLUTION_COPY = 1
+    POLLUTION_SET = 2
+    POLLUTION_COPY_PAGE = 3
+    POLLUTION_ZERO_PAGE = 4
+
+    def time_pollution(self, op: int, function: Optional[str], dst: int,
+                       src: int, size: int, chunk: int, working_set: int,
+                       working_set_size: int,
+                       iterations: int) -> Tuple[float, float]:
+        """Alternates an rlibc memory operation over size bytes with a pass
+        over a working set linked by rc_bench_make_chain().
+
+        Returns the average time of the operation and of the workload, in ns.
+        """
+        fn = self.address_of(self.rlibc, function) if function else None
+        op_ns = ctypes.c_uint64()
+        workload_ns = ctypes.c_uint64()
+        self.harness.rc_bench_pollution(op, fn, dst, src, size, chunk,
+                                        working_set, working_set_size,
+                                        iterations, ctypes.byref(op_ns),
+                                        ctypes.byref(workload_ns))
+        return op_ns.value / iterations, workload_ns.value / iterations
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Dumps the profiling counters of rlibc's test library.
+
+The test library must be built with profiling enabled (`make test-lib
+PROFILE=1`, or PROFILE=cycles to also measure cycles on x86). The given Python
+script, such as one of the benchmarks or a workload of your own, is run in this
+process, and the counters it accumulated in rlibc are printed once it exits.
+
+    $ python bench/rlibc_profile.py bench/printf_bench.py
+
+For each function, this shows the number of calls, the total and average size
+the calls operated on, and the distribution of those sizes in power-of-two
+buckets. Only calls made from outside rlibc are counted.
+"""
+
+import argparse
+import ctypes
+from pathlib import Path
+import runpy
+import sys
+from typing import List, NamedTuple, Optional, TextIO
+
+from rlibc_bench import format_size
+
+# Path to the test rlibc binary from the rlibc repository root.
+RLIBC_TEST_SO: Path = Path('build') / 'test_rlibc.so'
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Must match RC_PROFILE_BUCKETS in include/rlibc/profile.h.
+BUCKETS = 33
+
+
+class _ProfileCounter(ctypes.Structure):
+    _fields_ = [
+        ('name', ctypes.c_char_p),
+        ('calls', ctypes.c_uint64),
+        ('bytes', ctypes.c_uint64),
+        ('cycles', ctypes.c_uint64),
+        ('sizes', ctypes.c_uint64 * BUCKETS),
+    ]
+
+
+class Counter(NamedTuple):
+    """Profile of a single function."""
+    name: str
+    calls: int
+    bytes: int
+    # None if cycles were not measured.
+    cycles: Optional[int]
+    sizes: List[int]
+
+
+def _table(rlibc: ctypes.CDLL) -> ctypes.Array:
+    try:
+        size = ctypes.c_size_t.in_dll(rlibc,
+                                      '__rlibc_profile_counters_size').value
+    except ValueError:
+        raise RuntimeError(
+            'rlibc was built without profiling; rebuild it with PROFILE=1'
+        ) from None
+    return (_ProfileCounter * size).in_dll(rlibc, '__rlibc_profile_counters')
+
+
+def read_profile(rlibc: ctypes.CDLL) -> List[Counter]:
+    """Reads the profiling counters of a loaded rlibc library."""
+    cycles = ctypes.c_int.in_dll(rlibc, '__rlibc_profile_cycles').value != 0
+    return [
+        Counter(name=counter.name.decode('utf-8'),
+                calls=counter.calls,
+                bytes=counter.bytes,
+                cycles=counter.cycles if cycles else None,
+                sizes=list(counter.sizes)) for counter in _table(rlibc)
+    ]
+
+
+def reset_profile(rlibc: ctypes.CDLL) -> None:
+    """Zeroes the profiling counters of a loaded rlibc library."""
+    for counter in _table(rlibc):
+        counter.calls = 0
+        counter.bytes = 0
+        counter.cycles = 0
+        for i in range(BUCKETS):
+            counter.sizes[i] = 0
+
+
+def bucket_label(bucket: int) -> str:
+    """Describes the range of sizes counted by a histogram bucket."""
+    if bucket == 0:
+        return '0'
+    if bucket == BUCKETS - 1:
+        return f'{format_size(2**(bucket - 1))}+'
+    if bucket == 1:
+        return '1'
+    return f'{2**(bucket - 1)}-{2**bucket - 1}'
+
+
+def print_profile(counters: List[Counter], out: TextIO = sys.stdout) -> None:
+    """Prints the functions which were called, most called first."""
+    called = sorted((c for c in counters if c.calls > 0),
+                    key=lambda c: c.calls,
+                    reverse=True)
+    if not called:
+        print('No calls were recorded', file=out)
+        return
+
+    total_calls = sum(c.calls for c in called)
+    cycles = called[0].cycles is not None
+
+    header = (f'{"function":<16} {"calls":>12} {"share":>6} {"bytes":>14} '
+              f'{"avg size":>9}')
+    if cycles:
+        header += f' {"cycles/call":>11}'
+    print(header, file=out)
+
+    for c in called:
+        sized = sum(c.sizes)
+        average = f'{c.bytes / sized:.1f}' if sized else '-'
+        line = (f'{c.name:<16} {c.calls:>12} '
+                f'{100 * c.calls / total_calls:>5.1f}% '
+                f'{c.bytes if sized else "-":>14} {average:>9}')
+        if cycles:
+            line += f' {c.cycles / c.calls:>11.1f}'
+        print(line, file=out)
+
+    print(file=out)
+    print('Size distribution:', file=out)
+    for c in called:
+        sized = sum(c.sizes)
+        if not sized:
+            continue
+
+        buckets = [
+            f'{bucket_label(i)}: {100 * count / sized:.1f}%'
+            for i, count in enumerate(c.sizes) if count > 0
+        ]
+        print(f'  {c.name:<14} {", ".join(buckets)}', file=out)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('script', help='Python script to run')
+    parser.add_argument('args',
+                        nargs=argparse.REMAINDER,
+                        help='arguments to the script')
+    args = parser.parse_args()
+
+    # Scripts which load the test library by the same path share this copy of
+    # it, and with it the counters.
+    rlibc = ctypes.cdll.LoadLibrary(ROOT / RLIBC_TEST_SO)
+    reset_profile(rlibc)
+
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, str(Path(args.script).resolve().parent))
+    status = 0
+    try:
+        runpy.run_path(args.script, run_name='__main__')
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else 1
+
+    print()
+    print_profile(read_profile(rlibc))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Measures the speed of rlibc's strstr() and memmem() against the host C
+library.
+
+Needles are searched for in text-like haystacks, where most alignments are
+skipped, and in repetitive haystacks with needles which nearly match at every
+position, on which a naive search takes time proportional to the product of
+the two lengths.
+"""
+
+import ctypes
+import random
+from typing import List, Tuple
+
+from rlibc_bench import RlibcBenchmark
+
+HAYSTACK_SIZE = 64 * 1024
+
+
+def text(size: int) -> bytes:
+    """Returns random words of lowercase letters."""
+    rng = random.Random(0)
+    words = []
+    length = 0
+    while length < size:
+        word = ''.join(
+            rng.choice('etaoinshrdlucmfwypvbgkjqxz'[:rng.randint(8, 26)])
+            for _ in range(rng.randint(1, 10)))
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words).encode()[:size]
+
+
+def cases() -> List[Tuple[str, bytes, bytes]]:
+    """Returns the name, haystack and needle of each benchmark."""
+    haystack = text(HAYSTACK_SIZE)
+    repetitive = b'a' * HAYSTACK_SIZE
+    periodic = b'ab' * (HAYSTACK_SIZE // 2)
+
+    results = []
+    for length in (2, 4, 16, 64):
+        # A needle from the end of the text, so that most of it is searched.
+        needle = haystack[-length:]
+        results.append((f'text/{length}', haystack, needle))
+    results.append(('text/absent', haystack, b'zzzzqqqq'))
+
+    for length in (16, 256, 2048):
+        results.append((f'aaa...ab/{length}', repetitive,
+                         b'a' * (length - 1) + b'b'))
+        results.append((f'baa...aa/{length}', repetitive,
+                         b'b' + b'a' * (length - 1)))
+        results.append((f'abab...abb/{length}', periodic,
+                        b'ab' * (length // 2 - 1) + b'bb'))
+    return results
+
+
+def main() -> None:
+    bench = RlibcBenchmark()
+    host = ctypes.CDLL(None)
+
+    print(f'{"function":<8}  {"case":<16}  {"rlibc":>12}  {"host":>12}  '
+          f'{"speedup":>7}')
+
+    for name, haystack, needle in cases():
+        for function, timer in (('strstr', bench.time_strstr),
+                                ('memmem', bench.time_memmem)):
+            rlibc = timer(haystack, needle)
+            libc = timer(haystack, needle, host)
+            print(f'{function:<8}  {name:<16}  {rlibc:>9.0f} ns  '
+                  f'{libc:>9.0f} ns  {libc / rlibc:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Sweeps memcpy() and memset() sizes to find where `rep` strings pay off.
+
+`rep movsb` and `rep stosb` spend tens of cycles starting up before they move
+any data, so rlibc copies and sets short buffers with unaligned words instead.
+This times a bare `rep` instruction against rlibc's ERMS variant, which uses
+words below its threshold and `rep` above it, and against the default variant
+and the host C library. The crossover, the smallest size from which the bare
+instruction is never slower than words, is where the threshold belongs.
+"""
+
+import argparse
+import ctypes
+import sys
+from typing import List, Optional
+
+from rlibc_bench import RlibcBenchmark, format_size
+
+SIZES = [
+    1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64, 96, 128, 192, 256, 384, 512,
+    768, 1024, 1536, 2048, 4096
+]
+
+FILL = 0x5a
+
+
+def crossover(sizes: List[int], rep: List[float],
+              words: List[float]) -> Optional[int]:
+    """Returns the smallest size from which rep is never slower than words."""
+    result = None
+    for size, rep_ns, words_ns in zip(sizes, rep, words):
+        if rep_ns > words_ns:
+            result = None
+        elif result is None:
+            result = size
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--offset',
+                        type=int,
+                        default=0,
+                        help='misalignment of dst from a 64-byte boundary, '
+                        'in bytes (default: 0)')
+    args = parser.parse_args()
+
+    bench = RlibcBenchmark()
+    if not hasattr(bench.harness, 'rc_bench_rep_movsb'):
+        print('The benchmark harness was not built for x86', file=sys.stderr)
+        return 1
+
+    bench.rlibc.rc_memory_variant.restype = ctypes.c_char_p
+    bench.rlibc.rc_memory_select.argtypes = (ctypes.c_char_p, )
+    default = bench.rlibc.rc_memory_variant()
+    if bench.rlibc.rc_memory_select(b'erms') != 0:
+        print('This processor does not support ERMS', file=sys.stderr)
+        return 1
+    bench.rlibc.rc_memory_select(default)
+
+    libc = ctypes.CDLL(None)
+    buffers = [ctypes.create_string_buffer(max(SIZES) + 128) for _ in range(2)]
+    dst, src = [(ctypes.addressof(b) + 63) & ~63 for b in buffers]
+    dst += args.offset
+    ctypes.memset(src, FILL, max(SIZES))
+
+    def time(function: str, copy: bool, size: int, lib: ctypes.CDLL,
+             variant: Optional[bytes]) -> float:
+        if variant is not None:
+            bench.rlibc.rc_memory_select(variant)
+        if copy:
+            ns = bench.time_copy(function, dst, src, size, lib)
+        else:
+            ns = bench.time_set(function, dst, FILL, size, lib)
+        bench.rlibc.rc_memory_select(default)
+        return ns
+
+    for function, rep_function, copy in (
+        ('memcpy', 'rc_bench_rep_movsb', True),
+        ('memset', 'rc_bench_rep_stosb', False),
+    ):
+        print(f'{function} (ns per call)')
+        print(f'{"size":>8}  {"rep":>8}  {"erms":>8}  '
+              f'{default.decode():>8}  {"host":>8}')
+
+        rep: List[float] = []
+        words: List[float] = []
+        for size in SIZES:
+            rep.append(time(rep_function, copy, size, bench.harness, None))
+            words.append(time(function, copy, size, bench.rlibc, b'erms'))
+            current = time(function, copy, size, bench.rlibc, default)
+            host = time(function, copy, size, libc, None)
+            print(f'{format_size(size):>8}  {rep[-1]:>8.2f}  '
+                  f'{words[-1]:>8.2f}  {current:>8.2f}  {host:>8.2f}')
+
+        size = crossover(SIZES, rep, words)
+        if size is None:
+            print('rep never overtakes words\n')
+        else:
+            print(f'rep overtakes words from {format_size(size)}\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Measures how rlibc's non-temporal stores spare the cache.
+
+A workload chases pointers through a working set small enough to stay cached,
+taking turns with large memset() and memcpy() calls and with the page functions
+used by the kernel, as a process does when the kernel zeroes or copies pages on
+its behalf. Each operation is run with ordinary stores, which pull its
+destination into the cache and evict the working set, and with non-temporal
+stores, which write to memory directly. For each, this shows the throughput of
+the operation and how much it slows down the workload which follows it.
+"""
+
+import argparse
+import ctypes
+import mmap
+import sys
+from typing import List, NamedTuple, Optional
+
+from rlibc_bench import RlibcBenchmark, format_size
+
+PAGE_SIZE = 4096
+
+SIZE_MAX = 2**(8 * ctypes.sizeof(ctypes.c_size_t)) - 1
+
+
+class Case(NamedTuple):
+    name: str
+    op: int
+    function: str
+    # Size of each call, or None for the whole region.
+    chunk: Optional[int]
+    # Whether memcpy() and memset() use non-temporal stores.
+    stream: bool
+
+
+CASES: List[Case] = [
+    Case('memset', RlibcBenchmark.POLLUTION_SET, 'memset', None, False),
+    Case('memset', RlibcBenchmark.POLLUTION_SET, 'memset', None, True),
+    Case('memcpy', RlibcBenchmark.POLLUTION_COPY, 'memcpy', None, False),
+    Case('memcpy', RlibcBenchmark.POLLUTION_COPY, 'memcpy', None, True),
+    Case('memset (pages)', RlibcBenchmark.POLLUTION_SET, 'memset', PAGE_SIZE,
+         False),
+    Case('rc_zero_page', RlibcBenchmark.POLLUTION_ZERO_PAGE, 'rc_zero_page',
+         PAGE_SIZE, True),
+    Case('memcpy (pages)', RlibcBenchmark.POLLUTION_COPY, 'memcpy', PAGE_SIZE,
+         False),
+    Case('rc_copy_page', RlibcBenchmark.POLLUTION_COPY_PAGE, 'rc_copy_page',
+         PAGE_SIZE, True),
+]
+
+
+def address_of(buffer: mmap.mmap) -> int:
+    return ctypes.addressof(ctypes.c_char.from_buffer(buffer))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size',
+                        type=int,
+                        default=16 * 1024 * 1024,
+                        help='bytes written by each operation '
+                        '(default: 16 MiB)')
+    parser.add_argument('--working-set',
+                        type=int,
+                        default=1024 * 1024,
+                        help='size of the workload\'s working set '
+                        '(default: 1 MiB)')
+    parser.add_argument('--iterations',
+                        type=int,
+                        default=20,
+                        help='alternations of each operation and the '
+                        'workload (default: 20)')
+    args = parser.parse_args()
+
+    if args.size % PAGE_SIZE != 0:
+        parser.error(f'--size must be a multiple of {PAGE_SIZE}')
+
+    bench = RlibcBenchmark()
+    set_threshold = bench.rlibc.rc_memory_set_stream_threshold
+    set_threshold.restype = ctypes.c_size_t
+    set_threshold.argtypes = (ctypes.c_size_t, )
+
+    previous = set_threshold(SIZE_MAX)
+    if previous == SIZE_MAX:
+        print('This target has no non-temporal stores', file=sys.stderr)
+        return 1
+
+    # Anonymous mappings are page-aligned, as the page functions require.
+    dst = mmap.mmap(-1, args.size)
+    src = mmap.mmap(-1, args.size)
+    working_set = mmap.mmap(-1, args.working_set)
+    for buffer in (dst, src):
+        buffer.write(b'\xa5' * args.size)
+    bench.harness.rc_bench_make_chain(address_of(working_set),
+                                      args.working_set, 1)
+
+    def run(case: Optional[Case]):
+        if case is None:
+            case = Case('', RlibcBenchmark.POLLUTION_NONE, '', args.size,
+                        False)
+        set_threshold(0 if case.stream else SIZE_MAX)
+
+        # The first pass warms the working set.
+        return min((bench.time_pollution(case.op, case.function,
+                                         address_of(dst), address_of(src),
+                                         args.size, case.chunk or args.size,
+                                         address_of(working_set),
+                                         args.working_set, args.iterations)
+                    for _ in range(RlibcBenchmark.REPEATS)),
+                   key=lambda times: times[1])
+
+    lines = args.working_set // 64
+    _, baseline = run(None)
+
+    print(f'{format_size(args.size)} written per operation, '
+          f'{format_size(args.working_set)} working set')
+    print(f'{"operation":<16} {"stores":<14} {"throughput":>12} '
+          f'{"workload":>14} {"slowdown":>9}')
+    print(f'{"none":<16} {"":<14} {"":>12} '
+          f'{baseline / lines:>8.2f} ns/line {1:>8.2f}x')
+
+    for case in CASES:
+        op_ns, workload_ns = run(case)
+        stores = 'non-temporal' if case.stream else 'cached'
+        print(f'{case.name:<16} {stores:<14} '
+              f'{args.size / op_ns:>7.2f} GB/s '
+              f'{workload_ns / lines:>8.2f} ns/line '
+              f'{workload_ns / baseline:>8.2f}x')
+
+    set_threshold(previous)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Measures the speed of rlibc's strtoll() against the host C library.
+
+Decimal numbers of each length are parsed in turn, followed by a few
+hexadecimal ones for reference.
+"""
+
+import ctypes
+import random
+
+from rlibc_bench import RlibcBenchmark
+
+NUM_STRINGS = 256
+
+
+def sample_strings(digits: int, base: int) -> ctypes.Array:
+    """Returns random numbers with the given number of digits as strings."""
+    rng = random.Random(digits)
+    fmt = '%x' if base == 16 else '%d'
+    low, high = base**(digits - 1), base**digits - 1
+    strings = [(fmt % rng.randint(low, high)).encode()
+               for _ in range(NUM_STRINGS)]
+    return (ctypes.c_char_p * NUM_STRINGS)(*strings)
+
+
+def main() -> None:
+    bench = RlibcBenchmark()
+    host = ctypes.CDLL(None)
+
+    print(f'{"base":>4}  {"digits":>6}  {"rlibc":>10}  {"host":>10}  '
+          f'{"speedup":>7}')
+
+    cases = [(10, digits) for digits in (1, 2, 4, 8, 12, 16, 19)]
+    cases += [(16, digits) for digits in (4, 8, 15)]
+
+    for base, digits in cases:
+        strings = sample_strings(digits, base)
+        rlibc = bench.time_parse('strtoll', strings, base)
+        libc = bench.time_parse('strtoll', strings, base, host)
+        print(f'{base:>4}  {digits:>6}  {rlibc:>7.1f} ns  {libc:>7.1f} ns  '
+              f'{libc / rlibc:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
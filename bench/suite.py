@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Benchmarks rlibc against the host C library.
+
+The `run` command times the memory and string functions across sizes from
+1 B to 64 MiB and a few alignments, as well as snprintf() with a set of
+representative formats. Each case is timed in both rlibc and the host C
+library, and the results are written as JSON.
+
+The `compare` command checks a set of results against a stored baseline,
+exiting with an error if any of rlibc's functions became slower by more than
+a threshold.
+"""
+
+import argparse
+import ctypes
+import json
+import platform
+from pathlib import Path
+import random
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from rlibc_bench import RlibcBenchmark
+
+# 1 B to 64 MiB, in powers of four.
+SIZES = [4**n for n in range(14)]
+
+# (dst, src) or (s1, s2) offsets from a 64-byte aligned address. Functions
+# taking a single buffer use the first offset.
+ALIGNMENTS = [(0, 0), (1, 3)]
+
+FUNCTIONS = [
+    'memcpy', 'memmove', 'memset', 'memchr', 'memcmp', 'strlen', 'strcmp',
+    'strcpy', 'snprintf'
+]
+
+# (format, whether the arguments are 64 bits wide, maximum value)
+FORMATS = [
+    (b'%d', False, 2**31 - 1),
+    (b'%u', False, 2**32 - 1),
+    (b'%08x', False, 2**32 - 1),
+    (b'%llu', True, 2**64 - 1),
+    (b'[%5u] cpu%u: %08x %x\n', False, 2**32 - 1),
+    (b'starting up, please wait', False, 0),
+]
+
+FILL = 0x5a
+NEEDLE = 0xa5
+
+
+class Buffers:
+    """Two 64-byte aligned buffers large enough for every benchmark size."""
+
+    def __init__(self, size: int):
+        self._buffers = [
+            ctypes.create_string_buffer(size + 128) for _ in range(2)
+        ]
+        for buf in self._buffers:
+            ctypes.memset(buf, FILL, len(buf))
+        self.aligned = [(ctypes.addressof(buf) + 63) & ~63
+                        for buf in self._buffers]
+
+    @staticmethod
+    def poke(address: int, value: int) -> None:
+        """Writes a single byte."""
+        ctypes.c_uint8.from_address(address).value = value
+
+
+def memory_cases(function: str, bench: RlibcBenchmark, buffers: Buffers,
+                 lib: Optional[ctypes.CDLL]) -> Iterator[Tuple[str, float]]:
+    """Times a memory or string function across sizes and alignments.
+
+    Yields the name of each case and its time in ns per call.
+    """
+    for size in SIZES:
+        for align1, align2 in ALIGNMENTS:
+            a = buffers.aligned[0] + align1
+            b = buffers.aligned[1] + align2
+
+            if function in ('memcpy', 'memmove'):
+                ns = bench.time_copy(function, a, b, size, lib)
+            elif function == 'memset':
+                ns = bench.time_set(function, a, FILL, size, lib)
+            elif function == 'memcmp':
+                ns = bench.time_compare(function, a, b, size, lib)
+            elif function == 'memchr':
+                # The searched byte is the last one in the buffer.
+                buffers.poke(a + size - 1, NEEDLE)
+                ns = bench.time_scan(function, a, NEEDLE, size, lib)
+                buffers.poke(a + size - 1, FILL)
+            elif function == 'strlen':
+                buffers.poke(a + size, 0)
+                ns = bench.time_strlen(function, a, lib)
+                buffers.poke(a + size, FILL)
+            elif function == 'strcpy':
+                buffers.poke(b + size, 0)
+                ns = bench.time_strcpy(function, a, b, lib)
+                buffers.poke(a + size, FILL)
+                buffers.poke(b + size, FILL)
+            elif function == 'strcmp':
+                # The strings are equal, so they are compared in full.
+                buffers.poke(a + size, 0)
+                buffers.poke(b + size, 0)
+                ns = bench.time_strcmp(function, a, b, lib)
+                buffers.poke(a + size, FILL)
+                buffers.poke(b + size, FILL)
+            else:
+                raise ValueError(f'unknown function {function}')
+
+            yield f'{function}/{size}/{align1}:{align2}', ns
+
+
+def format_cases(bench: RlibcBenchmark,
+                 lib: Optional[ctypes.CDLL]) -> Iterator[Tuple[str, float]]:
+    """Times snprintf() with each format.
+
+    Yields the name of each case and its time in ns per call.
+    """
+    for format_string, wide, maximum in FORMATS:
+        rng = random.Random(0)
+        values = (ctypes.c_uint64 * 256)(
+            *(rng.randint(0, maximum) for _ in range(256)))
+        ns = bench.time_format(format_string, values, wide, lib)
+        yield f'snprintf/{format_string.decode()!r}', ns
+
+
+def cases(function: str, bench: RlibcBenchmark, buffers: Buffers,
+          lib: Optional[ctypes.CDLL]) -> Iterator[Tuple[str, float]]:
+    """Times every case of a function, in rlibc or another library."""
+    if function == 'snprintf':
+        return format_cases(bench, lib)
+    return memory_cases(function, bench, buffers, lib)
+
+
+def run(args: argparse.Namespace) -> int:
+    bench = RlibcBenchmark()
+    if args.quick:
+        bench.MIN_DURATION_NS //= 10
+        bench.REPEATS = 3
+
+    host = ctypes.CDLL(None)
+    buffers = Buffers(max(SIZES))
+
+    bench.rlibc.rc_memory_variant.restype = ctypes.c_char_p
+    results: Dict = {
+        'machine': platform.machine(),
+        'memory_variant': bench.rlibc.rc_memory_variant().decode(),
+        'results': {},
+    }
+
+    print(f'{"case":<36}  {"rlibc":>15}  {"host":>15}  {"host/rlibc":>10}')
+
+    for function in args.functions:
+        rlibc_cases = cases(function, bench, buffers, None)
+        host_cases = cases(function, bench, buffers, host)
+        for (name, rlibc), (_, libc) in zip(rlibc_cases, host_cases):
+            results['results'][name] = {'rlibc_ns': rlibc, 'host_ns': libc}
+            print(f'{name:<36}  {rlibc:>12.1f} ns  {libc:>12.1f} ns  '
+                  f'{libc / rlibc:>9.2f}x')
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(args.baseline.read_text())['results']
+    current = json.loads(args.current.read_text())['results']
+
+    regressions: List[str] = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+
+        ratio = result['rlibc_ns'] / baseline[name]['rlibc_ns']
+        if ratio > 1 + args.threshold:
+            regressions.append(name)
+            print(f'{name:<36}  {ratio:>6.2f}x slower')
+
+    if regressions:
+        print(f'{len(regressions)} case(s) regressed by more than '
+              f'{args.threshold:.0%}')
+        return 1
+
+    print(f'No regressions beyond {args.threshold:.0%}')
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('-o',
+                            '--output',
+                            type=Path,
+                            help='file to which to write JSON results')
+    run_parser.add_argument('-f',
+                            '--functions',
+                            nargs='+',
+                            choices=FUNCTIONS,
+                            default=FUNCTIONS,
+                            help='functions to benchmark (default: all)')
+    run_parser.add_argument('--quick',
+                            action='store_true',
+                            help='take shorter, noisier measurements')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser(
+        'compare', help='check results against a baseline')
+    compare_parser.add_argument('baseline',
+                                type=Path,
+                                help='JSON results to compare against')
+    compare_parser.add_argument('current',
+                                type=Path,
+                                help='JSON results to check')
+    compare_parser.add_argument(
+        '-t',
+        '--threshold',
+        type=float,
+        default=0.1,
+        help='maximum allowed slowdown as a fraction (default: 0.1)')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
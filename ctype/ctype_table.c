@@ -0,0 +1,36 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <ctype.h>
+#include <stdint.h>
+
+#define U  __RC_CTYPE_UPPER
+#define L  __RC_CTYPE_LOWER
+#define D  __RC_CTYPE_DIGIT
+#define X  __RC_CTYPE_XDIGIT
+#define S  __RC_CTYPE_SPACE
+#define B  __RC_CTYPE_BLANK
+#define P  __RC_CTYPE_PUNCT
+#define C  __RC_CTYPE_CNTRL
+#define SP __RC_CTYPE_SP
+
+// Characters outside of the ASCII range belong to no class.
+const uint16_t __rlibc_ctype_table[256] = {
+    [0x00 ... 0x08] = C,
+    ['\t'] = C | S | B,
+    ['\n' ... '\r'] = C | S,
+    [0x0e ... 0x1f] = C,
+    [' '] = S | B | SP,
+    ['!' ... '/'] = P,
+    ['0' ... '9'] = D | X,
+    [':' ... '@'] = P,
+    ['A' ... 'F'] = U | X,
+    ['G' ... 'Z'] = U,
+    ['[' ... '`'] = P,
+    ['a' ... 'f'] = L | X,
+    ['g' ... 'z'] = L,
+    ['{' ... '~'] = P,
+    [0x7f] = C,
+};
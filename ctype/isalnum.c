@@ -5,4 +5,6 @@
 
 #include <ctype.h>
 
-int isalnum(int c) { return isalpha(c) || isdigit(c); }
+#undef isalnum
+
+int isalnum(int c) { return __rc_ctype(c, __RC_CTYPE_ALNUM); }
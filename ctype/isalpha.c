@@ -5,4 +5,6 @@
 
 #include <ctype.h>
 
-int isalpha(int c) { return isupper(c) || islower(c); }
+#undef isalpha
+
+int isalpha(int c) { return __rc_ctype(c, __RC_CTYPE_ALPHA); }
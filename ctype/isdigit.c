@@ -5,4 +5,6 @@
 
 #include <ctype.h>
 
-int isdigit(int c) { return c >= '0' && c <= '9'; }
+#undef isdigit
+
+int isdigit(int c) { return __rc_ctype(c, __RC_CTYPE_DIGIT); }
@@ -5,4 +5,6 @@
 
 #include <ctype.h>
 
-int islower(int c) { return c >= 'a' && c <= 'z'; }
+#undef islower
+
+int islower(int c) { return __rc_ctype(c, __RC_CTYPE_LOWER); }
@@ -0,0 +1,10 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <ctype.h>
+
+#undef isspace
+
+int isspace(int c) { return __rc_ctype(c, __RC_CTYPE_SPACE); }
@@ -5,4 +5,6 @@
 
 #include <ctype.h>
 
-int isupper(int c) { return c >= 'A' && c <= 'Z'; }
+#undef isupper
+
+int isupper(int c) { return __rc_ctype(c, __RC_CTYPE_UPPER); }
@@ -5,4 +5,6 @@
 
 #include <ctype.h>
 
-int tolower(int c) { return isupper(c) ? c ^ 32 : c; }
+#undef tolower
+
+int tolower(int c) { return __rc_tolower(c); }
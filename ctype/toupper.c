@@ -5,4 +5,6 @@
 
 #include <ctype.h>
 
-int toupper(int c) { return islower(c) ? c ^ 32 : c; }
+#undef toupper
+
+int toupper(int c) { return __rc_toupper(c); }
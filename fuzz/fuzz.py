@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Differential fuzzer for rlibc's snprintf(), memory and string functions.
+
+Random calls to snprintf(), the memory and string functions, and the strtol()
+family are run through both rlibc's test library and the host C library, and
+any case on which the two disagree is reported. Cases are generated, run and
+compared inside a C harness (fuzz/harness.c), and the range of cases is split
+into shards which run in parallel across all CPUs.
+
+Each case is determined by the seed and its index alone, so a failing case can
+be replayed by itself using --seed and --case.
+"""
+
+import argparse
+import ctypes
+import multiprocessing
+import os
+from pathlib import Path
+import platform
+import random
+import signal
+import sys
+import time
+from typing import List, NamedTuple, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Number of cases run by each call into the harness.
+CHUNK_SIZE = 4096
+
+REPORT_SIZE = 8192
+
+
+class Failure(NamedTuple):
+    """A case on which rlibc and the host disagree."""
+    index: int
+    report: str
+
+
+class Fuzzer:
+    """Loads rlibc's test library alongside the C fuzzing harness, and builds
+    the tables of functions under test from it and the host C library."""
+
+    # Paths to the test rlibc binary and fuzzing harness from the rlibc
+    # repository root.
+    RLIBC_TEST_SO: Path = Path('build') / 'test_rlibc.so'
+    HARNESS_SO: Path = Path('build') / 'fuzz_harness.so'
+
+    def __init__(self):
+        for lib in (self.RLIBC_TEST_SO, self.HARNESS_SO):
+            if not (ROOT / lib).exists():
+                raise RuntimeError(
+                    f'No library found at {ROOT / lib}; run `make fuzz-lib`')
+
+        self.rlibc = ctypes.cdll.LoadLibrary(ROOT / self.RLIBC_TEST_SO)
+        self.harness = ctypes.cdll.LoadLibrary(ROOT / self.HARNESS_SO)
+        host = ctypes.CDLL(None)
+
+        self.harness.rc_fuzz_function_count.restype = ctypes.c_size_t
+        self.harness.rc_fuzz_function_name.restype = ctypes.c_char_p
+        self.harness.rc_fuzz_function_name.argtypes = (ctypes.c_size_t, )
+        self.harness.rc_fuzz_run.restype = ctypes.c_uint64
+        self.harness.rc_fuzz_run.argtypes = (ctypes.c_void_p,
+                                             ctypes.c_void_p,
+                                             ctypes.c_uint64,
+                                             ctypes.c_uint64,
+                                             ctypes.c_uint64,
+                                             ctypes.c_void_p,
+                                             ctypes.c_char_p,
+                                             ctypes.c_size_t)
+
+        names = [
+            self.harness.rc_fuzz_function_name(i).decode()
+            for i in range(self.harness.rc_fuzz_function_count())
+        ]
+
+        self._rlibc_functions = (ctypes.c_void_p * len(names))(
+            *(self._address_of(self.rlibc, name) for name in names))
+
+        # The harness has reference implementations of functions which the
+        # host C library may lack.
+        self._host_functions = (ctypes.c_void_p * len(names))(*(
+            self._address_of(host, name) if hasattr(host, name) else self.
+            _address_of(self.harness, f'rc_fuzz_{name}') for name in names))
+
+        self._current = ctypes.c_uint64(0)
+        self._report = ctypes.create_string_buffer(REPORT_SIZE)
+
+    @staticmethod
+    def _address_of(lib: ctypes.CDLL, name: str) -> int:
+        return ctypes.cast(getattr(lib, name), ctypes.c_void_p).value
+
+    def run(self,
+            seed: int,
+            first: int,
+            count: int,
+            current: Optional[int] = None) -> Optional[Failure]:
+        """Runs cases [first, first + count), returning the first failure.
+
+        The index of each case is written to the uint64_t at address current
+        before it runs, if given.
+        """
+        if current is None:
+            current = ctypes.addressof(self._current)
+
+        index = self.harness.rc_fuzz_run(self._rlibc_functions,
+                                         self._host_functions, seed, first,
+                                         count, current, self._report,
+                                         REPORT_SIZE)
+        if index == first + count:
+            return None
+        return Failure(index, self._report.value.decode(errors='replace'))
+
+
+def run_shard(seed: int, shard: int, first: int, count: int,
+              progress: ctypes.Array, failures: multiprocessing.SimpleQueue,
+              max_failures: int) -> None:
+    """Runs a shard of cases in a worker process, sending failures back to
+    the parent. The worker's slot in progress holds the case being run."""
+    fuzzer = Fuzzer()
+    current = ctypes.addressof(progress) + shard * ctypes.sizeof(
+        ctypes.c_uint64)
+
+    index = first
+    end = first + count
+    found = 0
+    while index < end and found < max_failures:
+        stop = min(index + CHUNK_SIZE, end)
+        failure = fuzzer.run(seed, index, stop - index, current)
+        if failure is None:
+            index = stop
+            continue
+
+        failures.put(failure)
+        found += 1
+        index = failure.index + 1
+
+    progress[shard] = index
+
+
+def replay_command(seed: int, index: int) -> str:
+    return f'{sys.argv[0]} --seed {seed:#x} --case {index}'
+
+
+def replay(seed: int, index: int) -> int:
+    failure = Fuzzer().run(seed, index, 1)
+    if failure is None:
+        print(f'case {index}: rlibc and the host agree')
+        return 0
+
+    print(f'case {index}: {failure.report}', end='')
+    return 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n',
+                        '--cases',
+                        type=int,
+                        default=1_000_000,
+                        help='number of cases to run (default: 1000000)')
+    parser.add_argument('-s',
+                        '--seed',
+                        type=lambda s: int(s, 0),
+                        help='seed from which cases are generated '
+                        '(default: random)')
+    parser.add_argument('-j',
+                        '--jobs',
+                        type=int,
+                        default=os.cpu_count() or 1,
+                        help='number of worker processes (default: all CPUs)')
+    parser.add_argument('--max-failures',
+                        type=int,
+                        default=10,
+                        help='stop each worker after this many failures '
+                        '(default: 10)')
+    parser.add_argument('--case',
+                        type=int,
+                        help='replay a single case of the seed and print '
+                        'its result')
+    args = parser.parse_args()
+
+    if platform.machine() != 'x86_64':
+        print('The fuzzing harness passes snprintf() arguments in a way '
+              'specific to x86_64', file=sys.stderr)
+        return 1
+
+    if args.seed is None:
+        if args.case is not None:
+            parser.error('--case requires --seed')
+        args.seed = random.getrandbits(64)
+
+    if args.case is not None:
+        return replay(args.seed, args.case)
+
+    # Fail early, before starting any workers.
+    Fuzzer()
+
+    jobs = max(1, min(args.jobs, args.cases))
+    bounds = [args.cases * shard // jobs for shard in range(jobs + 1)]
+    progress = multiprocessing.RawArray(ctypes.c_uint64, bounds[:-1])
+    queue = multiprocessing.SimpleQueue()
+
+    workers = [
+        multiprocessing.Process(target=run_shard,
+                                args=(args.seed, shard, bounds[shard],
+                                      bounds[shard + 1] - bounds[shard],
+                                      progress, queue, args.max_failures))
+        for shard in range(jobs)
+    ]
+
+    print(f'Running {args.cases} cases with seed {args.seed:#x} '
+          f'using {jobs} processes')
+    start = time.monotonic()
+    for worker in workers:
+        worker.start()
+
+    failures: List[Failure] = []
+    interactive = sys.stdout.isatty()
+    while any(worker.is_alive() for worker in workers):
+        time.sleep(0.25)
+        while not queue.empty():
+            failures.append(queue.get())
+        if interactive:
+            done = sum(progress[i] - bounds[i] for i in range(jobs))
+            print(f'\r{done}/{args.cases} cases, {len(failures)} failures',
+                  end='',
+                  flush=True)
+    if interactive:
+        print()
+
+    for worker in workers:
+        worker.join()
+    while not queue.empty():
+        failures.append(queue.get())
+    elapsed = time.monotonic() - start
+
+    separator = '=' * 70
+    for failure in sorted(failures):
+        print(separator)
+        print(f'case {failure.index}: {failure.report}', end='')
+        print(f'replay: {replay_command(args.seed, failure.index)}')
+
+    crashes = 0
+    for shard, worker in enumerate(workers):
+        if worker.exitcode == 0:
+            continue
+
+        crashes += 1
+        index = progress[shard]
+        if worker.exitcode < 0:
+            reason = f'killed by {signal.Signals(-worker.exitcode).name}'
+        else:
+            reason = f'exited with status {worker.exitcode}'
+        print(separator)
+        print(f'case {index}: worker {reason}')
+        print(f'replay: {replay_command(args.seed, index)}')
+
+    done = sum(progress[i] - bounds[i] for i in range(jobs))
+    print('-' * 70)
+    print(f'Ran {done} cases in {elapsed:.2f}s '
+          f'({done / elapsed * 60:,.0f} per minute) using {jobs} processes')
+
+    if failures or crashes:
+        print(f'FAILED (mismatches={len(failures)}, crashes={crashes})')
+        return 1
+
+    print('OK')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1251 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+// Differential fuzzing of rlibc against the host C library.
+//
+// This file is compiled against the host C library into a standalone shared
+// object, like the benchmark harness. The fuzz driver passes it two tables of
+// function pointers, one resolved from rlibc's test library and one from the
+// host, in the order given by rc_fuzz_function_name(). Each case is generated
+// from a seed and its index alone, so any case can be replayed by itself. It
+// is run through both tables on identical inputs, and their results and every
+// byte of their destination buffers are compared.
+//
+// Inputs and outputs are placed in windows surrounded by inaccessible guard
+// pages, often right against one, so that reads or writes beyond the bounds
+// of an argument crash the process instead of going unnoticed.
+//
+// snprintf() is called with six integer and eight double arguments following
+// the format, whichever conversions the format contains. Under the x86_64
+// System V calling convention, the doubles are all passed in registers and
+// read from a separate save area, so a conversion's argument is found by its
+// position among the integer or floating point conversions alone. The driver
+// refuses to run on other architectures.
+
+#include <stdarg.h>
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <unistd.h>
+
+typedef int (*format_fn)(char *, size_t, const char *, ...);
+typedef void *(*copy_fn)(void *, const void *, size_t);
+typedef void *(*copy_until_fn)(void *, const void *, int, size_t);
+typedef void *(*set_fn)(void *, int, size_t);
+typedef int (*compare_fn)(const void *, const void *, size_t);
+typedef void *(*scan_fn)(const void *, int, size_t);
+typedef void *(*memmem_fn)(const void *, size_t, const void *, size_t);
+typedef size_t (*strlen_fn)(const char *);
+typedef size_t (*strnlen_fn)(const char *, size_t);
+typedef int (*strcmp_fn)(const char *, const char *);
+typedef int (*strncmp_fn)(const char *, const char *, size_t);
+typedef char *(*strchr_fn)(const char *, int);
+typedef char *(*strstr_fn)(const char *, const char *);
+typedef char *(*strcpy_fn)(char *, const char *);
+typedef char *(*strncpy_fn)(char *, const char *, size_t);
+typedef size_t (*strlcpy_fn)(char *, const char *, size_t);
+typedef long long (*parse_fn)(const char *, char **, int);
+
+// Every function under test, with the type it is called through.
+#define FUZZ_FUNCTIONS(X)     \
+    X(format_fn, snprintf)    \
+    X(copy_fn, memcpy)        \
+    X(copy_fn, mempcpy)       \
+    X(copy_fn, memmove)       \
+    X(set_fn, memset)         \
+    X(compare_fn, memcmp)     \
+    X(scan_fn, memchr)        \
+    X(copy_until_fn, memccpy) \
+    X(memmem_fn, memmem)      \
+    X(strlen_fn, strlen)      \
+    X(strnlen_fn, strnlen)    \
+    X(strcmp_fn, strcmp)      \
+    X(strncmp_fn, strncmp)    \
+    X(strchr_fn, strchr)      \
+    X(strchr_fn, strrchr)     \
+    X(strstr_fn, strstr)      \
+    X(strcpy_fn, strcpy)      \
+    X(strcpy_fn, stpcpy)      \
+    X(strncpy_fn, strncpy)    \
+    X(strncpy_fn, stpncpy)    \
+    X(strcpy_fn, strcat)      \
+    X(strncpy_fn, strncat)    \
+    X(strlcpy_fn, strlcpy)    \
+    X(strlcpy_fn, strlcat)    \
+    X(parse_fn, strtol)       \
+    X(parse_fn, strtoul)      \
+    X(parse_fn, strtoll)      \
+    X(parse_fn, strtoull)
+
+#define FUNCTION_FIELD(type, name) type fn_##name;
+#define FUNCTION_KIND(type, name) KIND_##name,
+#define FUNCTION_NAME(type, name) #name,
+
+struct functions {
+    FUZZ_FUNCTIONS(FUNCTION_FIELD)
+};
+
+enum kind { FUZZ_FUNCTIONS(FUNCTION_KIND) KIND_COUNT };
+
+static const char *const function_names[] = {FUZZ_FUNCTIONS(FUNCTION_NAME)};
+
+// Returns the number of functions in a function table.
+size_t rc_fuzz_function_count(void) { return KIND_COUNT; }
+
+// Returns the name of the function at index i of a function table.
+const char *rc_fuzz_function_name(size_t i)
+{
+    return i < KIND_COUNT ? function_names[i] : NULL;
+}
+
+// Reference implementations of strlcpy() and strlcat(), for host C libraries
+// which do not provide them (such as glibc before 2.38).
+size_t rc_fuzz_strlcpy(char *dst, const char *src, size_t n)
+{
+    const size_t length = strlen(src);
+    if (n != 0) {
+        const size_t copied = length < n ? length : n - 1;
+        memcpy(dst, src, copied);
+        dst[copied] = '\0';
+    }
+    return length;
+}
+
+size_t rc_fuzz_strlcat(char *dst, const char *src, size_t n)
+{
+    const size_t used = strnlen(dst, n);
+    if (used == n) {
+        return n + strlen(src);
+    }
+    return used + rc_fuzz_strlcpy(dst + used, src, n - used);
+}
+
+//
+// Guarded memory windows.
+//
+
+#define WINDOW_SIZE 8192
+
+// Largest input generated for a single argument, leaving room in a window for
+// a random alignment and a terminator.
+#define MAX_LENGTH 4096
+
+enum window {
+    // Inputs, shared by both calls.
+    WINDOW_SOURCE,
+    WINDOW_AUX,
+    // Destinations, identically initialized before each call.
+    WINDOW_RLIBC,
+    WINDOW_HOST,
+    WINDOW_COUNT,
+};
+
+static uint8_t *windows[WINDOW_COUNT];
+
+// Maps each window between two inaccessible pages.
+static bool map_windows(void)
+{
+    if (windows[0] != NULL) {
+        return true;
+    }
+
+    const size_t page = sysconf(_SC_PAGESIZE);
+    if (WINDOW_SIZE % page != 0) {
+        return false;
+    }
+
+    const size_t stride = WINDOW_SIZE + page;
+    uint8_t *base = mmap(NULL,
+                         page + WINDOW_COUNT * stride,
+                         PROT_NONE,
+                         MAP_PRIVATE | MAP_ANONYMOUS,
+                         -1,
+                         0);
+    if (base == MAP_FAILED) {
+        return false;
+    }
+
+    for (int i = 0; i < WINDOW_COUNT; ++i) {
+        uint8_t *window = base + page + i * stride;
+        if (mprotect(window, WINDOW_SIZE, PROT_READ | PROT_WRITE) != 0) {
+            return false;
+        }
+        windows[i] = window;
+    }
+    return true;
+}
+
+//
+// Random generation.
+//
+
+struct rng {
+    uint64_t state;
+};
+
+// SplitMix64.
+static uint64_t next(struct rng *r)
+{
+    uint64_t z = (r->state += 0x9e3779b97f4a7c15);
+    z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9;
+    z = (z ^ (z >> 27)) * 0x94d049bb133111eb;
+    return z ^ (z >> 31);
+}
+
+// Returns a random integer in [0, n).
+static uint64_t below(struct rng *r, uint64_t n)
+{
+    return ((unsigned __int128)next(r) * n) >> 64;
+}
+
+// Returns true with a probability of 1/n.
+static bool one_in(struct rng *r, uint64_t n) { return below(r, n) == 0; }
+
+// Returns a length up to max, biased towards short ones.
+static size_t random_length(struct rng *r, size_t max)
+{
+    static const size_t limits[] = {16, 64, 256, MAX_LENGTH};
+    const size_t limit = limits[below(r, 4)];
+    return below(r, (limit < max ? limit : max) + 1);
+}
+
+// Returns the offset within a window at which to place an object of the given
+// size: either at a random alignment from its start, or right against the
+// guard page at its end.
+static size_t place(struct rng *r, size_t size)
+{
+    if (one_in(r, 3)) {
+        return WINDOW_SIZE - size;
+    }
+    return below(r, 64);
+}
+
+enum alphabet {
+    // Two letters, so that searches find many partial matches.
+    ALPHABET_NARROW,
+    // Any byte other than NUL.
+    ALPHABET_TEXT,
+    // Any byte.
+    ALPHABET_BYTES,
+};
+
+static uint8_t random_byte(struct rng *r, enum alphabet alphabet)
+{
+    switch (alphabet) {
+    case ALPHABET_NARROW:
+        return 'a' + below(r, 2);
+    case ALPHABET_TEXT:
+        return 1 + below(r, 255);
+    case ALPHABET_BYTES:
+        break;
+    }
+    return below(r, 256);
+}
+
+static void fill(struct rng *r, uint8_t *p, size_t n, enum alphabet alphabet)
+{
+    for (size_t i = 0; i < n; ++i) {
+        p[i] = random_byte(r, alphabet);
+    }
+}
+
+// Places `length` random bytes in a window, followed by a NUL if `terminate`
+// is set. Returns a pointer to the first byte.
+static uint8_t *put_random(struct rng *r,
+                           enum window window,
+                           size_t length,
+                           enum alphabet alphabet,
+                           bool terminate)
+{
+    uint8_t *p = windows[window] + place(r, length + terminate);
+    fill(r, p, length, alphabet);
+    if (terminate) {
+        p[length] = '\0';
+    }
+    return p;
+}
+
+// Places a copy of `length` bytes in a window, as put_random().
+static uint8_t *put_copy(struct rng *r,
+                         enum window window,
+                         const uint8_t *bytes,
+                         size_t length,
+                         bool terminate)
+{
+    uint8_t *p = windows[window] + place(r, length + terminate);
+    memmove(p, bytes, length);
+    if (terminate) {
+        p[length] = '\0';
+    }
+    return p;
+}
+
+// Returns a character argument for a search: usually one found in the first
+// `length` bytes of s, otherwise a random one. Some have bits set above the
+// low byte, which must be ignored.
+static int search_char(struct rng *r, const uint8_t *s, size_t length)
+{
+    int c = length > 0 && !one_in(r, 3) ? s[below(r, length)]
+                                        : (int)below(r, 256);
+    if (one_in(r, 8)) {
+        c += one_in(r, 2) ? 256 * (1 + (int)below(r, 4)) : -256;
+    }
+    return c;
+}
+
+// Returns a random integer, favoring small values and the boundaries of each
+// integer type.
+static uint64_t random_integer(struct rng *r)
+{
+    static const uint64_t boundaries[] = {
+        0,           1,          0x7f,        0x80,
+        0xff,        0x7fff,     0x8000,      0xffff,
+        0x7fffffff,  0x80000000, 0xffffffff,  0x100000000,
+        999999999,   1000000000, 0x7fffffffffffffff,
+        0x8000000000000000,      10000000000000000000u,
+    };
+
+    uint64_t value;
+    switch (below(r, 4)) {
+    case 0:
+        return below(r, 100);
+    case 1:
+        value = boundaries[below(r, sizeof boundaries / sizeof *boundaries)];
+        break;
+    default:
+        value = next(r) >> below(r, 64);
+        break;
+    }
+    return one_in(r, 3) ? -value : value;
+}
+
+// Returns a random double: any bit pattern, a short decimal, a value of
+// moderate size, a tie between two short decimals, or a special value.
+static double random_double(struct rng *r)
+{
+    static const double powers_of_ten[] = {1e0, 1e1, 1e2, 1e3, 1e4, 1e5, 1e6};
+    static const double specials[] = {
+        0.0,     1.0,      0.5,     9.5,   0.05,      999999.5,
+        1e15,    1e16,     1e17,    1e21,  1e-5,      0.0001,
+        1e308,   2.2250738585072014e-308,  4.9406564584124654e-324,
+        1.7976931348623157e308, __builtin_inf(), __builtin_nan(""),
+    };
+
+    const bool negative = one_in(r, 3);
+    double value;
+    uint64_t bits;
+
+    switch (below(r, 5)) {
+    case 0:
+        bits = next(r);
+        memcpy(&value, &bits, sizeof value);
+        return value;
+    case 1:
+        value = (double)below(r, 10000000) / powers_of_ten[below(r, 7)];
+        break;
+    case 2:
+        bits = (next(r) >> 12) | (uint64_t)(1023 - 40 + below(r, 100)) << 52;
+        memcpy(&value, &bits, sizeof value);
+        break;
+    case 3:
+        value = (double)(2 * below(r, 100000) + 1) / (1 << below(r, 12));
+        break;
+    default:
+        value = specials[below(r, sizeof specials / sizeof *specials)];
+        break;
+    }
+    return negative ? -value : value;
+}
+
+//
+// Reporting.
+//
+
+struct report {
+    char *buffer;
+    size_t size;
+    size_t length;
+};
+
+__attribute__((format(printf, 2, 3))) static void report_printf(
+    struct report *report, const char *format, ...)
+{
+    if (report->length >= report->size) {
+        return;
+    }
+
+    va_list ap;
+    va_start(ap, format);
+    const int written = vsnprintf(report->buffer + report->length,
+                                  report->size - report->length,
+                                  format,
+                                  ap);
+    va_end(ap);
+
+    if (written > 0) {
+        report->length += written;
+    }
+}
+
+// Appends bytes as a quoted C string, truncated if long.
+static void report_bytes(struct report *report, const void *bytes, size_t n)
+{
+    const uint8_t *p = bytes;
+    const size_t shown = n < 256 ? n : 256;
+
+    report_printf(report, "\"");
+    for (size_t i = 0; i < shown; ++i) {
+        if (p[i] == '"' || p[i] == '\\') {
+            report_printf(report, "\\%c", p[i]);
+        } else if (p[i] >= 0x20 && p[i] < 0x7f) {
+            report_printf(report, "%c", p[i]);
+        } else {
+            report_printf(report, "\\x%02x", p[i]);
+        }
+    }
+    report_printf(report, "\"%s", shown < n ? "..." : "");
+}
+
+// Reports the first difference between the two destination windows, if any,
+// relative to the destination pointer at `dst`. Returns true if they differ.
+static bool report_windows(struct report *report, size_t dst)
+{
+    const uint8_t *rlibc = windows[WINDOW_RLIBC];
+    const uint8_t *host = windows[WINDOW_HOST];
+
+    if (memcmp(rlibc, host, WINDOW_SIZE) == 0) {
+        return false;
+    }
+
+    size_t i = 0;
+    while (rlibc[i] == host[i]) {
+        ++i;
+    }
+
+    const size_t start = i < 16 ? 0 : i - 16;
+    const size_t length = WINDOW_SIZE - start < 48 ? WINDOW_SIZE - start : 48;
+    report_printf(report,
+                  "  destinations differ at dst%+td; from dst%+td:\n",
+                  (ptrdiff_t)i - (ptrdiff_t)dst,
+                  (ptrdiff_t)start - (ptrdiff_t)dst);
+    report_printf(report, "    rlibc: ");
+    report_bytes(report, rlibc + start, length);
+    report_printf(report, "\n    host:  ");
+    report_bytes(report, host + start, length);
+    report_printf(report, "\n");
+    return true;
+}
+
+// Fills both destination windows with the same random byte.
+static void prepare_windows(struct rng *r)
+{
+    const int fill_byte = 1 + below(r, 255);
+    memset(windows[WINDOW_RLIBC], fill_byte, WINDOW_SIZE);
+    memset(windows[WINDOW_HOST], fill_byte, WINDOW_SIZE);
+}
+
+//
+// snprintf().
+//
+
+#define MAX_INTS 6
+#define MAX_DOUBLES 8
+
+// Offset of the first of the argument strings for %s in the source window.
+// Each is given its own slot, as are the unterminated arrays used for %.Ns,
+// which are placed at the end of the auxiliary window.
+#define STRING_SLOT_SIZE 512
+
+struct printf_case {
+    char format[512];
+    uint64_t ints[MAX_INTS];
+    int int_count;
+    double doubles[MAX_DOUBLES];
+    int double_count;
+    size_t dst;
+    size_t size;
+};
+
+// Returns true if %#g would round value into a new power of ten. glibc then
+// drops the trailing zeros the '#' flag should keep (printing "1.e+06" for
+// 999999.5), so such cases are not generated.
+static bool rounds_to_power_of_ten(double value, int precision)
+{
+    char digits[32];
+    snprintf(digits,
+             sizeof digits,
+             "%.*e",
+             precision < 0 ? 5 : precision == 0 ? 0 : precision - 1,
+             value < 0 ? -value : value);
+
+    if (digits[0] != '1') {
+        return false;
+    }
+    for (const char *p = digits + 1; *p != 'e' && *p != '\0'; ++p) {
+        if (*p != '0' && *p != '.') {
+            return false;
+        }
+    }
+    return true;
+}
+
+static void append(char **p, const char *s)
+{
+    const size_t length = strlen(s);
+    memcpy(*p, s, length);
+    *p += length;
+}
+
+// Appends a random conversion to the format, generating its argument.
+// Only combinations whose output the C standard defines are generated, and
+// none of the following, where rlibc's output deliberately differs from the
+// usual one:
+//  - A '0' flag together with a precision for an integer conversion. rlibc
+//    zero-pads the field instead of ignoring the flag.
+//  - A precision of zero for an integer conversion of zero, which rlibc
+//    prints as "0" instead of no digits.
+//  - %p of NULL, which rlibc prints as "0".
+static void append_conversion(struct rng *r,
+                              struct printf_case *c,
+                              char **format,
+                              bool *used_end)
+{
+    static const char conversions[] = "diouxXcsp%fFeEgGaA";
+    const char conversion = conversions[below(r, sizeof conversions - 1)];
+
+    const bool is_double = strchr("fFeEgGaA", conversion) != NULL;
+    const bool is_integer = strchr("diouxX", conversion) != NULL;
+    if ((is_double && c->double_count == MAX_DOUBLES) ||
+        (!is_double && conversion != '%' && c->int_count == MAX_INTS)) {
+        append(format, "%%");
+        return;
+    }
+    if (conversion == '%') {
+        append(format, "%%");
+        return;
+    }
+
+    const char *allowed = is_double    ? "-+ 0#"
+                          : is_integer ? (strchr("oxX", conversion) ? "-+ 0#"
+                                                                    : "-+ 0")
+                                       : "-";
+
+    char flags[8] = {0};
+    size_t flag_count = 0;
+    for (const char *f = allowed; *f != '\0'; ++f) {
+        if (one_in(r, 4)) {
+            flags[flag_count++] = *f;
+        }
+    }
+
+    const int width = one_in(r, 2)  ? -1
+                      : one_in(r, 8) ? 1 + (int)below(r, 300)
+                                     : 1 + (int)below(r, 24);
+
+    int precision = -1;
+    if (conversion != 'c' && conversion != 'p' && one_in(r, 2)) {
+        precision = one_in(r, 32)  ? (int)below(r, 400)
+                    : one_in(r, 4) ? (int)below(r, 60)
+                                   : (int)below(r, 18);
+    }
+
+    const char *length = "";
+    if (is_integer) {
+        static const char *const lengths[] = {"", "", "h", "l", "ll"};
+        length = lengths[below(r, 5)];
+        if (strchr(flags, '0') != NULL) {
+            precision = -1;
+        }
+    }
+
+    if (is_double) {
+        const double value = random_double(r);
+        c->doubles[c->double_count++] = value;
+
+        char *special = strchr(flags, '#');
+        if (special != NULL && (conversion == 'g' || conversion == 'G') &&
+            rounds_to_power_of_ten(value, precision)) {
+            *special = '-';
+        }
+    } else if (conversion == 's') {
+        uint8_t *s;
+        if (precision >= 0 && !*used_end && one_in(r, 4)) {
+            // An array need not be terminated if the precision is no longer.
+            s = windows[WINDOW_AUX] + WINDOW_SIZE - precision;
+            fill(r, s, precision, ALPHABET_TEXT);
+            *used_end = true;
+        } else {
+            s = windows[WINDOW_SOURCE] + c->int_count * STRING_SLOT_SIZE +
+                below(r, 64);
+            const size_t n = one_in(r, 4) ? below(r, 300) : below(r, 24);
+            fill(r, s, n, ALPHABET_TEXT);
+            s[n] = '\0';
+        }
+        c->ints[c->int_count++] = (uintptr_t)s;
+    } else {
+        uint64_t value = random_integer(r);
+        if ((conversion == 'p' || precision == 0) && (value & 0xffff) == 0) {
+            value |= 1;
+        }
+        c->ints[c->int_count++] = value;
+    }
+
+    char spec[64];
+    char *p = spec;
+    *p++ = '%';
+    append(&p, flags);
+    if (width >= 0) {
+        p += sprintf(p, "%d", width);
+    }
+    if (precision >= 0) {
+        p += sprintf(p, ".%d", precision);
+    }
+    append(&p, length);
+    *p++ = conversion;
+    *p = '\0';
+
+    append(format, spec);
+}
+
+static void generate_printf_case(struct rng *r, struct printf_case *c)
+{
+    memset(c->ints, 0, sizeof c->ints);
+    memset(c->doubles, 0, sizeof c->doubles);
+    c->int_count = 0;
+    c->double_count = 0;
+
+    char *format = c->format;
+    bool used_end = false;
+    const int conversions = one_in(r, 8) ? below(r, 14) : below(r, 5);
+
+    for (int i = 0; i <= conversions; ++i) {
+        // Literal text between conversions.
+        for (uint64_t n = below(r, 5); n > 0; --n) {
+            const char ch = ' ' + below(r, 0x7f - ' ');
+            *format++ = ch;
+            if (ch == '%') {
+                *format++ = '%';
+            }
+        }
+        if (i < conversions) {
+            append_conversion(r, c, &format, &used_end);
+        }
+    }
+    *format = '\0';
+
+    c->dst = below(r, 64);
+    switch (below(r, 4)) {
+    case 0:
+        c->size = below(r, 16);
+        break;
+    case 1:
+        c->size = below(r, 128);
+        break;
+    default:
+        c->size = WINDOW_SIZE - c->dst;
+        break;
+    }
+}
+
+static int run_printf_case(const struct functions *fns,
+                           const struct printf_case *c,
+                           enum window window)
+{
+    const uint64_t *i = c->ints;
+    const double *d = c->doubles;
+    return fns->fn_snprintf((char *)windows[window] + c->dst,
+                            c->size,
+                            c->format,
+                            i[0], i[1], i[2], i[3], i[4], i[5],
+                            d[0], d[1], d[2], d[3], d[4], d[5], d[6], d[7]);
+}
+
+static bool printf_case(const struct functions *rlibc,
+                        const struct functions *host,
+                        struct rng *r,
+                        struct report *report)
+{
+    struct printf_case c;
+    generate_printf_case(r, &c);
+    prepare_windows(r);
+
+    const int rlibc_result = run_printf_case(rlibc, &c, WINDOW_RLIBC);
+    const int host_result = run_printf_case(host, &c, WINDOW_HOST);
+    if (rlibc_result == host_result &&
+        memcmp(windows[WINDOW_RLIBC], windows[WINDOW_HOST], WINDOW_SIZE) ==
+            0) {
+        return true;
+    }
+
+    report_printf(report, "snprintf(dst, %zu, ", c.size);
+    report_bytes(report, c.format, strlen(c.format));
+    report_printf(report, ")\n  integers:");
+    for (int i = 0; i < c.int_count; ++i) {
+        report_printf(report, " %#llx", (unsigned long long)c.ints[i]);
+    }
+    report_printf(report, "\n  doubles:");
+    for (int i = 0; i < c.double_count; ++i) {
+        report_printf(report, " %a", c.doubles[i]);
+    }
+    report_printf(report,
+                  "\n  rlibc returned %d, host returned %d\n",
+                  rlibc_result,
+                  host_result);
+    report_windows(report, c.dst);
+    return false;
+}
+
+//
+// Memory and string functions.
+//
+
+struct string_case {
+    enum kind kind;
+
+    // The inputs, in the source and auxiliary windows.
+    const uint8_t *a;
+    size_t a_length;
+    const uint8_t *b;
+    size_t b_length;
+
+    // Offset of the destination in each destination window, and of the
+    // source within it for memmove().
+    size_t dst;
+    size_t move_source;
+
+    size_t n;
+    // Character to search for or to fill with, or a base to parse in.
+    int c;
+};
+
+// Result of a call, with pointers converted to offsets from the argument they
+// point into, or -1 for NULL.
+struct outcome {
+    long long value;
+    long long end;
+};
+
+static long long offset(const void *p, const void *base)
+{
+    return p == NULL ? -1 : (const uint8_t *)p - (const uint8_t *)base;
+}
+
+static long long sign(int value) { return (value > 0) - (value < 0); }
+
+// Places a string of up to `max` characters in the source window, from a
+// narrow alphabet half of the time. Returns the alphabet used.
+static enum alphabet put_source_string(struct rng *r,
+                                       struct string_case *c,
+                                       size_t max)
+{
+    const enum alphabet alphabet =
+        one_in(r, 2) ? ALPHABET_NARROW : ALPHABET_TEXT;
+    c->a_length = random_length(r, max);
+    c->a = put_random(r, WINDOW_SOURCE, c->a_length, alphabet, true);
+    return alphabet;
+}
+
+// Places a needle in the auxiliary window: usually a piece of the haystack,
+// which is sometimes altered, otherwise random bytes from the haystack's
+// alphabet.
+static void put_needle(struct rng *r,
+                       struct string_case *c,
+                       enum alphabet alphabet,
+                       bool terminate)
+{
+    uint8_t needle[MAX_LENGTH];
+
+    if (c->a_length > 0 && !one_in(r, 3)) {
+        const size_t max = c->a_length < 300 ? c->a_length : 300;
+        c->b_length = below(r, max + 1);
+        memcpy(needle, c->a + below(r, c->a_length - c->b_length + 1),
+               c->b_length);
+        if (c->b_length > 0 && one_in(r, 3)) {
+            needle[below(r, c->b_length)] = random_byte(r, alphabet);
+        }
+    } else {
+        c->b_length = below(r, 20);
+        fill(r, needle, c->b_length, alphabet);
+    }
+
+    c->b = put_copy(r, WINDOW_AUX, needle, c->b_length, terminate);
+}
+
+// Places a string in a destination window, identically in both.
+static void put_destination_string(struct rng *r,
+                                   size_t at,
+                                   size_t length)
+{
+    fill(r, windows[WINDOW_RLIBC] + at, length, ALPHABET_TEXT);
+    windows[WINDOW_RLIBC][at + length] = '\0';
+    memcpy(windows[WINDOW_HOST] + at, windows[WINDOW_RLIBC] + at, length + 1);
+}
+
+// Returns a number for strtol() to parse in the given base, made of optional
+// whitespace, a sign and a prefix, digits which are mostly valid, and a
+// random final character.
+static size_t random_number(struct rng *r, int base, uint8_t *s)
+{
+    static const char whitespace[] = " \t\n\v\f\r";
+    static const char digits[] = "0123456789abcdefghijklmnopqrstuvwxyz";
+    uint8_t *p = s;
+
+    for (uint64_t n = below(r, 3); n > 0; --n) {
+        *p++ = whitespace[below(r, sizeof whitespace - 1)];
+    }
+    if (one_in(r, 2)) {
+        *p++ = one_in(r, 2) ? '-' : '+';
+    }
+    if ((base == 0 || base == 16) && one_in(r, 2)) {
+        *p++ = '0';
+        *p++ = one_in(r, 2) ? 'x' : 'X';
+    } else if (base == 0 && one_in(r, 3)) {
+        *p++ = '0';
+    }
+
+    const int valid = base == 0 ? 10 : base;
+    for (size_t n = random_length(r, 40); n > 0; --n) {
+        if (one_in(r, 16)) {
+            *p++ = ' ' + below(r, 0x7f - ' ');
+        } else {
+            const char digit = digits[below(r, valid)];
+            *p++ = one_in(r, 2) && digit >= 'a' ? digit - 'a' + 'A' : digit;
+        }
+    }
+    if (one_in(r, 2)) {
+        *p++ = ' ' + below(r, 0x7f - ' ');
+    }
+
+    return p - s;
+}
+
+static void generate_string_case(struct rng *r,
+                                 enum kind kind,
+                                 struct string_case *c)
+{
+    memset(c, 0, sizeof *c);
+    c->kind = kind;
+    prepare_windows(r);
+
+    switch (kind) {
+    case KIND_memcpy:
+    case KIND_mempcpy:
+    case KIND_memccpy:
+        c->n = random_length(r, MAX_LENGTH);
+        c->a_length = c->n;
+        c->a = put_random(r,
+                          WINDOW_SOURCE,
+                          c->n,
+                          one_in(r, 2) ? ALPHABET_NARROW : ALPHABET_BYTES,
+                          false);
+        c->dst = place(r, c->n);
+        c->c = search_char(r, c->a, c->n);
+        break;
+
+    case KIND_memmove: {
+        c->n = random_length(r, MAX_LENGTH);
+        c->dst = place(r, c->n);
+
+        // Overlap the source with the destination, in either direction.
+        const long long delta = (long long)below(r, 2 * c->n + 33) - c->n - 16;
+        long long source = c->dst + delta;
+        if (source < 0) {
+            source = 0;
+        } else if (source > (long long)(WINDOW_SIZE - c->n)) {
+            source = WINDOW_SIZE - c->n;
+        }
+        c->move_source = source;
+
+        const size_t low = c->dst < c->move_source ? c->dst : c->move_source;
+        const size_t high =
+            (c->dst > c->move_source ? c->dst : c->move_source) + c->n;
+        fill(r, windows[WINDOW_RLIBC] + low, high - low, ALPHABET_BYTES);
+        memcpy(windows[WINDOW_HOST] + low,
+               windows[WINDOW_RLIBC] + low,
+               high - low);
+        break;
+    }
+
+    case KIND_memset:
+        c->n = random_length(r, MAX_LENGTH);
+        c->dst = place(r, c->n);
+        c->c = (int)random_integer(r);
+        break;
+
+    case KIND_memcmp: {
+        c->n = random_length(r, MAX_LENGTH);
+        c->a_length = c->b_length = c->n;
+        c->a = put_random(r, WINDOW_SOURCE, c->n, ALPHABET_BYTES, false);
+        uint8_t *b = put_copy(r, WINDOW_AUX, c->a, c->n, false);
+        if (c->n > 0 && !one_in(r, 4)) {
+            b[below(r, c->n)] ^= 1 + below(r, 255);
+        }
+        c->b = b;
+        break;
+    }
+
+    case KIND_memchr:
+        c->n = random_length(r, MAX_LENGTH);
+        c->a_length = c->n;
+        c->a = put_random(r,
+                          WINDOW_SOURCE,
+                          c->n,
+                          one_in(r, 2) ? ALPHABET_NARROW : ALPHABET_BYTES,
+                          false);
+        c->c = search_char(r, c->a, c->n);
+        break;
+
+    case KIND_memmem: {
+        const enum alphabet alphabet =
+            one_in(r, 4) ? ALPHABET_BYTES : ALPHABET_NARROW;
+        c->a_length = random_length(r, MAX_LENGTH);
+        c->a = put_random(r, WINDOW_SOURCE, c->a_length, alphabet, false);
+        put_needle(r, c, alphabet, false);
+        break;
+    }
+
+    case KIND_strlen:
+    case KIND_strchr:
+    case KIND_strrchr:
+    case KIND_strcpy:
+    case KIND_stpcpy:
+        put_source_string(r, c, MAX_LENGTH);
+        c->c = one_in(r, 8) ? 0 : search_char(r, c->a, c->a_length);
+        c->dst = place(r, c->a_length + 1);
+        break;
+
+    case KIND_strnlen: {
+        // Without a terminator, the array must be at least n long.
+        const bool terminate = one_in(r, 2);
+        c->a_length = random_length(r, MAX_LENGTH);
+        c->a = put_random(
+            r, WINDOW_SOURCE, c->a_length, ALPHABET_TEXT, terminate);
+        c->n = !terminate   ? below(r, c->a_length + 1)
+               : one_in(r, 4) ? SIZE_MAX
+                              : below(r, c->a_length + 16);
+        break;
+    }
+
+    case KIND_strcmp:
+    case KIND_strncmp: {
+        uint8_t b[MAX_LENGTH + 16];
+        put_source_string(r, c, MAX_LENGTH);
+        memcpy(b, c->a, c->a_length);
+        c->b_length = c->a_length;
+
+        switch (below(r, 4)) {
+        case 0:
+            break;
+        case 1:
+            if (c->b_length > 0) {
+                b[below(r, c->b_length)] = random_byte(r, ALPHABET_TEXT);
+            }
+            break;
+        case 2:
+            c->b_length = below(r, c->a_length + 1);
+            break;
+        default:
+            for (uint64_t n = 1 + below(r, 16); n > 0; --n) {
+                b[c->b_length++] = random_byte(r, ALPHABET_TEXT);
+            }
+            break;
+        }
+        c->b = put_copy(r, WINDOW_AUX, b, c->b_length, true);
+
+        c->n = one_in(r, 4)   ? SIZE_MAX
+               : one_in(r, 3) ? c->a_length + below(r, 2)
+                              : below(r, c->a_length + 8);
+        break;
+    }
+
+    case KIND_strstr:
+        put_needle(r, c, put_source_string(r, c, MAX_LENGTH), true);
+        break;
+
+    case KIND_strncpy:
+    case KIND_stpncpy:
+    case KIND_strncat: {
+        // The source may be an unterminated array at least n long.
+        const bool terminate = !one_in(r, 4);
+        c->a_length = random_length(r, MAX_LENGTH);
+        c->a = put_random(
+            r, WINDOW_SOURCE, c->a_length, ALPHABET_TEXT, terminate);
+        c->n = terminate ? below(r, 2 * c->a_length + 16)
+                         : below(r, c->a_length + 1);
+        if (c->n > MAX_LENGTH) {
+            c->n = MAX_LENGTH;
+        }
+
+        if (kind != KIND_strncat) {
+            c->dst = place(r, c->n);
+            break;
+        }
+
+        const size_t prefix = random_length(r, 256);
+        const size_t appended = c->n < c->a_length ? c->n : c->a_length;
+        c->dst = place(r, prefix + appended + 1);
+        put_destination_string(r, c->dst, prefix);
+        break;
+    }
+
+    case KIND_strcat:
+    case KIND_strlcat: {
+        put_source_string(r, c, MAX_LENGTH);
+        const size_t prefix = random_length(r, 256);
+        c->n = below(r, prefix + c->a_length + 16);
+
+        size_t needed = prefix + c->a_length + 1;
+        if (kind == KIND_strlcat) {
+            needed = c->n > prefix ? c->n : prefix + 1;
+        }
+        c->dst = place(r, needed);
+        put_destination_string(r, c->dst, prefix);
+        break;
+    }
+
+    case KIND_strlcpy:
+        put_source_string(r, c, MAX_LENGTH);
+        c->n = below(r, c->a_length + 16);
+        c->dst = place(r, c->n);
+        break;
+
+    case KIND_strtol:
+    case KIND_strtoul:
+    case KIND_strtoll:
+    case KIND_strtoull: {
+        static const int bases[] = {0, 0, 10, 10, 16, 16, 8, 2, 36};
+        uint8_t number[128];
+        c->c = one_in(r, 4) ? 2 + (int)below(r, 35)
+                            : bases[below(r, sizeof bases / sizeof *bases)];
+        c->a_length = random_number(r, c->c, number);
+        c->a = put_copy(r, WINDOW_SOURCE, number, c->a_length, true);
+        break;
+    }
+
+    case KIND_snprintf:
+    case KIND_COUNT:
+        break;
+    }
+}
+
+static struct outcome run_string_case(const struct functions *fns,
+                                      const struct string_case *c,
+                                      enum window window)
+{
+    uint8_t *const dst = windows[window] + c->dst;
+    const void *const a = c->a;
+    const void *const b = c->b;
+    struct outcome o = {0, 0};
+    char *end;
+
+    switch (c->kind) {
+    case KIND_memcpy:
+        o.value = offset(fns->fn_memcpy(dst, a, c->n), dst);
+        break;
+    case KIND_mempcpy:
+        o.value = offset(fns->fn_mempcpy(dst, a, c->n), dst);
+        break;
+    case KIND_memmove:
+        o.value = offset(
+            fns->fn_memmove(dst, windows[window] + c->move_source, c->n), dst);
+        break;
+    case KIND_memset:
+        o.value = offset(fns->fn_memset(dst, c->c, c->n), dst);
+        break;
+    case KIND_memcmp:
+        o.value = sign(fns->fn_memcmp(a, b, c->n));
+        break;
+    case KIND_memchr:
+        o.value = offset(fns->fn_memchr(a, c->c, c->n), a);
+        break;
+    case KIND_memccpy:
+        o.value = offset(fns->fn_memccpy(dst, a, c->c, c->n), dst);
+        break;
+    case KIND_memmem:
+        o.value =
+            offset(fns->fn_memmem(a, c->a_length, b, c->b_length), a);
+        break;
+    case KIND_strlen:
+        o.value = fns->fn_strlen(a);
+        break;
+    case KIND_strnlen:
+        o.value = fns->fn_strnlen(a, c->n);
+        break;
+    case KIND_strcmp:
+        o.value = sign(fns->fn_strcmp(a, b));
+        break;
+    case KIND_strncmp:
+        o.value = sign(fns->fn_strncmp(a, b, c->n));
+        break;
+    case KIND_strchr:
+        o.value = offset(fns->fn_strchr(a, c->c), a);
+        break;
+    case KIND_strrchr:
+        o.value = offset(fns->fn_strrchr(a, c->c), a);
+        break;
+    case KIND_strstr:
+        o.value = offset(fns->fn_strstr(a, b), a);
+        break;
+    case KIND_strcpy:
+        o.value = offset(fns->fn_strcpy((char *)dst, a), dst);
+        break;
+    case KIND_stpcpy:
+        o.value = offset(fns->fn_stpcpy((char *)dst, a), dst);
+        break;
+    case KIND_strncpy:
+        o.value = offset(fns->fn_strncpy((char *)dst, a, c->n), dst);
+        break;
+    case KIND_stpncpy:
+        o.value = offset(fns->fn_stpncpy((char *)dst, a, c->n), dst);
+        break;
+    case KIND_strcat:
+        o.value = offset(fns->fn_strcat((char *)dst, a), dst);
+        break;
+    case KIND_strncat:
+        o.value = offset(fns->fn_strncat((char *)dst, a, c->n), dst);
+        break;
+    case KIND_strlcpy:
+        o.value = fns->fn_strlcpy((char *)dst, a, c->n);
+        break;
+    case KIND_strlcat:
+        o.value = fns->fn_strlcat((char *)dst, a, c->n);
+        break;
+    case KIND_strtol:
+        o.value = fns->fn_strtol(a, &end, c->c);
+        o.end = offset(end, a);
+        break;
+    case KIND_strtoul:
+        o.value = fns->fn_strtoul(a, &end, c->c);
+        o.end = offset(end, a);
+        break;
+    case KIND_strtoll:
+        o.value = fns->fn_strtoll(a, &end, c->c);
+        o.end = offset(end, a);
+        break;
+    case KIND_strtoull:
+        o.value = fns->fn_strtoull(a, &end, c->c);
+        o.end = offset(end, a);
+        break;
+    case KIND_snprintf:
+    case KIND_COUNT:
+        break;
+    }
+
+    return o;
+}
+
+static bool string_case(const struct functions *rlibc,
+                        const struct functions *host,
+                        enum kind kind,
+                        struct rng *r,
+                        struct report *report)
+{
+    struct string_case c;
+    generate_string_case(r, kind, &c);
+
+    const struct outcome rlibc_result =
+        run_string_case(rlibc, &c, WINDOW_RLIBC);
+    const struct outcome host_result = run_string_case(host, &c, WINDOW_HOST);
+    if (rlibc_result.value == host_result.value &&
+        rlibc_result.end == host_result.end &&
+        memcmp(windows[WINDOW_RLIBC], windows[WINDOW_HOST], WINDOW_SIZE) ==
+            0) {
+        return true;
+    }
+
+    report_printf(report,
+                  "%s: n=%zu c=%d dst=+%zu",
+                  function_names[kind],
+                  c.n,
+                  c.c,
+                  c.dst);
+    if (kind == KIND_memmove) {
+        report_printf(report, " src=+%zu", c.move_source);
+    }
+    if (c.a != NULL) {
+        report_printf(report,
+                      "\n  a (%zu bytes at +%td): ",
+                      c.a_length,
+                      c.a - windows[WINDOW_SOURCE]);
+        report_bytes(report, c.a, c.a_length);
+    }
+    if (c.b != NULL) {
+        report_printf(report,
+                      "\n  b (%zu bytes at +%td): ",
+                      c.b_length,
+                      c.b - windows[WINDOW_AUX]);
+        report_bytes(report, c.b, c.b_length);
+    }
+    report_printf(report,
+                  "\n  rlibc returned %lld (end %lld), "
+                  "host returned %lld (end %lld)\n",
+                  rlibc_result.value,
+                  rlibc_result.end,
+                  host_result.value,
+                  host_result.end);
+    report_windows(report, c.dst);
+    return false;
+}
+
+//
+// Entry point.
+//
+
+// Runs one case. Returns false and describes the case in the report if rlibc
+// and the host disagree.
+static bool run_case(const struct functions *rlibc,
+                     const struct functions *host,
+                     uint64_t seed,
+                     uint64_t index,
+                     struct report *report)
+{
+    struct rng r = {seed ^ (index * 0xd1342543de82ef95)};
+
+    // A third of cases exercise snprintf(), which has the largest input space.
+    const enum kind kind =
+        one_in(&r, 3) ? KIND_snprintf : 1 + below(&r, KIND_COUNT - 1);
+    if (kind == KIND_snprintf) {
+        return printf_case(rlibc, host, &r, report);
+    }
+    return string_case(rlibc, host, kind, &r, report);
+}
+
+// Runs cases [first, first + count) generated from a seed, comparing the
+// functions in the rlibc table to those in the host table. The index of each
+// case is written to `current` before it runs, so that a crash can be traced
+// back to it.
+//
+// Returns the index of the first case on which the two disagree, with a
+// description of it written to `report`, or first + count if all agree.
+uint64_t rc_fuzz_run(const struct functions *rlibc,
+                     const struct functions *host,
+                     uint64_t seed,
+                     uint64_t first,
+                     uint64_t count,
+                     volatile uint64_t *current,
+                     char *report_buffer,
+                     size_t report_size)
+{
+    struct report report = {report_buffer, report_size, 0};
+    if (report_size > 0) {
+        report_buffer[0] = '\0';
+    }
+
+    if (!map_windows()) {
+        report_printf(&report, "failed to map guarded buffers\n");
+        return first;
+    }
+
+    for (uint64_t index = first; index < first + count; ++index) {
+        *current = index;
+        if (!run_case(rlibc, host, seed, index, &report)) {
+            return index;
+        }
+    }
+    return first + count;
+}
@@ -6,20 +6,82 @@
 #ifndef RLIBC_CTYPE_H
 #define RLIBC_CTYPE_H
 
+#include <stdint.h>
+
 #ifdef __cplusplus
 extern "C" {
 #endif  // __cplusplus
 
 int isalnum(int c);
 int isalpha(int c);
+int isblank(int c);
+int iscntrl(int c);
 int isdigit(int c);
-
+int isgraph(int c);
 int islower(int c);
+int isprint(int c);
+int ispunct(int c);
+int isspace(int c);
 int isupper(int c);
+int isxdigit(int c);
 
 int tolower(int c);
 int toupper(int c);
 
+// Character classes, as stored in __rlibc_ctype_table.
+#define __RC_CTYPE_UPPER  (1 << 0)  // A-Z
+#define __RC_CTYPE_LOWER  (1 << 1)  // a-z
+#define __RC_CTYPE_DIGIT  (1 << 2)  // 0-9
+#define __RC_CTYPE_XDIGIT (1 << 3)  // 0-9, A-F, a-f
+#define __RC_CTYPE_SPACE  (1 << 4)  // Space, \t, \n, \v, \f, \r
+#define __RC_CTYPE_BLANK  (1 << 5)  // Space, \t
+#define __RC_CTYPE_PUNCT  (1 << 6)  // Printable, non-alphanumeric, not space
+#define __RC_CTYPE_CNTRL  (1 << 7)  // 0x00-0x1f, 0x7f
+#define __RC_CTYPE_SP     (1 << 8)  // The space character itself
+
+#define __RC_CTYPE_ALPHA (__RC_CTYPE_UPPER | __RC_CTYPE_LOWER)
+#define __RC_CTYPE_ALNUM (__RC_CTYPE_ALPHA | __RC_CTYPE_DIGIT)
+#define __RC_CTYPE_GRAPH (__RC_CTYPE_ALNUM | __RC_CTYPE_PUNCT)
+#define __RC_CTYPE_PRINT (__RC_CTYPE_GRAPH | __RC_CTYPE_SP)
+
+// Classes of every unsigned char value.
+extern const uint16_t __rlibc_ctype_table[256];
+
+// Returns nonzero if c, which is EOF or an unsigned char value, belongs to any
+// of the classes in mask.
+static inline int __rc_ctype(int c, unsigned mask)
+{
+    return (unsigned)c < 256 ? __rlibc_ctype_table[c] & mask : 0;
+}
+
+static inline int __rc_tolower(int c)
+{
+    return __rc_ctype(c, __RC_CTYPE_UPPER) ? c ^ 32 : c;
+}
+
+static inline int __rc_toupper(int c)
+{
+    return __rc_ctype(c, __RC_CTYPE_LOWER) ? c ^ 32 : c;
+}
+
+// The classification functions are also provided as macros, which avoid the
+// function call. Each is a single table lookup.
+#define isalnum(c)  __rc_ctype((c), __RC_CTYPE_ALNUM)
+#define isalpha(c)  __rc_ctype((c), __RC_CTYPE_ALPHA)
+#define isblank(c)  __rc_ctype((c), __RC_CTYPE_BLANK)
+#define iscntrl(c)  __rc_ctype((c), __RC_CTYPE_CNTRL)
+#define isdigit(c)  __rc_ctype((c), __RC_CTYPE_DIGIT)
+#define isgraph(c)  __rc_ctype((c), __RC_CTYPE_GRAPH)
+#define islower(c)  __rc_ctype((c), __RC_CTYPE_LOWER)
+#define isprint(c)  __rc_ctype((c), __RC_CTYPE_PRINT)
+#define ispunct(c)  __rc_ctype((c), __RC_CTYPE_PUNCT)
+#define isspace(c)  __rc_ctype((c), __RC_CTYPE_SPACE)
+#define isupper(c)  __rc_ctype((c), __RC_CTYPE_UPPER)
+#define isxdigit(c) __rc_ctype((c), __RC_CTYPE_XDIGIT)
+
+#define tolower(c) __rc_tolower(c)
+#define toupper(c) __rc_toupper(c)
+
 #ifdef __cplusplus
 }
 #endif  // __cplusplus
@@ -38,7 +38,11 @@
 #define ENOSPC    28
 #define ESPIPE    29
 #define EROFS     30
-#define ERRNO_MAX 30
+#define EMLINK    31
+#define EPIPE     32
+#define EDOM      33
+#define ERANGE    34
+#define ERRNO_MAX 34
 
 #ifdef __cplusplus
 extern "C" {
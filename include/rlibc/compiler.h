@@ -16,15 +16,25 @@
 
 #define __RC_SECTION(section_name) __attribute__((section(section_name)))
 
-#define __RC_NORETURN __attribute__((noreturn))
-#define __RC_UNUSED   __attribute__((unused))
+#define __RC_ALIGNED(alignment) __attribute__((aligned(alignment)))
+
+#define __RC_CLEANUP(function) __attribute__((cleanup(function)))
+
+#define __RC_MAY_ALIAS __attribute__((__may_alias__))
+#define __RC_NORETURN  __attribute__((noreturn))
+#define __RC_UNUSED    __attribute__((unused))
+#define __RC_USED      __attribute__((used))
 
 #else  // defined(__GNUC__) || defined(__clang__)
 
 #define __RC_PRINTF(format_index, arg_index)
 #define __RC_SECTION(section_name)
+#define __RC_ALIGNED(alignment)
+#define __RC_CLEANUP(function)
+#define __RC_MAY_ALIAS
 #define __RC_NORETURN
 #define __RC_UNUSED
+#define __RC_USED
 
 #endif  // defined(__GNUC__) || defined(__clang__)
 
@@ -14,6 +14,8 @@
 // they exist and have suitable values.
 
 #include <rlibc/target/memory.h>
+#include <rlibc/target/page.h>
+#include <rlibc/word.h>
 
 #include <limits.h>
 
@@ -37,6 +39,43 @@ extern "C" {
 #error Invalid value for __RLIBC_WORDSIZE.
 #endif  // __RLIBC_WORDSIZE < CHAR_BIT || __RLIBC_WORDSIZE > 128
 
+// __RLIBC_UNALIGNED_ACCESS
+//
+// Targets whose architecture supports efficient unaligned loads and stores may
+// define __RLIBC_UNALIGNED_ACCESS to 1. Generic code then accesses misaligned
+// words directly instead of shifting together pairs of aligned words.
+
+// __RLIBC_PAGE_SIZE
+//
+// Targets may define __RLIBC_PAGE_SIZE to the smallest size of a virtual
+// memory page. Together with __RLIBC_UNALIGNED_ACCESS, this allows string
+// functions to load unaligned words which are known not to cross into another
+// (possibly unmapped) page. It is defined in <rlibc/target/page.h> rather than
+// alongside the other macros, so that public headers can check for it.
+
+// __RLIBC_DISPATCH
+//
+// Targets which choose between several implementations of their primitives at
+// runtime define __RLIBC_DISPATCH to 1, and implement rc_memory_init(),
+// rc_memory_variant() and rc_memory_select() from <string.h>.
+//
+// __RLIBC_MEMORY_VARIANT
+//
+// Targets without runtime dispatch define __RLIBC_MEMORY_VARIANT to a string
+// naming their implementation, which is reported by rc_memory_variant().
+#if !defined(__RLIBC_DISPATCH) && !defined(__RLIBC_MEMORY_VARIANT)
+#error Target must define either __RLIBC_DISPATCH or __RLIBC_MEMORY_VARIANT.
+#endif  // !defined(__RLIBC_DISPATCH) && !defined(__RLIBC_MEMORY_VARIANT)
+
+// __RLIBC_STREAM
+//
+// Targets whose architecture has non-temporal stores, which write to memory
+// without reading the destination into the cache, may define __RLIBC_STREAM to
+// 1 and implement __rc_stream_copy_bytes() and __rc_stream_set_bytes() below.
+// memcpy() and memset() then use them for sizes of at least
+// __rc_stream_threshold bytes, and rc_copy_page() and rc_zero_page() always
+// do.
+
 //
 // Target functions.
 //
@@ -92,42 +131,185 @@ extern "C" {
 #error Target must implement __rc_scan_byte.
 #endif  // __RLIBC_HAS_SCAN_BYTE
 
+// void __rc_stream_copy_bytes(uint8_t *dst, const uint8_t *src, size_t n);
+// void __rc_stream_set_bytes(uint8_t *dst, uint8_t c, size_t n);
+//
+// Required if __RLIBC_STREAM is defined. Like __rc_copy_bytes_fwd() and
+// __rc_set_bytes(), but write dst with non-temporal stores, so that large
+// operations do not evict the rest of the cache. The src and dst regions may
+// not overlap. As non-temporal stores are weakly ordered, they must be fenced
+// before returning.
+
 //
 // Generic non-target definitions.
 //
 
-// Unrolled loop for setting up to 8 bytes.
-static inline void __rc_set_small(uint8_t *dst, uint8_t c, size_t n)
+#if defined(__RLIBC_STREAM)
+
+// Threshold used until rc_memory_init() has measured the cache, which is
+// larger than the private caches of most processors.
+#define __RC_STREAM_DEFAULT_THRESHOLD ((size_t)4 * 1024 * 1024)
+
+// Size in bytes from which memcpy() and memset() use non-temporal stores.
+extern size_t __rc_stream_threshold;
+
+#endif  // defined(__RLIBC_STREAM)
+
+// Returns the index of the first byte which differs between s1 and s2 within
+// their first n bytes, or n if the regions are equal.
+static inline size_t __rc_mismatch(const uint8_t *s1,
+                                   const uint8_t *s2,
+                                   size_t n)
 {
-    switch (n) {
-    case 8:
-        *dst++ = c;
-        // Fallthrough.
-    case 7:
-        *dst++ = c;
-        // Fallthrough.
-    case 6:
-        *dst++ = c;
-        // Fallthrough.
-    case 5:
-        *dst++ = c;
-        // Fallthrough.
-    case 4:
-        *dst++ = c;
-        // Fallthrough.
-    case 3:
-        *dst++ = c;
-        // Fallthrough.
-    case 2:
-        *dst++ = c;
-        // Fallthrough.
-    case 1:
-        *dst++ = c;
-        return;
-    default:
-        // assert(false);
-        break;
+    size_t i = 0;
+
+#if defined(__RLIBC_WORD_AT_A_TIME)
+    if (n >= 2 * __RC_WORD_BYTES) {
+        for (; !__rc_word_aligned(s1 + i); ++i) {
+            if (s1[i] != s2[i]) {
+                return i;
+            }
+        }
+
+        // Compare whole words, stopping at the first that differs. The exact
+        // byte is then found by the bytewise loop below.
+        const size_t shift = (uintptr_t)(s2 + i) & (__RC_WORD_BYTES - 1);
+        if (shift == 0) {
+            for (; n - i >= __RC_WORD_BYTES; i += __RC_WORD_BYTES) {
+                if (__rc_word_load(s1 + i) != __rc_word_load(s2 + i)) {
+                    break;
+                }
+            }
+        } else {
+#if defined(__RLIBC_UNALIGNED_ACCESS)
+            for (; n - i >= __RC_WORD_BYTES; i += __RC_WORD_BYTES) {
+                if (__rc_word_load(s1 + i) !=
+                    __rc_word_load_unaligned(s2 + i)) {
+                    break;
+                }
+            }
+#elif defined(__RLIBC_WORD_MERGE)
+            const uint8_t *aligned_s2 = s2 + i - shift;
+            __rc_word_t lo = __rc_word_load(aligned_s2);
+
+            for (; n - i >= __RC_WORD_BYTES; i += __RC_WORD_BYTES) {
+                aligned_s2 += __RC_WORD_BYTES;
+                __rc_word_t hi = __rc_word_load(aligned_s2);
+                if (__rc_word_load(s1 + i) != __rc_word_merge(lo, hi, shift)) {
+                    break;
+                }
+                lo = hi;
+            }
+#endif  // defined(__RLIBC_UNALIGNED_ACCESS)
+        }
     }
+#endif  // defined(__RLIBC_WORD_AT_A_TIME)
+
+    for (; i < n; ++i) {
+        if (s1[i] != s2[i]) {
+            return i;
+        }
+    }
+
+    return n;
+}
+
+// Skips the common prefix of the strings s1 and s2, reading at most n bytes of
+// each, by comparing them a word at a time.
+//
+// Returns an index i such that the first i bytes of s1 and s2 are equal and
+// contain no NUL, and the first difference or NUL (if there is one before n)
+// lies within a word of i. The caller should compare the strings bytewise from
+// i to determine their order.
+//
+// Only aligned words are loaded, and a word is only read once the string is
+// known to extend into it, so this never reads past the page holding the end
+// of either string.
+static inline size_t __rc_string_prefix(const uint8_t *s1,
+                                        const uint8_t *s2,
+                                        size_t n)
+{
+    size_t i = 0;
+
+#if defined(__RLIBC_WORD_AT_A_TIME) && defined(__RLIBC_WORD_MERGE)
+    if (n < 2 * __RC_WORD_BYTES) {
+        return 0;
+    }
+
+    for (; !__rc_word_aligned(s1 + i); ++i) {
+        if (s1[i] != s2[i] || s1[i] == '\0') {
+            return i;
+        }
+    }
+
+    const size_t shift = (uintptr_t)(s2 + i) & (__RC_WORD_BYTES - 1);
+    if (shift == 0) {
+        for (; n - i >= __RC_WORD_BYTES; i += __RC_WORD_BYTES) {
+            __rc_word_t w1 = __rc_word_load(s1 + i);
+            __rc_word_t w2 = __rc_word_load(s2 + i);
+
+            // A word of s1 which equals the same word of s2 and has no NUL
+            // byte means both strings continue past it.
+            if ((w1 ^ w2) | __rc_word_has_zero(w1)) {
+                break;
+            }
+        }
+    } else {
+#if defined(__RLIBC_UNALIGNED_ACCESS) && defined(__RLIBC_PAGE_SIZE)
+        for (; n - i >= __RC_WORD_BYTES; i += __RC_WORD_BYTES) {
+            // If this word of s2 straddles a page boundary, the next page may
+            // be unmapped if the string ends before it. Compare it bytewise.
+            const uintptr_t page_offset =
+                (uintptr_t)(s2 + i) & (__RLIBC_PAGE_SIZE - 1);
+            if (page_offset > __RLIBC_PAGE_SIZE - __RC_WORD_BYTES) {
+                for (size_t end = i + __RC_WORD_BYTES; i < end; ++i) {
+                    if (s1[i] != s2[i] || s1[i] == '\0') {
+                        return i;
+                    }
+                }
+                i -= __RC_WORD_BYTES;
+                continue;
+            }
+
+            __rc_word_t w1 = __rc_word_load(s1 + i);
+            __rc_word_t w2 = __rc_word_load_unaligned(s2 + i);
+            if ((w1 ^ w2) | __rc_word_has_zero(w1)) {
+                break;
+            }
+        }
+#else
+        // Read s2 in aligned words, merging adjacent pairs to line up with s1.
+        const uint8_t *aligned_s2 = s2 + i - shift;
+        __rc_word_t lo = __rc_word_load(aligned_s2);
+
+        for (; n - i >= __RC_WORD_BYTES; i += __RC_WORD_BYTES) {
+            // Before loading the next aligned word of s2, ensure that s2 does
+            // not end within the remaining bytes of the current one. Filling
+            // the other bytes with ones leaves only s2's bytes to test.
+            if (__rc_word_has_zero(
+                    __rc_word_merge(lo, ~(__rc_word_t)0, shift))) {
+                break;
+            }
+
+            aligned_s2 += __RC_WORD_BYTES;
+            __rc_word_t hi = __rc_word_load(aligned_s2);
+            __rc_word_t w1 = __rc_word_load(s1 + i);
+            __rc_word_t w2 = __rc_word_merge(lo, hi, shift);
+
+            if ((w1 ^ w2) | __rc_word_has_zero(w1)) {
+                break;
+            }
+            lo = hi;
+        }
+#endif  // defined(__RLIBC_UNALIGNED_ACCESS) && defined(__RLIBC_PAGE_SIZE)
+    }
+#else
+    (void)s1;
+    (void)s2;
+    (void)n;
+#endif  // defined(__RLIBC_WORD_AT_A_TIME) && defined(__RLIBC_WORD_MERGE)
+
+    return i;
 }
 
 #ifdef __cplusplus
@@ -10,8 +10,12 @@
 // operations. Targets may chose to provide their own optimized implementations
 // instead.
 //
-// By default, no functions are defined when this header is included, allowing
-// targets to pull in only those they require.
+// The implementations are always available under __rc_generic_* names, so that
+// targets can use them as fallbacks. A target installs one as its primitive by
+// defining the corresponding __RLIBC_GENERIC_* macro before including this
+// header.
+
+#include <rlibc/word.h>
 
 #include <stddef.h>
 #include <stdint.h>
@@ -20,68 +24,307 @@
 extern "C" {
 #endif  // __cplusplus
 
-#if defined(__RLIBC_GENERIC_COPY_BYTES_FWD)
-#define __RLIBC_HAS_COPY_BYTES_FWD 1
-
 // Copies n bytes from src to dst in ascending order.
-static inline void __rc_copy_bytes_fwd(uint8_t *dst,
-                                       const uint8_t *src,
-                                       size_t n)
+//
+// When copying words, a word of src is always loaded before the destination
+// bytes preceding it are stored, so this may be used for overlapping regions
+// with dst < src.
+static inline void __rc_generic_copy_bytes_fwd(uint8_t *dst,
+                                               const uint8_t *src,
+                                               size_t n)
 {
+#if defined(__RLIBC_WORD_MERGE)
+    if (n >= 2 * __RC_WORD_BYTES) {
+        // Copy single bytes until the destination is aligned.
+        for (; !__rc_word_aligned(dst); --n) {
+            *dst++ = *src++;
+        }
+
+        const size_t shift = (uintptr_t)src & (__RC_WORD_BYTES - 1);
+        if (shift == 0) {
+            // Both pointers are aligned, so words can be copied directly.
+            for (; n >= __RC_WORD_BYTES; n -= __RC_WORD_BYTES) {
+                __rc_word_store(dst, __rc_word_load(src));
+                dst += __RC_WORD_BYTES;
+                src += __RC_WORD_BYTES;
+            }
+        } else {
+            // The source is misaligned relative to the destination. Read
+            // aligned source words and shift adjacent pairs together to form
+            // each destination word. Every word loaded contains at least one
+            // byte of src, so this never reads outside of its pages.
+            const uint8_t *aligned_src = src - shift;
+            __rc_word_t lo = __rc_word_load(aligned_src);
+
+            for (; n >= __RC_WORD_BYTES; n -= __RC_WORD_BYTES) {
+                aligned_src += __RC_WORD_BYTES;
+                __rc_word_t hi = __rc_word_load(aligned_src);
+                __rc_word_store(dst, __rc_word_merge(lo, hi, shift));
+                lo = hi;
+                dst += __RC_WORD_BYTES;
+            }
+
+            src = aligned_src + shift;
+        }
+    }
+#endif  // defined(__RLIBC_WORD_MERGE)
+
     while (n > 0) {
         *dst++ = *src++;
         --n;
     }
 }
 
-#endif  // defined(__RLIBC_GENERIC_COPY_BYTES_FWD)
-
-#if defined(__RLIBC_GENERIC_COPY_BYTES_BWD)
-#define __RLIBC_HAS_COPY_BYTES_BWD 1
-
 // Copies n bytes from src to dst in descending order.
-static inline void __rc_copy_bytes_bwd(uint8_t *dst,
-                                       const uint8_t *src,
-                                       size_t n)
+//
+// When copying words, a word of src is always loaded before the destination
+// bytes following it are stored, so this may be used for overlapping regions
+// with dst > src.
+static inline void __rc_generic_copy_bytes_bwd(uint8_t *dst,
+                                               const uint8_t *src,
+                                               size_t n)
 {
+#if defined(__RLIBC_WORD_MERGE)
+    if (n >= 2 * __RC_WORD_BYTES) {
+        // Work from the ends of the buffers, copying single bytes until the
+        // end of the destination is aligned.
+        for (; !__rc_word_aligned(dst + n); --n) {
+            dst[n - 1] = src[n - 1];
+        }
+
+        uint8_t *dst_end = dst + n;
+        const size_t shift = (uintptr_t)(src + n) & (__RC_WORD_BYTES - 1);
+        if (shift == 0) {
+            const uint8_t *src_end = src + n;
+            for (; n >= __RC_WORD_BYTES; n -= __RC_WORD_BYTES) {
+                dst_end -= __RC_WORD_BYTES;
+                src_end -= __RC_WORD_BYTES;
+                __rc_word_store(dst_end, __rc_word_load(src_end));
+            }
+        } else {
+            // Mirror of the forward shifted copy: the aligned word containing
+            // the end of src is loaded first, then words are merged downwards.
+            const uint8_t *aligned_src = src + n - shift;
+            __rc_word_t hi = __rc_word_load(aligned_src);
+
+            for (; n >= __RC_WORD_BYTES; n -= __RC_WORD_BYTES) {
+                aligned_src -= __RC_WORD_BYTES;
+                __rc_word_t lo = __rc_word_load(aligned_src);
+                dst_end -= __RC_WORD_BYTES;
+                __rc_word_store(dst_end, __rc_word_merge(lo, hi, shift));
+                hi = lo;
+            }
+        }
+    }
+#endif  // defined(__RLIBC_WORD_MERGE)
+
     while (n > 0) {
         dst[n - 1] = src[n - 1];
         --n;
     }
 }
 
-#endif  // defined(__RLIBC_GENERIC_COPY_BYTES_BWD)
-
-#if defined(__RLIBC_GENERIC_SET_BYTES)
-#define __RLIBC_HAS_SET_BYTES 1
-
 // Sets n bytes starting from dst to the value c.
-static inline void __rc_set_bytes(uint8_t *dst, uint8_t c, size_t n)
+static inline void __rc_generic_set_bytes(uint8_t *dst, uint8_t c, size_t n)
 {
+#if defined(__RLIBC_WORD_AT_A_TIME)
+    if (n >= 2 * __RC_WORD_BYTES) {
+        // Set single bytes until the destination is aligned, then whole words.
+        for (; !__rc_word_aligned(dst); --n) {
+            *dst++ = c;
+        }
+
+        const __rc_word_t pattern = __rc_word_repeat(c);
+        for (; n >= __RC_WORD_BYTES; n -= __RC_WORD_BYTES) {
+            __rc_word_store(dst, pattern);
+            dst += __RC_WORD_BYTES;
+        }
+    }
+#endif  // defined(__RLIBC_WORD_AT_A_TIME)
+
     while (n > 0) {
         *dst++ = c;
         --n;
     }
 }
 
-#endif  // defined(__RLIBC_GENERIC_SET_BYTES)
+#if defined(__RLIBC_UNALIGNED_ACCESS)
 
-#if defined(__RLIBC_GENERIC_SCAN_BYTE)
-#define __RLIBC_HAS_SCAN_BYTE 1
+// Short copies and sets, which are most of those made by the library (string
+// duplication, printf conversions), are better served by a few overlapping
+// unaligned accesses than by a loop or by a `rep` string instruction, both of
+// which have a fixed startup cost far larger than the work itself.
+
+// Largest size handled by __rc_copy_small() and __rc_set_small().
+#define __RC_SMALL_BYTES (4 * __RC_WORD_BYTES)
+
+typedef uint16_t __RC_MAY_ALIAS __RC_ALIGNED(1) __rc_u16_unaligned_t;
+typedef uint32_t __RC_MAY_ALIAS __RC_ALIGNED(1) __rc_u32_unaligned_t;
+
+// Copies n <= __RC_SMALL_BYTES bytes from src to dst.
+//
+// Each size class copies a head and a tail which overlap in the middle. All of
+// src is loaded before any of dst is stored, so the regions may overlap in
+// either direction.
+static inline void __rc_copy_small(uint8_t *dst, const uint8_t *src, size_t n)
+{
+    if (n >= __RC_WORD_BYTES) {
+        const __rc_word_t head = __rc_word_load_unaligned(src);
+        const __rc_word_t tail =
+            __rc_word_load_unaligned(src + n - __RC_WORD_BYTES);
+
+        if (n > 2 * __RC_WORD_BYTES) {
+            const __rc_word_t head2 =
+                __rc_word_load_unaligned(src + __RC_WORD_BYTES);
+            const __rc_word_t tail2 =
+                __rc_word_load_unaligned(src + n - 2 * __RC_WORD_BYTES);
+            __rc_word_store_unaligned(dst + __RC_WORD_BYTES, head2);
+            __rc_word_store_unaligned(dst + n - 2 * __RC_WORD_BYTES, tail2);
+        }
+
+        __rc_word_store_unaligned(dst, head);
+        __rc_word_store_unaligned(dst + n - __RC_WORD_BYTES, tail);
+        return;
+    }
+
+#if __RLIBC_WORDSIZE == 64
+    if (n >= 4) {
+        const uint32_t head = *(const __rc_u32_unaligned_t *)src;
+        const uint32_t tail = *(const __rc_u32_unaligned_t *)(src + n - 4);
+        *(__rc_u32_unaligned_t *)dst = head;
+        *(__rc_u32_unaligned_t *)(dst + n - 4) = tail;
+        return;
+    }
+#endif  // __RLIBC_WORDSIZE == 64
+
+    if (n >= 2) {
+        const uint16_t head = *(const __rc_u16_unaligned_t *)src;
+        const uint16_t tail = *(const __rc_u16_unaligned_t *)(src + n - 2);
+        *(__rc_u16_unaligned_t *)dst = head;
+        *(__rc_u16_unaligned_t *)(dst + n - 2) = tail;
+        return;
+    }
+
+    if (n == 1) {
+        *dst = *src;
+    }
+}
+
+// Sets n <= __RC_SMALL_BYTES bytes starting from dst to the value c.
+static inline void __rc_set_small(uint8_t *dst, uint8_t c, size_t n)
+{
+    const __rc_word_t pattern = __rc_word_repeat(c);
+
+    if (n >= __RC_WORD_BYTES) {
+        __rc_word_store_unaligned(dst, pattern);
+        __rc_word_store_unaligned(dst + n - __RC_WORD_BYTES, pattern);
+        if (n > 2 * __RC_WORD_BYTES) {
+            __rc_word_store_unaligned(dst + __RC_WORD_BYTES, pattern);
+            __rc_word_store_unaligned(dst + n - 2 * __RC_WORD_BYTES, pattern);
+        }
+        return;
+    }
+
+#if __RLIBC_WORDSIZE == 64
+    if (n >= 4) {
+        *(__rc_u32_unaligned_t *)dst = (uint32_t)pattern;
+        *(__rc_u32_unaligned_t *)(dst + n - 4) = (uint32_t)pattern;
+        return;
+    }
+#endif  // __RLIBC_WORDSIZE == 64
+
+    if (n >= 2) {
+        *(__rc_u16_unaligned_t *)dst = (uint16_t)pattern;
+        *(__rc_u16_unaligned_t *)(dst + n - 2) = (uint16_t)pattern;
+        return;
+    }
+
+    if (n == 1) {
+        *dst = c;
+    }
+}
+
+// Copies n >= __RC_WORD_BYTES bytes from src to dst in ascending order using
+// unaligned words. The final word, which overlaps the one before it, is loaded
+// before anything is stored, so this may be used for overlapping regions with
+// dst < src.
+static inline void __rc_copy_words_fwd(uint8_t *dst,
+                                       const uint8_t *src,
+                                       size_t n)
+{
+    const __rc_word_t tail =
+        __rc_word_load_unaligned(src + n - __RC_WORD_BYTES);
+    uint8_t *const dst_tail = dst + n - __RC_WORD_BYTES;
+
+    for (; n > 2 * __RC_WORD_BYTES; n -= 2 * __RC_WORD_BYTES) {
+        const __rc_word_t w0 = __rc_word_load_unaligned(src);
+        const __rc_word_t w1 = __rc_word_load_unaligned(src + __RC_WORD_BYTES);
+        __rc_word_store_unaligned(dst, w0);
+        __rc_word_store_unaligned(dst + __RC_WORD_BYTES, w1);
+        dst += 2 * __RC_WORD_BYTES;
+        src += 2 * __RC_WORD_BYTES;
+    }
+
+    if (n > __RC_WORD_BYTES) {
+        __rc_word_store_unaligned(dst, __rc_word_load_unaligned(src));
+    }
+    __rc_word_store_unaligned(dst_tail, tail);
+}
+
+#endif  // defined(__RLIBC_UNALIGNED_ACCESS)
 
 // Finds the first occurrence of c within n bytes of ptr, if any.
-static inline const uint8_t *__rc_scan_byte(const uint8_t *ptr,
-                                            uint8_t c,
-                                            size_t n)
+static inline const uint8_t *__rc_generic_scan_byte(const uint8_t *ptr,
+                                                    uint8_t c,
+                                                    size_t n)
 {
-    for (size_t i = 0; i < n; ++i) {
-        if (ptr[i] == c) {
-            return ptr + i;
+#if defined(__RLIBC_WORD_AT_A_TIME)
+    // Check single bytes until ptr is word-aligned. Aligned word loads cannot
+    // cross a page boundary, so the scan below never faults when searching for
+    // a terminator with an unbounded n (as strlen() does).
+    for (; n > 0 && !__rc_word_aligned(ptr); ++ptr, --n) {
+        if (*ptr == c) {
+            return ptr;
+        }
+    }
+
+    // XOR each word with c repeated in every byte, turning matching bytes into
+    // zeros, and stop at the first word containing one. The exact byte is then
+    // located by the bytewise loop below.
+    const __rc_word_t pattern = __rc_word_repeat(c);
+    for (; n >= __RC_WORD_BYTES; ptr += __RC_WORD_BYTES, n -= __RC_WORD_BYTES) {
+        if (__rc_word_has_zero(__rc_word_load(ptr) ^ pattern)) {
+            break;
+        }
+    }
+#endif  // defined(__RLIBC_WORD_AT_A_TIME)
+
+    for (; n > 0; ++ptr, --n) {
+        if (*ptr == c) {
+            return ptr;
         }
     }
     return NULL;
 }
 
+#if defined(__RLIBC_GENERIC_COPY_BYTES_FWD)
+#define __RLIBC_HAS_COPY_BYTES_FWD 1
+#define __rc_copy_bytes_fwd        __rc_generic_copy_bytes_fwd
+#endif  // defined(__RLIBC_GENERIC_COPY_BYTES_FWD)
+
+#if defined(__RLIBC_GENERIC_COPY_BYTES_BWD)
+#define __RLIBC_HAS_COPY_BYTES_BWD 1
+#define __rc_copy_bytes_bwd        __rc_generic_copy_bytes_bwd
+#endif  // defined(__RLIBC_GENERIC_COPY_BYTES_BWD)
+
+#if defined(__RLIBC_GENERIC_SET_BYTES)
+#define __RLIBC_HAS_SET_BYTES 1
+#define __rc_set_bytes        __rc_generic_set_bytes
+#endif  // defined(__RLIBC_GENERIC_SET_BYTES)
+
+#if defined(__RLIBC_GENERIC_SCAN_BYTE)
+#define __RLIBC_HAS_SCAN_BYTE 1
+#define __rc_scan_byte        __rc_generic_scan_byte
 #endif  // defined(__RLIBC_GENERIC_SCAN_BYTE)
 
 #ifdef __cplusplus
@@ -0,0 +1,171 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_RLIBC_PROFILE_H
+#define RLIBC_RLIBC_PROFILE_H
+
+// Profiling counters for the memory, string and printf functions.
+//
+// When rlibc is built with __RLIBC_PROFILE defined (`make PROFILE=1`), each
+// call to one of these functions is counted in a table in the .rlibc_profile
+// section, which external tools can read in the same way as the errno table.
+// bench/rlibc_profile.py dumps it. Functions with a natural size (the length
+// argument of a memory function, or the number of bytes a string function
+// measured or copied) also record it, in total and in a histogram of
+// power-of-two buckets. If __RLIBC_PROFILE_CYCLES is defined as well
+// (`make PROFILE=cycles`), the time spent in each function is measured with
+// the x86 time stamp counter.
+//
+// Only calls made from outside of rlibc are recorded; calls between its own
+// functions (such as strcat() measuring its destination with strlen()) count
+// towards the caller. Counters are not synchronized, so updates from
+// concurrent calls may occasionally be lost.
+//
+// In regular builds, the profiling macros expand to nothing.
+
+#if defined(__RLIBC_PROFILE)
+
+#include <rlibc/compiler.h>
+
+#include <stddef.h>
+#include <stdint.h>
+
+#if !defined(__GNUC__) && !defined(__clang__)
+#error "Profiling requires the cleanup attribute of GCC or Clang"
+#endif
+
+#if defined(__RLIBC_PROFILE_CYCLES) && !defined(__i386__) && \
+    !defined(__x86_64__)
+#error "Profiling cycles requires the x86 time stamp counter"
+#endif
+
+#ifdef __cplusplus
+extern "C" {
+#endif  // __cplusplus
+
+enum rc_profile_function {
+    RC_PROFILE_MEMCPY,
+    RC_PROFILE_MEMPCPY,
+    RC_PROFILE_MEMMOVE,
+    RC_PROFILE_MEMSET,
+    RC_PROFILE_MEMCMP,
+    RC_PROFILE_MEMCHR,
+    RC_PROFILE_MEMCCPY,
+    RC_PROFILE_MEMMEM,
+    RC_PROFILE_STRLEN,
+    RC_PROFILE_STRNLEN,
+    RC_PROFILE_STRCMP,
+    RC_PROFILE_STRNCMP,
+    RC_PROFILE_STRCHR,
+    RC_PROFILE_STRRCHR,
+    RC_PROFILE_STRSTR,
+    RC_PROFILE_STRCPY,
+    RC_PROFILE_STPCPY,
+    RC_PROFILE_STRNCPY,
+    RC_PROFILE_STPNCPY,
+    RC_PROFILE_STRCAT,
+    RC_PROFILE_STRNCAT,
+    RC_PROFILE_STRLCPY,
+    RC_PROFILE_STRLCAT,
+    // Every printf-family function, with the length of its output.
+    RC_PROFILE_PRINTF,
+    RC_PROFILE_PRINTF_COMPILED,
+    RC_PROFILE_COUNT,
+};
+
+// Bucket 0 counts sizes of zero, and bucket k sizes from 2^(k-1) to 2^k - 1.
+// The last bucket also counts every larger size.
+#define RC_PROFILE_BUCKETS 33
+
+struct rc_profile_counter {
+    const char *name;
+    uint64_t calls;
+    // Sum of the sizes recorded by calls.
+    uint64_t bytes;
+    // Time stamp counter cycles spent in calls, if measured.
+    uint64_t cycles;
+    uint64_t sizes[RC_PROFILE_BUCKETS];
+};
+
+extern struct rc_profile_counter
+    __rlibc_profile_counters[RC_PROFILE_COUNT];
+
+// Number of profiled calls currently running in this thread.
+extern __thread unsigned int __rlibc_profile_depth;
+
+struct __rc_profile_scope {
+    // NULL if the call was made from within rlibc, and is not recorded.
+    struct rc_profile_counter *counter;
+#if defined(__RLIBC_PROFILE_CYCLES)
+    uint64_t start;
+#endif  // defined(__RLIBC_PROFILE_CYCLES)
+};
+
+static inline struct __rc_profile_scope __rc_profile_enter(
+    enum rc_profile_function function)
+{
+    struct __rc_profile_scope scope = {NULL};
+
+    if (__rlibc_profile_depth++ == 0) {
+        scope.counter = &__rlibc_profile_counters[function];
+        ++scope.counter->calls;
+#if defined(__RLIBC_PROFILE_CYCLES)
+        scope.start = __builtin_ia32_rdtsc();
+#endif  // defined(__RLIBC_PROFILE_CYCLES)
+    }
+
+    return scope;
+}
+
+static inline void __rc_profile_exit(struct __rc_profile_scope *scope)
+{
+#if defined(__RLIBC_PROFILE_CYCLES)
+    if (scope->counter != NULL) {
+        scope->counter->cycles += __builtin_ia32_rdtsc() - scope->start;
+    }
+#else
+    (void)scope;
+#endif  // defined(__RLIBC_PROFILE_CYCLES)
+
+    --__rlibc_profile_depth;
+}
+
+static inline void __rc_profile_size(struct __rc_profile_scope *scope,
+                                     size_t size)
+{
+    if (scope->counter == NULL) {
+        return;
+    }
+
+    int bucket = size == 0 ? 0 : 64 - __builtin_clzll(size);
+    if (bucket >= RC_PROFILE_BUCKETS) {
+        bucket = RC_PROFILE_BUCKETS - 1;
+    }
+
+    scope->counter->bytes += size;
+    ++scope->counter->sizes[bucket];
+}
+
+#ifdef __cplusplus
+}
+#endif  // __cplusplus
+
+// Records a call to the function, for the remainder of the enclosing scope.
+// This must be the first statement of the function.
+#define __RC_PROFILE(function)                                        \
+    struct __rc_profile_scope __rc_profile_scope                      \
+        __RC_CLEANUP(__rc_profile_exit) = __rc_profile_enter(function)
+
+// Records the size of the current call.
+#define __RC_PROFILE_SIZE(size) __rc_profile_size(&__rc_profile_scope, (size))
+
+#else  // defined(__RLIBC_PROFILE)
+
+#define __RC_PROFILE(function)  ((void)0)
+#define __RC_PROFILE_SIZE(size) ((void)(size))
+
+#endif  // defined(__RLIBC_PROFILE)
+
+#endif  // RLIBC_RLIBC_PROFILE_H
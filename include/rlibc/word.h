@@ -0,0 +1,140 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_RLIBC_WORD_H
+#define RLIBC_RLIBC_WORD_H
+
+// Helpers for operating on memory one machine word at a time.
+//
+// The definitions in this file are only available if the target's word size is
+// 32 or 64 bits on a system with 8-bit bytes, in which case the macro
+// __RLIBC_WORD_AT_A_TIME is defined. Code using them must provide a bytewise
+// fallback for other configurations.
+//
+// This header requires __RLIBC_WORDSIZE to be defined, and is therefore
+// included by target memory headers rather than directly.
+
+#include <rlibc/compiler.h>
+
+#include <limits.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif  // __cplusplus
+
+#ifndef __RLIBC_WORDSIZE
+#error __RLIBC_WORDSIZE must be defined before including <rlibc/word.h>.
+#endif  // __RLIBC_WORDSIZE
+
+#if CHAR_BIT == 8 && (__RLIBC_WORDSIZE == 32 || __RLIBC_WORDSIZE == 64)
+#define __RLIBC_WORD_AT_A_TIME 1
+
+#if __RLIBC_WORDSIZE == 32
+typedef uint32_t __rc_word_t;
+#elif __RLIBC_WORDSIZE == 64
+typedef uint64_t __rc_word_t;
+#endif
+
+// Word type which may be used to access memory of any other type. All word
+// loads and stores of byte buffers must go through this type.
+typedef __rc_word_t __RC_MAY_ALIAS __rc_word_alias_t;
+
+// Word type for accesses which may not be word-aligned. This should only be
+// used by targets whose architecture supports unaligned memory access.
+typedef __rc_word_t __RC_MAY_ALIAS __RC_ALIGNED(1) __rc_word_unaligned_t;
+
+#define __RC_WORD_BYTES sizeof(__rc_word_t)
+
+// A word with the value 0x01 in every byte.
+#define __RC_WORD_ONES ((__rc_word_t)-1 / 0xff)
+
+// A word with only the high bit of every byte set.
+#define __RC_WORD_HIGHS (__RC_WORD_ONES * 0x80)
+
+// Returns a word with every byte set to c.
+static inline __rc_word_t __rc_word_repeat(uint8_t c)
+{
+    return __RC_WORD_ONES * c;
+}
+
+// Returns true if ptr is aligned to the size of a word.
+static inline int __rc_word_aligned(const void *ptr)
+{
+    return ((uintptr_t)ptr & (__RC_WORD_BYTES - 1)) == 0;
+}
+
+// Returns nonzero if any byte within the word w is zero.
+//
+// Subtracting one from each byte borrows into the high bit only if the byte was
+// zero or had its high bit clear; masking with ~w removes the latter. The
+// result may contain false positives in bytes above a zero byte (due to the
+// borrow), but is nonzero if and only if the word contains a zero byte.
+static inline __rc_word_t __rc_word_has_zero(__rc_word_t w)
+{
+    return (w - __RC_WORD_ONES) & ~w & __RC_WORD_HIGHS;
+}
+
+// Loads a word from a word-aligned address.
+//
+// An aligned word never straddles a page boundary, so it is safe to load a
+// word containing at least one byte known to be accessible, even if some of
+// its other bytes lie beyond the end of an object.
+static inline __rc_word_t __rc_word_load(const void *ptr)
+{
+    return *(const __rc_word_alias_t *)ptr;
+}
+
+// Stores a word to a word-aligned address.
+static inline void __rc_word_store(void *ptr, __rc_word_t w)
+{
+    *(__rc_word_alias_t *)ptr = w;
+}
+
+// Loads a word from an address with any alignment.
+static inline __rc_word_t __rc_word_load_unaligned(const void *ptr)
+{
+    return *(const __rc_word_unaligned_t *)ptr;
+}
+
+// Stores a word to an address with any alignment.
+static inline void __rc_word_store_unaligned(void *ptr, __rc_word_t w)
+{
+    *(__rc_word_unaligned_t *)ptr = w;
+}
+
+#if __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__ || \
+    __BYTE_ORDER__ == __ORDER_BIG_ENDIAN__
+#define __RLIBC_WORD_MERGE 1
+
+// Combines two consecutive aligned words lo and hi into the unaligned word
+// starting shift bytes into lo. shift must be between 1 and the word size - 1.
+//
+// This allows reading a misaligned buffer one word at a time using only
+// aligned loads.
+static inline __rc_word_t __rc_word_merge(__rc_word_t lo,
+                                          __rc_word_t hi,
+                                          size_t shift)
+{
+    const unsigned lo_bits = shift * 8;
+    const unsigned hi_bits = (__RC_WORD_BYTES - shift) * 8;
+
+#if __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__
+    return (lo >> lo_bits) | (hi << hi_bits);
+#else
+    return (lo << lo_bits) | (hi >> hi_bits);
+#endif
+}
+
+#endif  // __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__ || ...
+
+#endif  // CHAR_BIT == 8 && (__RLIBC_WORDSIZE == 32 || __RLIBC_WORDSIZE == 64)
+
+#ifdef __cplusplus
+}
+#endif  // __cplusplus
+
+#endif  // RLIBC_RLIBC_WORD_H
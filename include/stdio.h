@@ -11,6 +11,7 @@
 #include <rlibc.h>
 #include <stdarg.h>
 #include <stddef.h>
+#include <stdint.h>
 
 #ifdef __cplusplus
 extern "C" {
@@ -22,13 +23,48 @@ extern "C" {
 #define SEEK_CUR 1
 #define SEEK_END 2
 
+// Default size of a stream buffer.
+#define BUFSIZ 1024
+
+// Buffering modes for setvbuf().
+#define _IOFBF 0  // Fully buffered.
+#define _IOLBF 1  // Line buffered.
+#define _IONBF 2  // Unbuffered.
+
 typedef struct rlibc_file {
+    // Writes data to the stream's underlying device, returning the number of
+    // bytes written.
     size_t (*write)(struct rlibc_file *, const char *, size_t);
+
+    // Output which has been accepted but not yet written. The first `buffered`
+    // bytes of `buffer` are pending. A stream without a buffer is unbuffered,
+    // regardless of its mode.
+    char *buffer;
+    size_t buffer_size;
+    size_t buffered;
+    int mode;
 } FILE;
 
 extern FILE *const stdout;
 extern FILE *const stderr;
 
+int fflush(FILE *stream);
+int setvbuf(FILE *__restrict stream,
+            char *__restrict buf,
+            int mode,
+            size_t size);
+void setbuf(FILE *__restrict stream, char *__restrict buf);
+
+size_t fwrite(const void *__restrict ptr,
+              size_t size,
+              size_t nmemb,
+              FILE *__restrict stream);
+int fputs(const char *__restrict s, FILE *__restrict stream);
+int puts(const char *s);
+int fputc(int c, FILE *stream);
+int putc(int c, FILE *stream);
+int putchar(int c);
+
 int printf(const char *__restrict format, ...) __RC_PRINTF(1, 2);
 int fprintf(FILE *stream, const char *__restrict format, ...) __RC_PRINTF(2, 3);
 int sprintf(char *__restrict str, const char *__restrict format, ...)
@@ -48,6 +84,49 @@ int vsnprintf(char *__restrict str,
               const char *__restrict format,
               va_list ap) __RC_PRINTF(3, 0);
 
+// Precompiled format strings.
+//
+// rc_printf_compile() parses a format string once into an array of segments,
+// which can then be formatted any number of times without being reparsed. Each
+// segment is a run of literal text followed by a conversion, except for the
+// last, which holds only the trailing text. A format string with n conversions
+// requires at most n + 1 segments.
+//
+// Segments refer to the text of the original format string, which must remain
+// valid for as long as they are used. Their fields are private to rlibc.
+struct rc_printf_segment {
+    const char *__literal;
+    size_t __literal_length;
+    int __type;
+    uint32_t __flags;
+    uint32_t __base;
+    int32_t __precision;
+    int32_t __width;
+};
+
+// Compiles format into at most count segments. Returns the number of segments
+// used on success. On failure, returns -1 and sets errno to EINVAL if format is
+// invalid, or E2BIG if it requires more than count segments.
+int rc_printf_compile(struct rc_printf_segment *segments,
+                      size_t count,
+                      const char *__restrict format);
+
+// Versions of fprintf() and snprintf() which take a compiled format string.
+int rc_fprintf_compiled(FILE *stream,
+                        const struct rc_printf_segment *format,
+                        ...);
+int rc_snprintf_compiled(char *__restrict str,
+                         size_t size,
+                         const struct rc_printf_segment *format,
+                         ...);
+int rc_vfprintf_compiled(FILE *stream,
+                         const struct rc_printf_segment *format,
+                         va_list ap);
+int rc_vsnprintf_compiled(char *__restrict str,
+                          size_t size,
+                          const struct rc_printf_segment *format,
+                          va_list ap);
+
 // These function prototypes are required to build gcc, but are yet
 // unimplemented.
 FILE *fopen(const char *__restrict pathname, const char *__restrict mode);
@@ -56,10 +135,6 @@ size_t fread(void *__restrict ptr,
              size_t size,
              size_t nmemb,
              FILE *__restrict stream);
-size_t fwrite(const void *__restrict ptr,
-              size_t size,
-              size_t nmemb,
-              FILE *__restrict stream);
 int fseek(FILE *stream, long offset, int whence);
 long ftell(FILE *stream);
 
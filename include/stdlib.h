@@ -18,6 +18,8 @@ extern "C" {
 #if !defined(__radix_kernel__)
 
 void *malloc(size_t size);
+void *calloc(size_t nmemb, size_t size);
+void *realloc(void *ptr, size_t size);
 void free(void *ptr);
 
 #endif  // !defined(__radix_kernel__)
@@ -31,6 +33,21 @@ static inline void free(void *ptr) { return kfree(ptr); }
 
 #endif  // defined(__radix_kernel__)
 
+long strtol(const char *__restrict nptr, char **__restrict endptr, int base);
+long long strtoll(const char *__restrict nptr,
+                  char **__restrict endptr,
+                  int base);
+unsigned long strtoul(const char *__restrict nptr,
+                      char **__restrict endptr,
+                      int base);
+unsigned long long strtoull(const char *__restrict nptr,
+                            char **__restrict endptr,
+                            int base);
+
+int atoi(const char *nptr);
+long atol(const char *nptr);
+long long atoll(const char *nptr);
+
 #ifdef __cplusplus
 }
 #endif  // __cplusplus
@@ -40,8 +57,6 @@ static inline void free(void *ptr) { return kfree(ptr); }
 __RC_NORETURN void exit(int status);
 __RC_NORETURN void abort(void);
 int abs(int j);
-int atoi(const char *nptr);
-void *calloc(size_t nmemb, size_t size);
 char *getenv(const char *name);
 
 #endif  // RLIBC_STDLIB_H
@@ -7,6 +7,7 @@
 #define RLIBC_STRING_H
 
 #include <rlibc.h>
+#include <rlibc/target/page.h>
 #include <stddef.h>
 
 #ifdef __cplusplus
@@ -14,11 +15,25 @@ extern "C" {
 #endif  // __cplusplus
 
 void *memcpy(void *__restrict dst, const void *__restrict src, size_t n);
+void *mempcpy(void *__restrict dst, const void *__restrict src, size_t n);
+void *memccpy(void *__restrict dst,
+              const void *__restrict src,
+              int c,
+              size_t n);
 void *memmove(void *dst, const void *src, size_t n);
 void *memset(void *dst, int c, size_t n);
 int memcmp(const void *s1, const void *s2, size_t n);
 
+// Returns nonzero if the first n bytes of s1 and s2 are equal. Unlike memcmp(),
+// does not determine the order of unequal regions, and is therefore faster
+// when only equality matters.
+int rc_memeq(const void *s1, const void *s2, size_t n);
+
 void *memchr(const void *s, int c, size_t n);
+void *memmem(const void *haystack,
+             size_t haystack_len,
+             const void *needle,
+             size_t needle_len);
 
 int strcmp(const char *s1, const char *s2);
 int strncmp(const char *s1, const char *s2, size_t n);
@@ -27,19 +42,60 @@ char *strcpy(char *__restrict dst, const char *__restrict src);
 char *strncpy(char *__restrict dst, const char *__restrict src, size_t n);
 size_t strlcpy(char *__restrict dst, const char *__restrict src, size_t n);
 
+// Like strcpy() and strncpy(), but return a pointer to the end of the copy in
+// dst, allowing a string to be built up piece by piece without rescanning it.
+char *stpcpy(char *__restrict dst, const char *__restrict src);
+char *stpncpy(char *__restrict dst, const char *__restrict src, size_t n);
+
+char *strcat(char *__restrict dst, const char *__restrict src);
+char *strncat(char *__restrict dst, const char *__restrict src, size_t n);
+size_t strlcat(char *__restrict dst, const char *__restrict src, size_t n);
+
 size_t strlen(const char *s);
 size_t strnlen(const char *s, size_t maxlen);
 
+char *strchr(const char *s, int c);
+char *strrchr(const char *s, int c);
+char *strstr(const char *haystack, const char *needle);
+
 char *strdup(const char *s);
 
 char *strrev(char *s);
 
 char *strerror(int errnum);
 
-// These function prototypes are required to build gcc, but are yet
-// unimplemented.
-char *strchr(const char *s, int c);
-char *strcat(char *__restrict dst, const char *__restrict src);
+// Selects the fastest implementation of rlibc's memory primitives supported by
+// the running processor. Programs do this automatically at startup. libk uses a
+// portable implementation until it is called once during early boot.
+void rc_memory_init(void);
+
+// Returns the name of the memory primitive implementation in use.
+const char *rc_memory_variant(void);
+
+// Switches to the named implementation of the memory primitives. Returns 0 on
+// success, or -1 if the variant is unknown or the processor does not support
+// it.
+int rc_memory_select(const char *variant);
+
+// Sets the size in bytes from which memcpy() and memset() write with
+// non-temporal stores, which bypass the cache. This keeps large copies from
+// evicting the working set of the program (or, in the kernel, of the process
+// being served). rc_memory_init() chooses a threshold based on the size of the
+// processor's last-level cache; SIZE_MAX disables non-temporal stores.
+//
+// Returns the previous threshold. On targets without non-temporal stores, this
+// has no effect and returns SIZE_MAX.
+size_t rc_memory_set_stream_threshold(size_t threshold);
+
+// Copy or zero a single page, which must be aligned to the page size of the
+// target. Both write the page with non-temporal stores where the target has
+// them: the kernel does not itself read the pages it copies on fork or
+// zero-fills on a page fault, and caching them would only evict other data.
+// Only available on targets with a fixed page size.
+#if defined(__RLIBC_PAGE_SIZE)
+void rc_copy_page(void *__restrict dst, const void *__restrict src);
+void rc_zero_page(void *page);
+#endif  // defined(__RLIBC_PAGE_SIZE)
 
 #ifdef __cplusplus
 }
@@ -0,0 +1,103 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_STDIO_DTOA_H
+#define RLIBC_STDIO_DTOA_H
+
+// Conversion of doubles to decimal digits, used by printf's floating point
+// conversions. These are not available in the kernel, which does not use
+// floating point.
+
+#include <stdbool.h>
+#include <stdint.h>
+#include <string.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif  // __cplusplus
+
+#define RC_DOUBLE_MANTISSA_BITS 52
+#define RC_DOUBLE_EXPONENT_MASK 0x7ff
+#define RC_DOUBLE_EXPONENT_BIAS 1023
+
+// A finite double has at most 767 significant decimal digits. The buffer has
+// room for a few more, as digits are produced in groups.
+#define RC_DTOA_MAX_DIGITS 800
+
+// No double has decimal digits beyond the 1074th place after the point, so
+// larger precisions only add trailing zeros.
+#define RC_DTOA_MAX_PRECISION 1100
+
+// The decimal digits of a double, without leading or trailing zeros. The value
+// is digits[0].digits[1]... times 10^exponent. Zero is represented as a single
+// "0" digit with an exponent of 0.
+struct rc_decimal {
+    int length;
+    int exponent;
+    char digits[RC_DTOA_MAX_DIGITS];
+};
+
+enum rc_dtoa_mode {
+    // Round to a number of significant digits.
+    RC_DTOA_SIGNIFICANT,
+    // Round to a number of digits following the decimal point.
+    RC_DTOA_FRACTION,
+};
+
+// Splits the bits of a double into its biased exponent and mantissa bits,
+// returning its sign.
+static inline bool rc_double_bits(double value,
+                                  uint64_t *mantissa,
+                                  int *exponent)
+{
+    uint64_t bits;
+    memcpy(&bits, &value, sizeof bits);
+
+    *mantissa = bits & (((uint64_t)1 << RC_DOUBLE_MANTISSA_BITS) - 1);
+    *exponent = (bits >> RC_DOUBLE_MANTISSA_BITS) & RC_DOUBLE_EXPONENT_MASK;
+    return bits >> 63;
+}
+
+// Returns the integer significand of a finite double, such that its magnitude
+// is the significand times 2^exponent.
+static inline uint64_t rc_double_significand(double value, int *exponent)
+{
+    uint64_t mantissa;
+    int biased;
+    rc_double_bits(value, &mantissa, &biased);
+
+    if (biased == 0) {
+        *exponent = 1 - RC_DOUBLE_EXPONENT_BIAS - RC_DOUBLE_MANTISSA_BITS;
+        return mantissa;
+    }
+
+    *exponent = biased - RC_DOUBLE_EXPONENT_BIAS - RC_DOUBLE_MANTISSA_BITS;
+    return mantissa | ((uint64_t)1 << RC_DOUBLE_MANTISSA_BITS);
+}
+
+// Finds the shortest digits which uniquely identify a positive, finite double,
+// using the Grisu3 algorithm. Returns false for the small fraction of values
+// for which the result cannot be proven to be the shortest, leaving `out`
+// unspecified.
+bool rc_dtoa_shortest(double value, struct rc_decimal *out);
+
+// Writes `count` significant digits of a positive, finite double, rounded to
+// nearest, using Grisu. `count` must be between 1 and 17. Returns false for
+// the small fraction of values for which the rounding cannot be decided,
+// leaving `out` unspecified.
+bool rc_dtoa_counted(double value, int count, struct rc_decimal *out);
+
+// Writes the exact value of a nonnegative, finite double, correctly rounded to
+// `precision` digits in the given mode. Ties are rounded to an even digit.
+void rc_dtoa_exact(double value,
+                   enum rc_dtoa_mode mode,
+                   int precision,
+                   struct rc_decimal *out);
+
+#ifdef __cplusplus
+}
+#endif  // __cplusplus
+
+#endif  // RLIBC_STDIO_DTOA_H
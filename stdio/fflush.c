@@ -0,0 +1,33 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+
+int fflush(FILE *stream)
+{
+    if (stream == NULL) {
+        // Until fopen() is implemented, the standard streams are the only open
+        // streams.
+        int ret = 0;
+        if (fflush(stdout) == EOF) {
+            ret = EOF;
+        }
+        if (fflush(stderr) == EOF) {
+            ret = EOF;
+        }
+        return ret;
+    }
+
+    if (stream->buffered == 0) {
+        return 0;
+    }
+
+    // Buffered data is discarded if the device fails to accept all of it, as
+    // there is no way to retry.
+    const size_t pending = stream->buffered;
+    stream->buffered = 0;
+
+    return stream->write(stream, stream->buffer, pending) == pending ? 0 : EOF;
+}
@@ -0,0 +1,27 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_STDIO_FILE_H
+#define RLIBC_STDIO_FILE_H
+
+#include <stddef.h>
+#include <stdio.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif  // __cplusplus
+
+// Writes size bytes of data to stream according to its buffering mode. Returns
+// the number of bytes accepted by the stream.
+size_t rc_file_write(FILE *stream, const char *data, size_t size);
+
+// rc_file_write() as a printf callback, with the stream as its context.
+size_t rc_file_callback(void *stream, const char *data, size_t size);
+
+#ifdef __cplusplus
+}
+#endif  // __cplusplus
+
+#endif  // RLIBC_STDIO_FILE_H
@@ -0,0 +1,14 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+
+#include "file.h"
+
+int fputc(int c, FILE *stream)
+{
+    const char ch = (unsigned char)c;
+    return rc_file_write(stream, &ch, 1) == 1 ? (unsigned char)c : EOF;
+}
@@ -0,0 +1,15 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+#include <string.h>
+
+#include "file.h"
+
+int fputs(const char *__restrict s, FILE *__restrict stream)
+{
+    const size_t len = strlen(s);
+    return rc_file_write(stream, s, len) == len ? 0 : EOF;
+}
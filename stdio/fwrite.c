@@ -0,0 +1,30 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <errno.h>
+#include <stdint.h>
+#include <stdio.h>
+
+#include "file.h"
+
+size_t fwrite(const void *__restrict ptr,
+              size_t size,
+              size_t nmemb,
+              FILE *__restrict stream)
+{
+    if (size == 0 || nmemb == 0) {
+        return 0;
+    }
+
+    // The total size of the items must fit in a size_t, as in calloc().
+    if (nmemb > SIZE_MAX / size) {
+        errno = EINVAL;
+        return 0;
+    }
+
+    // The items are written as a single block, so that they reach the stream's
+    // device in as few writes as possible.
+    return rc_file_write(stream, ptr, size * nmemb) / size;
+}
@@ -8,6 +8,7 @@
 
 #include <stdarg.h>
 #include <stddef.h>
+#include <stdio.h>
 
 #ifdef __cplusplus
 extern "C" {
@@ -20,6 +21,23 @@ int rc_callback_printf(printf_callback callback,
                        const char *__restrict format,
                        va_list ap);
 
+int rc_callback_printf_compiled(printf_callback callback,
+                                void *context,
+                                const struct rc_printf_segment *segments,
+                                va_list ap);
+
+// Variants of the above which write directly into a string of the given size,
+// with the semantics of vsnprintf().
+int rc_buffer_printf(char *__restrict str,
+                     size_t size,
+                     const char *__restrict format,
+                     va_list ap);
+
+int rc_buffer_printf_compiled(char *__restrict str,
+                              size_t size,
+                              const struct rc_printf_segment *segments,
+                              va_list ap);
+
 #ifdef __cplusplus
 }
 #endif  // __cplusplus
@@ -0,0 +1,11 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+
+int putchar(int c)
+{
+    return fputc(c, stdout);
+}
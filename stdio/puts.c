@@ -0,0 +1,38 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+#include <string.h>
+
+#include "file.h"
+
+// Size of the buffer in which an unbuffered stream's string and newline are
+// joined, matching printf()'s staging buffer.
+#define STAGING_SIZE 256
+
+int puts(const char *s)
+{
+    const size_t len = strlen(s);
+
+    // The string and its newline reach the device in a single write wherever
+    // they fit together, so that no other output can land between them.
+    if (stdout->buffer != NULL && stdout->mode != _IONBF) {
+        if (len < stdout->buffer_size &&
+            len + 1 > stdout->buffer_size - stdout->buffered &&
+            fflush(stdout) == EOF) {
+            return EOF;
+        }
+    } else if (len < STAGING_SIZE) {
+        char staging[STAGING_SIZE];
+        memcpy(staging, s, len);
+        staging[len] = '\n';
+        return rc_file_write(stdout, staging, len + 1) == len + 1 ? 0 : EOF;
+    }
+
+    if (rc_file_write(stdout, s, len) != len) {
+        return EOF;
+    }
+    return rc_file_write(stdout, "\n", 1) == 1 ? 0 : EOF;
+}
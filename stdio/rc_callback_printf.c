@@ -3,14 +3,17 @@
 // Use of this source code is governed by an MIT-style license
 // that can be found in the LICENSE file in the repository root.
 
+#include <rlibc/profile.h>
 #include <rlibc/util.h>
 
 #include <ctype.h>
 #include <errno.h>
 #include <stdbool.h>
 #include <stdint.h>
+#include <stdio.h>
 #include <string.h>
 
+#include "dtoa.h"
 #include "printf.h"
 
 enum format_type {
@@ -21,6 +24,10 @@ enum format_type {
     FORMAT_UINT,
     FORMAT_POINTER,
     FORMAT_PERCENT,
+    FORMAT_FLOAT_FIXED,
+    FORMAT_FLOAT_EXPONENT,
+    FORMAT_FLOAT_GENERAL,
+    FORMAT_FLOAT_HEX,
 };
 
 #define FLAGS_ZERO      (1 << 0)  // Zero-pad a formatted number.
@@ -28,7 +35,7 @@ enum format_type {
 #define FLAGS_LADJUST   (1 << 2)  // Left-adjust a padded value.
 #define FLAGS_SPACE     (1 << 3)  // Leave a space before a nonnegative number.
 #define FLAGS_SIGN      (1 << 4)  // Always place a sign before a number.
-#define FLAGS_LOWER     (1 << 5)  // Use lowercase hex formatting.
+#define FLAGS_LOWER     (1 << 5)  // Use lowercase hex and float formatting.
 #define FLAGS_SHORT     (1 << 6)  // Format a short int.
 #define FLAGS_LONG      (1 << 7)  // Format a long int.
 #define FLAGS_LONG_LONG (1 << 8)  // Format a long long int.
@@ -161,6 +168,32 @@ static int parse_format_sequence(const char *format, struct printf_format *p)
         p->type = FORMAT_UINT;
         p->base = 16;
         break;
+#if !defined(__radix_kernel__)
+    case 'f':
+        p->flags |= FLAGS_LOWER;
+        // Fallthrough.
+    case 'F':
+        p->type = FORMAT_FLOAT_FIXED;
+        break;
+    case 'e':
+        p->flags |= FLAGS_LOWER;
+        // Fallthrough.
+    case 'E':
+        p->type = FORMAT_FLOAT_EXPONENT;
+        break;
+    case 'g':
+        p->flags |= FLAGS_LOWER;
+        // Fallthrough.
+    case 'G':
+        p->type = FORMAT_FLOAT_GENERAL;
+        break;
+    case 'a':
+        p->flags |= FLAGS_LOWER;
+        // Fallthrough.
+    case 'A':
+        p->type = FORMAT_FLOAT_HEX;
+        break;
+#endif  // !defined(__radix_kernel__)
     default:
         return -1;
     }
@@ -169,118 +202,271 @@ static int parse_format_sequence(const char *format, struct printf_format *p)
     return format - start;
 }
 
-static size_t pad_chars(printf_callback callback,
-                        void *context,
-                        char c,
-                        size_t amount)
+// Size of the buffer in which formatted output is staged before being passed to
+// the callback.
+#define OUTPUT_BUFFER_SIZE 256
+
+// Destination of formatted output.
+//
+// With a callback, rather than invoking it for every small piece of a format
+// string, output is accumulated in a staging buffer which is flushed when full
+// and at the end of the printf call.
+//
+// Without a callback, the buffer is the final destination of the output, such
+// as the string passed to snprintf(). Output which does not fit is discarded,
+// but still counted.
+struct printf_output {
+    printf_callback callback;
+    void *context;
+
+    // With a callback, the sum of the values it returned. Otherwise, the number
+    // of discarded characters.
+    size_t written;
+
+    char *buffer;
+    size_t capacity;
+    size_t buffered;
+};
+
+static void output_flush(struct printf_output *out)
 {
-    char buffer[128];
-    size_t total_size = 0;
+    if (out->callback != NULL && out->buffered > 0) {
+        out->written += out->callback(out->context, out->buffer, out->buffered);
+        out->buffered = 0;
+    }
+}
 
-    while (amount > 0) {
-        size_t curr_size = min(amount, sizeof buffer);
-        memset(buffer, c, curr_size);
-        total_size += callback(context, buffer, curr_size);
-        amount -= curr_size;
+// Flushes any staged output and returns the total length of the output.
+static int output_finish(struct printf_output *out)
+{
+    output_flush(out);
+    return out->written + out->buffered;
+}
+
+static void output_write(struct printf_output *out,
+                         const char *data,
+                         size_t size)
+{
+    const size_t space = out->capacity - out->buffered;
+
+    if (size > space) {
+        if (out->callback == NULL) {
+            // snprintf() should return the number of characters that would
+            // have been written if the buffer were large enough, regardless of
+            // the actual written size. While this is generally considered a
+            // poor design choice and has led to many bugs, a standard is a
+            // standard.
+            memcpy(out->buffer + out->buffered, data, space);
+            out->buffered += space;
+            out->written += size - space;
+            return;
+        }
+
+        output_flush(out);
+
+        // Don't bother staging data which would fill the entire buffer.
+        if (size >= out->capacity) {
+            out->written += out->callback(out->context, data, size);
+            return;
+        }
     }
 
-    return total_size;
+    memcpy(out->buffer + out->buffered, data, size);
+    out->buffered += size;
 }
 
-static int format_char(printf_callback callback,
-                       void *context,
-                       char c,
-                       const struct printf_format *p)
+static inline void output_char(struct printf_output *out, char c)
+{
+    if (out->buffered < out->capacity) {
+        out->buffer[out->buffered++] = c;
+    } else {
+        output_write(out, &c, 1);
+    }
+}
+
+static void output_pad(struct printf_output *out, char c, size_t amount)
 {
-    size_t size = 0;
+    while (amount > 0) {
+        if (out->buffered == out->capacity) {
+            if (out->callback == NULL) {
+                out->written += amount;
+                return;
+            }
+            output_flush(out);
+        }
 
+        size_t curr_size = min(amount, out->capacity - out->buffered);
+        memset(out->buffer + out->buffered, c, curr_size);
+        out->buffered += curr_size;
+        amount -= curr_size;
+    }
+}
+
+static void format_char(struct printf_output *out,
+                        char c,
+                        const struct printf_format *p)
+{
     if (p->flags & FLAGS_LADJUST) {
-        size += callback(context, &c, 1);
+        output_char(out, c);
     }
 
     if (p->width > 1) {
-        size += pad_chars(callback, context, ' ', p->width - 1);
+        output_pad(out, ' ', p->width - 1);
     }
 
     if (!(p->flags & FLAGS_LADJUST)) {
-        size += callback(context, &c, 1);
+        output_char(out, c);
     }
-
-    return size;
 }
 
-static int format_string(printf_callback callback,
-                         void *context,
-                         const char *string,
-                         const struct printf_format *p)
+static void format_string(struct printf_output *out,
+                          const char *string,
+                          const struct printf_format *p)
 {
     if (!string) {
         string = "(null)";
     }
 
-    size_t len = strlen(string);
-    if (p->precision >= 0 && (size_t)p->precision < len) {
-        len = p->precision;
-    }
-
-    size_t size = 0;
+    // An array at least as long as the precision need not be terminated, so
+    // no more than that many bytes may be read.
+    const size_t len =
+        p->precision >= 0 ? strnlen(string, p->precision) : strlen(string);
 
     if (p->flags & FLAGS_LADJUST) {
-        size += callback(context, string, len);
+        output_write(out, string, len);
     }
 
     if (p->width > (int)len) {
-        size += pad_chars(callback, context, ' ', p->width - len);
+        output_pad(out, ' ', p->width - len);
     }
 
     if (!(p->flags & FLAGS_LADJUST)) {
-        size += callback(context, string, len);
+        output_write(out, string, len);
     }
+}
 
-    return size;
+static void print_number(struct printf_output *out,
+                         const char *prefix,
+                         size_t prefix_length,
+                         int zeros,
+                         const char *number_buffer,
+                         size_t number_length)
+{
+    if (prefix_length > 0) {
+        output_write(out, prefix, prefix_length);
+    }
+
+    if (zeros > 0) {
+        output_pad(out, '0', zeros);
+    }
+
+    output_write(out, number_buffer, number_length);
 }
 
-static size_t print_number(printf_callback callback,
-                           void *context,
-                           const char *prefix,
-                           int zeros,
-                           const char *number_buffer,
-                           size_t number_length)
+// Every pair of decimal digits from "00" to "99", indexed by twice its value.
+static const char decimal_pairs[] =
+    "00010203040506070809"
+    "10111213141516171819"
+    "20212223242526272829"
+    "30313233343536373839"
+    "40414243444546474849"
+    "50515253545556575859"
+    "60616263646566676869"
+    "70717273747576777879"
+    "80818283848586878889"
+    "90919293949596979899";
+
+// Writes the decimal digits of value backwards, ending just before end.
+// Returns a pointer to the first digit.
+static char *format_decimal32(char *end, uint32_t value)
 {
-    size_t size = 0;
+    while (value >= 100) {
+        const uint32_t pair = value % 100;
+        value /= 100;
+        end -= 2;
+        memcpy(end, &decimal_pairs[pair * 2], 2);
+    }
 
-    if (prefix) {
-        size += callback(context, prefix, strlen(prefix));
+    if (value >= 10) {
+        end -= 2;
+        memcpy(end, &decimal_pairs[value * 2], 2);
+    } else {
+        *--end = '0' + value;
     }
 
-    if (zeros > 0) {
-        size += pad_chars(callback, context, '0', zeros);
+    return end;
+}
+
+// Writes the decimal digits of value backwards, ending just before end.
+// Returns a pointer to the first digit.
+//
+// 64-bit division is a library call on 32-bit targets, so only one is done for
+// every nine digits, until the value fits in 32 bits.
+static char *format_decimal(char *end, uint64_t value)
+{
+    while (value > UINT32_MAX) {
+        const uint32_t low = value % 1000000000;
+        value /= 1000000000;
+
+        // The low part is always nine digits long, including leading zeros.
+        char *const chunk = end - 9;
+        char *digit = format_decimal32(end, low);
+        while (digit > chunk) {
+            *--digit = '0';
+        }
+        end = chunk;
     }
 
-    size += callback(context, number_buffer, number_length);
-    return size;
+    return format_decimal32(end, value);
 }
 
-static int format_number(printf_callback callback,
-                         void *context,
-                         const char *prefix,
-                         uint64_t value,
-                         const struct printf_format *p)
+// Writes the digits of value in a base of 2^shift backwards, ending just
+// before end. Returns a pointer to the first digit.
+static char *format_power_of_two(char *end,
+                                 uint64_t value,
+                                 unsigned shift,
+                                 const char *digits)
 {
-    char buffer[32];
-    char *pos = buffer;
+    const unsigned mask = (1u << shift) - 1;
+
+    // Values which fit in 32 bits are converted using 32-bit shifts, which are
+    // cheaper on 32-bit targets.
+    if (value <= UINT32_MAX) {
+        uint32_t value32 = value;
+        do {
+            *--end = digits[value32 & mask];
+            value32 >>= shift;
+        } while (value32 != 0);
+        return end;
+    }
 
-    const char *digits = "0123456789ABCDEF";
     do {
-        char c = digits[value % p->base];
-        *pos++ = (p->flags & FLAGS_LOWER) ? tolower(c) : c;
-        value /= p->base;
-    } while (value > 0);
+        *--end = digits[value & mask];
+        value >>= shift;
+    } while (value != 0);
+
+    return end;
+}
 
-    *pos = '\0';
-    strrev(buffer);
+static void format_number(struct printf_output *out,
+                          const char *prefix,
+                          uint64_t value,
+                          const struct printf_format *p)
+{
+    // Large enough for a 64-bit value in octal (22 digits).
+    char buffer[24];
+    char *const end = buffer + sizeof buffer;
+    const char *number;
+
+    if (p->base == 10) {
+        number = format_decimal(end, value);
+    } else {
+        const char *digits =
+            (p->flags & FLAGS_LOWER) ? "0123456789abcdef" : "0123456789ABCDEF";
+        number = format_power_of_two(end, value, p->base == 16 ? 4 : 3, digits);
+    }
 
-    size_t value_size = pos - buffer;
+    size_t value_size = end - number;
     size_t zeros_to_pad =
         p->precision > (int)value_size ? p->precision - value_size : 0;
 
@@ -289,10 +475,8 @@ static int format_number(printf_callback callback,
         --zeros_to_pad;
     }
 
-    size_t total_size = value_size + zeros_to_pad;
-    if (prefix != NULL) {
-        total_size += strlen(prefix);
-    }
+    const size_t prefix_size = prefix != NULL ? strlen(prefix) : 0;
+    size_t total_size = value_size + zeros_to_pad + prefix_size;
 
     // If both '0' and '-' flags are provided, left-adjust takes precedence.
     if ((p->flags & (FLAGS_ZERO | FLAGS_LADJUST)) == FLAGS_ZERO) {
@@ -302,33 +486,29 @@ static int format_number(printf_callback callback,
             zeros_to_pad += p->width - total_size;
         }
 
-        return print_number(
-            callback, context, prefix, zeros_to_pad, buffer, value_size);
+        print_number(
+            out, prefix, prefix_size, zeros_to_pad, number, value_size);
+        return;
     }
 
-    size_t size = 0;
-
     if (p->flags & FLAGS_LADJUST) {
-        size += print_number(
-            callback, context, prefix, zeros_to_pad, buffer, value_size);
+        print_number(
+            out, prefix, prefix_size, zeros_to_pad, number, value_size);
     }
 
     if (p->width > (int)total_size) {
-        size += pad_chars(callback, context, ' ', p->width - total_size);
+        output_pad(out, ' ', p->width - total_size);
     }
 
     if (!(p->flags & FLAGS_LADJUST)) {
-        size += print_number(
-            callback, context, prefix, zeros_to_pad, buffer, value_size);
+        print_number(
+            out, prefix, prefix_size, zeros_to_pad, number, value_size);
     }
-
-    return size;
 }
 
-static int format_signed(printf_callback callback,
-                         void *context,
-                         int64_t value,
-                         const struct printf_format *p)
+static void format_signed(struct printf_output *out,
+                          int64_t value,
+                          const struct printf_format *p)
 {
     const char *prefix = NULL;
     if (value < 0) {
@@ -342,13 +522,12 @@ static int format_signed(printf_callback callback,
         prefix = " ";
     }
 
-    return format_number(callback, context, prefix, value, p);
+    format_number(out, prefix, value, p);
 }
 
-static int format_unsigned(printf_callback callback,
-                           void *context,
-                           uint64_t value,
-                           const struct printf_format *p)
+static void format_unsigned(struct printf_output *out,
+                            uint64_t value,
+                            const struct printf_format *p)
 {
     const char *prefix = NULL;
     if (p->flags & FLAGS_SPECIAL && value != 0) {
@@ -359,9 +538,357 @@ static int format_unsigned(printf_callback callback,
         }
     }
 
-    return format_number(callback, context, prefix, value, p);
+    format_number(out, prefix, value, p);
+}
+
+#if !defined(__radix_kernel__)
+
+// Pieces of a formatted floating point number, in output order. Runs of zeros
+// are stored as counts, so that large precisions need no buffer space.
+struct float_parts {
+    // Sign and "0x" prefix.
+    char prefix[3];
+    size_t prefix_length;
+
+    const char *integer;
+    size_t integer_length;
+    size_t integer_zeros;
+
+    bool point;
+
+    size_t leading_zeros;
+    const char *fraction;
+    size_t fraction_length;
+    size_t trailing_zeros;
+
+    char exponent[8];
+    size_t exponent_length;
+};
+
+static void print_float_body(struct printf_output *out,
+                             const struct float_parts *f)
+{
+    output_write(out, f->integer, f->integer_length);
+    output_pad(out, '0', f->integer_zeros);
+
+    if (f->point) {
+        output_char(out, '.');
+    }
+
+    output_pad(out, '0', f->leading_zeros);
+    output_write(out, f->fraction, f->fraction_length);
+    output_pad(out, '0', f->trailing_zeros);
+
+    output_write(out, f->exponent, f->exponent_length);
+}
+
+static void print_float(struct printf_output *out,
+                        const struct float_parts *f,
+                        const struct printf_format *p)
+{
+    const size_t total = f->prefix_length + f->integer_length +
+                         f->integer_zeros + f->point + f->leading_zeros +
+                         f->fraction_length + f->trailing_zeros +
+                         f->exponent_length;
+    const size_t padding = p->width > (int)total ? p->width - total : 0;
+
+    // As with integers, zero padding goes between the prefix and the number,
+    // and left-adjustment takes precedence over it.
+    if ((p->flags & (FLAGS_ZERO | FLAGS_LADJUST)) == FLAGS_ZERO) {
+        output_write(out, f->prefix, f->prefix_length);
+        output_pad(out, '0', padding);
+        print_float_body(out, f);
+        return;
+    }
+
+    if (!(p->flags & FLAGS_LADJUST)) {
+        output_pad(out, ' ', padding);
+    }
+
+    output_write(out, f->prefix, f->prefix_length);
+    print_float_body(out, f);
+
+    if (p->flags & FLAGS_LADJUST) {
+        output_pad(out, ' ', padding);
+    }
+}
+
+// Writes an exponent suffix with a sign and at least `min_digits` digits into
+// f's exponent buffer.
+static void float_exponent(struct float_parts *f,
+                           char letter,
+                           int exponent,
+                           int min_digits)
+{
+    char buffer[4];
+    char *const end = buffer + sizeof buffer;
+    char *digits = format_decimal32(end, exponent < 0 ? -exponent : exponent);
+    while (end - digits < min_digits) {
+        *--digits = '0';
+    }
+
+    f->exponent[0] = letter;
+    f->exponent[1] = exponent < 0 ? '-' : '+';
+    f->exponent_length = 2 + (end - digits);
+    memcpy(f->exponent + 2, digits, end - digits);
+}
+
+// Converts a positive, finite value to decimal, correctly rounded to
+// `precision` digits in the given mode.
+static void decimal_digits(double value,
+                           enum rc_dtoa_mode mode,
+                           int precision,
+                           struct rc_decimal *d)
+{
+    // Grisu produces up to 17 significant digits directly, and gives up in
+    // the rare cases where its rounding is uncertain.
+    if (mode == RC_DTOA_SIGNIFICANT) {
+        if (precision <= 17 && rc_dtoa_counted(value, precision, d)) {
+            return;
+        }
+    } else if (value >= 0x1p-1022 && rc_dtoa_shortest(value, d)) {
+        // A normal double is within half of its unit in the last place, less
+        // than 2^-53 of its value, of its shortest decimal representation.
+        // That is under half a unit in the 15th significant digit, so if the
+        // shortest digits fit within 15 digits of the requested precision,
+        // they are also the correctly rounded result. This saves an exact
+        // conversion for the "round" values which are commonly printed.
+        if (d->length - 1 - d->exponent <= precision &&
+            d->exponent + 1 + precision <= 15) {
+            return;
+        }
+    }
+
+    rc_dtoa_exact(value, mode, precision, d);
 }
 
+// Lays out decimal digits with `precision` digits after the point, which must
+// be enough to hold all of the digits.
+static void fixed_parts(struct float_parts *f,
+                        const struct rc_decimal *d,
+                        int precision,
+                        const struct printf_format *p)
+{
+    if (d->exponent >= 0) {
+        const int integer_length = min(d->length, d->exponent + 1);
+        f->integer = d->digits;
+        f->integer_length = integer_length;
+        f->integer_zeros = d->exponent + 1 - integer_length;
+        f->leading_zeros = 0;
+        f->fraction = d->digits + integer_length;
+        f->fraction_length = d->length - integer_length;
+    } else {
+        f->integer = "0";
+        f->integer_length = 1;
+        f->integer_zeros = 0;
+        f->leading_zeros = -d->exponent - 1;
+        f->fraction = d->digits;
+        f->fraction_length = d->length;
+    }
+
+    f->point = precision > 0 || (p->flags & FLAGS_SPECIAL);
+    f->trailing_zeros = precision - f->leading_zeros - f->fraction_length;
+    f->exponent_length = 0;
+}
+
+// Lays out decimal digits in exponent notation with `precision` digits after
+// the point, which must be enough to hold all of the digits.
+static void exponent_parts(struct float_parts *f,
+                           const struct rc_decimal *d,
+                           int precision,
+                           const struct printf_format *p)
+{
+    f->integer = d->digits;
+    f->integer_length = 1;
+    f->integer_zeros = 0;
+    f->point = precision > 0 || (p->flags & FLAGS_SPECIAL);
+    f->leading_zeros = 0;
+    f->fraction = d->digits + 1;
+    f->fraction_length = d->length - 1;
+    f->trailing_zeros = precision - f->fraction_length;
+
+    float_exponent(f, (p->flags & FLAGS_LOWER) ? 'e' : 'E', d->exponent, 2);
+}
+
+// Lays out a finite value for the %f, %e and %g conversions.
+static void decimal_parts(struct float_parts *f,
+                          struct rc_decimal *d,
+                          double value,
+                          const struct printf_format *p)
+{
+    // Beyond the maximum, a precision only adds trailing zeros, which are
+    // counted separately.
+    int precision = p->precision >= 0 ? p->precision : 6;
+    const int digits = min(precision, RC_DTOA_MAX_PRECISION);
+
+    if (p->type == FORMAT_FLOAT_GENERAL && precision == 0) {
+        precision = 1;
+    }
+
+    if (value == 0) {
+        d->digits[0] = '0';
+        d->length = 1;
+        d->exponent = 0;
+    } else if (p->type == FORMAT_FLOAT_FIXED) {
+        decimal_digits(value, RC_DTOA_FRACTION, digits, d);
+    } else {
+        const int significant =
+            p->type == FORMAT_FLOAT_EXPONENT ? digits + 1 : max(digits, 1);
+        decimal_digits(value, RC_DTOA_SIGNIFICANT, significant, d);
+    }
+
+    if (p->type == FORMAT_FLOAT_FIXED) {
+        fixed_parts(f, d, precision, p);
+        return;
+    }
+
+    if (p->type == FORMAT_FLOAT_EXPONENT) {
+        exponent_parts(f, d, precision, p);
+        return;
+    }
+
+    // %g uses fixed notation for exponents from -4 up to the precision, and
+    // removes trailing zeros unless the '#' flag is given.
+    if (d->exponent >= -4 && d->exponent < precision) {
+        int fraction = precision - 1 - d->exponent;
+        if (!(p->flags & FLAGS_SPECIAL)) {
+            fraction = min(fraction, max(d->length - 1 - d->exponent, 0));
+        }
+        fixed_parts(f, d, fraction, p);
+    } else {
+        int fraction = precision - 1;
+        if (!(p->flags & FLAGS_SPECIAL)) {
+            fraction = min(fraction, d->length - 1);
+        }
+        exponent_parts(f, d, fraction, p);
+    }
+}
+
+// The number of hexadecimal digits in the fraction of a double.
+#define HEX_FRACTION_DIGITS (RC_DOUBLE_MANTISSA_BITS / 4)
+
+// Lays out a finite value for the %a conversion, writing its digits into
+// buffer.
+//
+// Like glibc, normal values are printed with a leading 1 and subnormals with a
+// leading 0 and the minimum exponent. Rounding to a precision may carry into
+// the leading digit, which is not renormalized.
+static void hex_parts(struct float_parts *f,
+                      char *buffer,
+                      uint64_t mantissa,
+                      int biased_exponent,
+                      const struct printf_format *p)
+{
+    const char *digits =
+        (p->flags & FLAGS_LOWER) ? "0123456789abcdef" : "0123456789ABCDEF";
+
+    uint64_t significand = mantissa;
+    int exponent = 0;
+    if (biased_exponent != 0) {
+        significand |= (uint64_t)1 << RC_DOUBLE_MANTISSA_BITS;
+        exponent = biased_exponent - RC_DOUBLE_EXPONENT_BIAS;
+    } else if (mantissa != 0) {
+        exponent = 1 - RC_DOUBLE_EXPONENT_BIAS;
+    }
+
+    int length = HEX_FRACTION_DIGITS;
+    if (p->precision >= 0 && p->precision < HEX_FRACTION_DIGITS) {
+        // Round half to even.
+        const int dropped = (HEX_FRACTION_DIGITS - p->precision) * 4;
+        const uint64_t rest = significand & (((uint64_t)1 << dropped) - 1);
+        const uint64_t half = (uint64_t)1 << (dropped - 1);
+
+        significand >>= dropped;
+        if (rest > half || (rest == half && (significand & 1))) {
+            ++significand;
+        }
+        length = p->precision;
+    }
+
+    for (int i = length; i > 0; --i) {
+        buffer[i] = digits[significand & 0xf];
+        significand >>= 4;
+    }
+    buffer[0] = '0' + significand;
+
+    // Without a precision, the value is printed exactly.
+    if (p->precision < 0) {
+        while (length > 0 && buffer[length] == '0') {
+            --length;
+        }
+    }
+
+    f->prefix[f->prefix_length++] = '0';
+    f->prefix[f->prefix_length++] = (p->flags & FLAGS_LOWER) ? 'x' : 'X';
+
+    f->integer = buffer;
+    f->integer_length = 1;
+    f->integer_zeros = 0;
+    f->leading_zeros = 0;
+    f->fraction = buffer + 1;
+    f->fraction_length = length;
+    f->trailing_zeros = p->precision > length ? p->precision - length : 0;
+    f->point = length > 0 || f->trailing_zeros > 0 ||
+               (p->flags & FLAGS_SPECIAL);
+
+    float_exponent(f, (p->flags & FLAGS_LOWER) ? 'p' : 'P', exponent, 1);
+}
+
+static void format_float(struct printf_output *out,
+                         double value,
+                         const struct printf_format *p)
+{
+    struct float_parts f;
+    uint64_t mantissa;
+    int biased_exponent;
+    const bool negative = rc_double_bits(value, &mantissa, &biased_exponent);
+
+    f.prefix_length = 0;
+    if (negative) {
+        f.prefix[f.prefix_length++] = '-';
+    } else if (p->flags & FLAGS_SIGN) {
+        f.prefix[f.prefix_length++] = '+';
+    } else if (p->flags & FLAGS_SPACE) {
+        f.prefix[f.prefix_length++] = ' ';
+    }
+
+    if (biased_exponent == RC_DOUBLE_EXPONENT_MASK) {
+        const bool lower = p->flags & FLAGS_LOWER;
+        if (mantissa != 0) {
+            f.integer = lower ? "nan" : "NAN";
+        } else {
+            f.integer = lower ? "inf" : "INF";
+        }
+
+        f.integer_length = 3;
+        f.integer_zeros = 0;
+        f.point = false;
+        f.leading_zeros = 0;
+        f.fraction_length = 0;
+        f.trailing_zeros = 0;
+        f.exponent_length = 0;
+
+        // Infinities and NaNs are never zero-padded.
+        struct printf_format spaces = *p;
+        spaces.flags &= ~FLAGS_ZERO;
+        print_float(out, &f, &spaces);
+        return;
+    }
+
+    if (p->type == FORMAT_FLOAT_HEX) {
+        char buffer[HEX_FRACTION_DIGITS + 1];
+        hex_parts(&f, buffer, mantissa, biased_exponent, p);
+        print_float(out, &f, p);
+        return;
+    }
+
+    struct rc_decimal d;
+    decimal_parts(&f, &d, negative ? -value : value, p);
+    print_float(out, &f, p);
+}
+
+#endif  // !defined(__radix_kernel__)
+
 #define VA_SIGNED_INT(ap, printf)                                    \
     ({                                                               \
         ((printf)->flags & FLAGS_LONG_LONG) ? va_arg(ap, long long)  \
@@ -379,13 +906,71 @@ static int format_unsigned(printf_callback callback,
             : va_arg(ap, unsigned int);                                      \
     })
 
-int rc_callback_printf(printf_callback callback,
-                       void *context,
-                       const char *__restrict format,
-                       va_list ap)
+// Formats a single conversion, reading its argument (if any) from ap.
+static void format_conversion(struct printf_output *out,
+                              const struct printf_format *p,
+                              va_list *ap)
 {
+    switch (p->type) {
+    case FORMAT_CHAR:
+        format_char(out, va_arg(*ap, int), p);
+        break;
+
+    case FORMAT_STRING:
+        format_string(out, va_arg(*ap, const char *), p);
+        break;
+
+    case FORMAT_INT:
+        format_signed(out, VA_SIGNED_INT(*ap, p), p);
+        break;
+
+    case FORMAT_UINT:
+        format_unsigned(out, VA_UNSIGNED_INT(*ap, p), p);
+        break;
+
+    case FORMAT_POINTER:
+        format_unsigned(out, (uintptr_t)va_arg(*ap, const void *), p);
+        break;
+
+    case FORMAT_PERCENT:
+        output_char(out, '%');
+        break;
+
+#if !defined(__radix_kernel__)
+    case FORMAT_FLOAT_FIXED:
+    case FORMAT_FLOAT_EXPONENT:
+    case FORMAT_FLOAT_GENERAL:
+    case FORMAT_FLOAT_HEX:
+        format_float(out, va_arg(*ap, double), p);
+        break;
+#else
+    // The kernel does not use floating point, and rejects these conversions
+    // when parsing.
+    case FORMAT_FLOAT_FIXED:
+    case FORMAT_FLOAT_EXPONENT:
+    case FORMAT_FLOAT_GENERAL:
+    case FORMAT_FLOAT_HEX:
+#endif  // !defined(__radix_kernel__)
+
+    case FORMAT_NONE:
+        break;
+    }
+}
+
+// Formats a format string into out. Returns the total length of the output,
+// or -1 if the format string is invalid.
+static int output_printf(struct printf_output *out,
+                         const char *__restrict format,
+                         va_list ap)
+{
+    __RC_PROFILE(RC_PROFILE_PRINTF);
+
     const char *start = format;
-    int n = 0;
+
+    // Arguments are consumed through a pointer by the conversion functions,
+    // which requires a local copy of the list.
+    va_list args;
+    va_copy(args, ap);
 
     while (*format != '\0') {
         if (*format != '%') {
@@ -394,7 +979,7 @@ int rc_callback_printf(printf_callback callback,
         }
 
         if (format != start) {
-            n += callback(context, start, format - start);
+            output_write(out, start, format - start);
         }
 
         // Skip the percent sign.
@@ -402,52 +987,191 @@ int rc_callback_printf(printf_callback callback,
 
         struct printf_format p;
         int format_size = parse_format_sequence(format, &p);
-        if (format_size == -1) {
+        if (format_size == -1 || p.type == FORMAT_NONE) {
+            output_finish(out);
+            va_end(args);
             errno = EINVAL;
             return -1;
         }
 
-        switch (p.type) {
-        case FORMAT_CHAR:
-            n += format_char(callback, context, va_arg(ap, int), &p);
-            break;
+        format_conversion(out, &p, &args);
 
-        case FORMAT_STRING:
-            n += format_string(callback, context, va_arg(ap, const char *), &p);
-            break;
+        format += format_size;
+        start = format;
+    }
 
-        case FORMAT_INT:
-            n += format_signed(callback, context, VA_SIGNED_INT(ap, &p), &p);
-            break;
+    if (format != start) {
+        output_write(out, start, format - start);
+    }
 
-        case FORMAT_UINT:
-            n +=
-                format_unsigned(callback, context, VA_UNSIGNED_INT(ap, &p), &p);
-            break;
+    va_end(args);
 
-        case FORMAT_POINTER:
-            n += format_unsigned(
-                callback, context, (uintptr_t)va_arg(ap, const void *), &p);
-            break;
+    const int length = output_finish(out);
+    __RC_PROFILE_SIZE(length);
+    return length;
+}
+
+// Formats a compiled format string into out. Returns the total length of the
+// output.
+static int output_printf_compiled(struct printf_output *out,
+                                  const struct rc_printf_segment *segments,
+                                  va_list ap)
+{
+    __RC_PROFILE(RC_PROFILE_PRINTF_COMPILED);
 
-        case FORMAT_PERCENT: {
-            const char percent = '%';
-            n += callback(context, &percent, 1);
+    va_list args;
+    va_copy(args, ap);
+
+    for (;; ++segments) {
+        if (segments->__literal_length > 0) {
+            output_write(out, segments->__literal, segments->__literal_length);
+        }
+
+        if (segments->__type == FORMAT_NONE) {
             break;
         }
 
-        case FORMAT_NONE:
+        const struct printf_format p = {
+            .type = segments->__type,
+            .flags = segments->__flags,
+            .base = segments->__base,
+            .precision = segments->__precision,
+            .width = segments->__width,
+        };
+        format_conversion(out, &p, &args);
+    }
+
+    va_end(args);
+
+    const int length = output_finish(out);
+    __RC_PROFILE_SIZE(length);
+    return length;
+}
+
+int rc_callback_printf(printf_callback callback,
+                       void *context,
+                       const char *__restrict format,
+                       va_list ap)
+{
+    char staging[OUTPUT_BUFFER_SIZE];
+    struct printf_output out = {
+        .callback = callback,
+        .context = context,
+        .written = 0,
+        .buffer = staging,
+        .capacity = sizeof staging,
+        .buffered = 0,
+    };
+
+    return output_printf(&out, format, ap);
+}
+
+int rc_callback_printf_compiled(printf_callback callback,
+                                void *context,
+                                const struct rc_printf_segment *segments,
+                                va_list ap)
+{
+    char staging[OUTPUT_BUFFER_SIZE];
+    struct printf_output out = {
+        .callback = callback,
+        .context = context,
+        .written = 0,
+        .buffer = staging,
+        .capacity = sizeof staging,
+        .buffered = 0,
+    };
+
+    return output_printf_compiled(&out, segments, ap);
+}
+
+// Output is written straight into the destination string, leaving space for
+// the terminating NUL.
+#define BUFFER_OUTPUT(str, size)                 \
+    {                                            \
+        .callback = NULL,                        \
+        .context = NULL,                         \
+        .written = 0,                            \
+        .buffer = (str),                         \
+        .capacity = (size) > 0 ? (size) - 1 : 0, \
+        .buffered = 0,                           \
+    }
+
+int rc_buffer_printf(char *__restrict str,
+                     size_t size,
+                     const char *__restrict format,
+                     va_list ap)
+{
+    struct printf_output out = BUFFER_OUTPUT(str, size);
+
+    int ret = output_printf(&out, format, ap);
+    if (size > 0) {
+        str[out.buffered] = '\0';
+    }
+
+    return ret;
+}
+
+int rc_buffer_printf_compiled(char *__restrict str,
+                              size_t size,
+                              const struct rc_printf_segment *segments,
+                              va_list ap)
+{
+    struct printf_output out = BUFFER_OUTPUT(str, size);
+
+    int ret = output_printf_compiled(&out, segments, ap);
+    if (size > 0) {
+        str[out.buffered] = '\0';
+    }
+
+    return ret;
+}
+
+int rc_printf_compile(struct rc_printf_segment *segments,
+                      size_t count,
+                      const char *__restrict format)
+{
+    const char *start = format;
+    size_t used = 0;
+
+    for (;;) {
+        if (*format != '%' && *format != '\0') {
+            ++format;
+            continue;
+        }
+
+        if (used == count) {
+            errno = E2BIG;
+            return -1;
+        }
+
+        struct rc_printf_segment *segment = &segments[used++];
+        segment->__literal = start;
+        segment->__literal_length = format - start;
+
+        if (*format == '\0') {
+            // The final segment holds the trailing literal text, and marks the
+            // end of the compiled format.
+            segment->__type = FORMAT_NONE;
+            return used;
+        }
+
+        // Skip the percent sign.
+        ++format;
+
+        struct printf_format p;
+        int format_size = parse_format_sequence(format, &p);
+        if (format_size == -1 || p.type == FORMAT_NONE) {
             errno = EINVAL;
             return -1;
         }
 
+        segment->__type = p.type;
+        segment->__flags = p.flags;
+        segment->__base = p.base;
+        segment->__precision = p.precision;
+        segment->__width = p.width;
+
         format += format_size;
         start = format;
     }
-
-    if (format != start) {
-        n += callback(context, start, format - start);
-    }
-
-    return n;
 }
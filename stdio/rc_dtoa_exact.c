@@ -0,0 +1,251 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+// Exact conversion of a double to decimal.
+//
+// A double is an integer significand times a power of two. Its integer part is
+// expanded in base 10^9 by repeatedly multiplying by powers of two. Its
+// fractional part is held as a binary fixed-point number, and each
+// multiplication by 10^9 shifts the next nine decimal digits into the integer
+// part. Digits are produced from the most significant onwards, so generation
+// stops as soon as enough have been produced to round the result.
+
+#if !defined(__radix_kernel__)
+
+#include <rlibc/util.h>
+
+#include "dtoa.h"
+
+#define BILLION 1000000000u
+
+// 2^1024 has 309 digits, which fit in 35 limbs of nine.
+#define INTEGER_LIMBS 35
+
+// Fractions have up to 1074 bits.
+#define FRACTION_LIMBS ((1074 + 31) / 32)
+
+struct digit_writer {
+    struct rc_decimal *out;
+    enum rc_dtoa_mode mode;
+    int precision;
+
+    // Decimal exponent of the next digit.
+    int position;
+
+    // Whether the first nonzero digit has been seen, and the number of digits
+    // to collect from it, including one to round with.
+    bool started;
+    int wanted;
+
+    // Whether any nonzero digit was dropped after the last collected one.
+    bool sticky;
+};
+
+static void push_digit(struct digit_writer *w, unsigned digit)
+{
+    struct rc_decimal *out = w->out;
+
+    if (!w->started) {
+        if (digit == 0) {
+            --w->position;
+            return;
+        }
+
+        w->started = true;
+        out->exponent = w->position;
+        w->wanted = w->mode == RC_DTOA_SIGNIFICANT
+                        ? w->precision + 1
+                        : w->position + w->precision + 2;
+        w->wanted = min(w->wanted, RC_DTOA_MAX_DIGITS);
+    }
+
+    if (out->length < w->wanted) {
+        out->digits[out->length++] = '0' + digit;
+    } else if (digit != 0) {
+        w->sticky = true;
+    }
+    --w->position;
+}
+
+// Returns true once no more digits can affect the result.
+static bool writer_done(const struct digit_writer *w)
+{
+    if (w->started) {
+        return w->out->length >= w->wanted;
+    }
+
+    // Digits below the rounding position can only round to zero.
+    return w->mode == RC_DTOA_FRACTION && w->position < -w->precision - 1;
+}
+
+// Pushes the nine digits of a limb, including leading zeros.
+static void push_limb(struct digit_writer *w, uint32_t limb)
+{
+    for (uint32_t power = BILLION / 10; power > 0; power /= 10) {
+        push_digit(w, limb / power);
+        limb %= power;
+    }
+}
+
+// Pushes the digits of significand * 2^exponent, which must be an integer.
+static void push_integer(struct digit_writer *w,
+                         uint64_t significand,
+                         int exponent)
+{
+    // Limbs are stored least significant first.
+    uint32_t limbs[INTEGER_LIMBS];
+    int count = 0;
+
+    limbs[count++] = significand % BILLION;
+    if (significand >= BILLION) {
+        limbs[count++] = significand / BILLION;
+    }
+
+    while (exponent > 0) {
+        const int shift = min(exponent, 29);
+        uint32_t carry = 0;
+
+        for (int i = 0; i < count; ++i) {
+            const uint64_t x = ((uint64_t)limbs[i] << shift) + carry;
+            limbs[i] = x % BILLION;
+            carry = x / BILLION;
+        }
+        if (carry != 0) {
+            limbs[count++] = carry;
+        }
+
+        exponent -= shift;
+    }
+
+    const uint32_t top = limbs[count - 1];
+    uint32_t power = 1;
+    int top_digits = 1;
+    while (power <= top / 10) {
+        power *= 10;
+        ++top_digits;
+    }
+
+    w->position = (count - 1) * 9 + top_digits - 1;
+    for (; power > 0; power /= 10) {
+        push_digit(w, top / power % 10);
+    }
+
+    for (int i = count - 2; i >= 0; --i) {
+        push_limb(w, limbs[i]);
+    }
+}
+
+// Pushes the digits following the decimal point of significand / 2^bits.
+static void push_fraction(struct digit_writer *w,
+                          uint64_t significand,
+                          int bits)
+{
+    if (bits < 64) {
+        significand &= ((uint64_t)1 << bits) - 1;
+    }
+    if (significand == 0) {
+        return;
+    }
+
+    // Fixed-point fraction over 2^(32 * count), least significant limb first.
+    uint32_t limbs[FRACTION_LIMBS] = {0};
+    const int count = (bits + 31) / 32;
+    const int shift = count * 32 - bits;
+
+    const uint64_t low = significand << shift;
+    limbs[0] = low;
+    if (count > 1) {
+        limbs[1] = low >> 32;
+    }
+    if (count > 2 && shift != 0) {
+        limbs[2] = significand >> (64 - shift);
+    }
+
+    // Index of the lowest nonzero limb.
+    int bottom = 0;
+    while (limbs[bottom] == 0) {
+        ++bottom;
+    }
+
+    w->position = -1;
+    while (bottom < count && !writer_done(w)) {
+        uint32_t carry = 0;
+        for (int i = bottom; i < count; ++i) {
+            const uint64_t x = (uint64_t)limbs[i] * BILLION + carry;
+            limbs[i] = x;
+            carry = x >> 32;
+        }
+        push_limb(w, carry);
+
+        while (bottom < count && limbs[bottom] == 0) {
+            ++bottom;
+        }
+    }
+
+    if (bottom < count) {
+        w->sticky = true;
+    }
+}
+
+void rc_dtoa_exact(double value,
+                   enum rc_dtoa_mode mode,
+                   int precision,
+                   struct rc_decimal *out)
+{
+    int exponent;
+    const uint64_t significand = rc_double_significand(value, &exponent);
+
+    struct digit_writer w = {
+        .out = out,
+        .mode = mode,
+        .precision = min(precision, RC_DTOA_MAX_PRECISION),
+        .position = 0,
+        .started = false,
+        .wanted = 0,
+        .sticky = false,
+    };
+    out->length = 0;
+
+    if (exponent >= 0) {
+        push_integer(&w, significand, exponent);
+    } else {
+        if (-exponent < 64 && (significand >> -exponent) != 0) {
+            push_integer(&w, significand >> -exponent, 0);
+        }
+        push_fraction(&w, significand, -exponent);
+    }
+
+    // Round half to even, using the digit after the last one to keep.
+    if (w.wanted > 0 && out->length == w.wanted) {
+        const int keep = w.wanted - 1;
+        const char next = out->digits[keep];
+        const bool odd = keep > 0 && (out->digits[keep - 1] - '0') % 2 != 0;
+
+        out->length = keep;
+        if (next > '5' || (next == '5' && (w.sticky || odd))) {
+            while (out->length > 0 && out->digits[out->length - 1] == '9') {
+                --out->length;
+            }
+            if (out->length == 0) {
+                // All of the kept digits were nines, or there were none.
+                out->digits[out->length++] = '1';
+                ++out->exponent;
+            } else {
+                ++out->digits[out->length - 1];
+            }
+        }
+    }
+
+    while (out->length > 0 && out->digits[out->length - 1] == '0') {
+        --out->length;
+    }
+
+    if (out->length == 0) {
+        out->digits[out->length++] = '0';
+        out->exponent = 0;
+    }
+}
+
+#endif  // !defined(__radix_kernel__)
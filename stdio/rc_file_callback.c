@@ -0,0 +1,13 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+
+#include "file.h"
+
+size_t rc_file_callback(void *stream, const char *data, size_t size)
+{
+    return rc_file_write(stream, data, size);
+}
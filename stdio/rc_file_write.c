@@ -0,0 +1,39 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+#include <string.h>
+
+#include "file.h"
+
+size_t rc_file_write(FILE *stream, const char *data, size_t size)
+{
+    if (stream->buffer == NULL || stream->mode == _IONBF) {
+        return stream->write(stream, data, size);
+    }
+
+    if (size > stream->buffer_size - stream->buffered) {
+        if (fflush(stream) == EOF) {
+            return 0;
+        }
+
+        // Data which would fill the entire buffer gains nothing from being
+        // copied into it first.
+        if (size >= stream->buffer_size) {
+            return stream->write(stream, data, size);
+        }
+    }
+
+    memcpy(stream->buffer + stream->buffered, data, size);
+    stream->buffered += size;
+
+    // A failed flush discards the buffered data, including this write's.
+    if (stream->mode == _IOLBF && memchr(data, '\n', size) != NULL &&
+        fflush(stream) == EOF) {
+        return 0;
+    }
+
+    return size;
+}
@@ -0,0 +1,19 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+
+int rc_fprintf_compiled(FILE *stream,
+                        const struct rc_printf_segment *format,
+                        ...)
+{
+    va_list ap;
+
+    va_start(ap, format);
+    int ret = rc_vfprintf_compiled(stream, format, ap);
+    va_end(ap);
+
+    return ret;
+}
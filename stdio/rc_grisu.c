@@ -0,0 +1,441 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+// Fast conversion of a double to decimal, using Florian Loitsch's Grisu3
+// algorithm ("Printing Floating-Point Numbers Quickly and Accurately with
+// Integers", PLDI 2010).
+//
+// The double is scaled by a cached power of ten into a range where its integer
+// part fits in 32 bits, and digits are generated from the scaled value using
+// 64-bit integer arithmetic. For the shortest digits, the boundaries of the
+// interval of reals which round to the double are scaled alongside it, and
+// digits are generated until the remainder falls within the interval. For a
+// fixed number of digits, the remainder decides how to round the last one.
+//
+// The scaling introduces a small error, which is tracked. If it could affect
+// the result, the conversion gives up, and the caller falls back to an exact
+// method.
+
+#if !defined(__radix_kernel__)
+
+#include "dtoa.h"
+
+// A floating point number with a 64-bit significand, f * 2^e.
+struct diy_fp {
+    uint64_t f;
+    int e;
+};
+
+// Normalized approximations of 10^decimal_exponent, for every eighth exponent
+// from -348 to 340, rounded to nearest.
+struct cached_power {
+    uint64_t significand;
+    int16_t binary_exponent;
+    int16_t decimal_exponent;
+};
+
+static const struct cached_power cached_powers[] = {
+    {0xfa8fd5a0081c0288, -1220, -348},
+    {0xbaaee17fa23ebf76, -1193, -340},
+    {0x8b16fb203055ac76, -1166, -332},
+    {0xcf42894a5dce35ea, -1140, -324},
+    {0x9a6bb0aa55653b2d, -1113, -316},
+    {0xe61acf033d1a45df, -1087, -308},
+    {0xab70fe17c79ac6ca, -1060, -300},
+    {0xff77b1fcbebcdc4f, -1034, -292},
+    {0xbe5691ef416bd60c, -1007, -284},
+    {0x8dd01fad907ffc3c, -980, -276},
+    {0xd3515c2831559a83, -954, -268},
+    {0x9d71ac8fada6c9b5, -927, -260},
+    {0xea9c227723ee8bcb, -901, -252},
+    {0xaecc49914078536d, -874, -244},
+    {0x823c12795db6ce57, -847, -236},
+    {0xc21094364dfb5637, -821, -228},
+    {0x9096ea6f3848984f, -794, -220},
+    {0xd77485cb25823ac7, -768, -212},
+    {0xa086cfcd97bf97f4, -741, -204},
+    {0xef340a98172aace5, -715, -196},
+    {0xb23867fb2a35b28e, -688, -188},
+    {0x84c8d4dfd2c63f3b, -661, -180},
+    {0xc5dd44271ad3cdba, -635, -172},
+    {0x936b9fcebb25c996, -608, -164},
+    {0xdbac6c247d62a584, -582, -156},
+    {0xa3ab66580d5fdaf6, -555, -148},
+    {0xf3e2f893dec3f126, -529, -140},
+    {0xb5b5ada8aaff80b8, -502, -132},
+    {0x87625f056c7c4a8b, -475, -124},
+    {0xc9bcff6034c13053, -449, -116},
+    {0x964e858c91ba2655, -422, -108},
+    {0xdff9772470297ebd, -396, -100},
+    {0xa6dfbd9fb8e5b88f, -369, -92},
+    {0xf8a95fcf88747d94, -343, -84},
+    {0xb94470938fa89bcf, -316, -76},
+    {0x8a08f0f8bf0f156b, -289, -68},
+    {0xcdb02555653131b6, -263, -60},
+    {0x993fe2c6d07b7fac, -236, -52},
+    {0xe45c10c42a2b3b06, -210, -44},
+    {0xaa242499697392d3, -183, -36},
+    {0xfd87b5f28300ca0e, -157, -28},
+    {0xbce5086492111aeb, -130, -20},
+    {0x8cbccc096f5088cc, -103, -12},
+    {0xd1b71758e219652c, -77, -4},
+    {0x9c40000000000000, -50, 4},
+    {0xe8d4a51000000000, -24, 12},
+    {0xad78ebc5ac620000, 3, 20},
+    {0x813f3978f8940984, 30, 28},
+    {0xc097ce7bc90715b3, 56, 36},
+    {0x8f7e32ce7bea5c70, 83, 44},
+    {0xd5d238a4abe98068, 109, 52},
+    {0x9f4f2726179a2245, 136, 60},
+    {0xed63a231d4c4fb27, 162, 68},
+    {0xb0de65388cc8ada8, 189, 76},
+    {0x83c7088e1aab65db, 216, 84},
+    {0xc45d1df942711d9a, 242, 92},
+    {0x924d692ca61be758, 269, 100},
+    {0xda01ee641a708dea, 295, 108},
+    {0xa26da3999aef774a, 322, 116},
+    {0xf209787bb47d6b85, 348, 124},
+    {0xb454e4a179dd1877, 375, 132},
+    {0x865b86925b9bc5c2, 402, 140},
+    {0xc83553c5c8965d3d, 428, 148},
+    {0x952ab45cfa97a0b3, 455, 156},
+    {0xde469fbd99a05fe3, 481, 164},
+    {0xa59bc234db398c25, 508, 172},
+    {0xf6c69a72a3989f5c, 534, 180},
+    {0xb7dcbf5354e9bece, 561, 188},
+    {0x88fcf317f22241e2, 588, 196},
+    {0xcc20ce9bd35c78a5, 614, 204},
+    {0x98165af37b2153df, 641, 212},
+    {0xe2a0b5dc971f303a, 667, 220},
+    {0xa8d9d1535ce3b396, 694, 228},
+    {0xfb9b7cd9a4a7443c, 720, 236},
+    {0xbb764c4ca7a44410, 747, 244},
+    {0x8bab8eefb6409c1a, 774, 252},
+    {0xd01fef10a657842c, 800, 260},
+    {0x9b10a4e5e9913129, 827, 268},
+    {0xe7109bfba19c0c9d, 853, 276},
+    {0xac2820d9623bf429, 880, 284},
+    {0x80444b5e7aa7cf85, 907, 292},
+    {0xbf21e44003acdd2d, 933, 300},
+    {0x8e679c2f5e44ff8f, 960, 308},
+    {0xd433179d9c8cb841, 986, 316},
+    {0x9e19db92b4e31ba9, 1013, 324},
+    {0xeb96bf6ebadf77d9, 1039, 332},
+    {0xaf87023b9bf0ee6b, 1066, 340},
+};
+
+#define CACHED_POWERS_OFFSET 348
+#define CACHED_POWERS_STEP   8
+
+// The range in which the binary exponent of a scaled value is kept.
+#define MINIMAL_TARGET_EXPONENT -60
+#define MAXIMAL_TARGET_EXPONENT -32
+
+static struct diy_fp normalize(struct diy_fp x)
+{
+    const int shift = __builtin_clzll(x.f);
+    return (struct diy_fp){x.f << shift, x.e - shift};
+}
+
+// Returns the product of a and b, rounded to 64 bits.
+static struct diy_fp multiply(struct diy_fp a, struct diy_fp b)
+{
+    const uint64_t mask = 0xffffffff;
+    const uint64_t a_hi = a.f >> 32;
+    const uint64_t a_lo = a.f & mask;
+    const uint64_t b_hi = b.f >> 32;
+    const uint64_t b_lo = b.f & mask;
+
+    const uint64_t hi_hi = a_hi * b_hi;
+    const uint64_t lo_hi = a_lo * b_hi;
+    const uint64_t hi_lo = a_hi * b_lo;
+    const uint64_t lo_lo = a_lo * b_lo;
+
+    uint64_t middle = (lo_lo >> 32) + (hi_lo & mask) + (lo_hi & mask);
+    middle += (uint64_t)1 << 31;
+
+    return (struct diy_fp){
+        hi_hi + (hi_lo >> 32) + (lo_hi >> 32) + (middle >> 32),
+        a.e + b.e + 64,
+    };
+}
+
+// Returns a cached power of ten, such that the binary exponent of its product
+// with a normalized number of binary exponent e is within the target range.
+// Stores the power's decimal exponent.
+static struct diy_fp cached_power_for(int e, int *decimal_exponent)
+{
+    // ceil((MINIMAL_TARGET_EXPONENT - e - 1) * log10(2)), with log10(2)
+    // approximated as 78913 / 2^18, which is exact over the range of doubles.
+    const int minimum = MINIMAL_TARGET_EXPONENT - (e + 64);
+    const int estimate = -((-(minimum + 63) * 78913) >> 18);
+    const int index =
+        (CACHED_POWERS_OFFSET + estimate - 1) / CACHED_POWERS_STEP + 1;
+
+    const struct cached_power *power = &cached_powers[index];
+    *decimal_exponent = power->decimal_exponent;
+    return (struct diy_fp){power->significand, power->binary_exponent};
+}
+
+// Adjusts the last generated digit downwards towards the value while it stays
+// within the safe interval, then checks that the result is unambiguous.
+//
+// All distances are relative to the (scaled) upper boundary, and `unit` is the
+// maximum error of the scaled values.
+static bool round_weed(struct rc_decimal *out,
+                       uint64_t distance_too_high_w,
+                       uint64_t unsafe_interval,
+                       uint64_t rest,
+                       uint64_t ten_kappa,
+                       uint64_t unit)
+{
+    const uint64_t small_distance = distance_too_high_w - unit;
+    const uint64_t big_distance = distance_too_high_w + unit;
+    char *const last = &out->digits[out->length - 1];
+
+    while (rest < small_distance && unsafe_interval - rest >= ten_kappa &&
+           (rest + ten_kappa < small_distance ||
+            small_distance - rest >= rest + ten_kappa - small_distance)) {
+        --*last;
+        rest += ten_kappa;
+    }
+
+    // If the digit could be lowered further for the other extreme of the
+    // error, the correct digit is unknown.
+    if (rest < big_distance && unsafe_interval - rest >= ten_kappa &&
+        (rest + ten_kappa < big_distance ||
+         big_distance - rest > rest + ten_kappa - big_distance)) {
+        return false;
+    }
+
+    // The result must be safely inside the interval.
+    return 2 * unit <= rest && rest <= unsafe_interval - 4 * unit;
+}
+
+// Generates the shortest digits of w lying within (low, high), storing the
+// decimal exponent of the last digit in `kappa`, relative to the scaling.
+static bool generate_digits(struct diy_fp low,
+                            struct diy_fp w,
+                            struct diy_fp high,
+                            struct rc_decimal *out,
+                            int *kappa)
+{
+    // The scaled values are accurate to within one unit, so the interval is
+    // widened by a unit on both sides. Any digits strictly within the narrowed
+    // interval are safe; those in the wider one might be.
+    uint64_t unit = 1;
+    const struct diy_fp too_low = {low.f - unit, low.e};
+    const struct diy_fp too_high = {high.f + unit, high.e};
+    uint64_t unsafe_interval = too_high.f - too_low.f;
+
+    const int shift = -w.e;
+    const uint64_t one = (uint64_t)1 << shift;
+
+    uint32_t integrals = too_high.f >> shift;
+    uint64_t fractionals = too_high.f & (one - 1);
+
+    uint32_t divisor = 1;
+    *kappa = 1;
+    while (divisor <= integrals / 10) {
+        divisor *= 10;
+        ++*kappa;
+    }
+
+    out->length = 0;
+
+    while (*kappa > 0) {
+        out->digits[out->length++] = '0' + integrals / divisor;
+        integrals %= divisor;
+        --*kappa;
+
+        const uint64_t rest = ((uint64_t)integrals << shift) + fractionals;
+        if (rest < unsafe_interval) {
+            return round_weed(out,
+                              too_high.f - w.f,
+                              unsafe_interval,
+                              rest,
+                              (uint64_t)divisor << shift,
+                              unit);
+        }
+        divisor /= 10;
+    }
+
+    for (;;) {
+        fractionals *= 10;
+        unit *= 10;
+        unsafe_interval *= 10;
+
+        out->digits[out->length++] = '0' + (fractionals >> shift);
+        fractionals &= one - 1;
+        --*kappa;
+
+        if (fractionals < unsafe_interval) {
+            return round_weed(out,
+                              (too_high.f - w.f) * unit,
+                              unsafe_interval,
+                              fractionals,
+                              one,
+                              unit);
+        }
+    }
+}
+
+// Rounds the digits generated by generate_counted(), given the remainder below
+// the last digit and the value of a unit of that digit, both scaled. Returns
+// false if the error in the scaled value prevents deciding which way to round.
+static bool round_counted(struct rc_decimal *out,
+                          uint64_t rest,
+                          uint64_t ten_kappa,
+                          uint64_t unit,
+                          int *kappa)
+{
+    if (unit >= ten_kappa || ten_kappa - unit <= unit) {
+        return false;
+    }
+
+    // Round down if the remainder is below half even with the error added.
+    if (ten_kappa - rest > rest && ten_kappa - 2 * rest >= 2 * unit) {
+        return true;
+    }
+
+    // Round up if it is above half even with the error subtracted.
+    if (rest > unit && ten_kappa - (rest - unit) <= rest - unit) {
+        int i = out->length - 1;
+        while (i > 0 && out->digits[i] == '9') {
+            out->digits[i--] = '0';
+        }
+        if (out->digits[i] == '9') {
+            out->digits[0] = '1';
+            ++*kappa;
+        } else {
+            ++out->digits[i];
+        }
+        return true;
+    }
+
+    return false;
+}
+
+// Generates `count` digits of w, storing the decimal exponent of the last digit
+// in `kappa`, relative to the scaling.
+static bool generate_counted(struct diy_fp w,
+                             int count,
+                             struct rc_decimal *out,
+                             int *kappa)
+{
+    uint64_t unit = 1;
+    const int shift = -w.e;
+    const uint64_t one = (uint64_t)1 << shift;
+
+    uint32_t integrals = w.f >> shift;
+    uint64_t fractionals = w.f & (one - 1);
+
+    uint32_t divisor = 1;
+    *kappa = 1;
+    while (divisor <= integrals / 10) {
+        divisor *= 10;
+        ++*kappa;
+    }
+
+    out->length = 0;
+
+    while (*kappa > 0) {
+        out->digits[out->length++] = '0' + integrals / divisor;
+        integrals %= divisor;
+        --*kappa;
+
+        if (out->length == count) {
+            const uint64_t rest = ((uint64_t)integrals << shift) + fractionals;
+            return round_counted(
+                out, rest, (uint64_t)divisor << shift, unit, kappa);
+        }
+        divisor /= 10;
+    }
+
+    // Beyond the integral part, the error grows with each digit, until the
+    // digits are no longer meaningful.
+    while (out->length < count && fractionals > unit) {
+        fractionals *= 10;
+        unit *= 10;
+
+        out->digits[out->length++] = '0' + (fractionals >> shift);
+        fractionals &= one - 1;
+        --*kappa;
+    }
+
+    if (out->length < count) {
+        return false;
+    }
+    return round_counted(out, fractionals, one, unit, kappa);
+}
+
+bool rc_dtoa_shortest(double value, struct rc_decimal *out)
+{
+    uint64_t mantissa;
+    int biased;
+    rc_double_bits(value, &mantissa, &biased);
+
+    int exponent;
+    const struct diy_fp v = {rc_double_significand(value, &exponent),
+                             exponent};
+
+    // The boundaries are halfway to the neighbouring doubles. Below a power of
+    // two, the gap to the next lower double is half as large.
+    const struct diy_fp upper = normalize((struct diy_fp){
+        (v.f << 1) + 1,
+        v.e - 1,
+    });
+    struct diy_fp lower;
+    if (mantissa == 0 && biased > 1) {
+        lower = (struct diy_fp){(v.f << 2) - 1, v.e - 2};
+    } else {
+        lower = (struct diy_fp){(v.f << 1) - 1, v.e - 1};
+    }
+    lower.f <<= lower.e - upper.e;
+    lower.e = upper.e;
+
+    const struct diy_fp w = normalize(v);
+
+    int power_exponent;
+    const struct diy_fp power = cached_power_for(w.e, &power_exponent);
+
+    int kappa;
+    if (!generate_digits(multiply(lower, power),
+                         multiply(w, power),
+                         multiply(upper, power),
+                         out,
+                         &kappa)) {
+        return false;
+    }
+
+    // The digits were generated from the value times 10^power_exponent, and
+    // form an integer times 10^kappa.
+    out->exponent = kappa - power_exponent + out->length - 1;
+    return true;
+}
+
+bool rc_dtoa_counted(double value, int count, struct rc_decimal *out)
+{
+    int exponent;
+    const struct diy_fp v = {rc_double_significand(value, &exponent),
+                             exponent};
+    const struct diy_fp w = normalize(v);
+
+    int power_exponent;
+    const struct diy_fp power = cached_power_for(w.e, &power_exponent);
+
+    int kappa;
+    if (!generate_counted(multiply(w, power), count, out, &kappa)) {
+        return false;
+    }
+
+    out->exponent = kappa - power_exponent + out->length - 1;
+    while (out->length > 1 && out->digits[out->length - 1] == '0') {
+        --out->length;
+    }
+    return true;
+}
+
+#endif  // !defined(__radix_kernel__)
@@ -0,0 +1,16 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+
+#include "file.h"
+#include "printf.h"
+
+int rc_vfprintf_compiled(FILE *stream,
+                         const struct rc_printf_segment *format,
+                         va_list ap)
+{
+    return rc_callback_printf_compiled(rc_file_callback, stream, format, ap);
+}
@@ -0,0 +1,16 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+
+#include "printf.h"
+
+int rc_vsnprintf_compiled(char *__restrict str,
+                          size_t size,
+                          const struct rc_printf_segment *format,
+                          va_list ap)
+{
+    return rc_buffer_printf_compiled(str, size, format, ap);
+}
@@ -0,0 +1,15 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdio.h>
+
+void setbuf(FILE *__restrict stream, char *__restrict buf)
+{
+    if (buf != NULL) {
+        setvbuf(stream, buf, _IOFBF, BUFSIZ);
+    } else {
+        setvbuf(stream, NULL, _IONBF, 0);
+    }
+}
@@ -0,0 +1,40 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <errno.h>
+#include <stdio.h>
+
+int setvbuf(FILE *__restrict stream,
+            char *__restrict buf,
+            int mode,
+            size_t size)
+{
+    if (mode != _IOFBF && mode != _IOLBF && mode != _IONBF) {
+        errno = EINVAL;
+        return -1;
+    }
+
+    if (buf != NULL && size == 0) {
+        errno = EINVAL;
+        return -1;
+    }
+
+    // Write out anything buffered under the previous settings.
+    if (fflush(stream) == EOF) {
+        return -1;
+    }
+
+    // setvbuf() never allocates a buffer, as libk has no heap and a FILE has no
+    // way to record that it owns one to free later. If none is provided, the
+    // stream keeps its existing one (e.g. stdout's static buffer). A stream
+    // which has no buffer remains unbuffered.
+    if (buf != NULL) {
+        stream->buffer = buf;
+        stream->buffer_size = size;
+    }
+    stream->mode = mode;
+
+    return 0;
+}
@@ -31,8 +31,13 @@ static size_t stderr_write(__RC_UNUSED FILE *stream,
 
 #endif  // defined(__radix_kernel__)
 
+// Error messages are written out immediately.
 static FILE stderr_file = {
     .write = stderr_write,
+    .buffer = NULL,
+    .buffer_size = 0,
+    .buffered = 0,
+    .mode = _IONBF,
 };
 
 FILE *const stderr = &stderr_file;
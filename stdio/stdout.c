@@ -31,8 +31,48 @@ static size_t stdout_write(__RC_UNUSED FILE *stream,
 
 #endif  // defined(__radix_kernel__)
 
+#if defined(__radix_kernel__)
+
+// The kernel's stdout is unbuffered. A shared buffer would need a lock against
+// other CPUs and interrupt handlers, and output without a trailing newline,
+// such as a panic message, would never be flushed as the kernel does not exit.
+// printf() still batches each call's output in its own staging buffer.
+static FILE stdout_file = {
+    .write = stdout_write,
+    .buffer = NULL,
+    .buffer_size = 0,
+    .buffered = 0,
+    .mode = _IONBF,
+};
+
+#else  // defined(__radix_kernel__)
+
+static char stdout_buffer[BUFSIZ];
+
 static FILE stdout_file = {
     .write = stdout_write,
+    .buffer = stdout_buffer,
+    .buffer_size = sizeof stdout_buffer,
+    .buffered = 0,
+    .mode = _IOLBF,
 };
 
+#endif  // defined(__radix_kernel__)
+
 FILE *const stdout = &stdout_file;
+
+#if !defined(__radix_kernel__) && (defined(__i386__) || defined(__x86_64__))
+
+static __RC_USED void stdio_fini(void)
+{
+    fflush(NULL);
+}
+
+// Flush all buffered output when the program exits by appending a call to the
+// body of _fini, which is assembled from the .fini sections of crti.o, every
+// linked object, and crtn.o. Any program which prints to stdout links this.
+__asm__(".pushsection .fini, \"ax\"\n"
+        "\tcall stdio_fini\n"
+        ".popsection");
+
+#endif  // !defined(__radix_kernel__) && ...
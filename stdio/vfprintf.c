@@ -5,15 +5,10 @@
 
 #include <stdio.h>
 
+#include "file.h"
 #include "printf.h"
 
-static size_t callback(void *ctx, const char *string, size_t size)
-{
-    FILE *stream = ctx;
-    return stream->write(stream, string, size);
-}
-
 int vfprintf(FILE *stream, const char *__restrict format, va_list ap)
 {
-    return rc_callback_printf(callback, stream, format, ap);
+    return rc_callback_printf(rc_file_callback, stream, format, ap);
 }
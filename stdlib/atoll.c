@@ -0,0 +1,8 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <stdlib.h>
+
+long long atoll(const char *nptr) { return strtoll(nptr, NULL, 10); }
@@ -0,0 +1,32 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#if !defined(__radix_kernel__)
+
+#include <rlibc/memory.h>
+
+#include <errno.h>
+#include <stdlib.h>
+
+#include "heap.h"
+
+void *calloc(size_t nmemb, size_t size)
+{
+    if (size != 0 && nmemb > SIZE_MAX / size) {
+        errno = ENOMEM;
+        return NULL;
+    }
+
+    // Memory which has never been handed out is already zero.
+    bool zeroed;
+    void *ptr = rc_heap_alloc(nmemb * size, &zeroed);
+    if (ptr != NULL && !zeroed) {
+        __rc_set_bytes(ptr, 0, nmemb * size);
+    }
+
+    return ptr;
+}
+
+#endif  // !defined(__radix_kernel__)
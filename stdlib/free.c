@@ -0,0 +1,19 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#if !defined(__radix_kernel__)
+
+#include <stdlib.h>
+
+#include "heap.h"
+
+void free(void *ptr)
+{
+    if (ptr != NULL) {
+        rc_heap_free(ptr);
+    }
+}
+
+#endif  // !defined(__radix_kernel__)
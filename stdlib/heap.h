@@ -0,0 +1,137 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_STDLIB_HEAP_H
+#define RLIBC_STDLIB_HEAP_H
+
+// Internal interface of the userspace memory allocator.
+//
+// Memory is obtained from a page provider in regions of whole slabs, each of
+// which starts at an address aligned to its size. Allocations of up to
+// RC_HEAP_MAX_SMALL bytes are rounded up to one of a set of size classes and
+// carved out of a slab dedicated to that class. Larger allocations receive a
+// region of their own. Either way, the header describing an allocation is
+// found by rounding its address down to a slab boundary, so allocations carry
+// no per-object header.
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#define RC_HEAP_SLAB_SIZE   ((size_t)64 * 1024)
+#define RC_HEAP_MAX_SMALL   8192
+#define RC_HEAP_NUM_CLASSES 32
+
+// Alignment of every allocation, and the size of a slab's header.
+#define RC_HEAP_ALIGNMENT   16
+#define RC_HEAP_HEADER_SIZE 64
+
+// Size class of a region holding a single large allocation.
+#define RC_HEAP_LARGE RC_HEAP_NUM_CLASSES
+
+struct rc_heap_object {
+    struct rc_heap_object *next;
+};
+
+// Header at the start of every region.
+struct rc_heap_slab {
+    // Neighbours in the list of slabs of this class with free objects.
+    struct rc_heap_slab *next;
+    struct rc_heap_slab *prev;
+
+    // Objects which have been freed, and the end of the never-allocated space
+    // beyond them.
+    struct rc_heap_object *free;
+    uint8_t *fresh;
+
+    // Size in bytes of the region, including this header.
+    size_t size;
+
+    uint32_t used;
+    uint16_t size_class;
+
+    // Whether the memory from `fresh` onwards is zeroed.
+    bool zeroed;
+};
+
+_Static_assert(sizeof(struct rc_heap_slab) <= RC_HEAP_HEADER_SIZE,
+               "slab header does not fit in its reserved space");
+
+struct rc_heap {
+    // For each size class, the slabs with space for at least one object.
+    struct rc_heap_slab *partial[RC_HEAP_NUM_CLASSES];
+};
+
+extern struct rc_heap rc_heap;
+extern const uint16_t rc_heap_class_sizes[RC_HEAP_NUM_CLASSES];
+
+static inline struct rc_heap_slab *rc_heap_slab_of(const void *ptr)
+{
+    return (struct rc_heap_slab *)((uintptr_t)ptr & ~(RC_HEAP_SLAB_SIZE - 1));
+}
+
+// Returns the number of bytes usable at an allocated pointer.
+static inline size_t rc_heap_capacity(const void *ptr)
+{
+    const struct rc_heap_slab *slab = rc_heap_slab_of(ptr);
+    if (slab->size_class == RC_HEAP_LARGE) {
+        return slab->size - RC_HEAP_HEADER_SIZE;
+    }
+    return rc_heap_class_sizes[slab->size_class];
+}
+
+// Returns the size of the region needed to hold a large allocation of `size`
+// bytes, or 0 if no region could be that large.
+static inline size_t rc_heap_large_region(size_t size)
+{
+    if (size > SIZE_MAX - RC_HEAP_HEADER_SIZE - RC_HEAP_SLAB_SIZE) {
+        return 0;
+    }
+    return (size + RC_HEAP_HEADER_SIZE + RC_HEAP_SLAB_SIZE - 1) &
+           ~(RC_HEAP_SLAB_SIZE - 1);
+}
+
+// Allocates at least `size` bytes. If `zeroed` is not NULL, it is set to
+// whether the returned memory is known to contain only zeroes. Sets errno and
+// returns NULL on failure.
+void *rc_heap_alloc(size_t size, bool *zeroed);
+
+// Releases memory returned by rc_heap_alloc().
+void rc_heap_free(void *ptr);
+
+//
+// Page provider.
+//
+// The allocator obtains memory through these three functions, which together
+// form the page provider. The default provider hands out pages from a static
+// arena of RC_HEAP_ARENA_SIZE bytes. A program may supply its own by defining
+// all three functions, in which case the default is not linked.
+//
+// All sizes are multiples of RC_HEAP_SLAB_SIZE, and all regions are aligned to
+// it.
+//
+
+// The arena lives in .bss, so its pages are not touched until they are first
+// allocated.
+#ifndef RC_HEAP_ARENA_SIZE
+#if UINTPTR_MAX > 0xffffffff
+#define RC_HEAP_ARENA_SIZE ((size_t)64 << 20)
+#else
+#define RC_HEAP_ARENA_SIZE ((size_t)16 << 20)
+#endif  // UINTPTR_MAX > 0xffffffff
+#endif  // RC_HEAP_ARENA_SIZE
+
+// Returns a region of `size` bytes, or NULL if none is available. Sets
+// `zeroed` to whether the region's contents are known to be zero.
+void *rc_pages_alloc(size_t size, bool *zeroed);
+
+// Attempts to grow a region from `size` to `new_size` bytes without moving it.
+// Returns true if it succeeded.
+bool rc_pages_extend(void *pages, size_t size, size_t new_size);
+
+// Returns a region to the provider.
+void rc_pages_free(void *pages, size_t size);
+
+#endif  // RLIBC_STDLIB_HEAP_H
@@ -0,0 +1,36 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_STDLIB_INTEGER_H
+#define RLIBC_STDLIB_INTEGER_H
+
+#include <stdbool.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif  // __cplusplus
+
+// Parses an integer as described for strtol(), returning its magnitude and
+// storing its sign in *negative.
+//
+// max is the largest magnitude of the destination type. Signed types also
+// accept negative values with a magnitude of max + 1; unsigned types accept
+// negative values up to max, which the caller negates.
+//
+// If the value is out of range, sets errno to ERANGE and returns the magnitude
+// and sign of the destination type's limit in that direction. An invalid base
+// sets errno to EINVAL.
+unsigned long long rc_parse_integer(const char *__restrict nptr,
+                                    char **__restrict endptr,
+                                    int base,
+                                    unsigned long long max,
+                                    bool is_signed,
+                                    bool *negative);
+
+#ifdef __cplusplus
+}
+#endif  // __cplusplus
+
+#endif  // RLIBC_STDLIB_INTEGER_H
@@ -0,0 +1,17 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#if !defined(__radix_kernel__)
+
+#include <stdlib.h>
+
+#include "heap.h"
+
+void *malloc(size_t size)
+{
+    return rc_heap_alloc(size, NULL);
+}
+
+#endif  // !defined(__radix_kernel__)
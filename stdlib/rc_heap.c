@@ -0,0 +1,177 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#if !defined(__radix_kernel__)
+
+#include <errno.h>
+
+#include "heap.h"
+
+struct rc_heap rc_heap;
+
+// Up to 128 bytes, classes are spaced 16 bytes apart. Beyond that, each power
+// of two is split into four classes, so that no more than a quarter of an
+// allocation is wasted to rounding.
+const uint16_t rc_heap_class_sizes[RC_HEAP_NUM_CLASSES] = {
+    16,   32,   48,   64,   80,   96,   112,  128,  160,  192,  224,
+    256,  320,  384,  448,  512,  640,  768,  896,  1024, 1280, 1536,
+    1792, 2048, 2560, 3072, 3584, 4096, 5120, 6144, 7168, 8192,
+};
+
+// Returns the index of the smallest class which fits `size` bytes, which must
+// not exceed RC_HEAP_MAX_SMALL.
+static unsigned size_class(size_t size)
+{
+    if (size <= 128) {
+        return size == 0 ? 0 : (size - 1) >> 4;
+    }
+
+    unsigned n = size - 1;
+    unsigned shift = 31 - __builtin_clz(n);
+    return 8 + (shift - 7) * 4 + ((n >> (shift - 2)) & 3);
+}
+
+static struct rc_heap_slab *new_region(size_t size, unsigned size_class)
+{
+    bool zeroed;
+    struct rc_heap_slab *slab = rc_pages_alloc(size, &zeroed);
+    if (slab == NULL) {
+        return NULL;
+    }
+
+    slab->next = NULL;
+    slab->prev = NULL;
+    slab->free = NULL;
+    slab->fresh = (uint8_t *)slab + RC_HEAP_HEADER_SIZE;
+    slab->size = size;
+    slab->used = 0;
+    slab->size_class = size_class;
+    slab->zeroed = zeroed;
+    return slab;
+}
+
+static bool slab_full(const struct rc_heap_slab *slab)
+{
+    return slab->free == NULL &&
+           slab->fresh + rc_heap_class_sizes[slab->size_class] >
+               (uint8_t *)slab + slab->size;
+}
+
+static void partial_push(struct rc_heap_slab *slab)
+{
+    struct rc_heap_slab **head = &rc_heap.partial[slab->size_class];
+
+    slab->prev = NULL;
+    slab->next = *head;
+    if (*head != NULL) {
+        (*head)->prev = slab;
+    }
+    *head = slab;
+}
+
+static void partial_remove(struct rc_heap_slab *slab)
+{
+    if (slab->prev != NULL) {
+        slab->prev->next = slab->next;
+    } else {
+        rc_heap.partial[slab->size_class] = slab->next;
+    }
+    if (slab->next != NULL) {
+        slab->next->prev = slab->prev;
+    }
+}
+
+static void *alloc_small(size_t size, bool *zeroed)
+{
+    unsigned class = size_class(size);
+
+    struct rc_heap_slab *slab = rc_heap.partial[class];
+    if (slab == NULL) {
+        slab = new_region(RC_HEAP_SLAB_SIZE, class);
+        if (slab == NULL) {
+            return NULL;
+        }
+        partial_push(slab);
+    }
+
+    void *ptr;
+    if (slab->free != NULL) {
+        ptr = slab->free;
+        slab->free = slab->free->next;
+        *zeroed = false;
+    } else {
+        ptr = slab->fresh;
+        slab->fresh += rc_heap_class_sizes[class];
+        *zeroed = slab->zeroed;
+    }
+
+    ++slab->used;
+    if (slab_full(slab)) {
+        partial_remove(slab);
+    }
+
+    return ptr;
+}
+
+void *rc_heap_alloc(size_t size, bool *zeroed)
+{
+    bool ignored;
+    if (zeroed == NULL) {
+        zeroed = &ignored;
+    }
+
+    void *ptr;
+    if (size <= RC_HEAP_MAX_SMALL) {
+        ptr = alloc_small(size, zeroed);
+    } else {
+        size_t region = rc_heap_large_region(size);
+        struct rc_heap_slab *slab =
+            region != 0 ? new_region(region, RC_HEAP_LARGE) : NULL;
+
+        if (slab != NULL) {
+            ptr = slab->fresh;
+            *zeroed = slab->zeroed;
+        } else {
+            ptr = NULL;
+        }
+    }
+
+    if (ptr == NULL) {
+        errno = ENOMEM;
+    }
+    return ptr;
+}
+
+void rc_heap_free(void *ptr)
+{
+    struct rc_heap_slab *slab = rc_heap_slab_of(ptr);
+
+    if (slab->size_class == RC_HEAP_LARGE) {
+        rc_pages_free(slab, slab->size);
+        return;
+    }
+
+    bool was_full = slab_full(slab);
+
+    struct rc_heap_object *object = ptr;
+    object->next = slab->free;
+    slab->free = object;
+    --slab->used;
+
+    if (was_full) {
+        partial_push(slab);
+    }
+
+    // Keep the last slab of a class even once it is empty, so that a program
+    // repeatedly allocating and freeing a single object does not go to the
+    // page provider each time.
+    if (slab->used == 0 &&
+        (slab->prev != NULL || slab->next != NULL)) {
+        partial_remove(slab);
+        rc_pages_free(slab, slab->size);
+    }
+}
+
+#endif  // !defined(__radix_kernel__)
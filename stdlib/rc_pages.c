@@ -0,0 +1,124 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+// The default page provider, which allocates regions from a static arena.
+//
+// TODO(frolv): Map pages with brk/mmap once userspace has a syscall layer.
+
+#if !defined(__radix_kernel__)
+
+#include <rlibc/compiler.h>
+
+#include "heap.h"
+
+// A run of free pages which have previously been allocated. The runs are kept
+// in order of address, and adjacent runs are merged.
+struct free_run {
+    struct free_run *next;
+    size_t size;
+};
+
+static uint8_t arena[RC_HEAP_ARENA_SIZE] __RC_ALIGNED(RC_HEAP_SLAB_SIZE);
+
+// Everything from here to the end of the arena has never been allocated, and
+// is therefore still zero.
+static uint8_t *untouched = arena;
+
+static struct free_run *free_runs = NULL;
+
+// Takes the first `size` bytes of the run at `*link`, which must be at least
+// that large.
+static void *take_from_run(struct free_run **link, size_t size)
+{
+    struct free_run *run = *link;
+
+    if (run->size == size) {
+        *link = run->next;
+    } else {
+        struct free_run *rest = (struct free_run *)((uint8_t *)run + size);
+        rest->next = run->next;
+        rest->size = run->size - size;
+        *link = rest;
+    }
+
+    return run;
+}
+
+void *rc_pages_alloc(size_t size, bool *zeroed)
+{
+    for (struct free_run **link = &free_runs; *link != NULL;
+         link = &(*link)->next) {
+        if ((*link)->size >= size) {
+            *zeroed = false;
+            return take_from_run(link, size);
+        }
+    }
+
+    if (size > (size_t)(arena + sizeof arena - untouched)) {
+        return NULL;
+    }
+
+    void *pages = untouched;
+    untouched += size;
+    *zeroed = true;
+    return pages;
+}
+
+bool rc_pages_extend(void *pages, size_t size, size_t new_size)
+{
+    uint8_t *end = (uint8_t *)pages + size;
+    size_t extra = new_size - size;
+
+    if (end == untouched) {
+        if (extra > (size_t)(arena + sizeof arena - untouched)) {
+            return false;
+        }
+        untouched += extra;
+        return true;
+    }
+
+    for (struct free_run **link = &free_runs; *link != NULL;
+         link = &(*link)->next) {
+        if ((uint8_t *)*link < end) {
+            continue;
+        }
+        if ((uint8_t *)*link > end || (*link)->size < extra) {
+            return false;
+        }
+        take_from_run(link, extra);
+        return true;
+    }
+
+    return false;
+}
+
+void rc_pages_free(void *pages, size_t size)
+{
+    struct free_run *run = pages;
+    struct free_run *prev = NULL;
+    struct free_run **link = &free_runs;
+
+    while (*link != NULL && *link < run) {
+        prev = *link;
+        link = &(*link)->next;
+    }
+
+    run->size = size;
+    run->next = *link;
+    *link = run;
+
+    if (run->next != NULL &&
+        (uint8_t *)run + run->size == (uint8_t *)run->next) {
+        run->size += run->next->size;
+        run->next = run->next->next;
+    }
+
+    if (prev != NULL && (uint8_t *)prev + prev->size == (uint8_t *)run) {
+        prev->size += run->size;
+        prev->next = run->next;
+    }
+}
+
+#endif  // !defined(__radix_kernel__)
@@ -0,0 +1,166 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/compiler.h>
+#include <rlibc/memory.h>
+
+#include <ctype.h>
+#include <errno.h>
+#include <limits.h>
+#include <stdbool.h>
+#include <stdint.h>
+
+#include "integer.h"
+
+// Returns the value of c as a digit in bases up to 36, or 36 if it is not one.
+static unsigned digit_value(unsigned char c)
+{
+    if (isdigit(c)) {
+        return c - '0';
+    }
+    if (isalpha(c)) {
+        return (c | 0x20) - 'a' + 10;
+    }
+    return 36;
+}
+
+#if defined(__RLIBC_UNALIGNED_ACCESS) && defined(__RLIBC_PAGE_SIZE) && \
+    __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__
+#define EIGHT_DIGITS_AT_A_TIME 1
+
+typedef uint64_t __RC_MAY_ALIAS __RC_ALIGNED(1) unaligned_u64_t;
+
+// Returns true if it is safe to load eight bytes from p: they do not straddle
+// a page boundary, so if p is readable, so are the rest.
+static inline bool can_load_eight(const char *p)
+{
+    return ((uintptr_t)p & (__RLIBC_PAGE_SIZE - 1)) <= __RLIBC_PAGE_SIZE - 8;
+}
+
+// Returns true if every byte of chunk is an ASCII decimal digit.
+static inline bool is_eight_digits(uint64_t chunk)
+{
+    // Digits are 0x30 to 0x39: their high nibbles are 3, and remain 3 after
+    // adding 6 to the low nibble.
+    return ((chunk & 0xf0f0f0f0f0f0f0f0) |
+            (((chunk + 0x0606060606060606) & 0xf0f0f0f0f0f0f0f0) >> 4)) ==
+           0x3333333333333333;
+}
+
+// Converts eight ASCII digits, the first in the lowest byte, to their value.
+// Adjacent digits are combined pairwise into 2, 4 and then 8 digit values,
+// each step a single multiplication.
+static inline uint32_t parse_eight_digits(uint64_t chunk)
+{
+    chunk = ((chunk & 0x0f0f0f0f0f0f0f0f) * (10 << 8 | 1)) >> 8;
+    chunk = ((chunk & 0x00ff00ff00ff00ff) * (100 << 16 | 1)) >> 16;
+    return ((chunk & 0x0000ffff0000ffff) * (10000ull << 32 | 1)) >> 32;
+}
+
+#endif  // EIGHT_DIGITS_AT_A_TIME
+
+unsigned long long rc_parse_integer(const char *__restrict nptr,
+                                    char **__restrict endptr,
+                                    int base,
+                                    unsigned long long max,
+                                    bool is_signed,
+                                    bool *negative)
+{
+    const char *s = nptr;
+
+    *negative = false;
+
+    if (base < 0 || base == 1 || base > 36) {
+        if (endptr != NULL) {
+            *endptr = (char *)nptr;
+        }
+        errno = EINVAL;
+        return 0;
+    }
+
+    while (isspace((unsigned char)*s)) {
+        ++s;
+    }
+
+    if (*s == '-') {
+        *negative = true;
+        ++s;
+    } else if (*s == '+') {
+        ++s;
+    }
+
+    // A "0x" prefix is only consumed if a hexadecimal digit follows it.
+    // Otherwise, the leading 0 is parsed alone.
+    if ((base == 0 || base == 16) && s[0] == '0' && (s[1] | 0x20) == 'x' &&
+        isxdigit((unsigned char)s[2])) {
+        s += 2;
+        base = 16;
+    } else if (base == 0) {
+        base = s[0] == '0' ? 8 : 10;
+    }
+
+    const char *const digits = s;
+    unsigned long long value = 0;
+    bool overflow = false;
+
+#if defined(EIGHT_DIGITS_AT_A_TIME)
+    // Multiplying by 10^8 and adding eight digits cannot overflow while the
+    // value is at most this.
+    const unsigned long long eight_digit_limit =
+        (ULLONG_MAX - 99999999) / 100000000;
+
+    if (base == 10) {
+        while (value <= eight_digit_limit && can_load_eight(s)) {
+            const uint64_t chunk = *(const unaligned_u64_t *)s;
+            if (!is_eight_digits(chunk)) {
+                break;
+            }
+            value = value * 100000000 + parse_eight_digits(chunk);
+            s += 8;
+        }
+    }
+#endif  // defined(EIGHT_DIGITS_AT_A_TIME)
+
+    const unsigned long long cutoff = ULLONG_MAX / base;
+    const unsigned cutlim = ULLONG_MAX % base;
+
+    for (;; ++s) {
+        const unsigned digit = digit_value(*s);
+        if (digit >= (unsigned)base) {
+            break;
+        }
+
+        // Digits past an overflow are still consumed.
+        if (value > cutoff || (value == cutoff && digit > cutlim)) {
+            overflow = true;
+        } else {
+            value = value * base + digit;
+        }
+    }
+
+    if (s == digits) {
+        // No digits were found, so nothing is consumed.
+        if (endptr != NULL) {
+            *endptr = (char *)nptr;
+        }
+        *negative = false;
+        return 0;
+    }
+
+    if (endptr != NULL) {
+        *endptr = (char *)s;
+    }
+
+    const unsigned long long limit = *negative && is_signed ? max + 1 : max;
+    if (overflow || value > limit) {
+        errno = ERANGE;
+        if (!is_signed) {
+            *negative = false;
+        }
+        return limit;
+    }
+
+    return value;
+}
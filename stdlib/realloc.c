@@ -0,0 +1,48 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#if !defined(__radix_kernel__)
+
+#include <rlibc/memory.h>
+#include <rlibc/util.h>
+
+#include <stdlib.h>
+
+#include "heap.h"
+
+void *realloc(void *ptr, size_t size)
+{
+    if (ptr == NULL) {
+        return rc_heap_alloc(size, NULL);
+    }
+
+    // Stay in place if the allocation already fits the new size without
+    // wasting more than half of it.
+    size_t capacity = rc_heap_capacity(ptr);
+    if (size <= capacity && size >= capacity / 2) {
+        return ptr;
+    }
+
+    // Large allocations may be able to grow into the pages following them.
+    struct rc_heap_slab *slab = rc_heap_slab_of(ptr);
+    if (slab->size_class == RC_HEAP_LARGE && size > capacity) {
+        size_t region = rc_heap_large_region(size);
+        if (region != 0 && rc_pages_extend(slab, slab->size, region)) {
+            slab->size = region;
+            return ptr;
+        }
+    }
+
+    void *new_ptr = rc_heap_alloc(size, NULL);
+    if (new_ptr == NULL) {
+        return NULL;
+    }
+
+    __rc_copy_bytes_fwd(new_ptr, ptr, min(size, capacity));
+    rc_heap_free(ptr);
+    return new_ptr;
+}
+
+#endif  // !defined(__radix_kernel__)
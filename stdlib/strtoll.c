@@ -0,0 +1,26 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <limits.h>
+#include <stdbool.h>
+#include <stdlib.h>
+
+#include "integer.h"
+
+long long strtoll(const char *__restrict nptr,
+                  char **__restrict endptr,
+                  int base)
+{
+    bool negative;
+    unsigned long long magnitude =
+        rc_parse_integer(nptr, endptr, base, LLONG_MAX, true, &negative);
+
+    if (negative) {
+        // The magnitude may be one greater than the type's maximum, which is
+        // only representable as LLONG_MIN.
+        return magnitude > LLONG_MAX ? LLONG_MIN : -(long long)magnitude;
+    }
+    return magnitude;
+}
@@ -0,0 +1,22 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <limits.h>
+#include <stdbool.h>
+#include <stdlib.h>
+
+#include "integer.h"
+
+unsigned long strtoul(const char *__restrict nptr,
+                      char **__restrict endptr,
+                      int base)
+{
+    bool negative;
+    unsigned long value =
+        rc_parse_integer(nptr, endptr, base, ULONG_MAX, false, &negative);
+
+    // Negative values are converted by negation in the unsigned type.
+    return negative ? -value : value;
+}
@@ -0,0 +1,78 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_STRING_COPY_H
+#define RLIBC_STRING_COPY_H
+
+#include <rlibc/memory.h>
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif  // __cplusplus
+
+// Copies the string src, including its terminator, to dst, stopping after n
+// bytes if the terminator has not been reached. Returns a pointer to the
+// terminator within dst, or dst + n if none was copied.
+//
+// The string is copied a word at a time in a single pass, without measuring
+// it first.
+static inline char *rc_copy_string(char *__restrict dst,
+                                   const char *__restrict src,
+                                   size_t n)
+{
+    uint8_t *d = (uint8_t *)dst;
+    const uint8_t *s = (const uint8_t *)src;
+
+#if defined(__RLIBC_WORD_AT_A_TIME)
+    // Copy single bytes until src is aligned to a pair of words. Aligned pairs
+    // of words never cross a page boundary, so they can be loaded in full even
+    // if the terminator lies within the first.
+    for (; n > 0 && ((uintptr_t)s & (2 * __RC_WORD_BYTES - 1)) != 0; --n) {
+        if ((*d++ = *s++) == '\0') {
+            return (char *)d - 1;
+        }
+    }
+
+#if defined(__RLIBC_UNALIGNED_ACCESS)
+    const bool words = true;
+#else
+    const bool words = __rc_word_aligned(d);
+#endif  // defined(__RLIBC_UNALIGNED_ACCESS)
+
+    // Copy pairs of words until one contains the terminator, which is left
+    // for the bytewise copy below.
+    if (words) {
+        for (; n >= 2 * __RC_WORD_BYTES; n -= 2 * __RC_WORD_BYTES) {
+            __rc_word_t lo = __rc_word_load(s);
+            __rc_word_t hi = __rc_word_load(s + __RC_WORD_BYTES);
+            if (__rc_word_has_zero(lo) | __rc_word_has_zero(hi)) {
+                break;
+            }
+            __rc_word_store_unaligned(d, lo);
+            __rc_word_store_unaligned(d + __RC_WORD_BYTES, hi);
+            s += 2 * __RC_WORD_BYTES;
+            d += 2 * __RC_WORD_BYTES;
+        }
+    }
+#endif  // defined(__RLIBC_WORD_AT_A_TIME)
+
+    for (; n > 0; --n) {
+        if ((*d++ = *s++) == '\0') {
+            return (char *)d - 1;
+        }
+    }
+
+    return (char *)d;
+}
+
+#ifdef __cplusplus
+}
+#endif  // __cplusplus
+
+#endif  // RLIBC_STRING_COPY_H
@@ -0,0 +1,21 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/memory.h>
+#include <rlibc/profile.h>
+
+#include <string.h>
+
+void *memccpy(void *__restrict dst, const void *__restrict src, int c, size_t n)
+{
+    __RC_PROFILE(RC_PROFILE_MEMCCPY);
+    __RC_PROFILE_SIZE(n);
+
+    const uint8_t *found = __rc_scan_byte(src, c, n);
+    size_t len = found != NULL ? (size_t)(found - (const uint8_t *)src) + 1 : n;
+
+    __rc_copy_bytes_fwd(dst, src, len);
+    return found != NULL ? (uint8_t *)dst + len : NULL;
+}
@@ -4,10 +4,14 @@
 // that can be found in the LICENSE file in the repository root.
 
 #include <rlibc/memory.h>
+#include <rlibc/profile.h>
 
 #include <string.h>
 
 void *memchr(const void *s, int c, size_t n)
 {
+    __RC_PROFILE(RC_PROFILE_MEMCHR);
+    __RC_PROFILE_SIZE(n);
+
     return (void *)__rc_scan_byte(s, c, n);
 }
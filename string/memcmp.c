@@ -3,23 +3,19 @@
 // Use of this source code is governed by an MIT-style license
 // that can be found in the LICENSE file in the repository root.
 
+#include <rlibc/memory.h>
+#include <rlibc/profile.h>
+
 #include <string.h>
-#include <stdint.h>
 
 int memcmp(const void *s1, const void *s2, size_t n)
 {
+    __RC_PROFILE(RC_PROFILE_MEMCMP);
+    __RC_PROFILE_SIZE(n);
+
     const uint8_t *s = s1;
     const uint8_t *t = s2;
 
-    while (n > 0) {
-        if (*s != *t) {
-            return *s - *t;
-        }
-
-        --n;
-        ++s;
-        ++t;
-    }
-
-    return 0;
+    size_t i = __rc_mismatch(s, t, n);
+    return i < n ? s[i] - t[i] : 0;
 }
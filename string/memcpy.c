@@ -4,11 +4,22 @@
 // that can be found in the LICENSE file in the repository root.
 
 #include <rlibc/memory.h>
+#include <rlibc/profile.h>
 
 #include <string.h>
 
 void *memcpy(void *restrict dst, const void *restrict src, size_t n)
 {
+    __RC_PROFILE(RC_PROFILE_MEMCPY);
+    __RC_PROFILE_SIZE(n);
+
+#if defined(__RLIBC_STREAM)
+    if (n >= __rc_stream_threshold) {
+        __rc_stream_copy_bytes(dst, src, n);
+        return dst;
+    }
+#endif  // defined(__RLIBC_STREAM)
+
     __rc_copy_bytes_fwd(dst, src, n);
     return dst;
 }
@@ -0,0 +1,118 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/memory.h>
+#include <rlibc/profile.h>
+
+#include <string.h>
+
+#include "search.h"
+
+// Number of bytes which may be spent verifying candidate matches, beyond twice
+// the distance searched, before switching to the Two-Way algorithm.
+#define VERIFY_ALLOWANCE 1024
+
+#if defined(__RLIBC_WORD_AT_A_TIME) && defined(__RLIBC_UNALIGNED_ACCESS)
+
+#define STRIDE (2 * __RC_WORD_BYTES)
+
+// Returns nonzero if any of the word's worth of positions starting at p has
+// both the first and the last byte of the needle, which are repeated in every
+// byte of `first` and `last`.
+static inline __rc_word_t candidates(const uint8_t *p,
+                                     size_t needle_len,
+                                     __rc_word_t first,
+                                     __rc_word_t last)
+{
+    return __rc_word_has_zero(__rc_word_load_unaligned(p) ^ first) &
+           __rc_word_has_zero(
+               __rc_word_load_unaligned(p + needle_len - 1) ^ last);
+}
+
+#endif  // defined(__RLIBC_WORD_AT_A_TIME) && ...
+
+void *memmem(const void *haystack,
+             size_t haystack_len,
+             const void *needle,
+             size_t needle_len)
+{
+    __RC_PROFILE(RC_PROFILE_MEMMEM);
+    __RC_PROFILE_SIZE(haystack_len);
+
+    const uint8_t *h = haystack;
+    const uint8_t *n = needle;
+
+    if (needle_len == 0) {
+        return (void *)haystack;
+    }
+    if (needle_len > haystack_len) {
+        return NULL;
+    }
+
+    // Skip directly to the first possible start of a match. For single-byte
+    // needles, that is the match.
+    const uint8_t *p = __rc_scan_byte(h, n[0], haystack_len - needle_len + 1);
+    if (p == NULL || needle_len == 1) {
+        return (void *)p;
+    }
+
+    // Most positions in a typical haystack can be ruled out by checking only
+    // the first and last bytes of the needle, which is done a word at a time
+    // where possible. The remaining candidates are compared in full. This is
+    // quadratic in the worst case, so if too much time is spent on candidates
+    // which fail to match, the rest of the haystack is handed to the Two-Way
+    // algorithm, whose running time is linear.
+    const uint8_t *const start = p;
+    const uint8_t *const end = h + haystack_len;
+    const uint8_t *const limit = end - needle_len + 1;
+    size_t verified = 0;
+
+#if defined(__RLIBC_WORD_AT_A_TIME) && defined(__RLIBC_UNALIGNED_ACCESS)
+    const __rc_word_t first = __rc_word_repeat(n[0]);
+    const __rc_word_t last = __rc_word_repeat(n[needle_len - 1]);
+
+    // Two words are checked per iteration, to overlap their computations.
+    for (; (size_t)(limit - p) >= STRIDE; p += STRIDE) {
+        if ((candidates(p, needle_len, first, last) |
+             candidates(p + __RC_WORD_BYTES, needle_len, first, last)) == 0) {
+            continue;
+        }
+
+        for (size_t i = 0; i < STRIDE; ++i) {
+            if (p[i] != n[0] || p[i + needle_len - 1] != n[needle_len - 1]) {
+                continue;
+            }
+            if (rc_memeq(p + i + 1, n + 1, needle_len - 2)) {
+                return (void *)(p + i);
+            }
+            verified += needle_len;
+        }
+
+        if (verified > 2 * (size_t)(p - start) + VERIFY_ALLOWANCE) {
+            return (void *)rc_two_way_search(p, end - p, n, needle_len);
+        }
+    }
+#endif  // defined(__RLIBC_WORD_AT_A_TIME) && ...
+
+    while (p < limit) {
+        p = __rc_scan_byte(p, n[0], limit - p);
+        if (p == NULL) {
+            return NULL;
+        }
+        if (p[needle_len - 1] == n[needle_len - 1]) {
+            if (rc_memeq(p + 1, n + 1, needle_len - 2)) {
+                return (void *)p;
+            }
+            verified += needle_len;
+        }
+
+        if (verified > 2 * (size_t)(p - start) + VERIFY_ALLOWANCE) {
+            return (void *)rc_two_way_search(p, end - p, n, needle_len);
+        }
+        ++p;
+    }
+
+    return NULL;
+}
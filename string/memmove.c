@@ -4,11 +4,15 @@
 // that can be found in the LICENSE file in the repository root.
 
 #include <rlibc/memory.h>
+#include <rlibc/profile.h>
 
 #include <string.h>
 
 void *memmove(void *dst, const void *src, size_t n)
 {
+    __RC_PROFILE(RC_PROFILE_MEMMOVE);
+    __RC_PROFILE_SIZE(n);
+
     if (dst > src && (uintptr_t)dst < (uintptr_t)src + n) {
         // If the memory regions overlap, and dst is higher, the bytes must be
         // copied backwards to avoid clobbering data.
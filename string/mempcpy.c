@@ -0,0 +1,25 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/memory.h>
+#include <rlibc/profile.h>
+
+#include <string.h>
+
+void *mempcpy(void *__restrict dst, const void *__restrict src, size_t n)
+{
+    __RC_PROFILE(RC_PROFILE_MEMPCPY);
+    __RC_PROFILE_SIZE(n);
+
+#if defined(__RLIBC_STREAM)
+    if (n >= __rc_stream_threshold) {
+        __rc_stream_copy_bytes(dst, src, n);
+        return (uint8_t *)dst + n;
+    }
+#endif  // defined(__RLIBC_STREAM)
+
+    __rc_copy_bytes_fwd(dst, src, n);
+    return (uint8_t *)dst + n;
+}
@@ -0,0 +1,21 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/memory.h>
+
+#include <string.h>
+
+#if defined(__RLIBC_PAGE_SIZE)
+
+void rc_copy_page(void *__restrict dst, const void *__restrict src)
+{
+#if defined(__RLIBC_STREAM)
+    __rc_stream_copy_bytes(dst, src, __RLIBC_PAGE_SIZE);
+#else
+    __rc_copy_bytes_fwd(dst, src, __RLIBC_PAGE_SIZE);
+#endif  // defined(__RLIBC_STREAM)
+}
+
+#endif  // defined(__RLIBC_PAGE_SIZE)
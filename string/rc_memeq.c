@@ -0,0 +1,34 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/memory.h>
+
+#include <string.h>
+
+int rc_memeq(const void *s1, const void *s2, size_t n)
+{
+    const uint8_t *s = s1;
+    const uint8_t *t = s2;
+
+#if defined(__RLIBC_WORD_AT_A_TIME) && defined(__RLIBC_UNALIGNED_ACCESS)
+    // As no ordering has to be determined, the differences of several words
+    // can be combined and tested with a single branch.
+    for (; n >= 4 * __RC_WORD_BYTES; n -= 4 * __RC_WORD_BYTES) {
+        __rc_word_t diff = 0;
+        for (size_t i = 0; i < 4 * __RC_WORD_BYTES; i += __RC_WORD_BYTES) {
+            diff |= __rc_word_load_unaligned(s + i) ^
+                    __rc_word_load_unaligned(t + i);
+        }
+        if (diff != 0) {
+            return 0;
+        }
+
+        s += 4 * __RC_WORD_BYTES;
+        t += 4 * __RC_WORD_BYTES;
+    }
+#endif  // defined(__RLIBC_WORD_AT_A_TIME) && defined(__RLIBC_UNALIGNED_ACCESS)
+
+    return __rc_mismatch(s, t, n) == n;
+}
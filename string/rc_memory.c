@@ -0,0 +1,47 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/memory.h>
+
+#include <stdint.h>
+#include <string.h>
+
+#if defined(__RLIBC_STREAM)
+
+size_t __rc_stream_threshold = __RC_STREAM_DEFAULT_THRESHOLD;
+
+size_t rc_memory_set_stream_threshold(size_t threshold)
+{
+    const size_t previous = __rc_stream_threshold;
+    __rc_stream_threshold = threshold;
+    return previous;
+}
+
+#else
+
+size_t rc_memory_set_stream_threshold(size_t threshold)
+{
+    (void)threshold;
+    return SIZE_MAX;
+}
+
+#endif  // defined(__RLIBC_STREAM)
+
+// Targets which dispatch at runtime provide these functions themselves.
+#if !defined(__RLIBC_DISPATCH)
+
+void rc_memory_init(void) {}
+
+const char *rc_memory_variant(void)
+{
+    return __RLIBC_MEMORY_VARIANT;
+}
+
+int rc_memory_select(const char *variant)
+{
+    return strcmp(variant, __RLIBC_MEMORY_VARIANT) == 0 ? 0 : -1;
+}
+
+#endif  // !defined(__RLIBC_DISPATCH)
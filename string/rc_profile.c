@@ -0,0 +1,53 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/profile.h>
+
+#if defined(__RLIBC_PROFILE)
+
+#define COUNTER(function, function_name) [function] = {.name = function_name}
+
+// Store the counters in a table which can be read by external programs.
+__RC_SECTION(".rlibc_profile")
+struct rc_profile_counter __rlibc_profile_counters[RC_PROFILE_COUNT] = {
+    COUNTER(RC_PROFILE_MEMCPY, "memcpy"),
+    COUNTER(RC_PROFILE_MEMPCPY, "mempcpy"),
+    COUNTER(RC_PROFILE_MEMMOVE, "memmove"),
+    COUNTER(RC_PROFILE_MEMSET, "memset"),
+    COUNTER(RC_PROFILE_MEMCMP, "memcmp"),
+    COUNTER(RC_PROFILE_MEMCHR, "memchr"),
+    COUNTER(RC_PROFILE_MEMCCPY, "memccpy"),
+    COUNTER(RC_PROFILE_MEMMEM, "memmem"),
+    COUNTER(RC_PROFILE_STRLEN, "strlen"),
+    COUNTER(RC_PROFILE_STRNLEN, "strnlen"),
+    COUNTER(RC_PROFILE_STRCMP, "strcmp"),
+    COUNTER(RC_PROFILE_STRNCMP, "strncmp"),
+    COUNTER(RC_PROFILE_STRCHR, "strchr"),
+    COUNTER(RC_PROFILE_STRRCHR, "strrchr"),
+    COUNTER(RC_PROFILE_STRSTR, "strstr"),
+    COUNTER(RC_PROFILE_STRCPY, "strcpy"),
+    COUNTER(RC_PROFILE_STPCPY, "stpcpy"),
+    COUNTER(RC_PROFILE_STRNCPY, "strncpy"),
+    COUNTER(RC_PROFILE_STPNCPY, "stpncpy"),
+    COUNTER(RC_PROFILE_STRCAT, "strcat"),
+    COUNTER(RC_PROFILE_STRNCAT, "strncat"),
+    COUNTER(RC_PROFILE_STRLCPY, "strlcpy"),
+    COUNTER(RC_PROFILE_STRLCAT, "strlcat"),
+    COUNTER(RC_PROFILE_PRINTF, "printf"),
+    COUNTER(RC_PROFILE_PRINTF_COMPILED, "printf_compiled"),
+};
+
+const size_t __rlibc_profile_counters_size = RC_PROFILE_COUNT;
+
+// Whether the counters include cycles.
+#if defined(__RLIBC_PROFILE_CYCLES)
+const int __rlibc_profile_cycles = 1;
+#else
+const int __rlibc_profile_cycles = 0;
+#endif  // defined(__RLIBC_PROFILE_CYCLES)
+
+__thread unsigned int __rlibc_profile_depth = 0;
+
+#endif  // defined(__RLIBC_PROFILE)
@@ -0,0 +1,146 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+// The Two-Way string matching algorithm of Crochemore and Perrin.
+//
+// The needle is split at a critical position into a left and a right half.
+// At each alignment, the right half is compared forwards and then the left
+// half backwards. On a mismatch in the right half, the needle shifts past the
+// mismatched position; on a mismatch in the left half, it shifts by the
+// needle's period. The split guarantees that neither shift skips a match, and
+// that no haystack byte is compared more than twice.
+//
+// Before comparing each alignment, the haystack byte under the end of the
+// needle is looked up in a table of shifts (the Boyer-Moore bad character
+// rule), which skips most alignments in typical text without comparing them.
+
+#include <rlibc/memory.h>
+#include <rlibc/util.h>
+
+#include <stdbool.h>
+#include <string.h>
+
+#include "search.h"
+
+// Returns the start of the lexicographically maximal suffix of the needle,
+// comparing bytes in reverse order if `reverse` is set. The period of the
+// suffix is stored in `period`.
+static size_t maximal_suffix(const uint8_t *needle,
+                             size_t len,
+                             bool reverse,
+                             size_t *period)
+{
+    size_t suffix = 0;
+    size_t candidate = 1;
+    size_t offset = 0;
+    size_t p = 1;
+
+    while (candidate + offset < len) {
+        uint8_t a = needle[suffix + offset];
+        uint8_t b = needle[candidate + offset];
+
+        if (a == b) {
+            // Skip over a whole period at once once it has matched.
+            if (offset + 1 == p) {
+                candidate += p;
+                offset = 0;
+            } else {
+                ++offset;
+            }
+        } else if (reverse ? a < b : a > b) {
+            // The candidate is smaller; the current suffix remains the
+            // maximum, with a period reaching past the mismatch.
+            candidate += offset + 1;
+            offset = 0;
+            p = candidate - suffix;
+        } else {
+            // The candidate is larger, and becomes the new maximal suffix.
+            suffix = candidate;
+            candidate = suffix + 1;
+            offset = 0;
+            p = 1;
+        }
+    }
+
+    *period = p;
+    return suffix;
+}
+
+const uint8_t *rc_two_way_search(const uint8_t *haystack,
+                                 size_t haystack_len,
+                                 const uint8_t *needle,
+                                 size_t needle_len)
+{
+    const uint8_t *end = haystack + haystack_len;
+    const size_t len = needle_len;
+
+    // The distance from the last occurrence of each byte within the needle
+    // to the needle's end, or the needle's length for absent bytes. Distances
+    // are capped to fit in a byte; shifting by less than the full distance is
+    // always safe, so this only costs a few extra steps for long needles.
+    uint8_t shift[256];
+    __rc_set_bytes(shift, min(len, (size_t)255), sizeof shift);
+    for (size_t i = 0; i < len; ++i) {
+        shift[needle[i]] = min(len - 1 - i, (size_t)255);
+    }
+
+    // The critical position is the later of the two maximal suffixes.
+    size_t period;
+    size_t reverse_period;
+    size_t split = maximal_suffix(needle, len, false, &period);
+    size_t reverse_split = maximal_suffix(needle, len, true, &reverse_period);
+    if (reverse_split > split) {
+        split = reverse_split;
+        period = reverse_period;
+    }
+
+    // If the left half is repeated one period later, the needle is periodic:
+    // after a mismatch in the left half, the needle shifts by its period and
+    // the bytes which overlap the previous alignment are known to match.
+    // Otherwise, the needle can be shifted by more than either half.
+    size_t remembered;
+    if (rc_memeq(needle, needle + period, split)) {
+        remembered = len - period;
+    } else {
+        period = max(split, len - split) + 1;
+        remembered = 0;
+    }
+
+    // Number of bytes at the start of the current alignment which are known
+    // to match.
+    size_t memory = 0;
+
+    while ((size_t)(end - haystack) >= len) {
+        size_t skip = shift[haystack[len - 1]];
+        if (skip != 0) {
+            haystack += max(skip, memory);
+            memory = 0;
+            continue;
+        }
+
+        size_t i = max(split, memory);
+        while (i < len && needle[i] == haystack[i]) {
+            ++i;
+        }
+        if (i < len) {
+            haystack += i - split + 1;
+            memory = 0;
+            continue;
+        }
+
+        i = split;
+        while (i > memory && needle[i - 1] == haystack[i - 1]) {
+            --i;
+        }
+        if (i <= memory) {
+            return haystack;
+        }
+
+        haystack += period;
+        memory = remembered;
+    }
+
+    return NULL;
+}
@@ -0,0 +1,31 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_STRING_SEARCH_H
+#define RLIBC_STRING_SEARCH_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif  // __cplusplus
+
+// Returns the first occurrence of the needle within the haystack, or NULL if
+// there is none. The needle must be at least two bytes long, and no longer
+// than the haystack.
+//
+// Uses the Two-Way algorithm, which runs in time linear in the length of the
+// haystack with constant extra space, regardless of the contents of either.
+const uint8_t *rc_two_way_search(const uint8_t *haystack,
+                                 size_t haystack_len,
+                                 const uint8_t *needle,
+                                 size_t needle_len);
+
+#ifdef __cplusplus
+}
+#endif  // __cplusplus
+
+#endif  // RLIBC_STRING_SEARCH_H
@@ -0,0 +1,20 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/profile.h>
+
+#include <stdint.h>
+#include <string.h>
+
+#include "copy.h"
+
+char *stpcpy(char *__restrict dst, const char *__restrict src)
+{
+    __RC_PROFILE(RC_PROFILE_STPCPY);
+
+    char *end = rc_copy_string(dst, src, SIZE_MAX);
+    __RC_PROFILE_SIZE(end - dst);
+    return end;
+}
@@ -0,0 +1,21 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/profile.h>
+
+#include <stdint.h>
+#include <string.h>
+
+#include "copy.h"
+
+char *strcat(char *__restrict dst, const char *__restrict src)
+{
+    __RC_PROFILE(RC_PROFILE_STRCAT);
+
+    char *start = dst + strlen(dst);
+    char *end = rc_copy_string(start, src, SIZE_MAX);
+    __RC_PROFILE_SIZE(end - start);
+    return dst;
+}
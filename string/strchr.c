@@ -0,0 +1,38 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/memory.h>
+#include <rlibc/profile.h>
+#include <rlibc/util.h>
+
+#include <string.h>
+
+// Scanning for c alone could run past the terminator, so the string is measured
+// first. This is done in chunks of growing size, so that finding c near the
+// start of a long string does not require measuring all of it.
+#define MIN_CHUNK 64
+#define MAX_CHUNK 4096
+
+char *strchr(const char *s, int c)
+{
+    __RC_PROFILE(RC_PROFILE_STRCHR);
+
+    size_t chunk = MIN_CHUNK;
+
+    for (;;) {
+        size_t len = strnlen(s, chunk);
+
+        // Including the terminator in the search allows it to be found when c
+        // is '\0'.
+        const uint8_t *match = __rc_scan_byte(
+            (const uint8_t *)s, c, len < chunk ? len + 1 : len);
+        if (match != NULL || len < chunk) {
+            return (char *)match;
+        }
+
+        s += chunk;
+        chunk = min(chunk * 2, (size_t)MAX_CHUNK);
+    }
+}
@@ -3,15 +3,25 @@
 // Use of this source code is governed by an MIT-style license
 // that can be found in the LICENSE file in the repository root.
 
+#include <rlibc/memory.h>
+#include <rlibc/profile.h>
+
+#include <stdint.h>
 #include <string.h>
 
 int strcmp(const char *s1, const char *s2)
 {
-    for (; *s1 == *s2; ++s1, ++s2) {
-        if (*s1 == '\0') {
+    __RC_PROFILE(RC_PROFILE_STRCMP);
+
+    const uint8_t *s = (const uint8_t *)s1;
+    const uint8_t *t = (const uint8_t *)s2;
+
+    size_t i = __rc_string_prefix(s, t, SIZE_MAX);
+    for (; s[i] == t[i]; ++i) {
+        if (s[i] == '\0') {
             return 0;
         }
     }
 
-    return *s1 < *s2 ? -1 : 1;
+    return s[i] < t[i] ? -1 : 1;
 }
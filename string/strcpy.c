@@ -1,15 +1,20 @@
 // Copyright 2022 Alexei Frolov
 //
-// Use of this source code is governed by an MIT - style license
+// Use of this source code is governed by an MIT-style license
 // that can be found in the LICENSE file in the repository root.
 
+#include <rlibc/profile.h>
+
+#include <stdint.h>
 #include <string.h>
 
+#include "copy.h"
+
 char *strcpy(char *__restrict dst, const char *__restrict src)
 {
-    char *start = dst;
-
-    while ((*dst++ = *src++)) {}
+    __RC_PROFILE(RC_PROFILE_STRCPY);
 
-    return start;
+    char *end = rc_copy_string(dst, src, SIZE_MAX);
+    __RC_PROFILE_SIZE(end - dst);
+    return dst;
 }
@@ -55,6 +55,10 @@ __RC_SECTION(".rlibc_errno_table") const
         ERRNO_DESC(ENOSPC, "No space left on device"),
         ERRNO_DESC(ESPIPE, "Illegal seek"),
         ERRNO_DESC(EROFS, "Read-only file system"),
+        ERRNO_DESC(EMLINK, "Too many links"),
+        ERRNO_DESC(EPIPE, "Broken pipe"),
+        ERRNO_DESC(EDOM, "Argument out of domain"),
+        ERRNO_DESC(ERANGE, "Result out of range"),
 };
 
 const size_t __rlibc_errno_descriptors_size =
@@ -0,0 +1,22 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/profile.h>
+
+#include <string.h>
+
+size_t strlcat(char *__restrict dst, const char *__restrict src, size_t n)
+{
+    __RC_PROFILE(RC_PROFILE_STRLCAT);
+
+    // If dst is not terminated within n bytes, there is no space to append
+    // to, and it is left untouched.
+    size_t len = strnlen(dst, n);
+    if (len == n) {
+        return n + strlen(src);
+    }
+
+    return len + strlcpy(dst + len, src, n - len);
+}
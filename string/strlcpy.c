@@ -1,24 +1,30 @@
 // Copyright 2022 Alexei Frolov
 //
-// Use of this source code is governed by an MIT - style license
+// Use of this source code is governed by an MIT-style license
 // that can be found in the LICENSE file in the repository root.
 
+#include <rlibc/profile.h>
+
 #include <string.h>
 
+#include "copy.h"
+
 size_t strlcpy(char *__restrict dst, const char *__restrict src, size_t n)
 {
-    size_t size = 0;
+    __RC_PROFILE(RC_PROFILE_STRLCPY);
 
-    if (n > 0) {
-        for (; size < n - 1 && src[size] != '\0'; ++size) {
-            dst[size] = src[size];
-        }
-        dst[size] = '\0';
+    if (n == 0) {
+        return strlen(src);
     }
 
-    if (src[size] != '\0') {
-        size += strlen(&src[size]);
+    char *end = rc_copy_string(dst, src, n - 1);
+    __RC_PROFILE_SIZE(end - dst);
+    if (end < dst + n - 1) {
+        return end - dst;
     }
 
-    return size;
+    // src did not fit. Terminate the truncated copy, and measure the rest of
+    // src to determine the length which would have been copied.
+    *end = '\0';
+    return n - 1 + strlen(src + n - 1);
 }
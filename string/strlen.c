@@ -4,14 +4,21 @@
 // that can be found in the LICENSE file in the repository root.
 
 #include <rlibc/memory.h>
+#include <rlibc/profile.h>
 
 #include <stdint.h>
 #include <string.h>
 
 size_t strlen(const char *s)
 {
+    __RC_PROFILE(RC_PROFILE_STRLEN);
+
     if (s == NULL) {
         return 0;
     }
-    return (const char *)__rc_scan_byte((const uint8_t *)s, '\0', SIZE_MAX) - s;
+
+    const size_t len =
+        (const char *)__rc_scan_byte((const uint8_t *)s, '\0', SIZE_MAX) - s;
+    __RC_PROFILE_SIZE(len);
+    return len;
 }
@@ -0,0 +1,26 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/profile.h>
+
+#include <string.h>
+
+#include "copy.h"
+
+char *strncat(char *__restrict dst, const char *__restrict src, size_t n)
+{
+    __RC_PROFILE(RC_PROFILE_STRNCAT);
+
+    char *start = dst + strlen(dst);
+
+    // Unlike strncpy(), the result is always terminated.
+    char *end = rc_copy_string(start, src, n);
+    __RC_PROFILE_SIZE(end - start);
+    if (end == start + n) {
+        *end = '\0';
+    }
+
+    return dst;
+}
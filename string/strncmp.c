@@ -3,22 +3,27 @@
 // Use of this source code is governed by an MIT-style license
 // that can be found in the LICENSE file in the repository root.
 
+#include <rlibc/memory.h>
+#include <rlibc/profile.h>
+
+#include <stdint.h>
 #include <string.h>
 
 int strncmp(const char *s1, const char *s2, size_t n)
 {
-    while (n > 0) {
-        if (*s1 != *s2) {
-            return *s1 - *s2;
+    __RC_PROFILE(RC_PROFILE_STRNCMP);
+
+    const uint8_t *s = (const uint8_t *)s1;
+    const uint8_t *t = (const uint8_t *)s2;
+
+    for (size_t i = __rc_string_prefix(s, t, n); i < n; ++i) {
+        if (s[i] != t[i]) {
+            return s[i] - t[i];
         }
 
-        if (*s1 == '\0') {
+        if (s[i] == '\0') {
             return 0;
         }
-
-        --n;
-        ++s1;
-        ++s2;
     }
 
     return 0;
@@ -1,20 +1,21 @@
 // Copyright 2022 Alexei Frolov
 //
-// Use of this source code is governed by an MIT - style license
+// Use of this source code is governed by an MIT-style license
 // that can be found in the LICENSE file in the repository root.
 
+#include <rlibc/memory.h>
+#include <rlibc/profile.h>
+
 #include <string.h>
 
+#include "copy.h"
+
 char *strncpy(char *__restrict dst, const char *__restrict src, size_t n)
 {
-    size_t i = 0;
-
-    for (; i < n && src[i] != '\0'; ++i) {
-        dst[i] = src[i];
-    }
-    for (; i < n; ++i) {
-        dst[i] = '\0';
-    }
+    __RC_PROFILE(RC_PROFILE_STRNCPY);
+    __RC_PROFILE_SIZE(n);
 
+    char *end = rc_copy_string(dst, src, n);
+    __rc_set_bytes((uint8_t *)end, '\0', dst + n - end);
     return dst;
 }
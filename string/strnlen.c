@@ -4,16 +4,21 @@
 // that can be found in the LICENSE file in the repository root.
 
 #include <rlibc/memory.h>
+#include <rlibc/profile.h>
 
 #include <string.h>
 
 size_t strnlen(const char *s, size_t maxlen)
 {
+    __RC_PROFILE(RC_PROFILE_STRNLEN);
+
     if (s == NULL) {
         return 0;
     }
 
     const char *nul =
         (const char *)__rc_scan_byte((const uint8_t *)s, '\0', maxlen);
-    return nul ? (size_t)(nul - s) : maxlen;
+    const size_t len = nul ? (size_t)(nul - s) : maxlen;
+    __RC_PROFILE_SIZE(len);
+    return len;
 }
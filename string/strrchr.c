@@ -0,0 +1,25 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/profile.h>
+
+#include <string.h>
+
+char *strrchr(const char *s, int c)
+{
+    __RC_PROFILE(RC_PROFILE_STRRCHR);
+
+    const char *p = s + strlen(s);
+    __RC_PROFILE_SIZE(p - s);
+
+    for (;; --p) {
+        if (*p == (char)c) {
+            return (char *)p;
+        }
+        if (p == s) {
+            return NULL;
+        }
+    }
+}
@@ -0,0 +1,38 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#include <rlibc/profile.h>
+#include <rlibc/util.h>
+
+#include <string.h>
+
+// The haystack is measured and searched in chunks of growing size, so that a
+// match near the start of a long haystack does not require measuring all of it.
+#define MIN_CHUNK 64
+#define MAX_CHUNK 4096
+
+char *strstr(const char *haystack, const char *needle)
+{
+    __RC_PROFILE(RC_PROFILE_STRSTR);
+
+    size_t needle_len = strlen(needle);
+    size_t chunk = max(2 * needle_len, (size_t)MIN_CHUNK);
+
+    for (;;) {
+        size_t len = strnlen(haystack, chunk);
+
+        char *match = memmem(haystack, len, needle, needle_len);
+        if (match != NULL || len < chunk) {
+            return match;
+        }
+
+        // A match may start within the last needle_len - 1 bytes of the chunk
+        // and continue past it, so the next chunk begins with those bytes.
+        // Each chunk is at least twice the length of the needle, so this
+        // overlap never costs more than half of the work.
+        haystack += chunk - needle_len + 1;
+        chunk = max(min(chunk * 2, (size_t)MAX_CHUNK), 2 * needle_len);
+    }
+}
@@ -0,0 +1,29 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_RLIBC_TARGET_MEMORY_H
+#define RLIBC_RLIBC_TARGET_MEMORY_H
+
+// Portable target which uses the generic implementation of every memory
+// primitive. This serves as a starting point for new ports, and allows the
+// generic code to be tested on the host (`make test-lib TEST_TARGET=generic`).
+
+#include <stdint.h>
+
+#if UINTPTR_MAX == 0xffffffff
+#define __RLIBC_WORDSIZE 32
+#else
+#define __RLIBC_WORDSIZE 64
+#endif  // UINTPTR_MAX == 0xffffffff
+
+#define __RLIBC_MEMORY_VARIANT "generic"
+
+#define __RLIBC_GENERIC_COPY_BYTES_FWD
+#define __RLIBC_GENERIC_COPY_BYTES_BWD
+#define __RLIBC_GENERIC_SET_BYTES
+#define __RLIBC_GENERIC_SCAN_BYTE
+#include <rlibc/memory_generic.h>
+
+#endif  // RLIBC_RLIBC_TARGET_MEMORY_H
@@ -0,0 +1,12 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_RLIBC_TARGET_PAGE_H
+#define RLIBC_RLIBC_TARGET_PAGE_H
+
+// The portable target does not assume a page size, so __RLIBC_PAGE_SIZE is left
+// undefined.
+
+#endif  // RLIBC_RLIBC_TARGET_PAGE_H
@@ -6,38 +6,141 @@
 #ifndef RLIBC_RLIBC_TARGET_MEMORY_H
 #define RLIBC_RLIBC_TARGET_MEMORY_H
 
-#define __RLIBC_WORDSIZE 32
+// The x86 memory primitives are selected at runtime based on the features of
+// the processor (see target/x86/memory.c). Copies and sets call through a table
+// of function pointers, which rc_memory_init() fills in.
+
+#define __RLIBC_WORDSIZE         32
+#define __RLIBC_UNALIGNED_ACCESS 1
+#define __RLIBC_DISPATCH         1
 
-#define __RLIBC_GENERIC_COPY_BYTES_BWD
 #define __RLIBC_GENERIC_SCAN_BYTE
 #include <rlibc/memory_generic.h>
+#include <rlibc/word.h>
+
+#include <stddef.h>
+#include <stdint.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif  // __cplusplus
+
+struct __rc_memory_ops {
+    void (*copy_bytes_fwd)(uint8_t *dst, const uint8_t *src, size_t n);
+    void (*copy_bytes_bwd)(uint8_t *dst, const uint8_t *src, size_t n);
+    void (*set_bytes)(uint8_t *dst, uint8_t c, size_t n);
+};
+
+extern struct __rc_memory_ops __rc_memory_ops;
+
+// Copies and sets of up to __RC_SMALL_BYTES are done inline, where an indirect
+// call would cost more than any implementation saves.
 
 #define __RLIBC_HAS_COPY_BYTES_FWD 1
 static inline void __rc_copy_bytes_fwd(uint8_t *dst,
                                        const uint8_t *src,
                                        size_t n)
 {
-    int a, b, c;
+    if (n <= __RC_SMALL_BYTES) {
+        __rc_copy_small(dst, src, n);
+        return;
+    }
+    __rc_memory_ops.copy_bytes_fwd(dst, src, n);
+}
 
-    if (n > 0) {
-        __asm__ volatile("rep movsb"
-                         : "=&c"(a), "=&D"(b), "=&S"(c)
-                         : "0"(n), "1"(dst), "2"(src)
-                         : "memory");
+#define __RLIBC_HAS_COPY_BYTES_BWD 1
+static inline void __rc_copy_bytes_bwd(uint8_t *dst,
+                                       const uint8_t *src,
+                                       size_t n)
+{
+    if (n <= __RC_SMALL_BYTES) {
+        __rc_copy_small(dst, src, n);
+        return;
     }
+    __rc_memory_ops.copy_bytes_bwd(dst, src, n);
 }
 
 #define __RLIBC_HAS_SET_BYTES 1
 static inline void __rc_set_bytes(uint8_t *dst, uint8_t c, size_t n)
 {
-    int a, b;
+    if (n <= __RC_SMALL_BYTES) {
+        __rc_set_small(dst, c, n);
+        return;
+    }
+    __rc_memory_ops.set_bytes(dst, c, n);
+}
+
+// movnti, which stores a general purpose register without allocating its cache
+// line, was introduced with SSE2. It is used only when building for processors
+// which have it, such as with -msse2 or -march=pentium4.
+#if defined(__SSE2__)
+
+#define __RLIBC_STREAM 1
+
+// Stores a word to a word-aligned address with a non-temporal hint.
+static inline void __rc_stream_word(uint8_t *dst, __rc_word_t w)
+{
+    __asm__("movnti %1, %0" : "=m"(*(__rc_word_alias_t *)dst) : "r"(w));
+}
+
+static inline void __rc_stream_copy_bytes(uint8_t *dst,
+                                          const uint8_t *src,
+                                          size_t n)
+{
+    for (; n > 0 && !__rc_word_aligned(dst); --n) {
+        *dst++ = *src++;
+    }
+
+    for (; n >= 4 * __RC_WORD_BYTES; n -= 4 * __RC_WORD_BYTES) {
+        __rc_word_t w0 = __rc_word_load_unaligned(src);
+        __rc_word_t w1 = __rc_word_load_unaligned(src + __RC_WORD_BYTES);
+        __rc_word_t w2 = __rc_word_load_unaligned(src + 2 * __RC_WORD_BYTES);
+        __rc_word_t w3 = __rc_word_load_unaligned(src + 3 * __RC_WORD_BYTES);
+        __rc_stream_word(dst, w0);
+        __rc_stream_word(dst + __RC_WORD_BYTES, w1);
+        __rc_stream_word(dst + 2 * __RC_WORD_BYTES, w2);
+        __rc_stream_word(dst + 3 * __RC_WORD_BYTES, w3);
+        dst += 4 * __RC_WORD_BYTES;
+        src += 4 * __RC_WORD_BYTES;
+    }
+
+    for (; n >= __RC_WORD_BYTES; n -= __RC_WORD_BYTES) {
+        __rc_stream_word(dst, __rc_word_load_unaligned(src));
+        dst += __RC_WORD_BYTES;
+        src += __RC_WORD_BYTES;
+    }
+
+    // Order the non-temporal stores before any which follow the copy.
+    __asm__ volatile("sfence" : : : "memory");
 
-    if (n > 0) {
-        __asm__ volatile("rep stosb"
-                         : "=&c"(a), "=&D"(b)
-                         : "a"(c), "1"(dst), "0"(n)
-                         : "memory");
+    for (; n > 0; --n) {
+        *dst++ = *src++;
     }
 }
 
+static inline void __rc_stream_set_bytes(uint8_t *dst, uint8_t c, size_t n)
+{
+    for (; n > 0 && !__rc_word_aligned(dst); --n) {
+        *dst++ = c;
+    }
+
+    const __rc_word_t w = __rc_word_repeat(c);
+    for (; n >= __RC_WORD_BYTES; n -= __RC_WORD_BYTES) {
+        __rc_stream_word(dst, w);
+        dst += __RC_WORD_BYTES;
+    }
+
+    __asm__ volatile("sfence" : : : "memory");
+
+    for (; n > 0; --n) {
+        *dst++ = c;
+    }
+}
+
+#endif  // defined(__SSE2__)
+
+#ifdef __cplusplus
+}
+#endif  // __cplusplus
+
 #endif  // RLIBC_RLIBC_TARGET_MEMORY_H
@@ -0,0 +1,201 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+// Runtime selection of the x86 memory primitives.
+//
+// Two variants of the primitives are built into the library. On startup, crt0
+// calls rc_memory_init(), which probes the processor with CPUID and installs
+// the fastest supported variant into __rc_memory_ops. libk has no crt0, so the
+// kernel must call rc_memory_init() itself.
+
+#include <rlibc/memory.h>
+
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+
+// CPUID feature bits.
+#define CPUID_7_EBX_ERMS (1u << 9)
+
+#define FEATURE_ERMS (1u << 0)
+
+static void cpuid(uint32_t leaf, uint32_t subleaf, uint32_t regs[4])
+{
+    __asm__("cpuid"
+            : "=a"(regs[0]), "=b"(regs[1]), "=c"(regs[2]), "=d"(regs[3])
+            : "a"(leaf), "c"(subleaf));
+}
+
+// Returns the FEATURE_* flags supported by the running processor. Every
+// processor supported by the i686 target implements CPUID.
+static unsigned cpu_features(void)
+{
+    uint32_t regs[4];
+    unsigned features = 0;
+
+    cpuid(0, 0, regs);
+    if (regs[0] < 7) {
+        return features;
+    }
+
+    cpuid(7, 0, regs);
+    if (regs[1] & CPUID_7_EBX_ERMS) {
+        features |= FEATURE_ERMS;
+    }
+
+    return features;
+}
+
+//
+// Word variant: aligned word stores, for processors on which `rep movsb` and
+// `rep stosb` move a few bytes per cycle at best.
+//
+
+static void word_copy_bytes_bwd(uint8_t *dst, const uint8_t *src, size_t n)
+{
+    // A descending `rep movsb` (with the direction flag set) is not optimized
+    // by any x86 processor and runs at around one byte per cycle. Instead, copy
+    // words from the end of the buffers, four per iteration.
+    //
+    // Every word is loaded before any part of it is stored, so this is safe
+    // for any overlap with dst > src. Only the destination is aligned, as x86
+    // allows unaligned loads.
+    for (; n > 0 && !__rc_word_aligned(dst + n); --n) {
+        dst[n - 1] = src[n - 1];
+    }
+
+    while (n >= 4 * __RC_WORD_BYTES) {
+        n -= 4 * __RC_WORD_BYTES;
+        const uint8_t *s = src + n;
+        uint8_t *d = dst + n;
+
+        __rc_word_t w3 = __rc_word_load_unaligned(s + 3 * __RC_WORD_BYTES);
+        __rc_word_t w2 = __rc_word_load_unaligned(s + 2 * __RC_WORD_BYTES);
+        __rc_word_t w1 = __rc_word_load_unaligned(s + __RC_WORD_BYTES);
+        __rc_word_t w0 = __rc_word_load_unaligned(s);
+        __rc_word_store(d + 3 * __RC_WORD_BYTES, w3);
+        __rc_word_store(d + 2 * __RC_WORD_BYTES, w2);
+        __rc_word_store(d + __RC_WORD_BYTES, w1);
+        __rc_word_store(d, w0);
+    }
+
+    while (n >= __RC_WORD_BYTES) {
+        n -= __RC_WORD_BYTES;
+        __rc_word_store(dst + n, __rc_word_load_unaligned(src + n));
+    }
+
+    for (; n > 0; --n) {
+        dst[n - 1] = src[n - 1];
+    }
+}
+
+//
+// ERMS variant: `rep movsb` and `rep stosb`, which processors with Enhanced
+// REP MOVSB/STOSB run in large internal chunks. Backward copies use words.
+//
+// The instructions take tens of cycles to start up. A loop of words keeps up
+// with `rep movsb` for longer than with `rep stosb`: copies below
+// ERMS_MIN_BYTES use words, while sets reaching this variant are already past
+// the crossover. The threshold is half of the one measured on x86_64 by
+// bench/small_copy_bench.py, to account for 32-bit words.
+//
+
+#define ERMS_MIN_BYTES 256
+
+static void erms_copy_bytes_fwd(uint8_t *dst, const uint8_t *src, size_t n)
+{
+    if (n < ERMS_MIN_BYTES) {
+        __rc_copy_words_fwd(dst, src, n);
+        return;
+    }
+    __asm__ volatile("rep movsb"
+                     : "+c"(n), "+D"(dst), "+S"(src)
+                     :
+                     : "memory");
+}
+
+static void erms_set_bytes(uint8_t *dst, uint8_t c, size_t n)
+{
+    __asm__ volatile("rep stosb" : "+c"(n), "+D"(dst) : "a"(c) : "memory");
+}
+
+struct variant {
+    const char *name;
+    unsigned features;
+    struct __rc_memory_ops ops;
+};
+
+// Available variants, ordered from slowest to fastest.
+static const struct variant variants[] = {
+    {
+        .name = "word",
+        .features = 0,
+        .ops = {__rc_generic_copy_bytes_fwd,
+                word_copy_bytes_bwd,
+                __rc_generic_set_bytes},
+    },
+    {
+        .name = "erms",
+        .features = FEATURE_ERMS,
+        .ops = {erms_copy_bytes_fwd,
+                word_copy_bytes_bwd,
+                erms_set_bytes},
+    },
+};
+
+#define NUM_VARIANTS (sizeof variants / sizeof *variants)
+
+// Until rc_memory_init() runs, words are used, as every processor runs them
+// at a reasonable speed.
+static const struct variant *current_variant = &variants[0];
+
+struct __rc_memory_ops __rc_memory_ops = {
+    __rc_generic_copy_bytes_fwd,
+    word_copy_bytes_bwd,
+    __rc_generic_set_bytes,
+};
+
+static void install_variant(const struct variant *variant)
+{
+    __rc_memory_ops = variant->ops;
+    current_variant = variant;
+}
+
+void rc_memory_init(void)
+{
+    const unsigned features = cpu_features();
+
+    for (size_t i = NUM_VARIANTS; i > 0; --i) {
+        const struct variant *variant = &variants[i - 1];
+        if ((variant->features & features) == variant->features) {
+            install_variant(variant);
+            return;
+        }
+    }
+}
+
+const char *rc_memory_variant(void)
+{
+    return current_variant->name;
+}
+
+int rc_memory_select(const char *name)
+{
+    const unsigned features = cpu_features();
+
+    for (size_t i = 0; i < NUM_VARIANTS; ++i) {
+        const struct variant *variant = &variants[i];
+        if (strcmp(variant->name, name) != 0) {
+            continue;
+        }
+        if ((variant->features & features) != variant->features) {
+            return -1;
+        }
+        install_variant(variant);
+        return 0;
+    }
+
+    return -1;
+}
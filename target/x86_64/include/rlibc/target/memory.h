@@ -0,0 +1,92 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+#ifndef RLIBC_RLIBC_TARGET_MEMORY_H
+#define RLIBC_RLIBC_TARGET_MEMORY_H
+
+// The x86_64 memory primitives are selected at runtime based on the features
+// of the processor (see target/x86_64/memory.c). Each primitive calls through
+// a table of function pointers, which rc_memory_init() fills in.
+
+#define __RLIBC_WORDSIZE         64
+#define __RLIBC_UNALIGNED_ACCESS 1
+#define __RLIBC_DISPATCH         1
+
+#include <rlibc/memory_generic.h>
+#include <rlibc/word.h>
+
+#include <stddef.h>
+#include <stdint.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif  // __cplusplus
+
+struct __rc_memory_ops {
+    void (*copy_bytes_fwd)(uint8_t *dst, const uint8_t *src, size_t n);
+    void (*copy_bytes_bwd)(uint8_t *dst, const uint8_t *src, size_t n);
+    void (*set_bytes)(uint8_t *dst, uint8_t c, size_t n);
+    const uint8_t *(*scan_byte)(const uint8_t *ptr, uint8_t c, size_t n);
+};
+
+extern struct __rc_memory_ops __rc_memory_ops;
+
+// Copies and sets of up to __RC_SMALL_BYTES are done inline, where an indirect
+// call would cost more than any implementation saves.
+
+#define __RLIBC_HAS_COPY_BYTES_FWD 1
+static inline void __rc_copy_bytes_fwd(uint8_t *dst,
+                                       const uint8_t *src,
+                                       size_t n)
+{
+    if (n <= __RC_SMALL_BYTES) {
+        __rc_copy_small(dst, src, n);
+        return;
+    }
+    __rc_memory_ops.copy_bytes_fwd(dst, src, n);
+}
+
+#define __RLIBC_HAS_COPY_BYTES_BWD 1
+static inline void __rc_copy_bytes_bwd(uint8_t *dst,
+                                       const uint8_t *src,
+                                       size_t n)
+{
+    if (n <= __RC_SMALL_BYTES) {
+        __rc_copy_small(dst, src, n);
+        return;
+    }
+    __rc_memory_ops.copy_bytes_bwd(dst, src, n);
+}
+
+#define __RLIBC_HAS_SET_BYTES 1
+static inline void __rc_set_bytes(uint8_t *dst, uint8_t c, size_t n)
+{
+    if (n <= __RC_SMALL_BYTES) {
+        __rc_set_small(dst, c, n);
+        return;
+    }
+    __rc_memory_ops.set_bytes(dst, c, n);
+}
+
+#define __RLIBC_HAS_SCAN_BYTE 1
+static inline const uint8_t *__rc_scan_byte(const uint8_t *ptr,
+                                            uint8_t c,
+                                            size_t n)
+{
+    return __rc_memory_ops.scan_byte(ptr, c, n);
+}
+
+// Non-temporal stores do not depend on the selected variant: userspace uses
+// SSE2's movntdq, and the kernel, which does not preserve vector registers,
+// movnti.
+#define __RLIBC_STREAM 1
+void __rc_stream_copy_bytes(uint8_t *dst, const uint8_t *src, size_t n);
+void __rc_stream_set_bytes(uint8_t *dst, uint8_t c, size_t n);
+
+#ifdef __cplusplus
+}
+#endif  // __cplusplus
+
+#endif  // RLIBC_RLIBC_TARGET_MEMORY_H
@@ -0,0 +1,479 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+// Runtime selection of the x86_64 memory primitives.
+//
+// Several variants of the primitives are built into the library. On startup,
+// crt0 calls rc_memory_init(), which probes the processor with CPUID and
+// installs the fastest supported variant into __rc_memory_ops. It also sizes
+// the threshold for non-temporal stores to the processor's caches. libk has no
+// crt0, so the kernel must call rc_memory_init() itself.
+
+#include <rlibc/memory.h>
+
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+
+// CPUID feature bits.
+#define CPUID_1_ECX_OSXSAVE (1u << 27)
+#define CPUID_1_ECX_AVX     (1u << 28)
+#define CPUID_7_EBX_AVX2    (1u << 5)
+#define CPUID_7_EBX_ERMS    (1u << 9)
+
+// XCR0 bits indicating that the OS saves SSE and AVX register state.
+#define XCR0_SSE_AVX 0x6
+
+// Cache types reported by CPUID leaves 4 and 0x8000001d.
+#define CPUID_CACHE_NONE        0
+#define CPUID_CACHE_INSTRUCTION 2
+
+#define FEATURE_ERMS (1u << 0)
+#define FEATURE_SSE2 (1u << 1)
+#define FEATURE_AVX2 (1u << 2)
+
+static void cpuid(uint32_t leaf, uint32_t subleaf, uint32_t regs[4])
+{
+    __asm__("cpuid"
+            : "=a"(regs[0]), "=b"(regs[1]), "=c"(regs[2]), "=d"(regs[3])
+            : "a"(leaf), "c"(subleaf));
+}
+
+// Returns the FEATURE_* flags supported by the running processor.
+static unsigned cpu_features(void)
+{
+    uint32_t regs[4];
+    unsigned features = 0;
+
+#if !defined(__radix_kernel__)
+    // SSE2 is part of the x86_64 baseline. The kernel does not preserve vector
+    // registers, so it never uses them.
+    features |= FEATURE_SSE2;
+#endif  // !defined(__radix_kernel__)
+
+    cpuid(0, 0, regs);
+    const uint32_t max_leaf = regs[0];
+    if (max_leaf < 7) {
+        return features;
+    }
+
+    cpuid(1, 0, regs);
+    const uint32_t ecx1 = regs[2];
+    cpuid(7, 0, regs);
+    const uint32_t ebx7 = regs[1];
+
+    if (ebx7 & CPUID_7_EBX_ERMS) {
+        features |= FEATURE_ERMS;
+    }
+
+#if !defined(__radix_kernel__)
+    // AVX2 additionally requires the OS to have enabled saving of the upper
+    // halves of the vector registers.
+    if ((ecx1 & CPUID_1_ECX_OSXSAVE) && (ecx1 & CPUID_1_ECX_AVX) &&
+        (ebx7 & CPUID_7_EBX_AVX2)) {
+        uint32_t xcr0_lo, xcr0_hi;
+        __asm__("xgetbv" : "=a"(xcr0_lo), "=d"(xcr0_hi) : "c"(0));
+        if ((xcr0_lo & XCR0_SSE_AVX) == XCR0_SSE_AVX) {
+            features |= FEATURE_AVX2;
+        }
+    }
+#else
+    (void)ecx1;
+#endif  // !defined(__radix_kernel__)
+
+    return features;
+}
+
+// Returns the largest share of a data cache available to a single logical
+// processor, as described by the subleaves of a CPUID cache leaf, or 0 if none
+// are reported. Intel processors describe their caches in leaf 4, and AMD ones
+// in leaf 0x8000001d, using the same format.
+static size_t cache_share_from_leaf(uint32_t leaf)
+{
+    uint32_t regs[4];
+    size_t largest = 0;
+
+    for (uint32_t i = 0; i < 16; ++i) {
+        cpuid(leaf, i, regs);
+
+        const uint32_t type = regs[0] & 0x1f;
+        if (type == CPUID_CACHE_NONE) {
+            break;
+        }
+        if (type == CPUID_CACHE_INSTRUCTION) {
+            continue;
+        }
+
+        const size_t sharing = ((regs[0] >> 14) & 0xfff) + 1;
+        const size_t ways = (regs[1] >> 22) + 1;
+        const size_t partitions = ((regs[1] >> 12) & 0x3ff) + 1;
+        const size_t line_size = (regs[1] & 0xfff) + 1;
+        const size_t sets = (size_t)regs[2] + 1;
+
+        const size_t share = ways * partitions * line_size * sets / sharing;
+        if (share > largest) {
+            largest = share;
+        }
+    }
+
+    return largest;
+}
+
+// Returns the share of the processor's caches available to each logical
+// processor, in bytes, or 0 if it cannot be determined.
+static size_t cache_share(void)
+{
+    uint32_t regs[4];
+
+    cpuid(0, 0, regs);
+    if (regs[0] >= 4) {
+        const size_t share = cache_share_from_leaf(4);
+        if (share != 0) {
+            return share;
+        }
+    }
+
+    cpuid(0x80000000, 0, regs);
+    if (regs[0] >= 0x8000001d) {
+        return cache_share_from_leaf(0x8000001d);
+    }
+
+    return 0;
+}
+
+//
+// Byte variant: one byte per iteration.
+//
+
+static void byte_copy_bytes_fwd(uint8_t *dst, const uint8_t *src, size_t n)
+{
+    for (size_t i = 0; i < n; ++i) {
+        dst[i] = src[i];
+    }
+}
+
+static void byte_copy_bytes_bwd(uint8_t *dst, const uint8_t *src, size_t n)
+{
+    while (n > 0) {
+        --n;
+        dst[n] = src[n];
+    }
+}
+
+static void byte_set_bytes(uint8_t *dst, uint8_t c, size_t n)
+{
+    for (size_t i = 0; i < n; ++i) {
+        dst[i] = c;
+    }
+}
+
+static const uint8_t *byte_scan_byte(const uint8_t *ptr, uint8_t c, size_t n)
+{
+    for (; n > 0; ++ptr, --n) {
+        if (*ptr == c) {
+            return ptr;
+        }
+    }
+    return NULL;
+}
+
+//
+// ERMS variant: `rep movsb` and `rep stosb`, which processors with Enhanced
+// REP MOVSB/STOSB run in large internal chunks. There is no fast descending
+// equivalent, so backward copies and scans use words.
+//
+// The instructions take tens of cycles to start up. Sets reaching this variant
+// are already longer than the inline small-size path, which is past where
+// `rep stosb` overtakes a loop of words, but copies below ERMS_MIN_BYTES use
+// words instead. The threshold is the crossover measured by
+// bench/small_copy_bench.py.
+//
+
+#define ERMS_MIN_BYTES 512
+
+static void erms_copy_bytes_fwd(uint8_t *dst, const uint8_t *src, size_t n)
+{
+    if (n < ERMS_MIN_BYTES) {
+        __rc_copy_words_fwd(dst, src, n);
+        return;
+    }
+    __asm__ volatile("rep movsb"
+                     : "+c"(n), "+D"(dst), "+S"(src)
+                     :
+                     : "memory");
+}
+
+static void erms_set_bytes(uint8_t *dst, uint8_t c, size_t n)
+{
+    __asm__ volatile("rep stosb" : "+c"(n), "+D"(dst) : "a"(c) : "memory");
+}
+
+//
+// Vector variants.
+//
+
+#if !defined(__radix_kernel__)
+
+#define VECTOR_BYTES       16
+#define VECTOR_NAME(name)  sse2_##name
+#define VECTOR_MOVEMASK(v) __builtin_ia32_pmovmskb128(v)
+#include "memory_vector.h"
+#undef VECTOR_BYTES
+#undef VECTOR_NAME
+#undef VECTOR_MOVEMASK
+
+#pragma GCC push_options
+#pragma GCC target("avx2")
+#define VECTOR_BYTES       32
+#define VECTOR_NAME(name)  avx2_##name
+#define VECTOR_MOVEMASK(v) __builtin_ia32_pmovmskb256(v)
+#include "memory_vector.h"
+#undef VECTOR_BYTES
+#undef VECTOR_NAME
+#undef VECTOR_MOVEMASK
+#pragma GCC pop_options
+
+#endif  // !defined(__radix_kernel__)
+
+//
+// Non-temporal stores, which write whole cache lines to memory through the
+// processor's write-combining buffers without reading them into the cache.
+//
+
+#if !defined(__radix_kernel__)
+
+// SSE2's movntdq, 16 bytes at a time.
+typedef long long stream_t __attribute__((__vector_size__(16)));
+typedef long long stream_unaligned_t
+    __attribute__((__vector_size__(16))) __RC_MAY_ALIAS __RC_ALIGNED(1);
+
+static inline stream_t stream_load(const uint8_t *src)
+{
+    return *(const stream_unaligned_t *)src;
+}
+
+static inline stream_t stream_repeat(uint8_t c)
+{
+    const long long w = (long long)__rc_word_repeat(c);
+    return (stream_t){w, w};
+}
+
+static inline void stream_store(uint8_t *dst, stream_t v)
+{
+    __builtin_ia32_movntdq((stream_t *)dst, v);
+}
+
+#else
+
+// movnti, a word at a time.
+typedef __rc_word_t stream_t;
+
+static inline stream_t stream_load(const uint8_t *src)
+{
+    return __rc_word_load_unaligned(src);
+}
+
+static inline stream_t stream_repeat(uint8_t c)
+{
+    return __rc_word_repeat(c);
+}
+
+static inline void stream_store(uint8_t *dst, stream_t w)
+{
+    __asm__("movnti %1, %0" : "=m"(*(__rc_word_alias_t *)dst) : "r"(w));
+}
+
+#endif  // !defined(__radix_kernel__)
+
+#define STREAM_BYTES sizeof(stream_t)
+
+void __rc_stream_copy_bytes(uint8_t *dst, const uint8_t *src, size_t n)
+{
+    // Non-temporal stores must be aligned to their size.
+    for (; n > 0 && ((uintptr_t)dst & (STREAM_BYTES - 1)) != 0; --n) {
+        *dst++ = *src++;
+    }
+
+    for (; n >= 4 * STREAM_BYTES; n -= 4 * STREAM_BYTES) {
+        stream_t v0 = stream_load(src);
+        stream_t v1 = stream_load(src + STREAM_BYTES);
+        stream_t v2 = stream_load(src + 2 * STREAM_BYTES);
+        stream_t v3 = stream_load(src + 3 * STREAM_BYTES);
+        stream_store(dst, v0);
+        stream_store(dst + STREAM_BYTES, v1);
+        stream_store(dst + 2 * STREAM_BYTES, v2);
+        stream_store(dst + 3 * STREAM_BYTES, v3);
+        dst += 4 * STREAM_BYTES;
+        src += 4 * STREAM_BYTES;
+    }
+
+    for (; n >= STREAM_BYTES; n -= STREAM_BYTES) {
+        stream_store(dst, stream_load(src));
+        dst += STREAM_BYTES;
+        src += STREAM_BYTES;
+    }
+
+    // Order the non-temporal stores before any which follow the copy.
+    __asm__ volatile("sfence" : : : "memory");
+
+    for (; n > 0; --n) {
+        *dst++ = *src++;
+    }
+}
+
+void __rc_stream_set_bytes(uint8_t *dst, uint8_t c, size_t n)
+{
+    for (; n > 0 && ((uintptr_t)dst & (STREAM_BYTES - 1)) != 0; --n) {
+        *dst++ = c;
+    }
+
+    const stream_t v = stream_repeat(c);
+    for (; n >= 4 * STREAM_BYTES; n -= 4 * STREAM_BYTES) {
+        stream_store(dst, v);
+        stream_store(dst + STREAM_BYTES, v);
+        stream_store(dst + 2 * STREAM_BYTES, v);
+        stream_store(dst + 3 * STREAM_BYTES, v);
+        dst += 4 * STREAM_BYTES;
+    }
+
+    for (; n >= STREAM_BYTES; n -= STREAM_BYTES) {
+        stream_store(dst, v);
+        dst += STREAM_BYTES;
+    }
+
+    __asm__ volatile("sfence" : : : "memory");
+
+    for (; n > 0; --n) {
+        *dst++ = c;
+    }
+}
+
+struct variant {
+    const char *name;
+    unsigned features;
+    struct __rc_memory_ops ops;
+};
+
+// Available variants, ordered from slowest to fastest.
+static const struct variant variants[] = {
+    {
+        .name = "byte",
+        .features = 0,
+        .ops = {byte_copy_bytes_fwd,
+                byte_copy_bytes_bwd,
+                byte_set_bytes,
+                byte_scan_byte},
+    },
+    {
+        .name = "word",
+        .features = 0,
+        .ops = {__rc_generic_copy_bytes_fwd,
+                __rc_generic_copy_bytes_bwd,
+                __rc_generic_set_bytes,
+                __rc_generic_scan_byte},
+    },
+    {
+        .name = "erms",
+        .features = FEATURE_ERMS,
+        .ops = {erms_copy_bytes_fwd,
+                __rc_generic_copy_bytes_bwd,
+                erms_set_bytes,
+                __rc_generic_scan_byte},
+    },
+#if !defined(__radix_kernel__)
+    {
+        .name = "sse2",
+        .features = FEATURE_SSE2,
+        .ops = {sse2_copy_bytes_fwd,
+                sse2_copy_bytes_bwd,
+                sse2_set_bytes,
+                sse2_scan_byte},
+    },
+    {
+        .name = "avx2",
+        .features = FEATURE_AVX2,
+        .ops = {avx2_copy_bytes_fwd,
+                avx2_copy_bytes_bwd,
+                avx2_set_bytes,
+                avx2_scan_byte},
+    },
+#endif  // !defined(__radix_kernel__)
+};
+
+#define NUM_VARIANTS (sizeof variants / sizeof *variants)
+
+// Until rc_memory_init() runs, the baseline variant for the environment is
+// used: SSE2 in userspace and words in the kernel.
+#if !defined(__radix_kernel__)
+#define DEFAULT_VARIANT 3
+#else
+#define DEFAULT_VARIANT 1
+#endif  // !defined(__radix_kernel__)
+
+static const struct variant *current_variant = &variants[DEFAULT_VARIANT];
+
+struct __rc_memory_ops __rc_memory_ops = {
+#if !defined(__radix_kernel__)
+    sse2_copy_bytes_fwd,
+    sse2_copy_bytes_bwd,
+    sse2_set_bytes,
+    sse2_scan_byte,
+#else
+    __rc_generic_copy_bytes_fwd,
+    __rc_generic_copy_bytes_bwd,
+    __rc_generic_set_bytes,
+    __rc_generic_scan_byte,
+#endif  // !defined(__radix_kernel__)
+};
+
+static void install_variant(const struct variant *variant)
+{
+    __rc_memory_ops = variant->ops;
+    current_variant = variant;
+}
+
+void rc_memory_init(void)
+{
+    // A copy larger than most of the cache would evict everything else from
+    // it, while gaining little from the cache itself.
+    const size_t share = cache_share();
+    if (share != 0) {
+        __rc_stream_threshold = share / 4 * 3;
+    }
+
+    const unsigned features = cpu_features();
+
+    for (size_t i = NUM_VARIANTS; i > 0; --i) {
+        const struct variant *variant = &variants[i - 1];
+        if ((variant->features & features) == variant->features) {
+            install_variant(variant);
+            return;
+        }
+    }
+}
+
+const char *rc_memory_variant(void)
+{
+    return current_variant->name;
+}
+
+int rc_memory_select(const char *name)
+{
+    const unsigned features = cpu_features();
+
+    for (size_t i = 0; i < NUM_VARIANTS; ++i) {
+        const struct variant *variant = &variants[i];
+        if (strcmp(variant->name, name) != 0) {
+            continue;
+        }
+        if ((variant->features & features) != variant->features) {
+            return -1;
+        }
+        install_variant(variant);
+        return 0;
+    }
+
+    return -1;
+}
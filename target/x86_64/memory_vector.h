@@ -0,0 +1,252 @@
+// Copyright 2022 Alexei Frolov
+//
+// Use of this source code is governed by an MIT-style license
+// that can be found in the LICENSE file in the repository root.
+
+// Vector implementations of the memory primitives.
+//
+// This file is a template, included by memory.c once for each vector
+// instruction set. Before including it, the following must be defined:
+//
+//   VECTOR_BYTES        The size of a vector register, in bytes.
+//   VECTOR_NAME(name)   Expands to name prefixed with the instruction set.
+//   VECTOR_MOVEMASK(v)  Returns a mask of the high bits of every byte of v.
+//
+// GCC vector extensions are used rather than intrinsics headers, which cannot
+// be included in a freestanding build.
+
+#define vec_t                VECTOR_NAME(vec_t)
+#define vec_alias_t          VECTOR_NAME(vec_alias_t)
+#define vec_unaligned_t      VECTOR_NAME(vec_unaligned_t)
+#define vec_load             VECTOR_NAME(load)
+#define vec_load_unaligned   VECTOR_NAME(load_unaligned)
+#define vec_store            VECTOR_NAME(store)
+#define vec_store_unaligned  VECTOR_NAME(store_unaligned)
+#define vec_repeat           VECTOR_NAME(repeat)
+#define vec_eq_mask          VECTOR_NAME(eq_mask)
+
+typedef char vec_t __attribute__((__vector_size__(VECTOR_BYTES)));
+typedef char vec_alias_t
+    __attribute__((__vector_size__(VECTOR_BYTES))) __RC_MAY_ALIAS;
+typedef char vec_unaligned_t
+    __attribute__((__vector_size__(VECTOR_BYTES))) __RC_MAY_ALIAS
+    __RC_ALIGNED(1);
+
+static inline vec_t vec_load(const void *ptr)
+{
+    return *(const vec_alias_t *)ptr;
+}
+
+static inline vec_t vec_load_unaligned(const void *ptr)
+{
+    return *(const vec_unaligned_t *)ptr;
+}
+
+static inline void vec_store(void *ptr, vec_t v)
+{
+    *(vec_alias_t *)ptr = v;
+}
+
+static inline void vec_store_unaligned(void *ptr, vec_t v)
+{
+    *(vec_unaligned_t *)ptr = v;
+}
+
+// Returns a vector with every byte set to c.
+static inline vec_t vec_repeat(uint8_t c)
+{
+    return (vec_t){0} + (char)c;
+}
+
+// Returns a mask with bit i set if byte i of a equals byte i of b.
+static inline unsigned vec_eq_mask(vec_t a, vec_t b)
+{
+    return (unsigned)VECTOR_MOVEMASK(a == b);
+}
+
+static void VECTOR_NAME(copy_bytes_fwd)(uint8_t *dst,
+                                        const uint8_t *src,
+                                        size_t n)
+{
+    if (n < VECTOR_BYTES) {
+        __rc_generic_copy_bytes_fwd(dst, src, n);
+        return;
+    }
+
+    // The first and last vectors are copied with unaligned accesses, which
+    // covers the unaligned head and the tail of the destination. They are
+    // loaded before and stored after the main loop, so that no source bytes
+    // are overwritten before being read if the regions overlap (dst < src).
+    const vec_t head = vec_load_unaligned(src);
+    const vec_t tail = vec_load_unaligned(src + n - VECTOR_BYTES);
+    uint8_t *const dst_start = dst;
+    uint8_t *const dst_end = dst + n;
+
+    const size_t skip = VECTOR_BYTES - ((uintptr_t)dst & (VECTOR_BYTES - 1));
+    dst += skip;
+    src += skip;
+    n -= skip;
+
+    for (; n >= 4 * VECTOR_BYTES; n -= 4 * VECTOR_BYTES) {
+        vec_t v0 = vec_load_unaligned(src);
+        vec_t v1 = vec_load_unaligned(src + VECTOR_BYTES);
+        vec_t v2 = vec_load_unaligned(src + 2 * VECTOR_BYTES);
+        vec_t v3 = vec_load_unaligned(src + 3 * VECTOR_BYTES);
+        vec_store(dst, v0);
+        vec_store(dst + VECTOR_BYTES, v1);
+        vec_store(dst + 2 * VECTOR_BYTES, v2);
+        vec_store(dst + 3 * VECTOR_BYTES, v3);
+        dst += 4 * VECTOR_BYTES;
+        src += 4 * VECTOR_BYTES;
+    }
+
+    for (; n >= VECTOR_BYTES; n -= VECTOR_BYTES) {
+        vec_store(dst, vec_load_unaligned(src));
+        dst += VECTOR_BYTES;
+        src += VECTOR_BYTES;
+    }
+
+    vec_store_unaligned(dst_start, head);
+    vec_store_unaligned(dst_end - VECTOR_BYTES, tail);
+}
+
+static void VECTOR_NAME(copy_bytes_bwd)(uint8_t *dst,
+                                        const uint8_t *src,
+                                        size_t n)
+{
+    if (n < VECTOR_BYTES) {
+        __rc_generic_copy_bytes_bwd(dst, src, n);
+        return;
+    }
+
+    // Mirror of the forward copy: the head and tail vectors are loaded first
+    // and stored last, and the loop runs downwards from the aligned end of the
+    // destination, making this safe for overlapping regions with dst > src.
+    const vec_t head = vec_load_unaligned(src);
+    const vec_t tail = vec_load_unaligned(src + n - VECTOR_BYTES);
+    uint8_t *const dst_start = dst;
+    uint8_t *const dst_end = dst + n;
+
+    n -= (uintptr_t)dst_end & (VECTOR_BYTES - 1);
+
+    for (; n >= 4 * VECTOR_BYTES; n -= 4 * VECTOR_BYTES) {
+        const uint8_t *s = src + n - 4 * VECTOR_BYTES;
+        uint8_t *d = dst + n - 4 * VECTOR_BYTES;
+
+        vec_t v3 = vec_load_unaligned(s + 3 * VECTOR_BYTES);
+        vec_t v2 = vec_load_unaligned(s + 2 * VECTOR_BYTES);
+        vec_t v1 = vec_load_unaligned(s + VECTOR_BYTES);
+        vec_t v0 = vec_load_unaligned(s);
+        vec_store(d + 3 * VECTOR_BYTES, v3);
+        vec_store(d + 2 * VECTOR_BYTES, v2);
+        vec_store(d + VECTOR_BYTES, v1);
+        vec_store(d, v0);
+    }
+
+    for (; n >= VECTOR_BYTES; n -= VECTOR_BYTES) {
+        vec_store(dst + n - VECTOR_BYTES,
+                  vec_load_unaligned(src + n - VECTOR_BYTES));
+    }
+
+    vec_store_unaligned(dst_end - VECTOR_BYTES, tail);
+    vec_store_unaligned(dst_start, head);
+}
+
+static void VECTOR_NAME(set_bytes)(uint8_t *dst, uint8_t c, size_t n)
+{
+    if (n < VECTOR_BYTES) {
+        __rc_generic_set_bytes(dst, c, n);
+        return;
+    }
+
+    const vec_t v = vec_repeat(c);
+
+    // Unaligned stores cover the head and tail; the rest is stored aligned.
+    vec_store_unaligned(dst, v);
+    vec_store_unaligned(dst + n - VECTOR_BYTES, v);
+
+    uint8_t *p = (uint8_t *)(((uintptr_t)dst + VECTOR_BYTES) &
+                             ~(uintptr_t)(VECTOR_BYTES - 1));
+    uint8_t *const end = dst + n - VECTOR_BYTES;
+
+    for (; p + 4 * VECTOR_BYTES <= end; p += 4 * VECTOR_BYTES) {
+        vec_store(p, v);
+        vec_store(p + VECTOR_BYTES, v);
+        vec_store(p + 2 * VECTOR_BYTES, v);
+        vec_store(p + 3 * VECTOR_BYTES, v);
+    }
+
+    for (; p < end; p += VECTOR_BYTES) {
+        vec_store(p, v);
+    }
+}
+
+static const uint8_t *VECTOR_NAME(scan_byte)(const uint8_t *ptr,
+                                             uint8_t c,
+                                             size_t n)
+{
+    if (n == 0) {
+        return NULL;
+    }
+
+    // Only aligned vectors are loaded, so the scan never crosses into a page
+    // that does not contain any of the searched bytes. The first vector may
+    // start before ptr; matches there are shifted out of the mask.
+    const vec_t needle = vec_repeat(c);
+    const size_t misalignment = (uintptr_t)ptr & (VECTOR_BYTES - 1);
+    const uint8_t *block = ptr - misalignment;
+
+    unsigned mask = vec_eq_mask(vec_load(block), needle) >> misalignment;
+    if (mask != 0) {
+        size_t index = __builtin_ctz(mask);
+        return index < n ? ptr + index : NULL;
+    }
+
+    // Number of bytes remaining to be searched from the next block onwards.
+    const size_t first = VECTOR_BYTES - misalignment;
+    if (n <= first) {
+        return NULL;
+    }
+    n -= first;
+    block += VECTOR_BYTES;
+
+    for (;;) {
+        // Once block is aligned to four vectors, check four per iteration,
+        // combining their comparisons so that only one branch is taken for
+        // each group. The alignment keeps every group within a single page.
+        if (((uintptr_t)block & (4 * VECTOR_BYTES - 1)) == 0) {
+            for (; n > 4 * VECTOR_BYTES; n -= 4 * VECTOR_BYTES) {
+                const uint8_t *b = block;
+                vec_t e0 = vec_load(b) == needle;
+                vec_t e1 = vec_load(b + VECTOR_BYTES) == needle;
+                vec_t e2 = vec_load(b + 2 * VECTOR_BYTES) == needle;
+                vec_t e3 = vec_load(b + 3 * VECTOR_BYTES) == needle;
+                if (VECTOR_MOVEMASK(e0 | e1 | e2 | e3) != 0) {
+                    break;
+                }
+                block += 4 * VECTOR_BYTES;
+            }
+        }
+
+        mask = vec_eq_mask(vec_load(block), needle);
+        if (mask != 0) {
+            size_t index = __builtin_ctz(mask);
+            return index < n ? block + index : NULL;
+        }
+        if (n <= VECTOR_BYTES) {
+            return NULL;
+        }
+        n -= VECTOR_BYTES;
+        block += VECTOR_BYTES;
+    }
+}
+
+#undef vec_t
+#undef vec_alias_t
+#undef vec_unaligned_t
+#undef vec_load
+#undef vec_load_unaligned
+#undef vec_store
+#undef vec_store_unaligned
+#undef vec_repeat
+#undef vec_eq_mask
@@ -17,6 +17,14 @@ def _exclude_chars(exclude: str) -> Set[int]:
     return set(range(0, 256)) - set(ord(c) for c in exclude)
 
 
+# Character classes from the C locale which have no equivalent in the string
+# module.
+_BLANK = ' \t'
+_CNTRL = ''.join(chr(c) for c in range(0x20)) + '\x7f'
+_GRAPH = string.ascii_letters + string.digits + string.punctuation
+_PRINT = _GRAPH + ' '
+
+
 class IsalnumTest(RlibcTest):
     """Tests the isalnum() function."""
 
@@ -41,6 +49,30 @@ class IsalphaTest(RlibcTest):
             self.assertFalse(bool(self._rlibc.isalpha(c)))
 
 
+class IsblankTest(RlibcTest):
+    """Tests the isblank() function."""
+
+    def test_blank(self):
+        for c in _BLANK:
+            self.assertTrue(bool(self._rlibc.isblank(ord(c))))
+
+    def test_nonblank(self):
+        for c in _exclude_chars(_BLANK):
+            self.assertFalse(bool(self._rlibc.isblank(c)))
+
+
+class IscntrlTest(RlibcTest):
+    """Tests the iscntrl() function."""
+
+    def test_cntrl(self):
+        for c in _CNTRL:
+            self.assertTrue(bool(self._rlibc.iscntrl(ord(c))))
+
+    def test_noncntrl(self):
+        for c in _exclude_chars(_CNTRL):
+            self.assertFalse(bool(self._rlibc.iscntrl(c)))
+
+
 class IsdigitTest(RlibcTest):
     """Tests the isdigit() function."""
 
@@ -53,6 +85,18 @@ class IsdigitTest(RlibcTest):
             self.assertFalse(bool(self._rlibc.isdigit(c)))
 
 
+class IsgraphTest(RlibcTest):
+    """Tests the isgraph() function."""
+
+    def test_graph(self):
+        for c in _GRAPH:
+            self.assertTrue(bool(self._rlibc.isgraph(ord(c))))
+
+    def test_nongraph(self):
+        for c in _exclude_chars(_GRAPH):
+            self.assertFalse(bool(self._rlibc.isgraph(c)))
+
+
 class IslowerTest(RlibcTest):
     """Tests the islower() function."""
 
@@ -65,6 +109,42 @@ class IslowerTest(RlibcTest):
             self.assertFalse(bool(self._rlibc.islower(c)))
 
 
+class IsprintTest(RlibcTest):
+    """Tests the isprint() function."""
+
+    def test_print(self):
+        for c in _PRINT:
+            self.assertTrue(bool(self._rlibc.isprint(ord(c))))
+
+    def test_nonprint(self):
+        for c in _exclude_chars(_PRINT):
+            self.assertFalse(bool(self._rlibc.isprint(c)))
+
+
+class IspunctTest(RlibcTest):
+    """Tests the ispunct() function."""
+
+    def test_punct(self):
+        for c in string.punctuation:
+            self.assertTrue(bool(self._rlibc.ispunct(ord(c))))
+
+    def test_nonpunct(self):
+        for c in _exclude_chars(string.punctuation):
+            self.assertFalse(bool(self._rlibc.ispunct(c)))
+
+
+class IsspaceTest(RlibcTest):
+    """Tests the isspace() function."""
+
+    def test_space(self):
+        for c in string.whitespace:
+            self.assertTrue(bool(self._rlibc.isspace(ord(c))))
+
+    def test_nonspace(self):
+        for c in _exclude_chars(string.whitespace):
+            self.assertFalse(bool(self._rlibc.isspace(c)))
+
+
 class IsupperTest(RlibcTest):
     """Tests the isupper() function."""
 
@@ -77,6 +157,18 @@ class IsupperTest(RlibcTest):
             self.assertFalse(bool(self._rlibc.isupper(c)))
 
 
+class IsxdigitTest(RlibcTest):
+    """Tests the isxdigit() function."""
+
+    def test_xdigit(self):
+        for c in string.hexdigits:
+            self.assertTrue(bool(self._rlibc.isxdigit(ord(c))))
+
+    def test_nonxdigit(self):
+        for c in _exclude_chars(string.hexdigits):
+            self.assertFalse(bool(self._rlibc.isxdigit(c)))
+
+
 class TolowerTest(RlibcTest):
     """Tests the tolower() function."""
 
@@ -101,5 +193,22 @@ class ToUpperTest(RlibcTest):
             self.assertEqual(self._rlibc.toupper(c), c)
 
 
+class EofTest(RlibcTest):
+    """Tests the <ctype.h> functions with EOF."""
+
+    EOF = -1
+
+    def test_classes(self):
+        for name in ('isalnum', 'isalpha', 'isblank', 'iscntrl', 'isdigit',
+                     'isgraph', 'islower', 'isprint', 'ispunct', 'isspace',
+                     'isupper', 'isxdigit'):
+            with self.subTest(function=name):
+                self.assertFalse(bool(getattr(self._rlibc, name)(self.EOF)))
+
+    def test_conversions(self):
+        self.assertEqual(self._rlibc.tolower(self.EOF), self.EOF)
+        self.assertEqual(self._rlibc.toupper(self.EOF), self.EOF)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Tests rlibc's profiling counters.
+
+These only run against a test library built with `make test-lib PROFILE=1`.
+"""
+
+import ctypes
+import unittest
+
+from rlibc_test import RlibcTest
+
+# Must match RC_PROFILE_BUCKETS in include/rlibc/profile.h.
+_BUCKETS = 33
+
+
+class _ProfileCounter(ctypes.Structure):
+    _fields_ = [
+        ('name', ctypes.c_char_p),
+        ('calls', ctypes.c_uint64),
+        ('bytes', ctypes.c_uint64),
+        ('cycles', ctypes.c_uint64),
+        ('sizes', ctypes.c_uint64 * _BUCKETS),
+    ]
+
+
+class ProfileTest(RlibcTest):
+    """Tests the counters in the .rlibc_profile section."""
+
+    def setUp(self):
+        if not hasattr(self._rlibc, '__rlibc_profile_counters'):
+            self.skipTest('rlibc was built without profiling')
+
+        size = ctypes.c_size_t.in_dll(self._rlibc,
+                                      '__rlibc_profile_counters_size').value
+        table = (_ProfileCounter * size).in_dll(self._rlibc,
+                                                '__rlibc_profile_counters')
+        self._counters = {c.name.decode('utf-8'): c for c in table}
+
+        # The counters accumulate over every test run by this process.
+        for counter in self._counters.values():
+            counter.calls = 0
+            counter.bytes = 0
+            counter.cycles = 0
+            for i in range(_BUCKETS):
+                counter.sizes[i] = 0
+
+    def _sizes(self, name: str):
+        """Returns the nonzero size buckets of a function's counter."""
+        return {
+            i: count
+            for i, count in enumerate(self._counters[name].sizes) if count
+        }
+
+    def test_table(self):
+        self.assertIn('memcpy', self._counters)
+        self.assertIn('strlen', self._counters)
+        self.assertIn('printf', self._counters)
+
+    def test_memcpy(self):
+        dst = ctypes.create_string_buffer(4096)
+        src = ctypes.create_string_buffer(4096)
+        for size in (0, 1, 3, 4, 100, 4096):
+            self._rlibc.memcpy(dst, src, ctypes.c_size_t(size))
+
+        counter = self._counters['memcpy']
+        self.assertEqual(counter.calls, 6)
+        self.assertEqual(counter.bytes, 4204)
+        self.assertEqual(self._sizes('memcpy'), {
+            0: 1,
+            1: 1,
+            2: 1,
+            3: 1,
+            7: 1,
+            13: 1
+        })
+
+    def test_strlen(self):
+        self.assertEqual(self._rlibc.strlen(b'hello'), 5)
+        self.assertEqual(self._rlibc.strlen(b''), 0)
+
+        counter = self._counters['strlen']
+        self.assertEqual(counter.calls, 2)
+        self.assertEqual(counter.bytes, 5)
+        self.assertEqual(self._sizes('strlen'), {0: 1, 3: 1})
+
+    def test_unsized(self):
+        self._rlibc.strcmp(b'abc', b'abd')
+
+        counter = self._counters['strcmp']
+        self.assertEqual(counter.calls, 1)
+        self.assertEqual(counter.bytes, 0)
+        self.assertEqual(self._sizes('strcmp'), {})
+
+    def test_nested_calls_not_counted(self):
+        buffer = ctypes.create_string_buffer(b'hello', 32)
+        self._rlibc.strcat(buffer, b', world')
+        self.assertEqual(buffer.value, b'hello, world')
+
+        counter = self._counters['strcat']
+        self.assertEqual(counter.calls, 1)
+        self.assertEqual(counter.bytes, 7)
+        self.assertEqual(self._counters['strlen'].calls, 0)
+
+    def test_printf(self):
+        buffer = ctypes.create_string_buffer(32)
+        self.assertEqual(
+            self._rlibc.snprintf(buffer, len(buffer), b'%d %s', 42, b'abc'),
+            6)
+
+        counter = self._counters['printf']
+        self.assertEqual(counter.calls, 1)
+        self.assertEqual(counter.bytes, 6)
+        self.assertEqual(self._counters['strlen'].calls, 0)
+        self.assertEqual(self._counters['memcpy'].calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,8 +5,9 @@
 """Unit test helpers for rlibc."""
 
 import ctypes
+import mmap
 from pathlib import Path
-import subprocess
+from typing import Dict, Tuple
 import unittest
 
 
@@ -18,24 +19,62 @@ class _ErrnoDescriptor(ctypes.Structure):
         return f'{self.name.decode("utf-8")}({self.value})'
 
 
+class GuardedBuffer:
+    """A writable buffer which ends at an inaccessible page.
+
+    Any read past the end of the buffer faults, which allows testing that
+    functions do not overread their inputs.
+    """
+
+    _PROT_NONE = 0
+
+    def __init__(self, size: int):
+        pages = (size + mmap.PAGESIZE - 1) // mmap.PAGESIZE + 1
+        self._map = mmap.mmap(-1, pages * mmap.PAGESIZE)
+        self._base = ctypes.addressof(ctypes.c_char.from_buffer(self._map))
+
+        guard = self._base + (pages - 1) * mmap.PAGESIZE
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.mprotect.argtypes = (ctypes.c_void_p, ctypes.c_size_t,
+                                  ctypes.c_int)
+        if libc.mprotect(guard, mmap.PAGESIZE, self._PROT_NONE) != 0:
+            raise OSError(ctypes.get_errno(), 'mprotect failed')
+
+        self.address = guard - size
+        self.size = size
+
+    def write(self, data: bytes) -> ctypes.c_void_p:
+        """Places data at the end of the buffer, returning a pointer to it."""
+        address = self.address + self.size - len(data)
+        ctypes.memmove(address, data, len(data))
+        return ctypes.c_void_p(address)
+
+
 class RlibcTest(unittest.TestCase):
     """Base class for rlibc test cases"""
 
     # Path to the test rlibc binary from the rlibc repository root.
     RLIBC_TEST_SO: Path = Path('build') / 'test_rlibc.so'
 
+    # The rlibc repository root, which contains this file's directory.
+    _ROOT: Path = Path(__file__).resolve().parent.parent
+
+    # Libraries loaded by the current process, with their errno tables. Each
+    # is loaded once and shared by every test case.
+    _loaded: Dict[Path, Tuple[ctypes.CDLL, '_ErrnoValues']] = {}
+
     @classmethod
     def setUpClass(cls):
-        root = subprocess.check_output(
-            ('git', 'rev-parse', '--show-toplevel')).decode('utf-8').strip()
+        lib = cls._ROOT / cls.RLIBC_TEST_SO
 
-        lib = Path(root) / cls.RLIBC_TEST_SO
+        if lib not in RlibcTest._loaded:
+            if not lib.exists():
+                raise RuntimeError('No rlibc library found at %s' % lib)
 
-        if not lib.exists():
-            raise RuntimeError('No rlibc library found at %s' % lib)
+            rlibc = ctypes.cdll.LoadLibrary(lib)
+            RlibcTest._loaded[lib] = (rlibc, cls._ErrnoValues(rlibc))
 
-        cls._rlibc = ctypes.cdll.LoadLibrary(lib)
-        cls.errno = cls._ErrnoValues(cls._rlibc)
+        cls._rlibc, cls.errno = RlibcTest._loaded[lib]
 
     class _ErrnoValues:
         """Parses rlibc's errno descriptor table and stores its values."""
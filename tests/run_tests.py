@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Runs all of rlibc's unit tests in parallel.
+
+Every *_test.py file in this directory is discovered, and its test cases are
+distributed across a pool of worker processes. Each worker loads the rlibc test
+library once and shares it between all the test cases it runs.
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+from pathlib import Path
+import sys
+import time
+from typing import List, NamedTuple, Tuple
+import unittest
+
+TESTS_DIR = Path(__file__).resolve().parent
+
+
+class ShardResult(NamedTuple):
+    """Outcome of running a single test case class in a worker."""
+    name: str
+    tests_run: int
+    failures: List[Tuple[str, str]]
+    errors: List[Tuple[str, str]]
+    skipped: int
+
+
+def test_case_names() -> List[str]:
+    """Returns the dotted names of every test case class in the test files."""
+    loader = unittest.TestLoader()
+    suite = loader.discover(str(TESTS_DIR), pattern='*_test.py')
+
+    names = set()
+
+    def collect(suite: unittest.TestSuite) -> None:
+        for test in suite:
+            if isinstance(test, unittest.TestSuite):
+                collect(test)
+            elif isinstance(test, unittest.loader._FailedTest):
+                raise ImportError(test._exception)
+            else:
+                cls = type(test)
+                names.add(f'{cls.__module__}.{cls.__qualname__}')
+
+    collect(suite)
+    return sorted(names)
+
+
+def run_test_case(name: str) -> ShardResult:
+    """Runs every test in a test case class."""
+    suite = unittest.defaultTestLoader.loadTestsFromName(name)
+    result = unittest.TextTestRunner(stream=io.StringIO(),
+                                     verbosity=0).run(suite)
+
+    return ShardResult(
+        name=name,
+        tests_run=result.testsRun,
+        failures=[(str(test), trace) for test, trace in result.failures],
+        errors=[(str(test), trace) for test, trace in result.errors],
+        skipped=len(result.skipped),
+    )
+
+
+def _init_worker() -> None:
+    sys.path.insert(0, str(TESTS_DIR))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-j',
+                        '--jobs',
+                        type=int,
+                        default=os.cpu_count() or 1,
+                        help='number of worker processes (default: all CPUs)')
+    parser.add_argument('-v',
+                        '--verbose',
+                        action='store_true',
+                        help='print the name of each test case as it finishes')
+    args = parser.parse_args()
+
+    _init_worker()
+    start = time.monotonic()
+    names = test_case_names()
+
+    results: List[ShardResult] = []
+    with multiprocessing.Pool(min(args.jobs, len(names)),
+                              initializer=_init_worker) as pool:
+        for result in pool.imap_unordered(run_test_case, names):
+            results.append(result)
+            if args.verbose:
+                status = ('ok' if not result.failures and not result.errors
+                          else 'FAIL')
+                print(f'{result.name}: {result.tests_run} tests {status}')
+
+    failures = [f for result in results for f in result.failures]
+    errors = [e for result in results for e in result.errors]
+
+    separator = '=' * 70
+    for kind, problems in (('FAIL', failures), ('ERROR', errors)):
+        for test, trace in problems:
+            print(separator)
+            print(f'{kind}: {test}')
+            print('-' * 70)
+            print(trace)
+
+    tests_run = sum(result.tests_run for result in results)
+    skipped = sum(result.skipped for result in results)
+    elapsed = time.monotonic() - start
+
+    print('-' * 70)
+    print(f'Ran {tests_run} tests from {len(names)} test cases in '
+          f'{elapsed:.2f}s using {min(args.jobs, len(names))} processes')
+
+    if failures or errors:
+        print(f'FAILED (failures={len(failures)}, errors={len(errors)})')
+        return 1
+
+    print(f'OK (skipped={skipped})' if skipped else 'OK')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,10 +6,13 @@
 """Tests rlibc's implementation of <stdio.h> functions."""
 
 import ctypes
+import decimal
+import random
+import struct
 from typing import Tuple
 import unittest
 
-from rlibc_test import RlibcTest
+from rlibc_test import GuardedBuffer, RlibcTest
 
 
 def c_int_limits(ctype) -> Tuple[int, int]:
@@ -24,6 +27,42 @@ def c_int_limits(ctype) -> Tuple[int, int]:
     return (0, 2**bits - 1)
 
 
+def random_double(rng: random.Random) -> float:
+    """Returns a finite double with a random bit pattern."""
+    while True:
+        value = struct.unpack('<d', struct.pack('<Q', rng.getrandbits(64)))[0]
+        if value - value == 0:
+            return value
+
+
+class File(ctypes.Structure):
+    """Mirror of rlibc's FILE structure."""
+
+
+WRITE_FUNCTION = ctypes.CFUNCTYPE(ctypes.c_size_t, ctypes.POINTER(File),
+                                  ctypes.c_void_p, ctypes.c_size_t)
+
+File._fields_ = [('write', WRITE_FUNCTION), ('buffer', ctypes.c_void_p),
+                 ('buffer_size', ctypes.c_size_t),
+                 ('buffered', ctypes.c_size_t), ('mode', ctypes.c_int)]
+
+# Buffering modes, from <stdio.h>.
+_IOFBF = 0
+_IOLBF = 1
+_IONBF = 2
+
+# Size of stdout's buffer, from <stdio.h>.
+BUFSIZ = 1024
+
+
+class PrintfSegment(ctypes.Structure):
+    """Mirror of rlibc's struct rc_printf_segment."""
+    _fields_ = [('literal', ctypes.c_char_p),
+                ('literal_length', ctypes.c_size_t), ('type', ctypes.c_int),
+                ('flags', ctypes.c_uint32), ('base', ctypes.c_uint32),
+                ('precision', ctypes.c_int32), ('width', ctypes.c_int32)]
+
+
 class SnprintfTest(RlibcTest):
     """Tests the snprintf() function."""
 
@@ -59,6 +98,42 @@ class SnprintfTest(RlibcTest):
         self.assertEqual(self._rlibc.snprintf(buffer, 0, b'hello world'), 11)
         self.assertEqual(buffer.raw, b'\xff' * 16)
 
+    def test_long_output_truncated(self):
+        # Output spanning several flushes of printf's staging buffer still
+        # reports its full length.
+        buffer = ctypes.create_string_buffer(b'\xff' * 16, 16)
+        self.assertEqual(
+            self._rlibc.snprintf(buffer, len(buffer), b'%1000d%s', 7,
+                                 b'x' * 500), 1500)
+        self.assertEqual(buffer.raw, b' ' * 15 + b'\0')
+
+    def test_truncated_at_every_size(self):
+        # Output is cut off at each possible point, including within padding,
+        # a number, a character and a literal percent sign.
+        expected = b'a:  -42|0x1f|c%|str'
+        for size in range(len(expected) + 2):
+            with self.subTest(size=size):
+                buffer = ctypes.create_string_buffer(b'\xff' * 32, 32)
+                self.assertEqual(
+                    self._rlibc.snprintf(buffer, size, b'a:%5d|%#x|%c%%|%s',
+                                         -42, 31, ord('c'), b'str'),
+                    len(expected))
+                if size == 0:
+                    self.assertEqual(buffer.raw, b'\xff' * 32)
+                else:
+                    written = min(size - 1, len(expected))
+                    self.assertEqual(buffer.raw[:written + 1],
+                                     expected[:written] + b'\0')
+                    self.assertEqual(buffer.raw[written + 1:],
+                                     b'\xff' * (31 - written))
+
+    def test_null_buffer_zero_size(self):
+        self.assertEqual(self._rlibc.snprintf(None, 0, b'%d items', 1234), 10)
+
+    def test_long_output(self):
+        self.assertEqual(self._format('%-300s|%0300u', b'abc', 12, bufsize=700),
+                         (601, 'abc' + ' ' * 297 + '|' + '0' * 298 + '12'))
+
     def test_format_char_single(self):
         buffer = ctypes.create_string_buffer(b'\xff' * 16, 16)
         self.assertEqual(
@@ -128,6 +203,20 @@ class SnprintfTest(RlibcTest):
                                  b'precision'), 5)
         self.assertEqual(buffer.raw, b'zero \0' + b'\xff' * 10)
 
+    def test_format_string_precision_unterminated(self):
+        # An array no shorter than the precision need not be terminated, and
+        # must not be read past.
+        guarded = GuardedBuffer(64)
+        buffer = ctypes.create_string_buffer(b'\xff' * 16, 16)
+        for length in range(8):
+            with self.subTest(length=length):
+                array = guarded.write(b'x' * length)
+                self.assertEqual(
+                    self._rlibc.snprintf(buffer, len(buffer),
+                                         f'[%.{length}s]'.encode(), array),
+                    length + 2)
+                self.assertEqual(buffer.value, b'[' + b'x' * length + b']')
+
     def test_format_string_null(self):
         buffer = ctypes.create_string_buffer(b'\xff' * 16, 16)
         self.assertEqual(
@@ -464,6 +553,21 @@ class SnprintfTest(RlibcTest):
         self.assertEqual(self._format('%#012X', 0xdeadbeef),
                          (12, '0X00DEADBEEF'))
 
+    def test_format_digits(self):
+        # Values around the boundaries of each conversion path: single digits,
+        # digit pairs, 32-bit values, and 64-bit values split into 9-digit
+        # chunks with inner zeros.
+        for value in (0, 9, 10, 99, 100, 101, 1000, 65535, 2**32 - 1, 2**32,
+                      10**9, 10**9 + 1, 10**10, 10**18 + 7, 10**19,
+                      2**63 + 5, 2**64 - 1):
+            for spec, expected in (('%llu', str(value)),
+                                   ('%llx', f'{value:x}'),
+                                   ('%llX', f'{value:X}'),
+                                   ('%llo', f'{value:o}')):
+                self.assertEqual(
+                    self._format(spec, ctypes.c_ulonglong(value)),
+                    (len(expected), expected))
+
     def test_format_pointer(self):
         self.assertEqual(self._format('%p', ctypes.c_void_p(0)), (1, '0'))
         self.assertEqual(self._format('%p', ctypes.c_void_p(0xcff02340)),
@@ -562,6 +666,178 @@ class SnprintfTest(RlibcTest):
             self._format('%#lx', ctypes.c_ulonglong(long_long_max)),
             (len(max_hex), max_hex))
 
+    def test_format_float_fixed(self):
+        self.assertEqual(self._format('%f', ctypes.c_double(3.14159)),
+                         (8, '3.141590'))
+        self.assertEqual(self._format('%.2f', ctypes.c_double(-2.675)),
+                         (5, '-2.67'))
+        self.assertEqual(self._format('%.0f', ctypes.c_double(1234.5)),
+                         (4, '1234'))
+        self.assertEqual(self._format('%#.0f', ctypes.c_double(7.0)),
+                         (2, '7.'))
+        self.assertEqual(self._format('%.3f', ctypes.c_double(0.0004)),
+                         (5, '0.000'))
+        self.assertEqual(self._format('%.3f', ctypes.c_double(0.0005)),
+                         (5, '0.001'))
+        self.assertEqual(self._format('%.1f', ctypes.c_double(9.96)),
+                         (4, '10.0'))
+        self.assertEqual(self._format('%F', ctypes.c_double(1e21)),
+                         (29, '1000000000000000000000.000000'))
+
+    def test_format_float_round_half_even(self):
+        # Ties are only possible when the double's exact value ends in a 5.
+        for value, expected in ((0.5, '0'), (1.5, '2'), (2.5, '2'),
+                                (3.5, '4')):
+            with self.subTest(value=value):
+                self.assertEqual(self._format('%.0f', ctypes.c_double(value)),
+                                 (1, expected))
+        self.assertEqual(self._format('%.2f', ctypes.c_double(0.125)),
+                         (4, '0.12'))
+        self.assertEqual(self._format('%.2f', ctypes.c_double(0.375)),
+                         (4, '0.38'))
+        self.assertEqual(self._format('%.1e', ctypes.c_double(1.25)),
+                         (7, '1.2e+00'))
+
+    def test_format_float_exponent(self):
+        self.assertEqual(self._format('%e', ctypes.c_double(12345.678)),
+                         (12, '1.234568e+04'))
+        self.assertEqual(self._format('%.2E', ctypes.c_double(-0.000123)),
+                         (9, '-1.23E-04'))
+        self.assertEqual(self._format('%.0e', ctypes.c_double(9.6)),
+                         (5, '1e+01'))
+        self.assertEqual(self._format('%#.0e', ctypes.c_double(3.0)),
+                         (6, '3.e+00'))
+        self.assertEqual(self._format('%e', ctypes.c_double(1e-300)),
+                         (13, '1.000000e-300'))
+
+    def test_format_float_general(self):
+        cases = [
+            ('%g', 100000.0, '100000'),
+            ('%g', 1000000.0, '1e+06'),
+            ('%g', 0.0001, '0.0001'),
+            ('%g', 0.00001, '1e-05'),
+            ('%g', 123456789.0, '1.23457e+08'),
+            ('%g', 0.1, '0.1'),
+            ('%.3g', 2.0, '2'),
+            ('%.0g', 25.0, '2e+01'),
+            ('%#g', 2.0, '2.00000'),
+            ('%#.3g', 0.5, '0.500'),
+            ('%G', 1.5e-10, '1.5E-10'),
+            ('%.17g', 0.1, '0.10000000000000001'),
+            ('%.20g', 0.1, '0.10000000000000000555'),
+        ]
+        for format_string, value, expected in cases:
+            with self.subTest(format=format_string, value=value):
+                self.assertEqual(
+                    self._format(format_string, ctypes.c_double(value)),
+                    (len(expected), expected))
+
+    def test_format_float_hex(self):
+        cases = [
+            ('%a', 1.0, '0x1p+0'),
+            ('%a', -0.1, '-0x1.999999999999ap-4'),
+            ('%A', 255.5, '0X1.FFP+7'),
+            ('%a', 5e-324, '0x0.0000000000001p-1022'),
+            ('%.0a', 1.5, '0x2p+0'),
+            ('%.0a', 2.5, '0x1p+1'),
+            ('%.1a', 1.96875, '0x2.0p+0'),
+            ('%.3a', 1.0, '0x1.000p+0'),
+            ('%#.0a', 1.0, '0x1.p+0'),
+            ('%.15a', 1.0, '0x1.000000000000000p+0'),
+            ('%010a', 1.0, '0x00001p+0'),
+        ]
+        for format_string, value, expected in cases:
+            with self.subTest(format=format_string, value=value):
+                self.assertEqual(
+                    self._format(format_string, ctypes.c_double(value)),
+                    (len(expected), expected))
+
+    def test_format_float_zero(self):
+        self.assertEqual(self._format('%f', ctypes.c_double(0.0)),
+                         (8, '0.000000'))
+        self.assertEqual(self._format('%e', ctypes.c_double(-0.0)),
+                         (13, '-0.000000e+00'))
+        self.assertEqual(self._format('%g', ctypes.c_double(0.0)), (1, '0'))
+        self.assertEqual(self._format('%#g', ctypes.c_double(0.0)),
+                         (7, '0.00000'))
+        self.assertEqual(self._format('%a', ctypes.c_double(0.0)),
+                         (6, '0x0p+0'))
+
+    def test_format_float_special(self):
+        inf = float('inf')
+        nan = float('nan')
+        self.assertEqual(self._format('%f', ctypes.c_double(inf)), (3, 'inf'))
+        self.assertEqual(self._format('%E', ctypes.c_double(-inf)),
+                         (4, '-INF'))
+        self.assertEqual(self._format('%g', ctypes.c_double(nan)), (3, 'nan'))
+        self.assertEqual(self._format('%A', ctypes.c_double(nan)), (3, 'NAN'))
+        self.assertEqual(self._format('%+f', ctypes.c_double(inf)),
+                         (4, '+inf'))
+        # Zero padding is not applied to infinities and NaNs.
+        self.assertEqual(self._format('%08f', ctypes.c_double(-inf)),
+                         (8, '    -inf'))
+        self.assertEqual(self._format('%-6e|', ctypes.c_double(nan)),
+                         (7, 'nan   |'))
+
+    def test_format_float_width(self):
+        cases = [
+            ('%10.3f', 3.14159, '     3.142'),
+            ('%-10.3f|', 3.14159, '3.142     |'),
+            ('%010.3f', -3.14159, '-00003.142'),
+            ('%+.1f', 2.0, '+2.0'),
+            ('% .1f', 2.0, ' 2.0'),
+            ('%-+012.2e', 5.0, '+5.00e+00   '),
+            ('%012g', 1e-7, '00000001e-07'),
+        ]
+        for format_string, value, expected in cases:
+            with self.subTest(format=format_string, value=value):
+                self.assertEqual(
+                    self._format(format_string, ctypes.c_double(value)),
+                    (len(expected), expected))
+
+    def test_format_float_long_output(self):
+        # Doubles are printed exactly at any precision.
+        self.assertEqual(
+            self._format('%.60f', ctypes.c_double(0.1), bufsize=128),
+            (62, '%.60f' % 0.1))
+        self.assertEqual(
+            self._format('%.1074f', ctypes.c_double(5e-324), bufsize=1100),
+            (1076, '%.1074f' % 5e-324))
+        self.assertEqual(
+            self._format('%.2f', ctypes.c_double(1.7976931348623157e308),
+                         bufsize=400), (312, '%.2f' % 1.7976931348623157e308))
+        self.assertEqual(
+            self._format('%.1000e', ctypes.c_double(1 / 3), bufsize=1100),
+            (1006, '%.1000e' % (1 / 3)))
+
+    def test_format_float_matches_host(self):
+        host = ctypes.CDLL(None)
+        formats = [
+            '%f', '%e', '%g', '%a', '%.0f', '%.3f', '%.17g', '%.20e', '%.3g',
+            '%.0e', '%G', '%.5a', '%+.10g', '%#.4e', '%.15g', '%.16e'
+        ]
+        rng = random.Random(0)
+        values = [random_double(rng) for _ in range(300)]
+        values += [rng.uniform(-1e6, 1e6) for _ in range(300)]
+        values += [round(rng.uniform(0, 1000), rng.randrange(4))
+                   for _ in range(300)]
+
+        for format_string in formats:
+            for value in values:
+                # Large values are printed in full by %f.
+                if format_string.endswith('f') and abs(value) > 1e100:
+                    continue
+                with self.subTest(format=format_string, value=value):
+                    buffer = ctypes.create_string_buffer(128)
+                    count = host.snprintf(buffer, len(buffer),
+                                          format_string.encode('utf-8'),
+                                          ctypes.c_double(value))
+                    self.assertEqual(
+                        self._format(format_string,
+                                     ctypes.c_double(value),
+                                     bufsize=128),
+                        (count, buffer.value.decode('utf-8')))
+
     def test_format_percent(self):
         self.assertEqual(self._format('loading: 10%%!'), (13, 'loading: 10%!'))
 
@@ -577,5 +853,404 @@ class SnprintfTest(RlibcTest):
                 self._format('foo: %#08.4ll bar: %#08.4llx')[0], -1)
 
 
+class DtoaTest(RlibcTest):
+    """Tests rlibc's Grisu conversions of doubles to decimal digits.
+
+    printf only uses their results when they are proven correct, so they are
+    tested directly.
+    """
+
+    class _Decimal(ctypes.Structure):
+        """Mirror of rlibc's struct rc_decimal."""
+        _fields_ = [('length', ctypes.c_int), ('exponent', ctypes.c_int),
+                    ('digits', ctypes.c_char * 800)]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._rlibc.rc_dtoa_shortest.restype = ctypes.c_bool
+        cls._rlibc.rc_dtoa_shortest.argtypes = (ctypes.c_double,
+                                                ctypes.c_void_p)
+        cls._rlibc.rc_dtoa_counted.restype = ctypes.c_bool
+        cls._rlibc.rc_dtoa_counted.argtypes = (ctypes.c_double, ctypes.c_int,
+                                               ctypes.c_void_p)
+
+    @staticmethod
+    def _digits(number: str) -> Tuple[str, int]:
+        """Returns the significant digits of a number and the exponent of the
+        first one."""
+        _, digits, exponent = decimal.Decimal(number).normalize().as_tuple()
+        return ''.join(map(str, digits)), exponent + len(digits) - 1
+
+    def test_shortest(self):
+        rng = random.Random(0)
+        failures = 0
+        for _ in range(2000):
+            value = abs(random_double(rng))
+            result = self._Decimal()
+            if not self._rlibc.rc_dtoa_shortest(value, ctypes.byref(result)):
+                failures += 1
+                continue
+
+            # repr() gives the shortest digits which round-trip.
+            with self.subTest(value=value):
+                self.assertEqual(
+                    (result.digits[:result.length].decode(), result.exponent),
+                    self._digits(repr(value)))
+
+        # Grisu3 gives up on around 0.5% of doubles.
+        self.assertLess(failures, 40)
+
+    def test_counted(self):
+        rng = random.Random(1)
+        for count in (1, 6, 15, 17):
+            failures = 0
+            for _ in range(500):
+                value = abs(random_double(rng))
+                result = self._Decimal()
+                if not self._rlibc.rc_dtoa_counted(value, count,
+                                                   ctypes.byref(result)):
+                    failures += 1
+                    continue
+
+                with self.subTest(value=value, count=count):
+                    self.assertEqual(
+                        (result.digits[:result.length].decode(),
+                         result.exponent),
+                        self._digits('%.*e' % (count - 1, value)))
+
+            self.assertLess(failures, 25)
+
+
+class FileTest(RlibcTest):
+    """Tests output to FILE streams."""
+
+    # Output of _printf_line(), which makes a separate callback for each
+    # literal run and conversion.
+    LINE = b'0000beef: hello\n'
+
+    def setUp(self):
+        self._writes = []
+        self._accept = True
+
+        def write(_stream, data, size):
+            if not self._accept:
+                return 0
+            self._writes.append(ctypes.string_at(data, size))
+            return size
+
+        # Keep a reference to the callback so that it is not freed.
+        self._write = WRITE_FUNCTION(write)
+        self._file = File(write=self._write, mode=_IOFBF)
+        self._stream = ctypes.byref(self._file)
+
+    def _printf(self, format_string: bytes, *args) -> int:
+        return self._rlibc.fprintf(self._stream, format_string, *args)
+
+    def _printf_line(self) -> int:
+        return self._printf(b'%08x: %s\n', 0xbeef, b'hello')
+
+    def _setvbuf(self, mode: int, size: int) -> ctypes.Array:
+        buf = ctypes.create_string_buffer(size)
+        self.assertEqual(self._rlibc.setvbuf(self._stream, buf, mode, size), 0)
+        return buf
+
+    def test_unbuffered_writes_per_printf(self):
+        # printf() stages its output internally, so even an unbuffered stream
+        # receives a single write.
+        self.assertEqual(self._printf_line(), len(self.LINE))
+        self.assertEqual(self._writes, [self.LINE])
+
+    def test_unbuffered_long_output(self):
+        # Output longer than printf's staging buffer is written in a few large
+        # chunks rather than one per conversion.
+        count = self._printf(b'%s|%0600d|%-300c|%s', b'a' * 300, 5, ord('x'),
+                             b'b' * 10)
+        output = b''.join(self._writes)
+        self.assertEqual(count, len(output))
+        self.assertEqual(
+            output, b'a' * 300 + b'|' + b'0' * 599 + b'5|x' + b' ' * 299 +
+            b'|' + b'b' * 10)
+        self.assertLessEqual(len(self._writes), 8)
+
+    def test_fully_buffered_writes_per_printf(self):
+        _buf = self._setvbuf(_IOFBF, 64)
+        self.assertEqual(self._printf_line(), len(self.LINE))
+        self.assertEqual(self._writes, [])
+        self.assertEqual(self._rlibc.fflush(self._stream), 0)
+        self.assertEqual(self._writes, [self.LINE])
+
+    def test_line_buffered_writes_per_printf(self):
+        _buf = self._setvbuf(_IOLBF, 64)
+        self.assertEqual(self._printf_line(), len(self.LINE))
+        self.assertEqual(self._writes, [self.LINE])
+
+    def test_line_buffered_partial_line(self):
+        _buf = self._setvbuf(_IOLBF, 64)
+        self._printf(b'no newline')
+        self.assertEqual(self._writes, [])
+        self._printf(b' until %s\n', b'now')
+        self.assertEqual(self._writes, [b'no newline until now\n'])
+
+    def test_buffer_overflow(self):
+        _buf = self._setvbuf(_IOFBF, 16)
+        for i in range(10):
+            self._printf(b'line %d\n', i)
+        self._rlibc.fflush(self._stream)
+        self.assertEqual(b''.join(self._writes),
+                         b''.join(b'line %d\n' % i for i in range(10)))
+        self.assertTrue(all(len(w) <= 16 for w in self._writes))
+
+    def test_write_larger_than_buffer(self):
+        _buf = self._setvbuf(_IOFBF, 16)
+        self._printf(b'ab')
+        self._printf(b'%s', b'x' * 40)
+        self.assertEqual(self._writes, [b'ab', b'x' * 40])
+
+    def test_setvbuf_unbuffered(self):
+        _buf = self._setvbuf(_IOFBF, 64)
+        self._printf(b'pending')
+        self.assertEqual(self._rlibc.setvbuf(self._stream, None, _IONBF, 0), 0)
+        self.assertEqual(self._writes, [b'pending'])
+        self._printf(b'direct')
+        self.assertEqual(self._writes, [b'pending', b'direct'])
+
+    def test_setvbuf_invalid(self):
+        buf = ctypes.create_string_buffer(16)
+        with self.assertErrno(self.errno.EINVAL):
+            self.assertEqual(self._rlibc.setvbuf(self._stream, buf, 7, 16), -1)
+        with self.assertErrno(self.errno.EINVAL):
+            self.assertEqual(
+                self._rlibc.setvbuf(self._stream, buf, _IOFBF, 0), -1)
+
+    def test_fflush_empty(self):
+        self.assertEqual(self._rlibc.fflush(self._stream), 0)
+        self.assertEqual(self._writes, [])
+
+    def test_fflush_failure(self):
+        _buf = self._setvbuf(_IOFBF, 64)
+        self._printf(b'lost')
+        self._accept = False
+        self.assertEqual(self._rlibc.fflush(self._stream), -1)
+        self._accept = True
+        self.assertEqual(self._rlibc.fflush(self._stream), 0)
+        self.assertEqual(self._writes, [])
+
+    def test_fwrite(self):
+        self.assertEqual(
+            self._rlibc.fwrite(b'abcdefgh', 2, 4, self._stream), 4)
+        self.assertEqual(self._writes, [b'abcdefgh'])
+
+    def test_fwrite_empty(self):
+        self.assertEqual(self._rlibc.fwrite(b'abcd', 0, 4, self._stream), 0)
+        self.assertEqual(self._rlibc.fwrite(b'abcd', 4, 0, self._stream), 0)
+        self.assertEqual(self._writes, [])
+
+    def test_fwrite_overflow(self):
+        size = 2**(8 * ctypes.sizeof(ctypes.c_size_t) - 1)
+        with self.assertErrno(self.errno.EINVAL):
+            self.assertEqual(
+                self._rlibc.fwrite(b'abcd', ctypes.c_size_t(size),
+                                   ctypes.c_size_t(2), self._stream), 0)
+        self.assertEqual(self._writes, [])
+
+    def test_fwrite_failure(self):
+        self._accept = False
+        self.assertEqual(self._rlibc.fwrite(b'abcd', 1, 4, self._stream), 0)
+
+    def test_fwrite_line_buffered_failure(self):
+        _buf = self._setvbuf(_IOLBF, 64)
+        self._accept = False
+        self.assertEqual(self._rlibc.fwrite(b'ab\n', 1, 3, self._stream), 0)
+        self.assertEqual(self._writes, [])
+
+    def test_fwrite_buffered(self):
+        _buf = self._setvbuf(_IOLBF, 64)
+        self.assertEqual(self._rlibc.fwrite(b'abc', 1, 3, self._stream), 3)
+        self.assertEqual(self._writes, [])
+        self.assertEqual(self._rlibc.fwrite(b'de\nf', 1, 4, self._stream), 4)
+        self.assertEqual(self._writes, [b'abcde\nf'])
+
+    def test_fputs(self):
+        self.assertEqual(self._rlibc.fputs(b'hello, world', self._stream), 0)
+        self.assertEqual(self._writes, [b'hello, world'])
+
+    def test_fputs_failure(self):
+        self._accept = False
+        self.assertEqual(self._rlibc.fputs(b'hello', self._stream), -1)
+
+    def test_fputc(self):
+        _buf = self._setvbuf(_IOLBF, 64)
+        for c in b'hi\n':
+            self.assertEqual(self._rlibc.fputc(c, self._stream), c)
+        self.assertEqual(self._writes, [b'hi\n'])
+
+    def test_fputc_unsigned(self):
+        self.assertEqual(self._rlibc.fputc(-1, self._stream), 0xff)
+        self.assertEqual(self._writes, [b'\xff'])
+
+    def test_fputc_failure(self):
+        self._accept = False
+        self.assertEqual(self._rlibc.fputc(ord('x'), self._stream), -1)
+
+    def test_putc(self):
+        self.assertEqual(self._rlibc.putc(ord('x'), self._stream), ord('x'))
+        self.assertEqual(self._writes, [b'x'])
+
+
+class StdoutTest(RlibcTest):
+    """Tests the output functions which write to stdout."""
+
+    def setUp(self):
+        self._writes = []
+
+        def write(_stream, data, size):
+            self._writes.append(ctypes.string_at(data, size))
+            return size
+
+        # Temporarily redirect stdout's device to the test.
+        self._stdout = ctypes.POINTER(File).in_dll(self._rlibc,
+                                                   'stdout').contents
+        self._original_write = self._stdout.write
+        self._write = WRITE_FUNCTION(write)
+        self._stdout.write = self._write
+
+    def tearDown(self):
+        self._rlibc.fflush(None)
+        self._set_mode(_IOLBF)
+        self._stdout.write = self._original_write
+
+    def _set_mode(self, mode: int):
+        # Without a new buffer, stdout keeps its static one.
+        self.assertEqual(
+            self._rlibc.setvbuf(ctypes.pointer(self._stdout), None, mode, 0),
+            0)
+
+    def test_puts(self):
+        # stdout is line buffered, so the string and its newline are written
+        # together.
+        self.assertEqual(self._rlibc.puts(b'hello'), 0)
+        self.assertEqual(self._writes, [b'hello\n'])
+
+    def test_puts_unbuffered(self):
+        # The string and its newline are joined before reaching the device.
+        self._set_mode(_IONBF)
+        self.assertEqual(self._rlibc.puts(b'hello'), 0)
+        self.assertEqual(self._writes, [b'hello\n'])
+
+    def test_puts_unbuffered_long(self):
+        # Strings too long to join are written separately from the newline.
+        self._set_mode(_IONBF)
+        self.assertEqual(self._rlibc.puts(b'x' * 300), 0)
+        self.assertEqual(self._writes, [b'x' * 300, b'\n'])
+
+    def test_puts_nearly_full_buffer(self):
+        # Pending output is flushed first to make room for the whole line.
+        pending = b'y' * (BUFSIZ - len(b'hello'))
+        self.assertEqual(
+            self._rlibc.fwrite(pending, 1, len(pending),
+                               ctypes.pointer(self._stdout)), len(pending))
+        self.assertEqual(self._rlibc.puts(b'hello'), 0)
+        self.assertEqual(self._writes, [pending, b'hello\n'])
+
+    def test_putchar(self):
+        for c in b'ok':
+            self.assertEqual(self._rlibc.putchar(c), c)
+        self.assertEqual(self._writes, [])
+        self.assertEqual(self._rlibc.putchar(ord('\n')), ord('\n'))
+        self.assertEqual(self._writes, [b'ok\n'])
+
+
+class RcPrintfCompiledTest(RlibcTest):
+    """Tests formatting with precompiled format strings."""
+
+    def _compile(self, format_string: bytes, count: int = 16):
+        segments = (PrintfSegment * count)()
+        used = self._rlibc.rc_printf_compile(segments, count, format_string)
+        return used, segments
+
+    def _format(self, format_string: bytes, *args, bufsize: int = 64):
+        used, segments = self._compile(format_string)
+        self.assertGreater(used, 0)
+        buffer = ctypes.create_string_buffer(b'\xff' * bufsize, bufsize)
+        count = self._rlibc.rc_snprintf_compiled(buffer, len(buffer), segments,
+                                                 *args)
+        return count, buffer.value
+
+    def _expected(self, format_string: bytes, *args, bufsize: int = 64):
+        buffer = ctypes.create_string_buffer(b'\xff' * bufsize, bufsize)
+        count = self._rlibc.snprintf(buffer, len(buffer), format_string, *args)
+        return count, buffer.value
+
+    def test_matches_snprintf(self):
+        cases = [
+            (b'',),
+            (b'no conversions',),
+            (b'%d', -42),
+            (b'%08x: %s\n', 0xbeef, b'hello'),
+            (b'[%-6s|%6s]', b'ab', b'cd'),
+            (b'%c%c%c', ord('a'), ord('b'), ord('c')),
+            (b'100%% of %u', 7),
+            (b'%#o %#X %+d % d', 8, 0xab, 5, 5),
+            (b'%.3s...', b'truncated'),
+            (b'%lld %llx', ctypes.c_longlong(-2**40),
+             ctypes.c_ulonglong(2**60)),
+            (b'%p', ctypes.c_void_p(0x1234)),
+            (b'%5.3d|%-5u|', 7, 8),
+            (b'%8.3f|%g|%a', ctypes.c_double(3.14159), ctypes.c_double(1e-5),
+             ctypes.c_double(1.0)),
+        ]
+        for args in cases:
+            with self.subTest(format=args[0]):
+                self.assertEqual(self._format(*args), self._expected(*args))
+
+    def test_truncation(self):
+        self.assertEqual(
+            self._format(b'%s world %d', b'hello', 12345, bufsize=8),
+            (17, b'hello w'))
+
+    def test_reuse(self):
+        used, segments = self._compile(b'value=%d;')
+        buffer = ctypes.create_string_buffer(32)
+        for value in (0, 1, -1, 99999):
+            expected = b'value=%d;' % value
+            self.assertEqual(
+                self._rlibc.rc_snprintf_compiled(buffer, len(buffer), segments,
+                                                 value), len(expected))
+            self.assertEqual(buffer.value, expected)
+
+    def test_segment_count(self):
+        self.assertEqual(self._compile(b'')[0], 1)
+        self.assertEqual(self._compile(b'text')[0], 1)
+        self.assertEqual(self._compile(b'%d')[0], 2)
+        self.assertEqual(self._compile(b'%08x: %s\n')[0], 3)
+        self.assertEqual(self._compile(b'%d%d%d')[0], 4)
+
+    def test_too_few_segments(self):
+        with self.assertErrno(self.errno.E2BIG):
+            self.assertEqual(self._compile(b'%d %d', count=2)[0], -1)
+        self.assertEqual(self._compile(b'%d %d', count=3)[0], 3)
+
+    def test_invalid(self):
+        with self.assertErrno(self.errno.EINVAL):
+            self.assertEqual(self._compile(b'%')[0], -1)
+        with self.assertErrno(self.errno.EINVAL):
+            self.assertEqual(self._compile(b'ok %d then %q')[0], -1)
+
+    def test_fprintf(self):
+        writes = []
+
+        def write(_stream, data, size):
+            writes.append(ctypes.string_at(data, size))
+            return size
+
+        write_function = WRITE_FUNCTION(write)
+        stream = File(write=write_function, mode=_IONBF)
+        _used, segments = self._compile(b'%08x: %s\n')
+        self.assertEqual(
+            self._rlibc.rc_fprintf_compiled(ctypes.byref(stream), segments,
+                                            0xbeef, b'hello'), 16)
+        self.assertEqual(writes, [b'0000beef: hello\n'])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# Copyright 2022 Alexei Frolov
+#
+# Use of this source code is governed by an MIT-style license
+# that can be found in the LICENSE file in the repository root.
+"""Tests rlibc's implementation of <stdlib.h> functions."""
+
+import ctypes
+import random
+from typing import Tuple
+import unittest
+
+from rlibc_test import GuardedBuffer, RlibcTest
+
+LONG_BITS = ctypes.sizeof(ctypes.c_long) * 8
+LONG_MAX = 2**(LONG_BITS - 1) - 1
+LONG_MIN = -2**(LONG_BITS - 1)
+ULONG_MAX = 2**LONG_BITS - 1
+SIZE_MAX = 2**(ctypes.sizeof(ctypes.c_size_t) * 8) - 1
+LLONG_MAX = 2**63 - 1
+LLONG_MIN = -2**63
+ULLONG_MAX = 2**64 - 1
+
+
+class StrtolTest(RlibcTest):
+    """Tests the strtol() family of functions."""
+
+    def setUp(self):
+        self._rlibc.strtol.restype = ctypes.c_long
+        self._rlibc.strtoll.restype = ctypes.c_longlong
+        self._rlibc.strtoul.restype = ctypes.c_ulong
+        self._rlibc.strtoull.restype = ctypes.c_ulonglong
+
+    def _parse(self,
+               string: bytes,
+               base: int = 10,
+               function: str = 'strtoll') -> Tuple[int, int]:
+        """Returns the parsed value and the number of characters consumed."""
+        buffer = ctypes.create_string_buffer(string)
+        end = ctypes.c_void_p()
+        value = getattr(self._rlibc, function)(buffer, ctypes.byref(end), base)
+        return (value, end.value - ctypes.addressof(buffer))
+
+    def test_decimal(self):
+        self.assertEqual(self._parse(b'0'), (0, 1))
+        self.assertEqual(self._parse(b'42'), (42, 2))
+        self.assertEqual(self._parse(b'123456789'), (123456789, 9))
+        self.assertEqual(self._parse(b'007'), (7, 3))
+
+    def test_sign(self):
+        self.assertEqual(self._parse(b'-42'), (-42, 3))
+        self.assertEqual(self._parse(b'+42'), (42, 3))
+        self.assertEqual(self._parse(b'-0'), (0, 2))
+
+    def test_leading_whitespace(self):
+        self.assertEqual(self._parse(b' \t\n\v\f\r-17'), (-17, 9))
+
+    def test_trailing_characters(self):
+        self.assertEqual(self._parse(b'123abc'), (123, 3))
+        self.assertEqual(self._parse(b'12345678 9'), (12345678, 8))
+        self.assertEqual(self._parse(b'1234567890123456x'),
+                         (1234567890123456, 16))
+
+    def test_no_digits(self):
+        for string in (b'', b'   ', b'-', b'+ 1', b'abc', b' - 5'):
+            with self.subTest(string=string):
+                self.assertEqual(self._parse(string), (0, 0))
+
+    def test_bases(self):
+        self.assertEqual(self._parse(b'777', 8), (0o777, 3))
+        self.assertEqual(self._parse(b'789', 8), (7, 1))
+        self.assertEqual(self._parse(b'ff', 16), (255, 2))
+        self.assertEqual(self._parse(b'FFg', 16), (255, 2))
+        self.assertEqual(self._parse(b'0x1A', 16), (26, 4))
+        self.assertEqual(self._parse(b'-101', 2), (-5, 4))
+        self.assertEqual(self._parse(b'zz', 36), (35 * 36 + 35, 2))
+        self.assertEqual(self._parse(b'Zz', 36), (35 * 36 + 35, 2))
+
+    def test_base_detection(self):
+        self.assertEqual(self._parse(b'123', 0), (123, 3))
+        self.assertEqual(self._parse(b'0123', 0), (0o123, 4))
+        self.assertEqual(self._parse(b'0x123', 0), (0x123, 5))
+        self.assertEqual(self._parse(b'0X1f', 0), (0x1f, 4))
+        self.assertEqual(self._parse(b'-0x10', 0), (-16, 5))
+        self.assertEqual(self._parse(b'0', 0), (0, 1))
+
+    def test_hex_prefix_without_digits(self):
+        self.assertEqual(self._parse(b'0x', 0), (0, 1))
+        self.assertEqual(self._parse(b'0xg', 16), (0, 1))
+
+    def test_invalid_base(self):
+        for base in (-1, 1, 37):
+            with self.subTest(base=base):
+                with self.assertErrno(self.errno.EINVAL):
+                    self.assertEqual(self._parse(b'10', base), (0, 0))
+
+    def test_long_limits(self):
+        with self.assertErrno(0):
+            self.assertEqual(self._parse(b'%d' % LONG_MAX, 10, 'strtol')[0],
+                             LONG_MAX)
+            self.assertEqual(self._parse(b'%d' % LONG_MIN, 10, 'strtol')[0],
+                             LONG_MIN)
+        with self.assertErrno(self.errno.ERANGE):
+            self.assertEqual(
+                self._parse(b'%d' % (LONG_MAX + 1), 10, 'strtol')[0], LONG_MAX)
+        with self.assertErrno(self.errno.ERANGE):
+            self.assertEqual(
+                self._parse(b'%d' % (LONG_MIN - 1), 10, 'strtol')[0], LONG_MIN)
+
+    def test_long_long_limits(self):
+        with self.assertErrno(0):
+            self.assertEqual(self._parse(b'%d' % LLONG_MAX)[0], LLONG_MAX)
+            self.assertEqual(self._parse(b'%d' % LLONG_MIN)[0], LLONG_MIN)
+            self.assertEqual(self._parse(b'-0x8000000000000000', 0)[0],
+                             LLONG_MIN)
+        with self.assertErrno(self.errno.ERANGE):
+            self.assertEqual(self._parse(b'%d' % (LLONG_MAX + 1))[0],
+                             LLONG_MAX)
+        with self.assertErrno(self.errno.ERANGE):
+            self.assertEqual(self._parse(b'%d' % (LLONG_MIN - 1))[0],
+                             LLONG_MIN)
+
+    def test_overflow_consumes_all_digits(self):
+        with self.assertErrno(self.errno.ERANGE):
+            self.assertEqual(self._parse(b'9' * 40 + b'!'), (LLONG_MAX, 40))
+        with self.assertErrno(self.errno.ERANGE):
+            self.assertEqual(self._parse(b'-' + b'f' * 30, 16),
+                             (LLONG_MIN, 31))
+
+    def test_unsigned_limits(self):
+        with self.assertErrno(0):
+            self.assertEqual(
+                self._parse(b'%d' % ULONG_MAX, 10, 'strtoul')[0], ULONG_MAX)
+            self.assertEqual(
+                self._parse(b'%d' % ULLONG_MAX, 10, 'strtoull')[0],
+                ULLONG_MAX)
+        with self.assertErrno(self.errno.ERANGE):
+            self.assertEqual(
+                self._parse(b'%d' % (ULONG_MAX + 1), 10, 'strtoul')[0],
+                ULONG_MAX)
+        with self.assertErrno(self.errno.ERANGE):
+            self.assertEqual(
+                self._parse(b'%d' % (ULLONG_MAX + 1), 10, 'strtoull')[0],
+                ULLONG_MAX)
+
+    def test_unsigned_negative(self):
+        # Negative values are negated in the unsigned type.
+        with self.assertErrno(0):
+            self.assertEqual(self._parse(b'-1', 10, 'strtoul')[0], ULONG_MAX)
+            self.assertEqual(
+                self._parse(b'-%d' % ULLONG_MAX, 10, 'strtoull')[0], 1)
+        with self.assertErrno(self.errno.ERANGE):
+            self.assertEqual(
+                self._parse(b'-%d' % (ULLONG_MAX + 1), 10, 'strtoull')[0],
+                ULLONG_MAX)
+
+    def test_null_endptr(self):
+        self.assertEqual(self._rlibc.strtoll(b'  -99 bottles', None, 10), -99)
+
+    def test_random_decimal(self):
+        # Covers every digit count, with and without trailing characters, to
+        # exercise both the eight-digit and single-digit paths.
+        rng = random.Random(0)
+        for digits in range(1, 21):
+            for _ in range(20):
+                value = rng.randint(10**(digits - 1), 10**digits - 1)
+                if rng.random() < 0.5:
+                    value = -value
+                suffix = rng.choice((b'', b' ', b'x', b'.5'))
+                string = b'%d' % value + suffix
+                expected = max(LLONG_MIN, min(value, LLONG_MAX))
+                with self.subTest(string=string):
+                    self.assertEqual(self._parse(string),
+                                     (expected, len(string) - len(suffix)))
+
+    def test_end_of_page(self):
+        # Digits immediately before an inaccessible page must not cause the
+        # eight-digit path to read past the end of the string.
+        buffer = GuardedBuffer(64)
+        for length in range(1, 20):
+            string = b'1' * length
+            with self.subTest(length=length):
+                ptr = buffer.write(string + b'\0')
+                self.assertEqual(self._rlibc.strtoll(ptr, None, 10),
+                                 int(string))
+
+
+class AtoiTest(RlibcTest):
+    """Tests the atoi() family of functions."""
+
+    def setUp(self):
+        self._rlibc.atol.restype = ctypes.c_long
+        self._rlibc.atoll.restype = ctypes.c_longlong
+
+    def test_atoi(self):
+        self.assertEqual(self._rlibc.atoi(b'  -1234xyz'), -1234)
+        self.assertEqual(self._rlibc.atoi(b'0x10'), 0)
+        self.assertEqual(self._rlibc.atoi(b'junk'), 0)
+
+    def test_atol(self):
+        self.assertEqual(self._rlibc.atol(b'%d' % LONG_MIN), LONG_MIN)
+
+    def test_atoll(self):
+        self.assertEqual(self._rlibc.atoll(b'+9223372036854775807'),
+                         LLONG_MAX)
+
+
+class MallocTest(RlibcTest):
+    """Tests the memory allocator."""
+
+    def setUp(self):
+        self._rlibc.malloc.restype = ctypes.c_void_p
+        self._rlibc.malloc.argtypes = (ctypes.c_size_t, )
+        self._rlibc.calloc.restype = ctypes.c_void_p
+        self._rlibc.calloc.argtypes = (ctypes.c_size_t, ctypes.c_size_t)
+        self._rlibc.realloc.restype = ctypes.c_void_p
+        self._rlibc.realloc.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+        self._rlibc.free.restype = None
+        self._rlibc.free.argtypes = (ctypes.c_void_p, )
+
+    def test_alignment_and_size(self):
+        sizes = [0, 1, 15, 16, 17, 100, 128, 129, 1000, 8192, 8193, 100000]
+        pointers = []
+        for size in sizes:
+            with self.subTest(size=size):
+                ptr = self._rlibc.malloc(size)
+                self.assertIsNotNone(ptr)
+                self.assertEqual(ptr % 16, 0)
+                ctypes.memset(ptr, 0xa5, size)
+                pointers.append(ptr)
+
+        self.assertEqual(len(set(pointers)), len(pointers))
+        for ptr in pointers:
+            self._rlibc.free(ptr)
+
+    def test_free_null(self):
+        self._rlibc.free(None)
+
+    def test_reuse(self):
+        for size in (24, 4000, 50000):
+            with self.subTest(size=size):
+                ptr = self._rlibc.malloc(size)
+                self._rlibc.free(ptr)
+                self.assertEqual(self._rlibc.malloc(size), ptr)
+                self._rlibc.free(ptr)
+
+    def test_out_of_memory(self):
+        for size in (SIZE_MAX, SIZE_MAX - 100, 2**30):
+            with self.subTest(size=size):
+                with self.assertErrno(self.errno.ENOMEM):
+                    self.assertIsNone(self._rlibc.malloc(size))
+
+    def test_calloc_zeroes_reused_memory(self):
+        for size in (40, 3000, 70000):
+            with self.subTest(size=size):
+                ptr = self._rlibc.malloc(size)
+                ctypes.memset(ptr, 0xff, size)
+                self._rlibc.free(ptr)
+
+                ptr = self._rlibc.calloc(size, 1)
+                self.assertEqual(ctypes.string_at(ptr, size), bytes(size))
+                self._rlibc.free(ptr)
+
+    def test_calloc_overflow(self):
+        with self.assertErrno(self.errno.ENOMEM):
+            self.assertIsNone(self._rlibc.calloc(SIZE_MAX // 2, 3))
+
+    def test_realloc_null(self):
+        ptr = self._rlibc.realloc(None, 10)
+        self.assertIsNotNone(ptr)
+        self._rlibc.free(ptr)
+
+    def test_realloc_in_place(self):
+        ptr = self._rlibc.malloc(24)
+        self.assertEqual(self._rlibc.realloc(ptr, 30), ptr)
+        self.assertEqual(self._rlibc.realloc(ptr, 20), ptr)
+        self._rlibc.free(ptr)
+
+        ptr = self._rlibc.malloc(100000)
+        self.assertEqual(self._rlibc.realloc(ptr, 120000), ptr)
+        self._rlibc.free(ptr)
+
+    def test_realloc_preserves_contents(self):
+        data = bytes(range(256)) * 400
+        ptr = self._rlibc.malloc(10)
+        ctypes.memmove(ptr, data, 10)
+        length = 10
+
+        for size in (100, 5000, 20000, 100000, 300, 7):
+            with self.subTest(size=size):
+                ptr = self._rlibc.realloc(ptr, size)
+                kept = min(size, length)
+                self.assertEqual(ctypes.string_at(ptr, kept), data[:kept])
+                ctypes.memmove(ptr, data, size)
+                length = size
+
+        self._rlibc.free(ptr)
+
+    def test_churn(self):
+        # Randomly allocates, resizes and frees blocks, checking that no block
+        # is overwritten while it is live.
+        rng = random.Random(0)
+        live = {}
+
+        def check(ptr):
+            fill, size = live[ptr]
+            self.assertEqual(ctypes.string_at(ptr, size), bytes([fill]) * size)
+
+        for i in range(3000):
+            action = rng.random()
+            if live and action < 0.4:
+                ptr = rng.choice(list(live))
+                check(ptr)
+                del live[ptr]
+                self._rlibc.free(ptr)
+                continue
+
+            size = rng.choice((rng.randint(0, 256), rng.randint(0, 10000),
+                               rng.randint(0, 200000)))
+            fill = i % 256
+            if live and action < 0.6:
+                old = rng.choice(list(live))
+                check(old)
+                old_fill, old_size = live.pop(old)
+                ptr = self._rlibc.realloc(old, size)
+                kept = min(size, old_size)
+                self.assertEqual(ctypes.string_at(ptr, kept),
+                                 bytes([old_fill]) * kept)
+            else:
+                ptr = self._rlibc.malloc(size)
+
+            self.assertIsNotNone(ptr)
+            self.assertNotIn(ptr, live)
+            ctypes.memset(ptr, fill, size)
+            live[ptr] = (fill, size)
+
+        for ptr in live:
+            check(ptr)
+            self._rlibc.free(ptr)
+
+
+if __name__ == '__main__':
+    unittest.main()
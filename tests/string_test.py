@@ -7,9 +7,21 @@
 
 import ctypes
 import functools
+import random
 import unittest
 
-from rlibc_test import RlibcTest
+from rlibc_test import GuardedBuffer, RlibcTest
+
+SIZE_MAX = 2**(8 * ctypes.sizeof(ctypes.c_size_t)) - 1
+
+
+def _buffer_at(data: bytes, offset: int):
+    """Creates a buffer holding data at an offset from its start.
+
+    Returns the buffer and a pointer to the data.
+    """
+    buf = ctypes.create_string_buffer(b'\0' * offset + data + b'\0' * 8)
+    return buf, ctypes.c_void_p(ctypes.addressof(buf) + offset)
 
 
 class MemchrTest(RlibcTest):
@@ -42,6 +54,31 @@ class MemchrTest(RlibcTest):
         self.assertEqual(self._rlibc.memchr(buf, 0xf0, 0), None)
         self.assertEqual(self._rlibc.memchr(buf, 0x22, 0), None)
 
+    def test_alignments(self):
+        # Search for every position of the byte from every starting offset to
+        # exercise the unaligned head, whole words, and tail of the scan.
+        size = 64
+        buf = ctypes.create_string_buffer(b'\x80' * size, size)
+        base = ctypes.addressof(buf)
+        for pos in range(size):
+            buf[pos] = 0x01
+            for start in range(pos + 1):
+                self.assertEqual(
+                    self._rlibc.memchr(ctypes.c_void_p(base + start), 0x01,
+                                       size - start), base + pos)
+                self.assertEqual(
+                    self._rlibc.memchr(ctypes.c_void_p(base + start), 0x01,
+                                       pos - start), None)
+            buf[pos] = 0x80
+
+    def test_high_bytes(self):
+        # Bytes with the high bit set must not be mistaken for matches.
+        buf = ctypes.create_string_buffer(bytes(range(0x80, 0x100)), 128)
+        for c in range(0x80, 0x100):
+            self.assertEqual(self._rlibc.memchr(buf, c, len(buf)),
+                             ctypes.addressof(buf) + c - 0x80)
+        self.assertEqual(self._rlibc.memchr(buf, 0x7f, len(buf)), None)
+
 
 class MemcmpTest(RlibcTest):
     """Tests the memcmp() function."""
@@ -72,6 +109,54 @@ class MemcmpTest(RlibcTest):
         self.assertEqual(
             self._rlibc.memcmp(b'\x01\x02\x03', b'\x01\x02\x03', 0), 0)
 
+    def test_alignments(self):
+        # Compare at every pair of alignments, with the first difference at
+        # positions throughout the buffers.
+        data = bytes(range(1, 81))
+        for offset1 in range(8):
+            for offset2 in range(8):
+                buf1, s1 = _buffer_at(data, offset1)
+                _, s2 = _buffer_at(data, offset2)
+                self.assertEqual(self._rlibc.memcmp(s1, s2, len(data)), 0)
+
+                for pos in range(0, len(data), 3):
+                    buf1[offset1 + pos] = 0xff
+                    self.assertGreater(self._rlibc.memcmp(s1, s2, len(data)),
+                                       0)
+                    self.assertLess(self._rlibc.memcmp(s2, s1, len(data)), 0)
+                    self.assertEqual(self._rlibc.memcmp(s1, s2, pos), 0)
+                    buf1[offset1 + pos] = data[pos]
+
+
+class RcMemeqTest(RlibcTest):
+    """Tests the rc_memeq() function."""
+
+    def test_equal(self):
+        self.assertTrue(self._rlibc.rc_memeq(b'', b'', 0))
+        self.assertTrue(self._rlibc.rc_memeq(b'\xef', b'\xef', 1))
+        self.assertTrue(self._rlibc.rc_memeq(b'abcdefgh', b'abcdefgi', 7))
+        self.assertTrue(self._rlibc.rc_memeq(b'0' * 1024, b'0' * 1024, 1024))
+
+    def test_not_equal(self):
+        self.assertFalse(self._rlibc.rc_memeq(b'1', b'2', 1))
+        self.assertFalse(self._rlibc.rc_memeq(b'abcdefgh', b'abcdefgi', 8))
+        self.assertFalse(
+            self._rlibc.rc_memeq(b'0' * 1023 + b'1', b'0' * 1024, 1024))
+
+    def test_alignments(self):
+        data = bytes(range(1, 81))
+        for offset1 in range(8):
+            for offset2 in range(8):
+                buf1, s1 = _buffer_at(data, offset1)
+                _, s2 = _buffer_at(data, offset2)
+                self.assertTrue(self._rlibc.rc_memeq(s1, s2, len(data)))
+
+                for pos in range(0, len(data), 3):
+                    buf1[offset1 + pos] = 0xff
+                    self.assertFalse(self._rlibc.rc_memeq(s1, s2, len(data)))
+                    self.assertTrue(self._rlibc.rc_memeq(s1, s2, pos))
+                    buf1[offset1 + pos] = data[pos]
+
 
 class MemcpyTest(RlibcTest):
     """Tests the memcpy() function."""
@@ -94,6 +179,35 @@ class MemcpyTest(RlibcTest):
         self._rlibc.memcpy(dst, src, 0)
         self.assertEqual(dst.value, b'\xff\xff\xff\xff\xff\xff\xff\xff')
 
+    def test_alignments(self):
+        # Copy between every pair of source and destination alignments, with
+        # sizes covering word copies with and without shifting.
+        src = ctypes.create_string_buffer(bytes(range(1, 97)), 96)
+        for src_offset in range(8):
+            for dst_offset in range(8):
+                for size in (0, 1, 7, 8, 15, 16, 17, 31, 32, 33, 63, 80):
+                    dst = ctypes.create_string_buffer(b'\xff' * 96, 96)
+                    self._rlibc.memcpy(
+                        ctypes.c_void_p(ctypes.addressof(dst) + dst_offset),
+                        ctypes.c_void_p(ctypes.addressof(src) + src_offset),
+                        size)
+                    self.assertEqual(
+                        dst.raw, b'\xff' * dst_offset +
+                        src.raw[src_offset:src_offset + size] + b'\xff' *
+                        (96 - dst_offset - size))
+
+    def test_small_sizes(self):
+        # Every size handled inline by overlapping heads and tails.
+        src = ctypes.create_string_buffer(bytes(range(1, 65)), 64)
+        for offset in (0, 1, 3):
+            for size in range(34):
+                dst = ctypes.create_string_buffer(b'\xff' * 64, 64)
+                self._rlibc.memcpy(
+                    ctypes.c_void_p(ctypes.addressof(dst) + offset), src, size)
+                self.assertEqual(
+                    dst.raw, b'\xff' * offset + src.raw[:size] + b'\xff' *
+                    (64 - offset - size))
+
     def test_large_copy(self):
         large_size = 2**22  # 4 MiB
         src = ctypes.create_string_buffer(b'\xaa' * large_size)
@@ -137,6 +251,57 @@ class Memmove(RlibcTest):
             result,
             self._initial[:32] + self._initial[:64] + self._initial[96:])
 
+    def test_overlap_below_offsets(self):
+        # Move by every small distance, from every alignment, across sizes that
+        # cover the unaligned head, unrolled and single word loops, and tail.
+        for distance in range(1, 10):
+            for start in range(8):
+                for size in (1, 3, 4, 7, 15, 16, 17, 33, 64, 100):
+                    buffer = (ctypes.c_byte * 256)(*range(0, 256))
+                    base = ctypes.addressof(buffer)
+                    self._rlibc.memmove(
+                        ctypes.c_void_p(base + start + distance),
+                        ctypes.c_void_p(base + start), size)
+                    expected = (self._initial[:start + distance] +
+                                self._initial[start:start + size] +
+                                self._initial[start + distance + size:])
+                    self.assertEqual(list(buffer), expected)
+
+    def test_overlap_above_offsets(self):
+        # Move down by distances around a vector's width, from every alignment
+        # of a vector, across sizes that cover the unaligned head and tail
+        # stores and the unrolled loop.
+        for distance in (1, 2, 7, 15, 16, 17, 63):
+            for start in range(16):
+                for size in (15, 16, 17, 31, 64, 65, 100, 170):
+                    buffer = (ctypes.c_byte * 256)(*range(0, 256))
+                    base = ctypes.addressof(buffer)
+                    self._rlibc.memmove(
+                        ctypes.c_void_p(base + start),
+                        ctypes.c_void_p(base + start + distance), size)
+                    expected = (self._initial[:start] +
+                                self._initial[start + distance:start +
+                                              distance + size] +
+                                self._initial[start + size:])
+                    self.assertEqual(list(buffer), expected)
+
+    def test_overlap_small_sizes(self):
+        # Small moves load all of the source before storing, in either
+        # direction.
+        for distance in (1, 3, 8, 17):
+            for size in range(34):
+                for down in (False, True):
+                    buffer = (ctypes.c_byte * 256)(*range(0, 256))
+                    base = ctypes.addressof(buffer)
+                    src, dst = 64, 64 + distance
+                    if down:
+                        src, dst = dst, src
+                    self._rlibc.memmove(ctypes.c_void_p(base + dst),
+                                        ctypes.c_void_p(base + src), size)
+                    expected = list(self._initial)
+                    expected[dst:dst + size] = self._initial[src:src + size]
+                    self.assertEqual(list(buffer), expected)
+
     def test_same_pointer(self):
         self._rlibc.memmove(self._buffer, self._buffer, len(self._buffer))
         result = [val for val in self._buffer]
@@ -178,6 +343,28 @@ class MemsetTest(RlibcTest):
         self._rlibc.memset(start, 0, len(buffer) - 5)
         self.assertEqual(buffer.raw, b'\xff' * 5 + b'\x00' * 123)
 
+    def test_alignments(self):
+        for offset in range(16):
+            for size in (0, 1, 15, 16, 17, 31, 63, 64, 65, 100, 200):
+                buffer = ctypes.create_string_buffer(b'\xff' * 256, 256)
+                self._rlibc.memset(
+                    ctypes.c_void_p(ctypes.addressof(buffer) + offset), 0x5a,
+                    size)
+                self.assertEqual(
+                    buffer.raw, b'\xff' * offset + b'\x5a' * size + b'\xff' *
+                    (256 - offset - size))
+
+    def test_small_sizes(self):
+        for offset in (0, 1, 3):
+            for size in range(34):
+                buffer = ctypes.create_string_buffer(b'\xff' * 64, 64)
+                self._rlibc.memset(
+                    ctypes.c_void_p(ctypes.addressof(buffer) + offset), 0x5a,
+                    size)
+                self.assertEqual(
+                    buffer.raw, b'\xff' * offset + b'\x5a' * size + b'\xff' *
+                    (64 - offset - size))
+
 
 class StrcmpTest(RlibcTest):
     """Tests the strcmp() function."""
@@ -199,6 +386,40 @@ class StrcmpTest(RlibcTest):
         self.assertGreater(self._rlibc.strcmp(b'8', b'7'), 0)
         self.assertGreater(self._rlibc.strcmp(b'somebody', b'once'), 0)
 
+    def test_unsigned(self):
+        # Characters compare as unsigned char.
+        self.assertGreater(self._rlibc.strcmp(b'\xff', b'a'), 0)
+        self.assertLess(self._rlibc.strcmp(b'abcdefgh\x7f', b'abcdefgh\x80'),
+                        0)
+
+    def test_alignments(self):
+        data = b'the quick brown fox jumps over the lazy dog'
+        for offset1 in range(8):
+            for offset2 in range(8):
+                buf1, s1 = _buffer_at(data, offset1)
+                _, s2 = _buffer_at(data, offset2)
+                self.assertEqual(self._rlibc.strcmp(s1, s2), 0)
+
+                for pos in range(len(data)):
+                    buf1[offset1 + pos] = data[pos] + 1
+                    self.assertGreater(self._rlibc.strcmp(s1, s2), 0)
+                    self.assertLess(self._rlibc.strcmp(s2, s1), 0)
+                    buf1[offset1 + pos] = 0
+                    self.assertLess(self._rlibc.strcmp(s1, s2), 0)
+                    buf1[offset1 + pos] = data[pos]
+
+    def test_page_boundary(self):
+        # Strings which end right before an unmapped page must not be read
+        # beyond their terminators.
+        data = b'/usr/share/locale/en_US.UTF-8'
+        for length in range(len(data) + 1):
+            guarded = GuardedBuffer(64)
+            s1 = guarded.write(data[:length] + b'\0')
+            for offset in range(8):
+                _, s2 = _buffer_at(data[:length] + b'\0', offset)
+                self.assertEqual(self._rlibc.strcmp(s1, s2), 0)
+                self.assertEqual(self._rlibc.strcmp(s2, s1), 0)
+
     def test_sort(self):
         names = ['Bob', 'Dave', 'Alice', 'Eve', 'Bob', 'Carol']
         key = functools.cmp_to_key(lambda a, b: self._rlibc.strcmp(a, b))
@@ -237,6 +458,37 @@ class StrncmpTest(RlibcTest):
         self.assertGreater(self._rlibc.strncmp(b'b', b'a', 16), 0)
         self.assertGreater(self._rlibc.strncmp(b'somebody', b'once', 4), 0)
 
+    def test_unsigned(self):
+        self.assertGreater(self._rlibc.strncmp(b'\xff', b'a', 1), 0)
+        self.assertLess(
+            self._rlibc.strncmp(b'abcdefgh\x7f', b'abcdefgh\x80', 16), 0)
+
+    def test_alignments(self):
+        data = b'the quick brown fox jumps over the lazy dog'
+        for offset1 in range(8):
+            for offset2 in range(8):
+                buf1, s1 = _buffer_at(data, offset1)
+                _, s2 = _buffer_at(data, offset2)
+
+                for pos in range(0, len(data), 3):
+                    buf1[offset1 + pos] = data[pos] + 1
+                    self.assertEqual(self._rlibc.strncmp(s1, s2, pos), 0)
+                    self.assertGreater(self._rlibc.strncmp(s1, s2, pos + 1),
+                                       0)
+                    self.assertLess(self._rlibc.strncmp(s2, s1, len(data)), 0)
+                    buf1[offset1 + pos] = data[pos]
+
+    def test_page_boundary(self):
+        # Unterminated strings ending right before an unmapped page.
+        data = b'/usr/share/locale/en_US.UTF-8'
+        for length in range(len(data) + 1):
+            guarded = GuardedBuffer(64)
+            s1 = guarded.write(data[:length])
+            for offset in range(8):
+                _, s2 = _buffer_at(data[:length] + b'!', offset)
+                self.assertEqual(self._rlibc.strncmp(s1, s2, length), 0)
+                self.assertEqual(self._rlibc.strncmp(s2, s1, length), 0)
+
     def test_sort(self):
         names = ['Bob', 'Dave', 'Alice', 'Eve', 'Bob', 'Carol']
         key = functools.cmp_to_key(lambda a, b: self._rlibc.strncmp(b, a, 1))
@@ -310,6 +562,11 @@ class StrncpyTest(RlibcTest):
                          b'some')
         self.assertEqual(buf.raw, b'some')  # Not terminated
 
+    def test_long_padding(self):
+        buf = ctypes.create_string_buffer(b'\xff' * 4096, 4096)
+        self._rlibc.strncpy(buf, b'abc', 4000)
+        self.assertEqual(buf.raw, b'abc' + b'\0' * 3997 + b'\xff' * 96)
+
 
 class StrlcpyTest(RlibcTest):
     """Tests the strlcpy() function."""
@@ -362,6 +619,208 @@ class StrlcpyTest(RlibcTest):
         self.assertEqual(buf.raw, b'copy this dat\0')
 
 
+class StpcpyTest(RlibcTest):
+    """Tests the stpcpy() function."""
+
+    def setUp(self):
+        self._rlibc.stpcpy.restype = ctypes.c_void_p
+
+    def test_returns_end(self):
+        buf = ctypes.create_string_buffer(b'junk junk')
+        end = self._rlibc.stpcpy(buf, b'abc')
+        self.assertEqual(end, ctypes.addressof(buf) + 3)
+        self.assertEqual(buf.raw, b'abc\0 junk\0')
+
+    def test_chained(self):
+        buf = ctypes.create_string_buffer(64)
+        end = ctypes.c_void_p(ctypes.addressof(buf))
+        for piece in (b'one', b', ', b'two', b'', b' and three'):
+            end = ctypes.c_void_p(self._rlibc.stpcpy(end, piece))
+        self.assertEqual(buf.value, b'one, two and three')
+        self.assertEqual(end.value, ctypes.addressof(buf) + 18)
+
+    def test_alignments(self):
+        # Copies from and to every offset within a word, over lengths which
+        # cover the bytewise head, whole words and the tail.
+        data = bytes(range(1, 65))
+        for src_offset in range(8):
+            for dst_offset in range(8):
+                for length in range(40):
+                    with self.subTest(src_offset=src_offset,
+                                      dst_offset=dst_offset,
+                                      length=length):
+                        src_buf, src = _buffer_at(data[:length], src_offset)
+                        dst = ctypes.create_string_buffer(b'\xff' * 64, 64)
+                        base = ctypes.addressof(dst)
+                        end = self._rlibc.stpcpy(
+                            ctypes.c_void_p(base + dst_offset), src)
+                        self.assertEqual(end, base + dst_offset + length)
+                        self.assertEqual(
+                            dst.raw,
+                            b'\xff' * dst_offset + data[:length] + b'\0' +
+                            b'\xff' * (63 - dst_offset - length))
+
+    def test_page_boundary(self):
+        guarded = GuardedBuffer(64)
+        dst = ctypes.create_string_buffer(64)
+        for length in range(64):
+            src = guarded.write(b'x' * length + b'\0')
+            self._rlibc.stpcpy(dst, src)
+            self.assertEqual(dst.value, b'x' * length)
+
+
+class StpncpyTest(RlibcTest):
+    """Tests the stpncpy() function."""
+
+    def setUp(self):
+        self._rlibc.stpncpy.restype = ctypes.c_void_p
+
+    def test_padded(self):
+        buf = ctypes.create_string_buffer(b'junk junk')
+        end = self._rlibc.stpncpy(buf, b'ab', 7)
+        self.assertEqual(end, ctypes.addressof(buf) + 2)
+        self.assertEqual(buf.raw, b'ab\0\0\0\0\0nk\0')
+
+    def test_truncated(self):
+        buf = ctypes.create_string_buffer(b'junk junk')
+        end = self._rlibc.stpncpy(buf, b'abcdef', 4)
+        self.assertEqual(end, ctypes.addressof(buf) + 4)
+        self.assertEqual(buf.raw, b'abcd junk\0')
+
+    def test_zero(self):
+        buf = ctypes.create_string_buffer(b'junk')
+        self.assertEqual(self._rlibc.stpncpy(buf, b'abc', 0),
+                         ctypes.addressof(buf))
+        self.assertEqual(buf.raw, b'junk\0')
+
+    def test_long_padding(self):
+        buf = ctypes.create_string_buffer(b'\xff' * 1000, 1000)
+        self._rlibc.stpncpy(buf, b'x' * 100, 1000)
+        self.assertEqual(buf.raw, b'x' * 100 + b'\0' * 900)
+
+
+class StrcatTest(RlibcTest):
+    """Tests the strcat() function."""
+
+    def setUp(self):
+        self._rlibc.strcat.restype = ctypes.c_char_p
+
+    def test_append(self):
+        buf = ctypes.create_string_buffer(b'hello', 32)
+        self.assertEqual(self._rlibc.strcat(buf, b', world'), b'hello, world')
+        self.assertEqual(self._rlibc.strcat(buf, b''), b'hello, world')
+
+    def test_empty_dst(self):
+        buf = ctypes.create_string_buffer(32)
+        self.assertEqual(self._rlibc.strcat(buf, b'abc'), b'abc')
+
+
+class StrncatTest(RlibcTest):
+    """Tests the strncat() function."""
+
+    def setUp(self):
+        self._rlibc.strncat.restype = ctypes.c_char_p
+
+    def test_short_src(self):
+        buf = ctypes.create_string_buffer(b'ab\0xxxxxxx')
+        self.assertEqual(self._rlibc.strncat(buf, b'cd', 5), b'abcd')
+        self.assertEqual(buf.raw, b'abcd\0xxxxx\0')
+
+    def test_limited(self):
+        buf = ctypes.create_string_buffer(b'ab\0xxxxxxx')
+        self.assertEqual(self._rlibc.strncat(buf, b'cdefgh', 3), b'abcde')
+        self.assertEqual(buf.raw, b'abcde\0xxxx\0')
+
+    def test_exact(self):
+        buf = ctypes.create_string_buffer(b'ab\0xxxxxxx')
+        self.assertEqual(self._rlibc.strncat(buf, b'cde', 3), b'abcde')
+        self.assertEqual(buf.raw, b'abcde\0xxxx\0')
+
+    def test_zero(self):
+        buf = ctypes.create_string_buffer(b'ab\0xx')
+        self.assertEqual(self._rlibc.strncat(buf, b'cd', 0), b'ab')
+        self.assertEqual(buf.raw, b'ab\0xx\0')
+
+
+class StrlcatTest(RlibcTest):
+    """Tests the strlcat() function."""
+
+    def setUp(self):
+        self._rlibc.strlcat.restype = ctypes.c_size_t
+
+    def test_fits(self):
+        buf = ctypes.create_string_buffer(b'abc', 10)
+        self.assertEqual(self._rlibc.strlcat(buf, b'def', len(buf)), 6)
+        self.assertEqual(buf.value, b'abcdef')
+
+    def test_truncated(self):
+        buf = ctypes.create_string_buffer(b'abc', 6)
+        self.assertEqual(self._rlibc.strlcat(buf, b'defgh', len(buf)), 8)
+        self.assertEqual(buf.raw, b'abcde\0')
+
+    def test_exact_size(self):
+        buf = ctypes.create_string_buffer(b'abc', 6)
+        self.assertEqual(self._rlibc.strlcat(buf, b'de', len(buf)), 5)
+        self.assertEqual(buf.raw, b'abcde\0')
+
+    def test_full_dst(self):
+        buf = ctypes.create_string_buffer(b'abc', 6)
+        self.assertEqual(self._rlibc.strlcat(buf, b'de', 2), 4)
+        self.assertEqual(buf.raw, b'abc\0\0\0')
+
+    def test_zero(self):
+        buf = ctypes.create_string_buffer(b'abc', 6)
+        self.assertEqual(self._rlibc.strlcat(buf, b'de', 0), 2)
+        self.assertEqual(buf.raw, b'abc\0\0\0')
+
+
+class MempcpyTest(RlibcTest):
+    """Tests the mempcpy() function."""
+
+    def setUp(self):
+        self._rlibc.mempcpy.restype = ctypes.c_void_p
+
+    def test_copy(self):
+        buf = ctypes.create_string_buffer(b'\xff' * 16, 16)
+        self.assertEqual(self._rlibc.mempcpy(buf, b'a\0b\0c', 5),
+                         ctypes.addressof(buf) + 5)
+        self.assertEqual(buf.raw, b'a\0b\0c' + b'\xff' * 11)
+
+    def test_zero(self):
+        buf = ctypes.create_string_buffer(b'junk')
+        self.assertEqual(self._rlibc.mempcpy(buf, b'abc', 0),
+                         ctypes.addressof(buf))
+        self.assertEqual(buf.raw, b'junk\0')
+
+
+class MemccpyTest(RlibcTest):
+    """Tests the memccpy() function."""
+
+    def setUp(self):
+        self._rlibc.memccpy.restype = ctypes.c_void_p
+
+    def test_found(self):
+        buf = ctypes.create_string_buffer(b'\xff' * 16, 16)
+        self.assertEqual(self._rlibc.memccpy(buf, b'key=value', ord('='), 9),
+                         ctypes.addressof(buf) + 4)
+        self.assertEqual(buf.raw, b'key=' + b'\xff' * 12)
+
+    def test_not_found(self):
+        buf = ctypes.create_string_buffer(b'\xff' * 16, 16)
+        self.assertIsNone(self._rlibc.memccpy(buf, b'key=value', ord(':'), 9))
+        self.assertEqual(buf.raw, b'key=value' + b'\xff' * 7)
+
+    def test_beyond_limit(self):
+        buf = ctypes.create_string_buffer(b'\xff' * 16, 16)
+        self.assertIsNone(self._rlibc.memccpy(buf, b'key=value', ord('='), 3))
+        self.assertEqual(buf.raw, b'key' + b'\xff' * 13)
+
+    def test_high_byte(self):
+        buf = ctypes.create_string_buffer(16)
+        self.assertEqual(self._rlibc.memccpy(buf, b'a\xffb', -1, 3),
+                         ctypes.addressof(buf) + 2)
+
+
 class StrerrorTest(RlibcTest):
     """Tests the strerror() function."""
 
@@ -398,6 +857,232 @@ class StrlenTest(RlibcTest):
     def test_null(self):
         self.assertEqual(self._rlibc.strlen(ctypes.c_char_p(0)), 0)
 
+    def test_page_boundary(self):
+        guarded = GuardedBuffer(64)
+        for length in range(64):
+            self.assertEqual(
+                self._rlibc.strlen(guarded.write(b'x' * length + b'\0')),
+                length)
+
+    def test_alignments(self):
+        buf = ctypes.create_string_buffer(b'\xff' * 64)
+        base = ctypes.addressof(buf)
+        for length in range(len(buf) - 16):
+            for start in range(16):
+                buf[start + length] = 0
+                self.assertEqual(
+                    self._rlibc.strlen(ctypes.c_void_p(base + start)), length)
+                buf[start + length] = 0xff
+
+
+class StrchrTest(RlibcTest):
+    """Tests the strchr() function."""
+
+    def setUp(self):
+        self._rlibc.strchr.restype = ctypes.c_void_p
+
+    def _find(self, string: bytes, c: int):
+        buf = ctypes.create_string_buffer(string)
+        result = self._rlibc.strchr(buf, c)
+        return None if result is None else result - ctypes.addressof(buf)
+
+    def test_found(self):
+        self.assertEqual(self._find(b'hello, world', ord('o')), 4)
+        self.assertEqual(self._find(b'hello, world', ord('h')), 0)
+        self.assertEqual(self._find(b'hello, world', ord('d')), 11)
+
+    def test_not_found(self):
+        self.assertIsNone(self._find(b'hello, world', ord('z')))
+        self.assertIsNone(self._find(b'', ord('a')))
+
+    def test_terminator(self):
+        self.assertEqual(self._find(b'hello', 0), 5)
+        self.assertEqual(self._find(b'', 0), 0)
+
+    def test_converted_to_char(self):
+        self.assertEqual(self._find(b'a\xffb', 0xff), 1)
+        self.assertEqual(self._find(b'a\xffb', -1), 1)
+
+    def test_stops_at_terminator(self):
+        buf = ctypes.create_string_buffer(b'abc\0xyz')
+        self.assertIsNone(self._rlibc.strchr(buf, ord('x')))
+
+    def test_page_boundary(self):
+        guarded = GuardedBuffer(64)
+        for length in range(64):
+            ptr = guarded.write(b'x' * length + b'\0')
+            self.assertIsNone(self._rlibc.strchr(ptr, ord('y')))
+            self.assertEqual(self._rlibc.strchr(ptr, 0), ptr.value + length)
+
+
+class StrrchrTest(RlibcTest):
+    """Tests the strrchr() function."""
+
+    def setUp(self):
+        self._rlibc.strrchr.restype = ctypes.c_void_p
+
+    def _find(self, string: bytes, c: int):
+        buf = ctypes.create_string_buffer(string)
+        result = self._rlibc.strrchr(buf, c)
+        return None if result is None else result - ctypes.addressof(buf)
+
+    def test_found(self):
+        self.assertEqual(self._find(b'hello, world', ord('o')), 8)
+        self.assertEqual(self._find(b'hello, world', ord('h')), 0)
+        self.assertEqual(self._find(b'hello, world', ord('d')), 11)
+        self.assertEqual(self._find(b'aaaa', ord('a')), 3)
+
+    def test_not_found(self):
+        self.assertIsNone(self._find(b'hello, world', ord('z')))
+        self.assertIsNone(self._find(b'', ord('a')))
+
+    def test_terminator(self):
+        self.assertEqual(self._find(b'hello', 0), 5)
+        self.assertEqual(self._find(b'', 0), 0)
+
+    def test_converted_to_char(self):
+        self.assertEqual(self._find(b'\xff\xff', -1), 1)
+
+
+def _search_cases(seed: int):
+    """Yields random haystacks and needles from a small alphabet, where
+    partial matches and periodic needles are common.
+    """
+    rng = random.Random(seed)
+    for _ in range(2000):
+        alphabet = b'ab' if rng.random() < 0.5 else b'abc'
+        haystack = bytes(
+            rng.choice(alphabet) for _ in range(rng.randint(0, 64)))
+        if haystack and rng.random() < 0.5:
+            start = rng.randrange(len(haystack))
+            needle = haystack[start:start + rng.randint(1, 12)]
+        else:
+            needle = bytes(
+                rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+        yield haystack, needle
+
+
+class StrstrTest(RlibcTest):
+    """Tests the strstr() function."""
+
+    def setUp(self):
+        self._rlibc.strstr.restype = ctypes.c_void_p
+
+    def _find(self, haystack: bytes, needle: bytes):
+        buf = ctypes.create_string_buffer(haystack)
+        result = self._rlibc.strstr(buf, needle)
+        return None if result is None else result - ctypes.addressof(buf)
+
+    def test_found(self):
+        self.assertEqual(self._find(b'hello, world', b'world'), 7)
+        self.assertEqual(self._find(b'hello, world', b'hello'), 0)
+        self.assertEqual(self._find(b'hello, world', b'o'), 4)
+        self.assertEqual(self._find(b'hello, world', b'o, w'), 4)
+
+    def test_not_found(self):
+        self.assertIsNone(self._find(b'hello, world', b'word'))
+        self.assertIsNone(self._find(b'hello', b'hello!'))
+        self.assertIsNone(self._find(b'', b'a'))
+
+    def test_empty_needle(self):
+        self.assertEqual(self._find(b'hello', b''), 0)
+        self.assertEqual(self._find(b'', b''), 0)
+
+    def test_random(self):
+        for haystack, needle in _search_cases(0):
+            with self.subTest(haystack=haystack, needle=needle):
+                expected = haystack.find(needle)
+                self.assertEqual(self._find(haystack, needle),
+                                 None if expected < 0 else expected)
+
+    def test_pathological(self):
+        # A naive search takes quadratic time on these inputs.
+        haystack = b'a' * 100000
+        self.assertIsNone(self._find(haystack, b'a' * 5000 + b'b'))
+        self.assertIsNone(self._find(haystack, b'b' + b'a' * 5000))
+        self.assertEqual(self._find(haystack + b'b', b'a' * 5000 + b'b'),
+                         100000 - 5000)
+
+    def test_page_boundary(self):
+        guarded = GuardedBuffer(256)
+        for length in range(1, 64):
+            ptr = guarded.write(b'xy' * 32 + b'z' * length + b'\0')
+            self.assertIsNone(self._rlibc.strstr(ptr, b'zzx'))
+            self.assertEqual(self._rlibc.strstr(ptr, b'y' + b'z' * length),
+                             ptr.value + 63)
+
+
+class MemmemTest(RlibcTest):
+    """Tests the memmem() function."""
+
+    def setUp(self):
+        self._rlibc.memmem.restype = ctypes.c_void_p
+
+    def _find(self, haystack: bytes, needle: bytes):
+        result = self._rlibc.memmem(haystack, len(haystack), needle,
+                                    len(needle))
+        return None if result is None else result - ctypes.cast(
+            haystack, ctypes.c_void_p).value
+
+    def test_found(self):
+        self.assertEqual(self._find(b'\0\1\2\0\1\3', b'\0\1\3'), 3)
+        self.assertEqual(self._find(b'\xff\xfe\xff', b'\xff'), 0)
+        self.assertEqual(self._find(b'abcabc', b'abcabc'), 0)
+
+    def test_not_found(self):
+        self.assertIsNone(self._find(b'\0\1\2\0\1\2', b'\0\1\3'))
+        self.assertIsNone(self._find(b'abc', b'abcd'))
+        self.assertIsNone(self._find(b'', b'a'))
+
+    def test_empty_needle(self):
+        self.assertEqual(self._find(b'abc', b''), 0)
+        self.assertEqual(self._find(b'', b''), 0)
+
+    def test_bounded(self):
+        # Bytes beyond the haystack's length must not be matched.
+        buf = ctypes.create_string_buffer(b'abcdef')
+        self.assertIsNone(self._rlibc.memmem(buf, 4, b'de', 2))
+        self.assertEqual(self._rlibc.memmem(buf, 5, b'de', 2),
+                         ctypes.addressof(buf) + 3)
+
+    def test_random(self):
+        for haystack, needle in _search_cases(1):
+            with self.subTest(haystack=haystack, needle=needle):
+                expected = haystack.find(needle)
+                self.assertEqual(self._find(haystack, needle),
+                                 None if expected < 0 else expected)
+
+    def test_long_needle(self):
+        # Needles longer than 255 bytes have their skip distances capped.
+        rng = random.Random(2)
+        haystack = bytes(rng.randrange(256) for _ in range(20000))
+        for start, length in ((0, 300), (5000, 1000), (19000, 1000)):
+            needle = haystack[start:start + length]
+            self.assertEqual(self._find(haystack, needle),
+                             haystack.find(needle))
+
+    def test_two_way(self):
+        # Short inputs are matched without resorting to the Two-Way search, so
+        # it is tested directly.
+        self._rlibc.rc_two_way_search.restype = ctypes.c_void_p
+        for haystack, needle in _search_cases(3):
+            if not 2 <= len(needle) <= len(haystack):
+                continue
+            with self.subTest(haystack=haystack, needle=needle):
+                result = self._rlibc.rc_two_way_search(haystack, len(haystack),
+                                                       needle, len(needle))
+                expected = haystack.find(needle)
+                self.assertEqual(
+                    None if result is None else result -
+                    ctypes.cast(haystack, ctypes.c_void_p).value,
+                    None if expected < 0 else expected)
+
+    def test_pathological(self):
+        haystack = b'ab' * 50000
+        self.assertIsNone(self._find(haystack, b'ab' * 2000 + b'b'))
+        self.assertEqual(self._find(haystack + b'b', b'ab' * 2000 + b'b'),
+                         100000 - 4000)
+
 
 class StrnlenTest(RlibcTest):
     """Tests the strnlen() function."""
@@ -429,6 +1114,15 @@ class StrnlenTest(RlibcTest):
     def test_null(self):
         self.assertEqual(self._rlibc.strnlen(ctypes.c_char_p(0), 128), 0)
 
+    def test_alignments(self):
+        buf = ctypes.create_string_buffer(b'\x01' * 48, 48)
+        base = ctypes.addressof(buf)
+        for start in range(16):
+            for maxlen in range(len(buf) - start + 1):
+                self.assertEqual(
+                    self._rlibc.strnlen(ctypes.c_void_p(base + start), maxlen),
+                    maxlen)
+
 
 class StrrevTest(RlibcTest):
     """Tests the strrev() function."""
@@ -451,5 +1145,167 @@ class StrrevTest(RlibcTest):
         self.assertEqual(self._rlibc.strrev(b''), b'')
 
 
+class RcMemoryVariantTest(RlibcTest):
+    """Tests selection of the memory primitive implementation."""
+
+    # Every variant which any target may provide.
+    VARIANTS = ('byte', 'word', 'erms', 'sse2', 'avx2', 'generic')
+
+    def setUp(self):
+        self._rlibc.rc_memory_variant.restype = ctypes.c_char_p
+        self._rlibc.memchr.restype = ctypes.c_void_p
+
+    def tearDown(self):
+        self._rlibc.rc_memory_init()
+
+    def _supported_variants(self):
+        return [
+            variant for variant in self.VARIANTS
+            if self._rlibc.rc_memory_select(variant.encode()) == 0
+        ]
+
+    def test_init(self):
+        self._rlibc.rc_memory_init()
+        variant = self._rlibc.rc_memory_variant().decode()
+        self.assertIn(variant, self._supported_variants())
+
+    def test_select(self):
+        for variant in self._supported_variants():
+            self.assertEqual(self._rlibc.rc_memory_select(variant.encode()), 0)
+            self.assertEqual(self._rlibc.rc_memory_variant().decode(), variant)
+
+    def test_select_unknown(self):
+        before = self._rlibc.rc_memory_variant()
+        self.assertEqual(self._rlibc.rc_memory_select(b'unknown'), -1)
+        self.assertEqual(self._rlibc.rc_memory_variant(), before)
+
+    def test_primitives(self):
+        # Run each primitive through every supported variant, with sizes on
+        # either side of the word and vector widths and of the threshold for
+        # `rep` strings.
+        data = bytes(range(1, 256)) * 3
+        sizes = (16, 17, 31, 32, 33, 64, 100, 127, 128, 129, 300, 511, 512,
+                 513)
+        length = 600
+
+        for variant in self._supported_variants():
+            self._rlibc.rc_memory_select(variant.encode())
+            for offset in (0, 1, 7, 15, 31):
+                for size in sizes:
+                    with self.subTest(variant=variant, offset=offset,
+                                      size=size):
+                        dst = ctypes.create_string_buffer(b'\xff' * length,
+                                                          length)
+                        base = ctypes.addressof(dst)
+                        self._rlibc.memcpy(ctypes.c_void_p(base + offset),
+                                           data, size)
+                        self.assertEqual(dst.raw[offset:offset + size],
+                                         data[:size])
+                        self.assertEqual(dst.raw[offset + size:],
+                                         b'\xff' * (length - offset - size))
+
+                        self._rlibc.memmove(ctypes.c_void_p(base + offset + 3),
+                                            ctypes.c_void_p(base + offset),
+                                            size)
+                        self.assertEqual(dst.raw[offset + 3:offset + 3 + size],
+                                         data[:size])
+
+                        self._rlibc.memset(ctypes.c_void_p(base + offset), 0,
+                                           size)
+                        self.assertEqual(dst.raw[offset:offset + size],
+                                         b'\0' * size)
+
+                        buf, ptr = _buffer_at(data[:size], offset)
+                        self.assertEqual(
+                            self._rlibc.memchr(ptr, data[size - 1], size),
+                            ptr.value + data.index(data[size - 1]))
+                        self.assertEqual(self._rlibc.strlen(ptr), size)
+
+
+class RcStreamThresholdTest(RlibcTest):
+    """Tests memcpy() and memset() using non-temporal stores."""
+
+    def setUp(self):
+        self._rlibc.rc_memory_set_stream_threshold.restype = ctypes.c_size_t
+        self._rlibc.rc_memory_set_stream_threshold.argtypes = (
+            ctypes.c_size_t, )
+        self._rlibc.mempcpy.restype = ctypes.c_void_p
+
+        # Stream every call, however small, to cover the unaligned head and
+        # tail of the destination.
+        self._previous = self._rlibc.rc_memory_set_stream_threshold(0)
+        if self._previous == SIZE_MAX:
+            self.skipTest('target has no non-temporal stores')
+
+    def tearDown(self):
+        self._rlibc.rc_memory_set_stream_threshold(self._previous)
+
+    def test_set_threshold(self):
+        self.assertEqual(self._rlibc.rc_memory_set_stream_threshold(4096), 0)
+        self.assertEqual(self._rlibc.rc_memory_set_stream_threshold(0), 4096)
+
+    def test_copy(self):
+        src = ctypes.create_string_buffer(bytes(range(1, 256)), 255)
+        for src_offset in (0, 3):
+            for dst_offset in range(16):
+                for size in (0, 1, 7, 8, 15, 16, 17, 63, 64, 65, 127, 200):
+                    dst = ctypes.create_string_buffer(b'\xff' * 255, 255)
+                    self._rlibc.memcpy(
+                        ctypes.c_void_p(ctypes.addressof(dst) + dst_offset),
+                        ctypes.c_void_p(ctypes.addressof(src) + src_offset),
+                        size)
+                    self.assertEqual(
+                        dst.raw, b'\xff' * dst_offset +
+                        src.raw[src_offset:src_offset + size] + b'\xff' *
+                        (255 - dst_offset - size))
+
+    def test_mempcpy(self):
+        src = ctypes.create_string_buffer(b'\xaa' * 100)
+        dst = ctypes.create_string_buffer(100)
+        self.assertEqual(self._rlibc.mempcpy(dst, src, 100),
+                         ctypes.addressof(dst) + 100)
+        self.assertEqual(dst.raw, src.raw[:100])
+
+    def test_set(self):
+        for offset in range(16):
+            for size in (0, 1, 15, 16, 17, 63, 64, 65, 100, 200):
+                buffer = ctypes.create_string_buffer(b'\xff' * 256, 256)
+                self._rlibc.memset(
+                    ctypes.c_void_p(ctypes.addressof(buffer) + offset), 0x5a,
+                    size)
+                self.assertEqual(
+                    buffer.raw, b'\xff' * offset + b'\x5a' * size + b'\xff' *
+                    (256 - offset - size))
+
+
+class RcPageTest(RlibcTest):
+    """Tests the rc_copy_page() and rc_zero_page() functions."""
+
+    PAGE_SIZE = 4096
+
+    def setUp(self):
+        if not hasattr(self._rlibc, 'rc_copy_page'):
+            self.skipTest('target has no fixed page size')
+
+    def test_copy_page(self):
+        data = bytes(range(256)) * (self.PAGE_SIZE // 256)
+        src = GuardedBuffer(self.PAGE_SIZE)
+        dst = GuardedBuffer(self.PAGE_SIZE)
+        src_ptr = src.write(data)
+        dst_ptr = dst.write(b'\xff' * self.PAGE_SIZE)
+        self.assertEqual(dst_ptr.value % self.PAGE_SIZE, 0)
+
+        self._rlibc.rc_copy_page(dst_ptr, src_ptr)
+        self.assertEqual(ctypes.string_at(dst_ptr, self.PAGE_SIZE), data)
+
+    def test_zero_page(self):
+        page = GuardedBuffer(self.PAGE_SIZE)
+        ptr = page.write(b'\xff' * self.PAGE_SIZE)
+
+        self._rlibc.rc_zero_page(ptr)
+        self.assertEqual(ctypes.string_at(ptr, self.PAGE_SIZE),
+                         b'\0' * self.PAGE_SIZE)
+
+
 if __name__ == '__main__':
     unittest.main()